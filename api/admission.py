@@ -0,0 +1,103 @@
+"""
+Admission control for the API: bounded in-flight requests per route group.
+
+Each worker admits a limited number of concurrent requests per group and
+lets a few more wait briefly. When a group's queue is full, or a request
+has waited ADMISSION_QUEUE_TIMEOUT seconds, the request is answered at
+once with 503 and Retry-After instead of piling up in the thread pool and
+the driver's connection queue.
+
+Limits are "in_flight,queue" per worker, e.g. ADMISSION_LOOKUPS=24,48.
+The default in-flight limits add up to 40, the size of the thread pool
+that runs the sync endpoints.
+"""
+
+import json
+import os
+from functools import partial
+from database import metrics
+from admission_control import AdmissionLimiter, RouteGroups, parse_limits
+
+# 0 = admit every request
+ADMISSION = os.getenv("ADMISSION", "1") == "1"
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "1.0"))
+RETRY_AFTER = os.getenv("ADMISSION_RETRY_AFTER", "1")
+
+# (group, pattern on "METHOD /path", default (in_flight, queue)), first
+# match wins. Paths outside /api (health, metrics, docs) are not limited.
+ROUTE_GROUPS = (
+    # Bulk results, route geometry and density, graph traversals
+    (
+        "exports",
+        r"^POST /api/routes/(stops|competition)$"
+        r"|^GET /api/routes/(airline/|geometry|density)"
+        r"|/reachable$",
+        (4, 8),
+    ),
+    # Paginated lists and route searches
+    (
+        "listings",
+        r"^GET /api/routes/|^GET /api/\w+/$|/country/|/centrality$|/routes$",
+        (12, 24),
+    ),
+    # Single airports, airlines and their precomputed stats
+    ("lookups", r"^GET /api/", (24, 48)),
+)
+
+
+def build_route_groups() -> RouteGroups:
+    """Create this worker's limiters from ROUTE_GROUPS and the environment"""
+    groups = []
+    for name, pattern, default in ROUTE_GROUPS:
+        limit, queue = parse_limits(os.getenv(f"ADMISSION_{name.upper()}"), default)
+        limiter = AdmissionLimiter(name, limit, queue, ADMISSION_QUEUE_TIMEOUT)
+        for gauge in ("in_flight", "queue_depth"):
+            metrics.register_gauge(
+                f"admission_{gauge}_{name}", partial(getattr, limiter, gauge)
+            )
+        groups.append((name, pattern, limiter))
+    return RouteGroups(groups)
+
+
+class AdmissionMiddleware:
+    """ASGI middleware that admits, queues or sheds each HTTP request"""
+
+    def __init__(self, app, groups: RouteGroups = None):
+        self.app = app
+        self.groups = groups or build_route_groups()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not ADMISSION:
+            await self.app(scope, receive, send)
+            return
+
+        group = self.groups.match(scope["method"], scope["path"])
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await group.limiter.acquire():
+            metrics.increment(f"admission_shed_{group.name}")
+            await self.shed(send, group.name)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            group.limiter.release()
+
+    async def shed(self, send, group: str):
+        body = json.dumps(
+            {"detail": f"Server busy ({group}), retry in {RETRY_AFTER}s"}
+        ).encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("ascii")),
+                    (b"retry-after", RETRY_AFTER.encode("ascii")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
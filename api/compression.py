@@ -0,0 +1,94 @@
+"""
+Response compression negotiated through Accept-Encoding.
+
+Responses of at least COMPRESSION_MIN_BYTES are compressed with the best
+encoding the client accepts (see response_compression.negotiate). Every
+compressed payload is kept in a per-worker LRU keyed by a digest of the
+uncompressed body, so repeated responses (a hot airport's routes) are
+served precompressed. Large bodies are compressed in the thread pool to
+keep the event loop free.
+
+Each compressed response carries "Server-Timing: compress;dur=<ms>" with
+the compression CPU time (0 when served from the cache); the benchmark
+reads it together with Content-Length.
+"""
+
+import os
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from database import metrics
+from response_compression import CompressedCache, negotiate
+
+# 0 = never compress
+COMPRESSION = os.getenv("COMPRESSION", "1") == "1"
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+COMPRESSION_CACHE_MB = int(os.getenv("COMPRESSION_CACHE_MB", "64"))
+
+# Bodies at least this large are compressed off the event loop
+THREADPOOL_MIN_BYTES = 64 * 1024
+
+cache = CompressedCache(COMPRESSION_CACHE_MB * 1024 * 1024)
+metrics.register_gauge("compression_cache_bytes", lambda: cache.size)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing complete, uncompressed response bodies"""
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not COMPRESSION:
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            body = message.get("body", b"")
+            headers = Headers(raw=start_message["headers"])
+            if (
+                message.get("more_body")
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or headers.get("content-type", "").startswith("image/")
+            ):
+                # Streamed, small, already encoded or an image: send as it is
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            if len(body) >= THREADPOOL_MIN_BYTES:
+                compressed, cpu_ms, hit = await run_in_threadpool(
+                    cache.compress, encoding, body
+                )
+            else:
+                compressed, cpu_ms, hit = cache.compress(encoding, body)
+            metrics.increment("response_bytes_uncompressed", len(body))
+            metrics.increment("response_bytes_sent", len(compressed))
+            metrics.increment("compression_cache_hits" if hit else "compressions")
+
+            response_headers = MutableHeaders(raw=start_message["headers"])
+            response_headers["content-encoding"] = encoding
+            response_headers["content-length"] = str(len(compressed))
+            response_headers.add_vary_header("Accept-Encoding")
+            response_headers.append("server-timing", f"compress;dur={cpu_ms:.3f}")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,24 +1,153 @@
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, RoutingControl
+import asyncio
 import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
 from dotenv import load_dotenv
 
+# Add the shared helper directory to path for query instrumentation
+HELPER_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "database", "helper"
+)
+sys.path.insert(0, HELPER_DIR)
+from query_metrics import metrics, profile_query
+from single_flight import SingleFlight, flight_key
+
 # Load environment variables from .env file
 load_dotenv()
 
 NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
 NEO4J_USERNAME = os.getenv("NEO4J_USERNAME", "neo4j")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "airfacts-pw")
+NEO4J_DATABASE = os.getenv("NEO4J_DATABASE") or None
+
+# Share one in-flight query between identical concurrent calls (0 = off)
+COALESCE_QUERIES = os.getenv("COALESCE_QUERIES", "1") == "1"
+
+_driver = None
+_driver_pid = None
+_driver_lock = threading.Lock()
+_flight = SingleFlight()
+
+
+def get_driver():
+    """
+    Return this process's driver, creating it on first use.
+
+    The driver is never created at import time: under gunicorn the app is
+    imported once in the master and then forked, and a connection pool must
+    not be shared between processes. A process that finds a driver created
+    by its parent drops it and creates its own.
+    """
+    global _driver, _driver_pid
+    if _driver is None or _driver_pid != os.getpid():
+        with _driver_lock:
+            if _driver is None or _driver_pid != os.getpid():
+                _driver = GraphDatabase.driver(
+                    NEO4J_URI, auth=(NEO4J_USERNAME, NEO4J_PASSWORD)
+                )
+                _driver_pid = os.getpid()
+    return _driver
+
+
+def reset_driver():
+    """
+    Forget the driver without closing it (after fork, the parent owns its sockets)
+    """
+    global _driver, _driver_pid
+    _driver = None
+    _driver_pid = None
 
-driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USERNAME, NEO4J_PASSWORD))
 
 def get_db_session():
     """
     Return a new session to the database
     """
-    return driver.session()
+    return get_driver().session()
+
+
+def run_query(
+    query: str, name: Optional[str] = None, **parameters: Any
+) -> List[Dict[str, Any]]:
+    """
+    Run a read query and return its rows as dictionaries.
+
+    The query is timed and recorded in the shared metrics registry under
+    `name`, by default the name of the calling function; endpoints pass
+    their own name. Identical concurrent calls (same name, query and
+    parameters) share one database query; each caller gets its own copy of
+    the rows.
+    """
+    name = name or sys._getframe(1).f_code.co_name
+    if not COALESCE_QUERIES:
+        return _execute(name, query, parameters)
+
+    rows, shared = _flight.do(
+        flight_key(name, query, params=parameters),
+        lambda: _execute(name, query, parameters),
+    )
+    return _rows_for_caller(rows, shared)
+
+
+async def run_query_async(
+    query: str, name: Optional[str] = None, **parameters: Any
+) -> List[Dict[str, Any]]:
+    """
+    Async variant of run_query() for async endpoints.
+
+    The query runs in the default thread pool, and coroutines waiting for an
+    identical query share its result without holding a thread each.
+    """
+    name = name or sys._getframe(1).f_code.co_name
+    if not COALESCE_QUERIES:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, _execute, name, query, parameters
+        )
+
+    rows, shared = await _flight.do_async(
+        flight_key(name, query, params=parameters),
+        lambda: _execute(name, query, parameters),
+    )
+    return _rows_for_caller(rows, shared)
+
+
+def _execute(name: str, query: str, parameters: Dict[str, Any]) -> List[Dict[str, Any]]:
+    start = time.perf_counter()
+    try:
+        records, summary, keys = get_driver().execute_query(
+            profile_query(query),
+            parameters,
+            routing_=RoutingControl.READ,
+            database_=NEO4J_DATABASE,
+        )
+    except Exception:
+        wall_ms = (time.perf_counter() - start) * 1000
+        metrics.record(name, wall_ms, error=True, query=query, parameters=parameters)
+        raise
+
+    rows = [dict(zip(keys, record)) for record in records]
+    wall_ms = (time.perf_counter() - start) * 1000
+    metrics.record(
+        name, wall_ms, len(rows), summary, query=query, parameters=parameters
+    )
+    return rows
+
+
+def _rows_for_caller(rows: List[Dict[str, Any]], shared: bool) -> List[Dict[str, Any]]:
+    if not shared:
+        return rows
+    # Endpoints may modify their rows, so waiters get their own copies
+    metrics.increment("coalesced_requests")
+    return [dict(row) for row in rows]
+
 
 def close_db():
     """
     Close the database connection
     """
-    driver.close()
+    global _driver
+    if _driver is not None and _driver_pid == os.getpid():
+        _driver.close()
+    _driver = None
@@ -0,0 +1,68 @@
+import os
+import threading
+import time
+from typing import Optional
+from database import NEO4J_DATABASE, get_driver, metrics
+from graph_snapshot import SNAPSHOT_PATH, load_route_graph
+from route_graph import RouteGraph
+
+# Seconds before the graph is reloaded (0 = never). A graph from the
+# snapshot file is also reloaded whenever the loader replaces or removes the
+# file; the reload checks the snapshot against Neo4j again.
+ROUTE_GRAPH_TTL = float(os.getenv("ROUTE_GRAPH_TTL", "3600"))
+
+_graph: Optional[RouteGraph] = None
+_snapshot_mtime: Optional[float] = None
+_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+def get_route_graph() -> RouteGraph:
+    """
+    Return the cached CSR route graph, loading it on first use.
+
+    The graph is memory-mapped from the loader's snapshot when it matches
+    the database, so all worker processes share a single page-cached copy;
+    otherwise it is read from Neo4j. Either is kept for ROUTE_GRAPH_TTL
+    seconds.
+    """
+    global _graph, _snapshot_mtime, _loaded_at
+    snapshot_mtime = _current_snapshot_mtime()
+    if _graph is not None and not _stale(snapshot_mtime):
+        return _graph
+
+    with _lock:
+        # Another request may have loaded the graph while we waited
+        if _graph is None or _stale(snapshot_mtime):
+            start = time.perf_counter()
+            _graph = load_route_graph(get_driver(), NEO4J_DATABASE)
+            _snapshot_mtime = snapshot_mtime
+            _loaded_at = time.monotonic()
+            metrics.record(
+                "load_route_graph",
+                (time.perf_counter() - start) * 1000,
+                _graph.num_routes,
+            )
+        return _graph
+
+
+def invalidate_route_graph():
+    """
+    Drop the cached graph so the next request reloads it
+    """
+    global _graph
+    with _lock:
+        _graph = None
+
+
+def _current_snapshot_mtime() -> Optional[float]:
+    try:
+        return os.path.getmtime(SNAPSHOT_PATH)
+    except OSError:
+        return None
+
+
+def _stale(snapshot_mtime: Optional[float]) -> bool:
+    if snapshot_mtime != _snapshot_mtime:
+        return True
+    return ROUTE_GRAPH_TTL > 0 and time.monotonic() - _loaded_at > ROUTE_GRAPH_TTL
@@ -0,0 +1,70 @@
+"""
+Gunicorn settings for serving the API on every core of a node.
+
+    cd api && gunicorn -c gunicorn.conf.py main:app
+
+The app is imported once in the master and forked (preload_app), so the
+NumPy/SciPy imports are shared copy-on-write. Each worker then creates its
+own Neo4j driver on first use and warms up (see warmup.py) before it
+accepts connections. The graph snapshot and stops matrix are memory-mapped
+read-only, so all workers share one copy through the page cache. On
+SIGTERM, workers stop accepting connections and get GRACEFUL_TIMEOUT
+seconds to finish in-flight requests.
+
+Every worker keeps its own query metrics, admission gauges and compression
+counters. Workers publish them to METRICS_DIR, which is emptied when the
+server starts, and GET /metrics returns the sum over all workers.
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+bind = os.getenv(
+    "API_BIND", f"{os.getenv('API_HOST', '0.0.0.0')}:{os.getenv('API_PORT', '8000')}"
+)
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+# Seconds a worker may take to warm up or answer before it is restarted
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+
+# Recycle workers now and then, with jitter so they do not restart together
+max_requests = int(os.getenv("MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.getenv("ACCESS_LOG", "-") or None
+
+# Set before the app is imported so that query_metrics picks it up
+metrics_dir = os.environ.setdefault(
+    "METRICS_DIR",
+    os.path.join(tempfile.gettempdir(), f"airfacts-metrics-{os.getpid()}"),
+)
+
+
+def on_starting(server):
+    # Counts of a previous server must not be added to this one's
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir)
+
+
+def post_fork(server, worker):
+    # A driver inherited from the master shares its sockets; never reuse it
+    from database import reset_driver
+
+    reset_driver()
+
+
+def worker_exit(server, worker):
+    # Publish the final counts so they survive the worker being recycled
+    from database import metrics
+
+    metrics.publish(metrics_dir)
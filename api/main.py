@@ -1,7 +1,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routers import airports, airlines, routes
-from database import close_db
+from fastapi.responses import JSONResponse, PlainTextResponse
+from admission import AdmissionMiddleware
+from compression import CompressionMiddleware
+from routers import aircraft, airports, airlines, markets, routes
+from database import close_db, metrics
+from query_metrics import METRICS_DIR, merge_states, read_states, render_prometheus
+import os
+import warmup
 
 app = FastAPI(
     title="Airfacts API",
@@ -29,6 +35,10 @@ origins = [
     # "https://airfacts-api.onrender.com",
 ]
 
+# Shed load per route group before requests queue up (see admission.py).
+# Added first so CORS headers are also set on its 503 responses.
+app.add_middleware(AdmissionMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,  # Allowed origins
@@ -37,10 +47,15 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+# Compress responses per Accept-Encoding, reusing cached payloads (outermost)
+app.add_middleware(CompressionMiddleware)
+
 # Include routers
 app.include_router(airports.router, prefix="/api/airports", tags=["Airports"])
 app.include_router(airlines.router, prefix="/api/airlines", tags=["Airlines"])
 app.include_router(routes.router, prefix="/api/routes", tags=["Routes"])
+app.include_router(aircraft.router, prefix="/api/aircraft", tags=["Aircraft"])
+app.include_router(markets.router, prefix="/api/markets", tags=["Markets"])
 
 
 @app.get("/")
@@ -48,6 +63,39 @@ async def root():
     return {"message": "Welcome to Airfacts!"}
 
 
+@app.get("/health", include_in_schema=False)
+def health():
+    """Readiness of this worker: 503 until its warm-up has finished"""
+    ready = warmup.is_ready()
+    return JSONResponse(
+        {"status": "ok" if ready else "warming up", "pid": os.getpid()},
+        status_code=200 if ready else 503,
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """
+    Query timings and counters in the Prometheus text format, summed over
+    every worker when METRICS_DIR is set
+    """
+    if METRICS_DIR:
+        metrics.publish(METRICS_DIR)
+        text = render_prometheus(merge_states(read_states(METRICS_DIR)))
+    else:
+        text = metrics.render_prometheus()
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+
+@app.on_event("startup")
+def startup():
+    # Runs in every worker before it accepts connections
+    warmup.warm_up()
+    if METRICS_DIR:
+        metrics.start_publishing(METRICS_DIR)
+
+
 @app.on_event("shutdown")
 def shutdown():
+    # In-flight requests have been drained by now
     close_db()
@@ -0,0 +1,93 @@
+"""
+fields= projection for the airport, airline and route endpoints.
+
+A client passes e.g. ?fields=IATA,Latitude,Longitude. The names are checked
+against the detail schema of the resource in schemas.py and compiled into
+the query's RETURN clause (see field_projection.py). A projected response
+holds only the requested keys, so it is returned as it is instead of
+through the endpoint's response_model, whose required fields it may lack.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import HTTPException, Query
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from field_projection import parse_fields, quote, return_items, with_return
+from schemas import AirlineDetail, AirportDetail, RouteDetail
+
+FIELDS_QUERY = Query(
+    default=None,
+    description="Comma-separated fields to return, e.g. IATA,Latitude,Longitude",
+)
+
+
+def node_columns(model: BaseModel, variable: str) -> Dict[str, str]:
+    """Map every field of a node schema to the node property of the same name"""
+    return {
+        field.alias: f"{variable}.{quote(field.alias)}"
+        for field in model.__fields__.values()
+    }
+
+
+AIRPORT_COLUMNS = node_columns(AirportDetail, "a")
+AIRLINE_COLUMNS = node_columns(AirlineDetail, "a")
+ROUTE_COLUMNS = {
+    "source": "a.IATA",
+    "destination": "b.IATA",
+    "airline": "r.Airline",
+    "distance": "r.Distance",
+    "stops": "r.Stops",
+    "equipment": "r.Equipment",
+    "codeshare": "r.Codeshare",
+    "operated_by": "r.OperatedBy",
+}
+
+
+def accepted_names(model: BaseModel) -> Dict[str, str]:
+    """Accept both the output key (alias) and the attribute name of a field"""
+    names = {}
+    for name, field in model.__fields__.items():
+        names[name] = field.alias
+        names[field.alias] = field.alias
+    return names
+
+
+RESOURCES = {
+    "airport": (AIRPORT_COLUMNS, accepted_names(AirportDetail)),
+    "airline": (AIRLINE_COLUMNS, accepted_names(AirlineDetail)),
+    "route": (ROUTE_COLUMNS, accepted_names(RouteDetail)),
+}
+
+
+def project(
+    query: str, resource: str, fields: Optional[str]
+) -> Tuple[str, Optional[List[str]]]:
+    """
+    Narrow a query's RETURN clause to the requested fields.
+
+    Args:
+        query: The endpoint's full query
+        resource: airport, airline or route
+        fields: The fields= parameter (None returns the query unchanged)
+
+    Returns:
+        (query, keys): keys is None when no projection was requested
+
+    Raises:
+        HTTPException: 400 for unknown fields
+    """
+    columns, accepted = RESOURCES[resource]
+    try:
+        keys = parse_fields(fields, accepted)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if keys is None:
+        return query, None
+    return with_return(query, return_items(columns, keys)), keys
+
+
+def projected(rows: Any, keys: Optional[List[str]]):
+    """Return projected rows as they are, bypassing the response model"""
+    if keys is None:
+        return rows
+    return JSONResponse(rows)
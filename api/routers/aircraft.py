@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Query
+from database import run_query
+from schemas import AircraftType, RouteDetail
+from typing import List
+
+router = APIRouter()
+
+
+# Return aircraft types by number of routes
+@router.get("/", response_model=List[AircraftType])
+def get_top_aircraft_types(limit: int = Query(default=20, ge=1, le=500)):
+    """
+    Returns aircraft types ordered by the number of routes flown with them.
+    Counts are precomputed by the loader's fleet summary.
+
+    Args:
+        limit (int): Maximum number of aircraft types to return
+    """
+    query = """
+    MATCH (ac:Aircraft)
+    WHERE ac.RouteCount > 0
+    RETURN ac.Code AS Code, ac.RouteCount AS Routes, ac.AirlineCount AS Airlines
+    ORDER BY Routes DESC, Code
+    LIMIT $limit
+    """
+    return run_query(query, limit=limit, name="get_top_aircraft_types")
+
+
+# Return routes flown with an aircraft type
+@router.get("/{code}/routes", response_model=List[RouteDetail])
+def get_routes_by_aircraft(
+    code: str,
+    limit: int = Query(default=50, ge=1, le=1000),
+    include_codeshare: bool = Query(default=True),
+):
+    """
+    Returns routes flown with an aircraft type. Converts the code to uppercase.
+
+    Args:
+        code (str): IATA aircraft type code, e.g. 738
+        limit (int): Maximum number of routes to return
+        include_codeshare (bool): Include codeshare routes (default: true)
+    """
+    # EquipmentKey is the padded equipment list, so " 738 " never matches "7380"
+    query = """
+    MATCH (a:Airport)-[r:ROUTE]->(b:Airport)
+    WHERE r.EquipmentKey CONTAINS $key AND ($include_codeshare OR r.Operated)
+    RETURN a.IATA AS source, b.IATA AS destination, r.Airline AS airline,
+           r.Distance AS distance, r.Stops AS stops,
+           r.Equipment AS equipment, r.Codeshare AS codeshare,
+           r.OperatedBy AS operated_by
+    LIMIT $limit
+    """
+    return run_query(
+        query,
+        key=f" {code.strip().upper()} ",
+        limit=limit,
+        include_codeshare=include_codeshare,
+        name="get_routes_by_aircraft",
+    )
@@ -1,7 +1,16 @@
 from fastapi import APIRouter, HTTPException, Query
-from database import get_db_session
-from schemas import AirlineBase, AirlineDetail, ErrorResponse
-from typing import List
+from database import run_query  # puts database/helper on sys.path
+from competition_matrix import load_competition_matrix
+from projection import FIELDS_QUERY, project, projected
+from schemas import (
+    AirlineBase,
+    AirlineCompetition,
+    AirlineDetail,
+    AirlineStats,
+    ErrorResponse,
+    FleetEntry,
+)
+from typing import List, Optional
 
 router = APIRouter()
 
@@ -9,7 +18,9 @@ router = APIRouter()
 # Return all airlines
 @router.get("/", response_model=List[AirlineBase])
 def get_all_airlines(
-    limit: int = Query(default=50, ge=1), skip: int = Query(default=0, ge=0)
+    limit: int = Query(default=50, ge=1),
+    skip: int = Query(default=0, ge=0),
+    fields: Optional[str] = FIELDS_QUERY,
 ):
     """
     Returns all airlines in the database.
@@ -17,28 +28,32 @@ def get_all_airlines(
     Args:
         limit (int): Maximum number of airlines to return
         skip (int): Number of airlines to skip
+        fields (str): Comma-separated fields to return (default: all)
     """
+    # plan-check: allow NodeByLabelScan (paginated listing)
     query = """
     MATCH (a:Airline)
     RETURN a.IATA AS IATA, a.Name AS Name, a.Country AS Country
     SKIP $skip
     LIMIT $limit
     """
-    with get_db_session() as session:
-        result = session.run(query, skip=skip, limit=limit)
-        return [record.data() for record in result]
+    query, keys = project(query, "airline", fields)
+    return projected(
+        run_query(query, skip=skip, limit=limit, name="get_all_airlines"), keys
+    )
 
 
 # Return airline by IATA
 @router.get(
     "/{iata}", response_model=AirlineDetail, responses={404: {"model": ErrorResponse}}
 )
-def get_airline_by_iata(iata: str):
+def get_airline_by_iata(iata: str, fields: Optional[str] = FIELDS_QUERY):
     """
     Returns an airline by IATA code. Converts IATA code to uppercase.
 
     Args:
         iata (str): IATA code of the airline
+        fields (str): Comma-separated fields to return (default: all)
     """
     iata = iata.upper()
     query = """
@@ -47,22 +62,125 @@ def get_airline_by_iata(iata: str):
            a.ICAO AS ICAO, a.Callsign AS Callsign, a.Alias AS Alias,
            a.Active AS Active
     """
-    with get_db_session() as session:
-        result = session.run(query, iata=iata).single()
-        if not result:
-            raise HTTPException(status_code=404, detail="Airline not found")
-        return result.data()
+    query, keys = project(query, "airline", fields)
+    rows = run_query(query, iata=iata, name="get_airline_by_iata")
+    if not rows:
+        raise HTTPException(status_code=404, detail="Airline not found")
+    return projected(rows[0], keys)
+
+
+# Return route statistics of an airline
+@router.get(
+    "/{iata}/stats",
+    response_model=AirlineStats,
+    responses={404: {"model": ErrorResponse}},
+)
+def get_airline_stats(iata: str, include_codeshare: bool = Query(default=True)):
+    """
+    Returns route statistics of an airline. The statistics are precomputed
+    on the Airline node by the loader, so this is a single indexed lookup.
+    Without codeshares they cover only the routes the airline flies itself
+    (the Operated* properties).
+
+    Args:
+        iata (str): IATA code of the airline
+        include_codeshare (bool): Include codeshare routes (default: true)
+    """
+    iata = iata.upper()
+    prefix = "" if include_codeshare else "Operated"
+    query = f"""
+    MATCH (a:Airline {{IATA: $iata}})
+    RETURN a.IATA AS IATA, a.Name AS Name, a.Country AS Country,
+           coalesce(a.{prefix}RouteCount, 0) AS Routes,
+           a.{prefix}MinDistance AS MinDistance,
+           a.{prefix}AvgDistance AS AvgDistance,
+           a.{prefix}MaxDistance AS MaxDistance,
+           coalesce(a.{prefix}AirportsFrom, 0) AS AirportsFrom,
+           coalesce(a.{prefix}AirportsTo, 0) AS AirportsTo,
+           coalesce(a.{prefix}AirportsServed, 0) AS AirportsServed
+    """
+    rows = run_query(query, iata=iata, name="get_airline_stats")
+    if not rows:
+        raise HTTPException(status_code=404, detail="Airline not found")
+    return rows[0]
+
+
+# Return fleet mix of an airline
+@router.get(
+    "/{iata}/fleet",
+    response_model=List[FleetEntry],
+    responses={404: {"model": ErrorResponse}},
+)
+def get_airline_fleet(iata: str):
+    """
+    Returns the aircraft types an airline flies, by number of routes.
+    Uses the fleet summary precomputed by the loader.
+
+    Args:
+        iata (str): IATA code of the airline
+    """
+    iata = iata.upper()
+    query = """
+    MATCH (al:Airline {IATA: $iata})
+    OPTIONAL MATCH (al)-[f:FLIES]->(ac:Aircraft)
+    RETURN ac.Code AS Code, f.Routes AS Routes,
+           toFloat(f.Routes) / al.FleetRoutes AS Share
+    ORDER BY Routes DESC, Code
+    """
+    rows = run_query(query, iata=iata, name="get_airline_fleet")
+    if not rows:
+        raise HTTPException(status_code=404, detail="Airline not found")
+    return [row for row in rows if row["Code"] is not None]
+
+
+# Return an airline's market mix and overlap with competitors
+@router.get(
+    "/{iata}/competition",
+    response_model=AirlineCompetition,
+    responses={404: {"model": ErrorResponse}, 503: {"model": ErrorResponse}},
+)
+def get_airline_competition(
+    iata: str,
+    limit: int = Query(default=20, ge=1, le=500),
+    include_codeshare: bool = Query(default=True),
+):
+    """
+    Returns how many of an airline's airport pairs are monopolies, duopolies
+    or competitive, and the airlines it shares the most pairs with. Read
+    from the precomputed competition matrix.
+
+    Args:
+        iata (str): IATA code of the airline
+        limit (int): Maximum number of competitors to return
+        include_codeshare (bool): Count pairs and airlines that only sell a
+            pair as a codeshare (default: true)
+    """
+    matrix = load_competition_matrix(include_codeshare=include_codeshare)
+    if matrix is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Competition matrix has not been built, run `make competition`",
+        )
+    overlap = matrix.airline_overlap(iata.upper(), limit=limit)
+    if overlap is None:
+        raise HTTPException(status_code=404, detail="Airline has no routes")
+    return overlap
 
 
 # Return airline by country
 @router.get("/country/{country}", response_model=List[AirlineBase])
-def get_airlines_by_country(country: str, limit: int = Query(default=50, ge=1)):
+def get_airlines_by_country(
+    country: str,
+    limit: int = Query(default=50, ge=1),
+    fields: Optional[str] = FIELDS_QUERY,
+):
     """
     Returns all airlines in a country. Capitalizes country name.
 
     Args:
         country (str): Country name
         limit (int): Maximum number of airlines to return
+        fields (str): Comma-separated fields to return (default: all)
     """
     country = country.capitalize()
     query = """
@@ -70,6 +188,8 @@ def get_airlines_by_country(country: str, limit: int = Query(default=50, ge=1)):
     RETURN a.IATA AS IATA, a.Name AS Name, a.Country AS Country
     LIMIT $limit
     """
-    with get_db_session() as session:
-        result = session.run(query, country=country, limit=limit)
-        return [record.data() for record in result]
+    query, keys = project(query, "airline", fields)
+    return projected(
+        run_query(query, country=country, limit=limit, name="get_airlines_by_country"),
+        keys,
+    )
@@ -1,15 +1,35 @@
 from fastapi import APIRouter, HTTPException, Query
-from database import get_db_session
-from schemas import AirportBase, AirportDetail, ErrorResponse
-from typing import List
+import numpy as np
+from database import run_query
+from graph_cache import get_route_graph
+from projection import FIELDS_QUERY, project, projected
+from route_graph import reachable
+from schemas import (
+    AirportBase,
+    AirportCentrality,
+    AirportDetail,
+    ErrorResponse,
+    ReachableAirport,
+)
+from typing import List, Optional
 
 router = APIRouter()
 
+# Centrality metric names accepted by the API and the Airport property behind each
+CENTRALITY_METRICS = {
+    "pagerank": "PageRank",
+    "betweenness": "Betweenness",
+    "degree_in": "DegreeIn",
+    "degree_out": "DegreeOut",
+}
+
 
 # Return all airports (default limit 50)
 @router.get("/", response_model=List[AirportBase])
 def get_all_airports(
-    limit: int = Query(default=50, ge=1), skip: int = Query(default=0, ge=0)
+    limit: int = Query(default=50, ge=1),
+    skip: int = Query(default=0, ge=0),
+    fields: Optional[str] = FIELDS_QUERY,
 ):
     """
     Returns all airports in the database
@@ -17,28 +37,63 @@ def get_all_airports(
     Args:
         limit (int): Maximum number of airports to return
         skip (int): Number of airports to skip
+        fields (str): Comma-separated fields to return (default: all)
     """
+    # plan-check: allow NodeByLabelScan (paginated listing)
     query = """
     MATCH (a:Airport)
     RETURN a.IATA AS IATA, a.Name AS Name, a.City AS City, a.Country AS Country
     SKIP $skip
     LIMIT $limit
     """
-    with get_db_session() as session:
-        result = session.run(query, limit=limit, skip=skip)
-        return [record.data() for record in result]
+    query, keys = project(query, "airport", fields)
+    return projected(
+        run_query(query, limit=limit, skip=skip, name="get_all_airports"), keys
+    )
+
+
+# Return airports ranked by a centrality metric
+@router.get("/centrality", response_model=List[AirportCentrality])
+def get_airports_by_centrality(
+    metric: str = Query(
+        default="pagerank", regex="^(pagerank|betweenness|degree_in|degree_out)$"
+    ),
+    limit: int = Query(default=20, ge=1),
+):
+    """
+    Returns airports ranked by a hub/centrality metric. Metrics are computed
+    offline by database/compute_centrality.py.
+
+    Args:
+        metric (str): pagerank, betweenness, degree_in or degree_out
+        limit (int): Maximum number of airports to return
+    """
+    prop = CENTRALITY_METRICS[metric]
+    # plan-check: allow NodeByLabelScan (top-k over all airports)
+    query = f"""
+    MATCH (a:Airport)
+    WHERE a.{prop} IS NOT NULL
+    RETURN a.IATA AS IATA, a.Name AS Name, a.City AS City, a.Country AS Country,
+           a.PageRank AS PageRank, a.Betweenness AS Betweenness,
+           a.DegreeIn AS DegreeIn, a.DegreeOut AS DegreeOut,
+           a.Component AS Component, a.ComponentSize AS ComponentSize
+    ORDER BY a.{prop} DESC
+    LIMIT $limit
+    """
+    return run_query(query, limit=limit, name="get_airports_by_centrality")
 
 
 # Return airport by IATA
 @router.get(
     "/{iata}", response_model=AirportDetail, responses={404: {"model": ErrorResponse}}
 )
-def get_airport_by_iata(iata: str):
+def get_airport_by_iata(iata: str, fields: Optional[str] = FIELDS_QUERY):
     """
     Returns an airport by IATA code. Converts IATA code to uppercase.
 
     Args:
         iata (str): IATA code of the airport
+        fields (str): Comma-separated fields to return (default: all)
     """
     iata = iata.upper()
     query = """
@@ -49,28 +104,96 @@ def get_airport_by_iata(iata: str):
            a.`Tz database time zone` AS `Tz database time zone`,
            a.Type AS Type, a.Source AS Source
     """
-    with get_db_session() as session:
-        result = session.run(query, iata=iata).single()
-        if not result:
-            raise HTTPException(status_code=404, detail="Airport not found")
-        return result.data()
+    query, keys = project(query, "airport", fields)
+    rows = run_query(query, iata=iata, name="get_airport_by_iata")
+    if not rows:
+        raise HTTPException(status_code=404, detail="Airport not found")
+    return projected(rows[0], keys)
+
+
+# Return airports reachable within a number of stops and a distance budget
+@router.get(
+    "/{iata}/reachable",
+    response_model=List[ReachableAirport],
+    responses={404: {"model": ErrorResponse}},
+)
+def get_reachable_airports(
+    iata: str,
+    max_stops: int = Query(default=1, ge=0, le=5),
+    max_km: Optional[float] = Query(default=None, gt=0),
+    limit: int = Query(default=500, ge=1),
+):
+    """
+    Returns every airport reachable from an airport with at most max_stops
+    connections (0 = nonstop only) and at most max_km in total, with the
+    minimal number of legs and the minimal distance. Sorted by legs, then
+    distance. Converts IATA code to uppercase.
+
+    Uses a BFS over the cached route graph instead of a variable-length
+    Cypher pattern, which explodes combinatorially from large hubs.
+
+    Args:
+        iata (str): IATA code of the departure airport
+        max_stops (int): Maximum number of connections
+        max_km (float): Maximum total distance in km (routes with an unknown
+            distance are ignored when set)
+        limit (int): Maximum number of airports to return
+    """
+    graph = get_route_graph()
+    source = graph.index.get(iata.upper())
+    if source is None:
+        raise HTTPException(status_code=404, detail="Airport not found")
+
+    legs, dist = reachable(
+        graph.indptr, graph.indices, graph.distance, source, max_stops + 1, max_km
+    )
+    found = np.flatnonzero(legs > 0)
+    found = found[np.lexsort((dist[found], legs[found]))][:limit]
+    codes = graph.iata[found].tolist()
+
+    query = """
+    MATCH (a:Airport)
+    WHERE a.IATA IN $codes
+    RETURN a.IATA AS IATA, a.Name AS Name, a.City AS City, a.Country AS Country
+    """
+    details = {
+        row["IATA"]: row
+        for row in run_query(query, codes=codes, name="get_reachable_airports")
+    }
+
+    return [
+        {
+            **details[code],
+            "Legs": int(legs[i]),
+            "Distance": round(float(dist[i]), 2) if np.isfinite(dist[i]) else None,
+        }
+        for code, i in zip(codes, found)
+        if code in details
+    ]
 
 
 # Return all airports in a country
 @router.get("/country/{country}", response_model=List[AirportBase])
-def get_airports_by_country(country: str, limit: int = Query(default=50, ge=1)):
+def get_airports_by_country(
+    country: str,
+    limit: int = Query(default=50, ge=1),
+    fields: Optional[str] = FIELDS_QUERY,
+):
     """
     Returns all airports in a country. Capitalizes country name.
 
     Args:
         country (str): Country name
         limit (int): Maximum number of airports to return
+        fields (str): Comma-separated fields to return (default: all)
     """
     query = """
     MATCH (a:Airport {Country: $country})
     RETURN a.IATA AS IATA, a.Name AS Name, a.City AS City, a.Country AS Country
     LIMIT $limit
     """
-    with get_db_session() as session:
-        result = session.run(query, country=country, limit=limit)
-        return [record.data() for record in result]
+    query, keys = project(query, "airport", fields)
+    return projected(
+        run_query(query, country=country, limit=limit, name="get_airports_by_country"),
+        keys,
+    )
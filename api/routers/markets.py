@@ -0,0 +1,111 @@
+from fastapi import APIRouter, HTTPException, Query
+from database import run_query
+from schemas import ErrorResponse, MarketDetail, MarketRoute
+from typing import List
+
+router = APIRouter()
+
+# A market is given by its Id (a metro code such as NYC, or for a single
+# city the lowest IATA code of its airports) or by any of its airports'
+# IATA codes. Markets and their MARKET_ROUTE statistics are precomputed by
+# the loader (database/cypher/build_markets.cypher).
+
+
+# Return a market with its airports
+@router.get(
+    "/{code}", response_model=MarketDetail, responses={404: {"model": ErrorResponse}}
+)
+def get_market(code: str):
+    """
+    Returns a city or metro-area market with its airports. Converts the code
+    to uppercase.
+
+    Args:
+        code (str): Market Id or IATA code of one of its airports
+    """
+    query = """
+    OPTIONAL MATCH (m:Market {Id: $code})
+    OPTIONAL MATCH (:Airport {IATA: $code})-[:IN_MARKET]->(am:Market)
+    WITH coalesce(m, am) AS m
+    WHERE m IS NOT NULL
+    RETURN m.Id AS Id, m.Name AS Name, m.Country AS Country,
+           m.Airports AS Airports,
+           coalesce(m.Destinations, 0) AS Destinations,
+           coalesce(m.RouteCount, 0) AS Routes,
+           coalesce(m.OperatedRouteCount, 0) AS OperatedRoutes
+    """
+    rows = run_query(query, code=code.upper(), name="get_market")
+    if not rows:
+        raise HTTPException(status_code=404, detail="Market not found")
+    return rows[0]
+
+
+# Return the markets served from a market
+@router.get("/{code}/routes", response_model=List[MarketRoute])
+def get_market_routes(code: str, limit: int = Query(default=50, ge=1, le=1000)):
+    """
+    Returns the markets with routes from a market, most routes first, with
+    route, carrier and distance statistics per market pair. Converts the
+    code to uppercase.
+
+    Args:
+        code (str): Market Id or IATA code of one of its airports
+        limit (int): Maximum number of market pairs to return
+    """
+    query = """
+    OPTIONAL MATCH (m:Market {Id: $code})
+    OPTIONAL MATCH (:Airport {IATA: $code})-[:IN_MARKET]->(am:Market)
+    WITH coalesce(m, am) AS m
+    MATCH (m)-[mr:MARKET_ROUTE]->(d:Market)
+    RETURN m.Id AS source, m.Name AS source_name,
+           d.Id AS destination, d.Name AS destination_name,
+           mr.Routes AS routes, coalesce(mr.OperatedRoutes, 0) AS operated_routes,
+           mr.Carriers AS carriers, mr.Airlines AS airlines,
+           mr.AirportPairs AS airport_pairs, mr.MinDistance AS min_distance,
+           mr.AvgDistance AS avg_distance, mr.MaxDistance AS max_distance
+    ORDER BY routes DESC, destination
+    LIMIT $limit
+    """
+    return run_query(query, code=code.upper(), limit=limit, name="get_market_routes")
+
+
+# Return the statistics of one market pair
+@router.get(
+    "/{source}/to/{destination}",
+    response_model=MarketRoute,
+    responses={404: {"model": ErrorResponse}},
+)
+def get_market_pair(source: str, destination: str):
+    """
+    Returns route, carrier and distance statistics between two markets, e.g.
+    NYC to LON covers every route from JFK, LGA or EWR to any London
+    airport. Converts the codes to uppercase.
+
+    Args:
+        source (str): Source market Id or airport IATA code
+        destination (str): Destination market Id or airport IATA code
+    """
+    query = """
+    OPTIONAL MATCH (s:Market {Id: $source})
+    OPTIONAL MATCH (:Airport {IATA: $source})-[:IN_MARKET]->(sa:Market)
+    WITH coalesce(s, sa) AS s
+    OPTIONAL MATCH (d:Market {Id: $destination})
+    OPTIONAL MATCH (:Airport {IATA: $destination})-[:IN_MARKET]->(da:Market)
+    WITH s, coalesce(d, da) AS d
+    MATCH (s)-[mr:MARKET_ROUTE]->(d)
+    RETURN s.Id AS source, s.Name AS source_name,
+           d.Id AS destination, d.Name AS destination_name,
+           mr.Routes AS routes, coalesce(mr.OperatedRoutes, 0) AS operated_routes,
+           mr.Carriers AS carriers, mr.Airlines AS airlines,
+           mr.AirportPairs AS airport_pairs, mr.MinDistance AS min_distance,
+           mr.AvgDistance AS avg_distance, mr.MaxDistance AS max_distance
+    """
+    rows = run_query(
+        query,
+        source=source.upper(),
+        destination=destination.upper(),
+        name="get_market_pair",
+    )
+    if not rows:
+        raise HTTPException(status_code=404, detail="No routes between the markets")
+    return rows[0]
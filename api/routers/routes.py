@@ -1,38 +1,299 @@
+import io
+from typing import List, Optional
+
+import numpy as np
 from fastapi import APIRouter, HTTPException, Query
-from database import get_db_session
-from schemas import RouteBase, ErrorResponse
-from typing import List
+from fastapi.responses import JSONResponse, Response
+
+from database import run_query  # puts database/helper on sys.path
+from competition_matrix import load_competition_matrix
+from projection import FIELDS_QUERY, project, projected
+from route_density import load_route_density
+from route_geometry import feature_collection, geometry_cache
+from route_search import SORT_FIELDS, paginate, plan_route_search
+from schemas import (
+    CompetitionLookupRequest,
+    ErrorResponse,
+    PairCompetition,
+    RouteBase,
+    RouteGeometryCollection,
+    RouteSearchPage,
+    StopsLookupRequest,
+    StopsLookupResult,
+)
+from stops_matrix import load_stops_matrix
 
 router = APIRouter()
 
+ROUTES_BY_AIRLINE_QUERY = """
+MATCH (a:Airport)-[r:ROUTE]->(b:Airport)
+WHERE r.Airline = $airline_iata AND ($include_codeshare OR r.Operated)
+RETURN a.IATA AS source, b.IATA AS destination, r.Airline AS airline, r.Distance AS distance
+ORDER BY r.Distance
+LIMIT $limit
+"""
+
+# Search routes by any combination of criteria
+
+
+@router.get(
+    "/search", response_model=RouteSearchPage, responses={400: {"model": ErrorResponse}}
+)
+def search_routes(
+    source: Optional[str] = None,
+    destination: Optional[str] = None,
+    source_country: Optional[str] = None,
+    destination_country: Optional[str] = None,
+    airline: Optional[str] = None,
+    min_distance: Optional[float] = Query(default=None, ge=0),
+    max_distance: Optional[float] = Query(default=None, ge=0),
+    stops: Optional[int] = Query(default=None, ge=0),
+    equipment: Optional[str] = None,
+    codeshare: Optional[bool] = None,
+    sort: str = Query(default="distance", regex=f"^-?({'|'.join(SORT_FIELDS)})$"),
+    limit: int = Query(default=50, ge=1, le=1000),
+    cursor: Optional[str] = None,
+):
+    """
+    Returns routes matching all given criteria, ordered server-side.
+    Pass next_cursor from the response as cursor to get the next page.
+
+    Args:
+        source (str): IATA code of the source airport
+        destination (str): IATA code of the destination airport
+        source_country (str): Country of the source airport
+        destination_country (str): Country of the destination airport
+        airline (str): IATA code of the airline
+        min_distance (float): Minimum distance in kilometers
+        max_distance (float): Maximum distance in kilometers
+        stops (int): Number of stops
+        equipment (str): Aircraft code, e.g. 738
+        codeshare (bool): Only codeshare (true) or only own (false) routes
+        sort (str): distance, stops, airline, source or destination;
+            prefix with - for descending order
+        limit (int): Maximum number of routes per page
+        cursor (str): Cursor from the previous page
+    """
+    filters = {
+        "source": source,
+        "destination": destination,
+        "source_country": source_country,
+        "destination_country": destination_country,
+        "airline": airline,
+        "min_distance": min_distance,
+        "max_distance": max_distance,
+        "stops": stops,
+        "equipment": equipment,
+        "codeshare": codeshare,
+    }
+    try:
+        query, params = plan_route_search(filters, sort, limit, cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    routes, next_cursor = paginate(
+        run_query(query, **params, name="search_routes"), limit, sort
+    )
+    return {"routes": routes, "next_cursor": next_cursor}
+
+
+# Return great-circle lines of one route or an airline's network as GeoJSON
+
+
+@router.get(
+    "/geometry",
+    responses={
+        200: {"model": RouteGeometryCollection},
+        400: {"model": ErrorResponse},
+    },
+)
+def get_route_geometry(
+    source: Optional[str] = None,
+    destination: Optional[str] = None,
+    airline: Optional[str] = None,
+    points: int = Query(default=32, ge=2, le=256),
+    limit: int = Query(default=1000, ge=1, le=10000),
+    include_codeshare: bool = Query(default=True),
+):
+    """
+    Returns GeoJSON great-circle lines for the routes between two airports
+    (optionally of one airline) or for an airline's whole network. Lines
+    crossing the antimeridian are split into a MultiLineString. Lines are
+    cached per airport pair and point density.
+
+    Args:
+        source (str): IATA code of the source airport
+        destination (str): IATA code of the destination airport
+        airline (str): IATA code of the airline
+        points (int): Points per line, endpoints included
+        limit (int): Maximum number of routes
+        include_codeshare (bool): Include codeshare routes (default: true)
+    """
+    if source and destination:
+        query = """
+        MATCH (a:Airport {IATA: $source})-[r:ROUTE]->(b:Airport {IATA: $destination})
+        WHERE ($airline IS NULL OR r.Airline = $airline)
+          AND ($include_codeshare OR r.Operated)
+          AND a.Latitude IS NOT NULL AND a.Longitude IS NOT NULL
+          AND b.Latitude IS NOT NULL AND b.Longitude IS NOT NULL
+        RETURN a.IATA AS source, a.Latitude AS source_lat, a.Longitude AS source_lon,
+               b.IATA AS destination, b.Latitude AS dest_lat, b.Longitude AS dest_lon,
+               r.Airline AS airline, r.Distance AS distance
+        LIMIT $limit
+        """
+    elif airline and not (source or destination):
+        query = """
+        MATCH (a:Airport)-[r:ROUTE]->(b:Airport)
+        WHERE r.Airline = $airline
+          AND ($include_codeshare OR r.Operated)
+          AND a.Latitude IS NOT NULL AND a.Longitude IS NOT NULL
+          AND b.Latitude IS NOT NULL AND b.Longitude IS NOT NULL
+        RETURN a.IATA AS source, a.Latitude AS source_lat, a.Longitude AS source_lon,
+               b.IATA AS destination, b.Latitude AS dest_lat, b.Longitude AS dest_lon,
+               r.Airline AS airline, r.Distance AS distance
+        LIMIT $limit
+        """
+    else:
+        raise HTTPException(
+            status_code=400,
+            detail="Pass source and destination, or an airline on its own",
+        )
+
+    rows = run_query(
+        query,
+        source=source.upper() if source else None,
+        destination=destination.upper() if destination else None,
+        airline=airline.upper() if airline else None,
+        limit=limit,
+        include_codeshare=include_codeshare,
+        name="get_route_geometry",
+    )
+    paths = geometry_cache.paths(
+        [
+            (
+                row["source"],
+                row["source_lat"],
+                row["source_lon"],
+                row["destination"],
+                row["dest_lat"],
+                row["dest_lon"],
+            )
+            for row in rows
+        ],
+        points,
+    )
+    features = [
+        (
+            path,
+            {
+                "source": row["source"],
+                "destination": row["destination"],
+                "airline": row["airline"],
+                "distance": row["distance"],
+            },
+        )
+        for path, row in zip(paths, rows)
+    ]
+    # Returned as is: validating every coordinate would cost more than building it
+    return JSONResponse(feature_collection(features))
+
+
+# Return the global route-density raster
+
+
+@router.get(
+    "/density",
+    response_class=Response,
+    responses={
+        200: {"content": {"image/png": {}, "application/octet-stream": {}}},
+        400: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
+    },
+)
+def get_route_density(
+    resolution: float = Query(default=0.5, gt=0),
+    format: str = Query(default="png", regex="^(png|npy)$"),
+):
+    """
+    Returns the number of routes crossing every latitude/longitude cell,
+    prebuilt after each load. As a PNG, empty cells are transparent and the
+    image spans longitude -180..180 and latitude 90..-90 (equirectangular).
+    As .npy, it is the uint32 grid with row 0 at the northern edge.
+
+    Args:
+        resolution (float): Cell size in degrees (1, 0.5 or 0.25)
+        format (str): png or npy
+    """
+    density = load_route_density()
+    if density is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Route density has not been built, run `make route-density`",
+        )
+    if resolution not in density.resolutions:
+        raise HTTPException(
+            status_code=400,
+            detail="Resolution must be one of "
+            + ", ".join(f"{r:g}" for r in density.resolutions),
+        )
+
+    headers = {"X-Max-Count": str(density.max_count[f"{resolution:g}"])}
+    if format == "png":
+        return Response(
+            density.png(resolution), media_type="image/png", headers=headers
+        )
+    buffer = io.BytesIO()
+    np.save(buffer, density.grid(resolution))
+    return Response(
+        buffer.getvalue(), media_type="application/octet-stream", headers=headers
+    )
+
+
 # Return routes by source airport
 
 
 @router.get("/source/{source_iata}", response_model=List[RouteBase])
-def get_routes_by_source(source_iata: str, limit: int = Query(default=50, ge=1)):
+def get_routes_by_source(
+    source_iata: str,
+    limit: int = Query(default=50, ge=1),
+    include_codeshare: bool = Query(default=True),
+    fields: Optional[str] = FIELDS_QUERY,
+):
     """
     Returns all routes from a source airport. Orders by distance.
 
     Args:
         source_iata (str): IATA code of the source airport
         limit (int): Maximum number of routes to return
+        include_codeshare (bool): Include codeshare routes (default: true)
+        fields (str): Comma-separated fields to return (default: all)
     """
     source_iata = source_iata.upper()
     query = """
     MATCH (a:Airport {IATA: $source_iata})-[r:ROUTE]->(b:Airport)
+    WHERE $include_codeshare OR r.Operated
     RETURN a.IATA AS source, b.IATA AS destination, r.Airline AS airline, r.Distance AS distance
     ORDER BY r.Distance
     LIMIT $limit
     """
-    with get_db_session() as session:
-        result = session.run(query, source_iata=source_iata, limit=limit)
-        return [record.data() for record in result]
+    query, keys = project(query, "route", fields)
+    rows = run_query(
+        query,
+        source_iata=source_iata,
+        limit=limit,
+        include_codeshare=include_codeshare,
+        name="get_routes_by_source",
+    )
+    return projected(rows, keys)
 
 
 # Return routes by destination airport
 @router.get("/destination/{destination_iata}", response_model=List[RouteBase])
 def get_routes_by_destination(
-    destination_iata: str, limit: int = Query(default=50, ge=1)
+    destination_iata: str,
+    limit: int = Query(default=50, ge=1),
+    include_codeshare: bool = Query(default=True),
+    fields: Optional[str] = FIELDS_QUERY,
 ):
     """
     Returns all routes to a destination airport. Orders by distance.
@@ -40,17 +301,26 @@ def get_routes_by_destination(
     Args:
         destination_iata (str): IATA code of the destination airport
         limit (int): Maximum number of routes to return
+        include_codeshare (bool): Include codeshare routes (default: true)
+        fields (str): Comma-separated fields to return (default: all)
     """
     destination_iata = destination_iata.upper()
     query = """
     MATCH (a:Airport)-[r:ROUTE]->(b:Airport {IATA: $destination_iata})
+    WHERE $include_codeshare OR r.Operated
     RETURN a.IATA AS source, b.IATA AS destination, r.Airline AS airline, r.Distance AS distance
     ORDER BY r.Distance
     LIMIT $limit
     """
-    with get_db_session() as session:
-        result = session.run(query, destination_iata=destination_iata, limit=limit)
-        return [record.data() for record in result]
+    query, keys = project(query, "route", fields)
+    rows = run_query(
+        query,
+        destination_iata=destination_iata,
+        limit=limit,
+        include_codeshare=include_codeshare,
+        name="get_routes_by_destination",
+    )
+    return projected(rows, keys)
 
 
 # Return routes by source and destination
@@ -58,47 +328,171 @@ def get_routes_by_destination(
     "/source/{source_iata}/destination/{destination_iata}",
     response_model=List[RouteBase],
 )
-def get_routes_by_source_and_destination(source_iata: str, destination_iata: str):
+def get_routes_by_source_and_destination(
+    source_iata: str,
+    destination_iata: str,
+    include_codeshare: bool = Query(default=True),
+    fields: Optional[str] = FIELDS_QUERY,
+):
     """
     Returns all routes from a source airport to a destination airport. Orders by distance.
 
     Args:
         source_iata (str): IATA code of the source airport
         destination_iata (str): IATA code of the destination airport
+        include_codeshare (bool): Include codeshare routes (default: true)
+        fields (str): Comma-separated fields to return (default: all)
     """
     source_iata = source_iata.upper()
     destination_iata = destination_iata.upper()
     query = """
     MATCH (a:Airport {IATA: $source_iata})-[r:ROUTE]->(b:Airport {IATA: $destination_iata})
+    WHERE $include_codeshare OR r.Operated
     RETURN a.IATA AS source, b.IATA AS destination, r.Airline AS airline, r.Distance AS distance
     ORDER BY r.Distance
     """
-    with get_db_session() as session:
-        result = session.run(
-            query, source_iata=source_iata, destination_iata=destination_iata
-        )
-        return [record.data() for record in result]
+    query, keys = project(query, "route", fields)
+    rows = run_query(
+        query,
+        source_iata=source_iata,
+        destination_iata=destination_iata,
+        include_codeshare=include_codeshare,
+        name="get_routes_by_source_and_destination",
+    )
+    return projected(rows, keys)
 
 
 # Return routes by airline
 
 
 @router.get("/airline/{airline_iata}", response_model=List[RouteBase])
-def get_routes_by_airline(airline_iata: str, limit: int = Query(default=50, ge=1)):
+def get_routes_by_airline(
+    airline_iata: str,
+    limit: int = Query(default=50, ge=1),
+    include_codeshare: bool = Query(default=True),
+    fields: Optional[str] = FIELDS_QUERY,
+):
     """
     Returns all routes by an airline. Orders by distance.
 
     Args:
         airline_iata (str): IATA code of the airline
         limit (int): Maximum number of routes to return
+        include_codeshare (bool): Include codeshare routes (default: true)
+        fields (str): Comma-separated fields to return (default: all)
     """
     airline_iata = airline_iata.upper()
-    query = """
-    MATCH (a:Airport)-[r:ROUTE {Airline: $airline_iata}]->(b:Airport)
-    RETURN a.IATA AS source, b.IATA AS destination, r.Airline AS airline, r.Distance AS distance
-    ORDER BY r.Distance
-    LIMIT $limit
+    query, keys = project(ROUTES_BY_AIRLINE_QUERY, "route", fields)
+    rows = run_query(
+        query,
+        airline_iata=airline_iata,
+        limit=limit,
+        include_codeshare=include_codeshare,
+        name="get_routes_by_airline",
+    )
+    return projected(rows, keys)
+
+
+# Return minimal legs and distance for a batch of airport pairs
+
+
+@router.post(
+    "/stops",
+    response_model=List[StopsLookupResult],
+    responses={503: {"model": ErrorResponse}},
+)
+def get_minimal_stops(request: StopsLookupRequest):
+    """
+    Returns the minimal number of legs and the minimal distance between each
+    pair of airports, read from the precomputed stops matrix. Converts IATA
+    codes to uppercase.
+
+    Args:
+        request (StopsLookupRequest): Up to 10,000 source/destination pairs
+    """
+    matrix = load_stops_matrix()
+    if matrix is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Stops matrix has not been built, run `make stops-matrix`",
+        )
+
+    sources = [pair.source.upper() for pair in request.pairs]
+    destinations = [pair.destination.upper() for pair in request.pairs]
+    legs, distances = matrix.lookup(sources, destinations)
+    return [
+        {"source": s, "destination": d, "legs": n, "distance": km}
+        for s, d, n, km in zip(sources, destinations, legs, distances)
+    ]
+
+
+def _competition_matrix(include_codeshare: bool = True):
+    """Return the competition matrix, 503 if it has not been built"""
+    matrix = load_competition_matrix(include_codeshare=include_codeshare)
+    if matrix is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Competition matrix has not been built, run `make competition`",
+        )
+    return matrix
+
+
+# Return the airlines flying each of a batch of airport pairs
+
+
+@router.post(
+    "/competition",
+    response_model=List[PairCompetition],
+    responses={503: {"model": ErrorResponse}},
+)
+def get_pair_competition(
+    request: CompetitionLookupRequest, include_codeshare: bool = Query(default=True)
+):
+    """
+    Returns the airlines flying each directed airport pair, their number and
+    the market type (monopoly, duopoly or competitive), read from the
+    precomputed competition matrix. Converts IATA codes to uppercase.
+
+    Args:
+        request (CompetitionLookupRequest): Up to 10,000 source/destination pairs
+        include_codeshare (bool): Count airlines that only sell a pair as a
+            codeshare (default: true)
+    """
+    matrix = _competition_matrix(include_codeshare)
+    return matrix.lookup(
+        [pair.source.upper() for pair in request.pairs],
+        [pair.destination.upper() for pair in request.pairs],
+    )
+
+
+# Return the airlines flying each route from an airport
+
+
+@router.get(
+    "/competition/{source_iata}",
+    response_model=List[PairCompetition],
+    responses={404: {"model": ErrorResponse}, 503: {"model": ErrorResponse}},
+)
+def get_airport_competition(
+    source_iata: str,
+    market: Optional[str] = Query(
+        default=None, regex="^(monopoly|duopoly|competitive)$"
+    ),
+    include_codeshare: bool = Query(default=True),
+):
+    """
+    Returns every airport pair leaving an airport with the airlines flying
+    it, most airlines first. Converts IATA code to uppercase.
+
+    Args:
+        source_iata (str): IATA code of the source airport
+        market (str): Only monopoly, duopoly or competitive pairs
+        include_codeshare (bool): Count airlines that only sell a pair as a
+            codeshare (default: true)
     """
-    with get_db_session() as session:
-        result = session.run(query, airline_iata=airline_iata, limit=limit)
-        return [record.data() for record in result]
+    rows = _competition_matrix(include_codeshare).from_airport(source_iata.upper())
+    if rows is None:
+        raise HTTPException(status_code=404, detail="Airport not found")
+    if market:
+        rows = [row for row in rows if row["market"] == market]
+    return rows
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Any, List, Optional
 
 
 class AirportBase(BaseModel):
@@ -51,6 +51,46 @@ class AirportDetail(AirportBase):
         populate_by_name = True
 
 
+class AirportCentrality(AirportBase):
+    """Airport with hub and centrality metrics over the route graph"""
+
+    PageRank: Optional[float] = Field(
+        None, description="PageRank over the route graph", example=0.0042
+    )
+    Betweenness: Optional[float] = Field(
+        None,
+        description="Estimated share of shortest paths passing through the airport",
+        example=0.031,
+    )
+    DegreeIn: Optional[int] = Field(
+        None, description="Number of airports with routes to this one", example=162
+    )
+    DegreeOut: Optional[int] = Field(
+        None, description="Number of airports with routes from this one", example=164
+    )
+    Component: Optional[int] = Field(
+        None,
+        description="Connected component of the route graph (0 is the main network)",
+        example=0,
+    )
+    ComponentSize: Optional[int] = Field(
+        None, description="Number of airports in the component", example=3304
+    )
+
+
+class ReachableAirport(AirportBase):
+    """Airport reachable from another one within a leg and distance budget"""
+
+    Legs: int = Field(
+        ..., description="Minimal number of flights needed to get there", example=2
+    )
+    Distance: Optional[float] = Field(
+        None,
+        description="Minimal total distance in km within the leg limit",
+        example=6410.25,
+    )
+
+
 class AirlineBase(BaseModel):
     """Base schema for Airline"""
 
@@ -81,6 +121,118 @@ class AirlineDetail(AirlineBase):
         populate_by_name = True
 
 
+class AirlineStats(AirlineBase):
+    """Route statistics of an airline, precomputed by the loader"""
+
+    Routes: int = Field(..., description="Number of routes operated", example=2354)
+    MinDistance: Optional[float] = Field(
+        None, description="Shortest route in kilometers", example=97.4
+    )
+    AvgDistance: Optional[float] = Field(
+        None, description="Average route distance in kilometers", example=1912.6
+    )
+    MaxDistance: Optional[float] = Field(
+        None, description="Longest route in kilometers", example=11432.9
+    )
+    AirportsFrom: int = Field(
+        ..., description="Airports with departures of the airline", example=429
+    )
+    AirportsTo: int = Field(
+        ..., description="Airports with arrivals of the airline", example=429
+    )
+    AirportsServed: int = Field(
+        ..., description="Airports the airline flies from or to", example=431
+    )
+
+
+class MarketBase(BaseModel):
+    """City or metro-area market, a group of airports serving one city"""
+
+    Id: str = Field(
+        ...,
+        description="Metro code, or the lowest IATA code of the market's airports",
+        example="NYC",
+    )
+    Name: str = Field(..., description="City or metro area", example="New York")
+    Country: Optional[str] = Field(
+        None, description="Country of the market", example="United States"
+    )
+
+
+class MarketDetail(MarketBase):
+    """Market with its airports and route totals, precomputed by the loader"""
+
+    Airports: List[str] = Field(
+        ..., description="IATA codes of the market's airports", example=["EWR", "JFK"]
+    )
+    Destinations: int = Field(
+        ..., description="Markets with routes from this one", example=412
+    )
+    Routes: int = Field(
+        ...,
+        description="Routes to other markets (one per airline and airport pair)",
+        example=2034,
+    )
+    OperatedRoutes: int = Field(
+        ..., description="Routes to other markets, without codeshares", example=1650
+    )
+
+
+class MarketRoute(BaseModel):
+    """Routes between two markets, aggregated over their airports"""
+
+    source: str = Field(..., description="Id of the source market", example="NYC")
+    source_name: str = Field(..., example="New York")
+    destination: str = Field(
+        ..., description="Id of the destination market", example="LON"
+    )
+    destination_name: str = Field(..., example="London")
+    routes: int = Field(
+        ..., description="Routes between the markets' airports", example=23
+    )
+    operated_routes: int = Field(
+        ...,
+        description="Routes between the markets' airports, without codeshares",
+        example=17,
+    )
+    carriers: int = Field(..., description="Number of airlines", example=7)
+    airlines: List[str] = Field(
+        ..., description="IATA codes of the airlines", example=["AA", "BA"]
+    )
+    airport_pairs: int = Field(
+        ..., description="Airport pairs with at least one route", example=6
+    )
+    min_distance: Optional[float] = Field(None, example=5539.0)
+    avg_distance: Optional[float] = Field(None, example=5570.4)
+    max_distance: Optional[float] = Field(None, example=5601.8)
+
+
+class AircraftType(BaseModel):
+    """Aircraft type with the number of routes and airlines flying it"""
+
+    Code: str = Field(..., description="IATA aircraft type code", example="738")
+    Routes: int = Field(
+        ..., description="Number of routes flown with this type", example=5432
+    )
+    Airlines: int = Field(
+        ..., description="Number of airlines flying this type", example=87
+    )
+
+
+class FleetEntry(BaseModel):
+    """Aircraft type in an airline's fleet mix"""
+
+    Code: str = Field(..., description="IATA aircraft type code", example="738")
+    Routes: int = Field(
+        ..., description="Number of the airline's routes flown with this type"
+    )
+    Share: float = Field(
+        ...,
+        description="Fraction of the airline's routes flown with this type",
+        example=0.42,
+    )
+
+
 class RouteBase(BaseModel):
     """Base schema for Route"""
 
@@ -106,11 +258,150 @@ class RouteDetail(RouteBase):
         None, description="Aircraft types used on this route", example="737 738 739"
     )
     codeshare: Optional[str] = Field(None, description="Codeshare indicator")
+    operated_by: Optional[str] = Field(
+        None,
+        description="IATA code of the airline operating a codeshare route",
+        example="BA",
+    )
 
     class Config:
         populate_by_name = True
 
 
+class RouteSearchResult(RouteDetail):
+    """Route matched by a search, with the countries it connects"""
+
+    source_country: Optional[str] = Field(
+        None, description="Country of source airport", example="United States"
+    )
+    destination_country: Optional[str] = Field(
+        None, description="Country of destination airport", example="United States"
+    )
+
+
+class RouteSearchPage(BaseModel):
+    """One page of route search results"""
+
+    routes: List[RouteSearchResult]
+    next_cursor: Optional[str] = Field(
+        None, description="Pass as cursor to get the next page, null on the last page"
+    )
+
+
+class RouteGeometryProperties(BaseModel):
+    """Route a geometry feature belongs to"""
+
+    source: str = Field(..., description="IATA code of source airport", example="JFK")
+    destination: str = Field(
+        ..., description="IATA code of destination airport", example="NRT"
+    )
+    airline: str = Field(
+        ..., description="IATA code of airline operating the route", example="AA"
+    )
+    distance: Optional[float] = Field(
+        None, description="Distance in kilometers", example=10838.0
+    )
+
+
+class LineGeometry(BaseModel):
+    """GeoJSON LineString, or MultiLineString when split at the antimeridian"""
+
+    type: str = Field(..., example="LineString")
+    coordinates: List[Any] = Field(
+        ..., description="[longitude, latitude] positions (a list per part)"
+    )
+
+
+class RouteGeometryFeature(BaseModel):
+    """GeoJSON feature with the great-circle line of one route"""
+
+    type: str = Field("Feature", example="Feature")
+    geometry: LineGeometry
+    properties: RouteGeometryProperties
+
+
+class RouteGeometryCollection(BaseModel):
+    """GeoJSON FeatureCollection of route lines"""
+
+    type: str = Field("FeatureCollection", example="FeatureCollection")
+    features: List[RouteGeometryFeature]
+
+
+class AirportPair(BaseModel):
+    """Pair of airports to look up in a precomputed matrix"""
+
+    source: str = Field(..., description="IATA code of source airport", example="JFK")
+    destination: str = Field(
+        ..., description="IATA code of destination airport", example="LAX"
+    )
+
+
+class StopsLookupRequest(BaseModel):
+    """Batch of airport pairs"""
+
+    pairs: List[AirportPair] = Field(..., max_items=10000)
+
+
+class StopsLookupResult(AirportPair):
+    """Minimal legs and distance between two airports"""
+
+    legs: Optional[int] = Field(
+        None,
+        description="Minimal number of flights, null if there is no connection",
+        example=1,
+    )
+    distance: Optional[float] = Field(
+        None, description="Minimal total distance in kilometers", example=3983.0
+    )
+
+
+class CompetitionLookupRequest(StopsLookupRequest):
+    """Batch of directed airport pairs to look up carriers for"""
+
+
+class PairCompetition(AirportPair):
+    """Airlines flying a directed airport pair"""
+
+    carriers: List[str] = Field(
+        ..., description="IATA codes of the airlines flying the pair", example=["AA"]
+    )
+    carrier_count: int = Field(..., description="Number of airlines", example=1)
+    market: Optional[str] = Field(
+        None,
+        description="monopoly, duopoly or competitive, null if nobody flies it",
+        example="monopoly",
+    )
+
+
+class Competitor(BaseModel):
+    """An airline flying some of the same airport pairs"""
+
+    airline: str = Field(..., description="IATA code of the competitor", example="DL")
+    shared_pairs: int = Field(
+        ..., description="Airport pairs both airlines fly", example=412
+    )
+    share: float = Field(
+        ...,
+        description="Shared pairs as a fraction of the airline's pairs",
+        example=0.18,
+    )
+
+
+class AirlineCompetition(BaseModel):
+    """Market mix of an airline's airport pairs and its main competitors"""
+
+    airline: str = Field(..., description="IATA code of the airline", example="AA")
+    pairs: int = Field(..., description="Directed airport pairs flown", example=2300)
+    monopoly: int = Field(..., description="Pairs only this airline flies", example=980)
+    duopoly: int = Field(
+        ..., description="Pairs flown by this and one other airline", example=640
+    )
+    competitive: int = Field(
+        ..., description="Pairs flown by three or more airlines", example=680
+    )
+    competitors: List[Competitor]
+
+
 class ErrorResponse(BaseModel):
     """Standard error response"""
 
@@ -0,0 +1,65 @@
+"""
+Unit tests for the worker warm-up calls.
+Run with: WARMUP=0 python -m pytest test_warmup.py
+or: python test_warmup.py
+"""
+
+import unittest
+from unittest import mock
+from fastapi import HTTPException
+import warmup
+from routers import airlines, airports, routes
+
+# Parameter types the Neo4j driver can send (no FastAPI markers)
+DRIVER_TYPES = (type(None), bool, int, float, str, list, dict)
+
+
+class TestHotCalls(unittest.TestCase):
+    """Test that the replayed endpoint calls send valid query parameters"""
+
+    def test_hot_calls_pass_driver_values(self):
+        """Test every hot call against a stub run_query"""
+        sent, names = [], []
+
+        def run_query(query, name=None, **parameters):
+            sent.append(parameters)
+            names.append(name)
+            return []
+
+        with mock.patch.object(airports, "run_query", run_query), mock.patch.object(
+            airlines, "run_query", run_query
+        ), mock.patch.object(routes, "run_query", run_query):
+            calls = warmup.hot_calls()
+            for fn, kwargs in calls:
+                try:
+                    fn(**kwargs)
+                except HTTPException:
+                    pass  # 404 for the empty stub result
+
+        self.assertEqual(len(sent), len(calls))
+        # Endpoints name their own queries
+        self.assertEqual(names, [fn.__name__ for fn, _ in calls])
+        for parameters in sent:
+            for name, value in parameters.items():
+                self.assertIsInstance(value, DRIVER_TYPES, name)
+        self.assertIn(
+            {"source_iata": "JFK", "limit": 50, "include_codeshare": True}, sent
+        )
+
+    def test_call_kwargs_resolves_query_defaults(self):
+        """Test that Query(default=...) markers become their default values"""
+        kwargs = warmup.call_kwargs(routes.get_routes_by_airline, airline_iata="AA")
+        self.assertEqual(
+            kwargs,
+            {
+                "airline_iata": "AA",
+                "limit": 50,
+                "include_codeshare": True,
+                "fields": None,
+            },
+        )
+
+
+if __name__ == "__main__":
+    # Run tests
+    unittest.main(verbosity=2)
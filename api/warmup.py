@@ -0,0 +1,113 @@
+import inspect
+import logging
+import os
+import time
+from fastapi import params
+from database import get_driver, metrics
+from graph_cache import get_route_graph
+from competition_matrix import load_competition_matrix
+from route_density import load_route_density
+from stops_matrix import load_stops_matrix
+
+# Warm each worker up before it accepts traffic (0 = serve immediately)
+WARMUP = os.getenv("WARMUP", "1") == "1"
+
+log = logging.getLogger("airfacts.warmup")
+
+_ready = False
+
+
+def call_kwargs(fn, **values):
+    """
+    Return the keyword arguments to call endpoint `fn` directly: the
+    defaults FastAPI would inject for omitted query parameters, then `values`.
+
+    Declared defaults such as Query(default=True) are FastAPI markers, not
+    values, so passing them through would hand the marker itself to the
+    driver as a query parameter.
+    """
+    kwargs = {}
+    for name, parameter in inspect.signature(fn).parameters.items():
+        default = parameter.default
+        if isinstance(default, params.Param):
+            default = default.default
+        if default is not inspect.Parameter.empty and default is not Ellipsis:
+            kwargs[name] = default
+    kwargs.update(values)
+    return kwargs
+
+
+def hot_calls():
+    """
+    Return the endpoint calls replayed during warm-up, as (function, kwargs).
+
+    Running the exact endpoint queries fills the driver's connection pool
+    and Neo4j's query plan cache, which is keyed by query text.
+    """
+    from routers import airlines, airports, routes
+
+    calls = [
+        (airports.get_airport_by_iata, {"iata": "JFK"}),
+        (airports.get_all_airports, {}),
+        (airlines.get_airline_by_iata, {"iata": "AA"}),
+        (airlines.get_airline_stats, {"iata": "AA"}),
+        (routes.get_routes_by_source, {"source_iata": "JFK"}),
+        (routes.get_routes_by_destination, {"destination_iata": "LAX"}),
+        (
+            routes.get_routes_by_source_and_destination,
+            {"source_iata": "JFK", "destination_iata": "LAX"},
+        ),
+        (routes.get_routes_by_airline, {"airline_iata": "AA"}),
+    ]
+    return [(fn, call_kwargs(fn, **values)) for fn, values in calls]
+
+
+def warm_up():
+    """
+    Prepare this worker: map the stops matrix, route density and
+    competition matrix, connect, map the snapshot, and replay the hot
+    queries. Failures are logged, never raised, so a worker still starts
+    (and reports errors per request) if Neo4j is down.
+    """
+    global _ready
+    if not WARMUP:
+        _ready = True
+        return
+
+    start = time.perf_counter()
+    # The stops matrix and the graph snapshot are memory-mapped, so all
+    # workers share one page-cached copy of each
+    steps = [
+        ("stops_matrix", load_stops_matrix),
+        ("route_density", load_route_density),
+        ("competition_matrix", load_competition_matrix),
+        ("connect", lambda: get_driver().verify_connectivity()),
+        ("route_graph", get_route_graph),
+    ]
+    steps += [(fn.__name__, lambda fn=fn, kw=kw: fn(**kw)) for fn, kw in hot_calls()]
+
+    failed = 0
+    for name, step in steps:
+        try:
+            step()
+        except Exception as e:
+            failed += 1
+            log.warning("warm-up step %s failed: %s", name, e)
+            if name == "connect":
+                # Every other step would wait for its own connection timeout
+                break
+
+    wall_ms = (time.perf_counter() - start) * 1000
+    metrics.record("warm_up", wall_ms, len(steps) - failed, error=failed > 0)
+    log.info(
+        "worker %d warmed up in %.0f ms (%d/%d steps)",
+        os.getpid(),
+        wall_ms,
+        len(steps) - failed,
+        len(steps),
+    )
+    _ready = True
+
+
+def is_ready() -> bool:
+    return _ready
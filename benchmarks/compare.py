@@ -0,0 +1,84 @@
+"""
+Compare two benchmark result files and flag latency regressions.
+
+Usage:
+    python benchmarks/compare.py baseline.json candidate.json --threshold 10
+"""
+
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path) as file:
+        return json.load(file)
+
+
+def compare(baseline, candidate, metric="p99", threshold=10.0):
+    """
+    Compare one latency percentile for every workload and concurrency level.
+
+    Returns:
+        List of (workload, concurrency, before, after, change_pct, regressed)
+    """
+    rows = []
+    for section in ("api", "connector"):
+        for name, runs in candidate.get(section, {}).items():
+            before_runs = {
+                run["concurrency"]: run
+                for run in baseline.get(section, {}).get(name, [])
+            }
+            for run in runs:
+                before = before_runs.get(run["concurrency"])
+                if before is None:
+                    continue
+                old = before["latency_ms"][metric]
+                new = run["latency_ms"][metric]
+                change = (new - old) / old * 100 if old else 0.0
+                rows.append(
+                    (
+                        f"{section}.{name}",
+                        run["concurrency"],
+                        old,
+                        new,
+                        change,
+                        change > threshold,
+                    )
+                )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--metric", default="p99", help="Latency percentile to compare")
+    parser.add_argument(
+        "--threshold", type=float, default=10.0, help="Allowed slowdown in percent"
+    )
+    args = parser.parse_args()
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    print(
+        f"Comparing {args.metric}: {baseline['metadata'].get('commit')} -> "
+        f"{candidate['metadata'].get('commit')}"
+    )
+
+    rows = compare(baseline, candidate, args.metric, args.threshold)
+    for name, level, old, new, change, regressed in rows:
+        marker = "✗" if regressed else "✓"
+        print(
+            f"  {marker} {name:<50} c={level:<3} {old:9.2f}ms -> {new:9.2f}ms "
+            f"({change:+6.1f}%)"
+        )
+
+    regressions = [row for row in rows if row[-1]]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold}%")
+        sys.exit(1)
+    print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
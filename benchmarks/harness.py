@@ -0,0 +1,127 @@
+"""
+Measurement helpers for the benchmark suite.
+
+Runs a callable at a fixed concurrency level and reports latency percentiles
+and throughput, plus the metadata needed to compare runs between commits.
+"""
+
+import json
+import math
+import os
+import platform
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """
+    Return the pct-th percentile of already sorted values (linear interpolation).
+
+    Args:
+        sorted_values: Values in ascending order
+        pct: Percentile between 0 and 100
+
+    Returns:
+        Interpolated percentile, or 0.0 for no values
+    """
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return sorted_values[low]
+    weight = rank - low
+    return sorted_values[low] * (1 - weight) + sorted_values[high] * weight
+
+
+def measure(
+    fn: Callable[[], Any], concurrency: int, requests: int, warmup: int = 5
+) -> Dict[str, Any]:
+    """
+    Call fn `requests` times from `concurrency` threads and summarize latencies.
+
+    Args:
+        fn: Zero-argument callable performing one request; raising counts as an error
+        concurrency: Number of worker threads issuing requests
+        requests: Total number of measured calls
+        warmup: Calls made before measuring (not reported)
+
+    Returns:
+        Dictionary with count, errors, throughput and latency percentiles in ms
+    """
+    for _ in range(warmup):
+        try:
+            fn()
+        except Exception:
+            pass
+
+    def timed_call(_):
+        start = time.perf_counter()
+        try:
+            fn()
+            ok = True
+        except Exception:
+            ok = False
+        return (time.perf_counter() - start) * 1000, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed_call, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, ok in results if ok)
+    errors = sum(1 for _, ok in results if not ok)
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "duration_s": round(elapsed, 4),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "min": round(latencies[0], 3) if latencies else 0.0,
+            "mean": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50), 3),
+            "p90": round(percentile(latencies, 90), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "max": round(latencies[-1], 3) if latencies else 0.0,
+        },
+    }
+
+
+def run_metadata(**extra: Any) -> Dict[str, Any]:
+    """Return metadata identifying the commit and machine a run was made on"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        **extra,
+    }
+
+
+def write_results(path: str, results: Dict[str, Any]) -> None:
+    """Write results as stable, diff-friendly JSON"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+        file.write("\n")
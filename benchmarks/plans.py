@@ -0,0 +1,235 @@
+"""
+Before/after query plan report for the relationship property indexes.
+
+Every query that the ROUTE.Airline and ROUTE.Distance indexes are meant to
+serve is profiled twice against a local Neo4j: first with those indexes
+dropped, then with the schema recreated. The queries are imported from the
+API router and the dashboard connector, so the report covers the text they
+send. It lists db hits, rows and time per query plus both plan trees.
+
+Dropping indexes changes the database, so the script refuses to run unless
+NEO4J_URI points at localhost.
+
+Usage:
+    python benchmarks/plans.py                # PROFILE (executes the queries)
+    python benchmarks/plans.py --explain      # EXPLAIN only (estimated rows)
+"""
+
+import argparse
+import os
+import sys
+from urllib.parse import urlparse
+
+from harness import REPO_ROOT, run_metadata
+
+sys.path.insert(0, os.path.join(REPO_ROOT, "database"))
+sys.path.insert(0, os.path.join(REPO_ROOT, "database", "helper"))
+sys.path.insert(0, os.path.join(REPO_ROOT, "dashboard"))
+sys.path.insert(0, os.path.join(REPO_ROOT, "api"))
+import loader  # noqa: E402
+from database_connector import (  # noqa: E402
+    AIRLINE_NETWORK_QUERY,
+    AIRLINE_ROUTES_QUERY,
+)
+from route_search import plan_route_search  # noqa: E402
+from routers.routes import ROUTES_BY_AIRLINE_QUERY  # noqa: E402
+
+# Indexes dropped for the "before" run; create_schema() restores them
+RELATIONSHIP_INDEXES = ("route_airline", "route_distance")
+
+# Hosts the script may drop indexes on
+LOCAL_HOSTS = ("localhost", "127.0.0.1", "::1")
+
+AIRLINE_STATS_BEFORE_QUERY = """
+MATCH (a:Airline {IATA: $iata})<-[:operates]-(source:Airport)-[r:ROUTE {Airline: $iata}]->(dest:Airport)
+WITH a, count(r) as total_routes, avg(r.Distance) as avg_distance,
+     count(DISTINCT source) as airports_from, count(DISTINCT dest) as airports_to
+RETURN a.IATA as IATA, total_routes, avg_distance, airports_from, airports_to
+"""
+
+AIRLINE_STATS_QUERY = """
+MATCH (a:Airline {IATA: $iata})
+RETURN a.IATA as IATA, a.RouteCount as total_routes, a.AvgDistance as avg_distance,
+       a.AirportsFrom as airports_from, a.AirportsTo as airports_to
+"""
+
+_search_by_airline = plan_route_search({"airline": "AA", "max_distance": 3000})
+_search_by_distance = plan_route_search({"min_distance": 12000}, sort="-distance")
+
+# (name, query, parameters, query before the change or None for the same
+# query)
+PLAN_QUERIES = [
+    (
+        "routes_by_airline",
+        ROUTES_BY_AIRLINE_QUERY,
+        {"airline_iata": "AA", "limit": 50, "include_codeshare": True},
+        None,
+    ),
+    (
+        "get_airline_routes",
+        AIRLINE_ROUTES_QUERY,
+        {"iata": "AA", "limit": 1000, "include_codeshare": True},
+        None,
+    ),
+    (
+        "get_airline_network",
+        AIRLINE_NETWORK_QUERY,
+        {"iata": "AA", "limit": 200, "include_codeshare": True},
+        None,
+    ),
+    (
+        "get_airline_route_stats",
+        AIRLINE_STATS_QUERY,
+        {"iata": "AA"},
+        AIRLINE_STATS_BEFORE_QUERY,
+    ),
+    ("routes_search_airline", *_search_by_airline, None),
+    ("routes_search_distance", *_search_by_distance, None),
+]
+
+
+def profile(session, query, params, explain=False):
+    """Run a query under PROFILE (or EXPLAIN) and summarize its plan"""
+    prefix = "EXPLAIN" if explain else "PROFILE"
+    summary = session.run(f"{prefix} {query}", params).consume()
+    plan = summary.plan if explain else summary.profile
+    return {
+        "db_hits": None if explain else total(plan, "dbHits"),
+        "rows": None if explain else plan.get("rows"),
+        "estimated_rows": plan.get("args", {}).get("EstimatedRows"),
+        "time_ms": (
+            None
+            if explain
+            else (summary.result_available_after or 0)
+            + (summary.result_consumed_after or 0)
+        ),
+        "operators": operators(plan),
+        "tree": render(plan),
+    }
+
+
+def total(plan, key):
+    """Sum a counter over a plan tree"""
+    return plan.get(key, 0) + sum(total(child, key) for child in plan["children"])
+
+
+def operators(plan):
+    """Return the operator names of a plan tree, without the planner suffix"""
+    names = [plan["operatorType"].split("@")[0]]
+    for child in plan["children"]:
+        names.extend(operators(child))
+    return names
+
+
+def render(plan, depth=0):
+    """Render a plan tree as indented text, one operator per line"""
+    args = plan.get("args", {})
+    line = "  " * depth + plan["operatorType"].split("@")[0]
+    if args.get("Details"):
+        line += f"  {args['Details']}"
+    if "dbHits" in plan:
+        line += f"  [rows={plan.get('rows')}, db hits={plan['dbHits']}]"
+    lines = [line]
+    for child in plan["children"]:
+        lines.extend(render(child, depth + 1))
+    return lines
+
+
+def is_local(uri):
+    """Return True if a Neo4j URI points at this machine"""
+    return urlparse(uri).hostname in LOCAL_HOSTS
+
+
+def set_relationship_indexes(driver, present):
+    """Drop the relationship indexes, or recreate the full schema"""
+    if present:
+        loader.create_schema()
+        return
+    with driver.session() as session:
+        for name in RELATIONSHIP_INDEXES:
+            session.run(f"DROP INDEX {name} IF EXISTS").consume()
+
+
+def write_report(path, results, metadata, explain):
+    """Write the before/after comparison as Markdown"""
+    counter = "estimated_rows" if explain else "db_hits"
+    lines = [
+        "# Query plans: relationship property indexes",
+        "",
+        f"Commit `{metadata['commit']}`, {metadata['timestamp']}, "
+        f"{'EXPLAIN' if explain else 'PROFILE'}",
+        "",
+        f"| Query | {counter} before | {counter} after | ms before | ms after "
+        "| Index seek after |",
+        "| --- | --- | --- | --- | --- | --- |",
+    ]
+    for name, (before, after) in results.items():
+        seek = any("IndexSeek" in op for op in after["operators"])
+        lines.append(
+            f"| {name} | {before[counter]} | {after[counter]} "
+            f"| {before['time_ms']} | {after['time_ms']} | {'yes' if seek else 'no'} |"
+        )
+    for name, (before, after) in results.items():
+        for label, result in (("Before", before), ("After", after)):
+            lines += ["", f"## {name}: {label}", "", "```", *result["tree"], "```"]
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as file:
+        file.write("\n".join(lines) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--explain", action="store_true", help="Plan only, do not run the queries"
+    )
+    parser.add_argument("--output", help="Report path (default: benchmarks/results/)")
+    args = parser.parse_args()
+
+    if not is_local(loader.NEO4J_URI):
+        print(
+            f"Refusing to drop indexes on {loader.NEO4J_URI}: "
+            "point NEO4J_URI at a local Neo4j"
+        )
+        sys.exit(1)
+    if not loader.test_connection():
+        sys.exit(1)
+
+    driver = loader.driver
+    metadata = run_metadata()
+    results = {}
+    try:
+        try:
+            set_relationship_indexes(driver, present=False)
+            with driver.session() as session:
+                for name, query, params, before in PLAN_QUERIES:
+                    before = before or query
+                    results[name] = [profile(session, before, params, args.explain)]
+        finally:
+            # Never leave the database without its indexes
+            set_relationship_indexes(driver, present=True)
+
+        with driver.session() as session:
+            for name, query, params, _ in PLAN_QUERIES:
+                results[name].append(profile(session, query, params, args.explain))
+                before, after = results[name]
+                print(
+                    f"{name:28} db hits {before['db_hits']} -> {after['db_hits']}"
+                    if not args.explain
+                    else f"{name:28} {' > '.join(after['operators'])}"
+                )
+    finally:
+        driver.close()
+
+    output = args.output or os.path.join(
+        REPO_ROOT,
+        "benchmarks",
+        "results",
+        f"plans-{(metadata['commit'] or 'local')[:7]}.md",
+    )
+    write_report(output, results, metadata, args.explain)
+    print(f"Report written to {output}")
+
+
+if __name__ == "__main__":
+    main()
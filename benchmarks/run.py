@@ -0,0 +1,178 @@
+"""
+Benchmark every API endpoint and Neo4jConnector method.
+
+Each workload is run at every concurrency level and its latency percentiles
+and throughput are written as JSON, so two runs can be compared with
+benchmarks/compare.py.
+
+Usage:
+    python benchmarks/run.py --target all --concurrency 1,8,32 --requests 200
+"""
+
+import argparse
+import os
+import sys
+
+import requests
+
+from harness import REPO_ROOT, measure, run_metadata, write_results
+from workloads import API_ENDPOINTS, CONNECTOR_METHODS
+
+sys.path.insert(0, os.path.join(REPO_ROOT, "dashboard"))
+
+
+def bench_api(base_url, levels, count, only=None, encoding="gzip"):
+    """Benchmark the HTTP endpoints of a running API"""
+    http = requests.Session()
+    http.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=max(levels)))
+    http.headers["Accept-Encoding"] = encoding
+    results = {}
+
+    for name, path, *body in API_ENDPOINTS:
+        if only and name not in only:
+            continue
+
+        wire = []
+
+        def call(url=f"{base_url}{path}", body=body):
+            if body:
+                response = http.post(url, json=body[0], timeout=30)
+            else:
+                response = http.get(url, timeout=30)
+            response.raise_for_status()
+            wire.append(wire_cost(response))
+
+        results[name] = []
+        for level in levels:
+            wire.clear()
+            run = measure(call, level, count)
+            run.update(summarize_wire(wire))
+            results[name].append(run)
+        print_summary(f"api.{name}", results[name])
+
+    return results
+
+
+def wire_cost(response):
+    """Return (bytes on the wire, server compression ms) of one response"""
+    size = response.headers.get("content-length")
+    compress_ms = 0.0
+    for metric in response.headers.get("server-timing", "").split(","):
+        name, _, duration = metric.strip().partition(";dur=")
+        if name == "compress":
+            compress_ms = float(duration)
+    return int(size) if size else len(response.content), compress_ms
+
+
+def summarize_wire(wire):
+    """Average bytes on the wire and compression CPU time per response"""
+    if not wire:
+        return {"bytes_on_wire": 0, "compress_ms": 0.0}
+    return {
+        "bytes_on_wire": round(sum(size for size, _ in wire) / len(wire)),
+        "compress_ms": round(sum(ms for _, ms in wire) / len(wire), 3),
+    }
+
+
+def bench_connector(levels, count, only=None):
+    """Benchmark the dashboard's Neo4jConnector methods directly"""
+    from database_connector import Neo4jConnector
+
+    db = Neo4jConnector()
+    results = {}
+    try:
+        for name, args, kwargs in CONNECTOR_METHODS:
+            if only and name not in only:
+                continue
+
+            method = getattr(db, name)
+            results[name] = [
+                measure(lambda: method(*args, **kwargs), level, count)
+                for level in levels
+            ]
+            print_summary(f"connector.{name}", results[name])
+    finally:
+        db.close()
+
+    return results
+
+
+def print_summary(label, runs):
+    """Print one line per concurrency level"""
+    for run in runs:
+        latency = run["latency_ms"]
+        print(
+            f"  {label:<45} c={run['concurrency']:<3} "
+            f"p50={latency['p50']:8.2f}ms p99={latency['p99']:8.2f}ms "
+            f"{run['throughput_rps']:9.1f} req/s errors={run['errors']}"
+            + (
+                f" {run['bytes_on_wire']}B/resp compress={run['compress_ms']:.3f}ms"
+                if "bytes_on_wire" in run
+                else ""
+            )
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--target", choices=["api", "connector", "all"], default="all"
+    )
+    parser.add_argument(
+        "--api-url", default=os.getenv("API_URL", "http://localhost:8000")
+    )
+    parser.add_argument(
+        "--concurrency", default="1,8,32", help="Comma-separated concurrency levels"
+    )
+    parser.add_argument(
+        "--requests", type=int, default=200, help="Requests per workload and level"
+    )
+    parser.add_argument(
+        "--encoding",
+        default="gzip",
+        help="Accept-Encoding sent to the API (identity = uncompressed)",
+    )
+    parser.add_argument(
+        "--scale", type=int, default=1, help="Scale factor of the seeded database"
+    )
+    parser.add_argument(
+        "--only", help="Comma-separated workload names to run (default: all)"
+    )
+    parser.add_argument(
+        "--output",
+        help="Result file (default: benchmarks/results/<commit>-<scale>x.json)",
+    )
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    only = set(args.only.split(",")) if args.only else None
+    metadata = run_metadata(
+        scale=args.scale,
+        concurrency=levels,
+        requests=args.requests,
+        encoding=args.encoding,
+    )
+    results = {"metadata": metadata}
+
+    if args.target in ("api", "all"):
+        print(f"Benchmarking API at {args.api_url}...")
+        results["api"] = bench_api(
+            args.api_url, levels, args.requests, only, args.encoding
+        )
+
+    if args.target in ("connector", "all"):
+        print("Benchmarking Neo4jConnector...")
+        results["connector"] = bench_connector(levels, args.requests, only)
+
+    output = args.output or os.path.join(
+        REPO_ROOT,
+        "benchmarks",
+        "results",
+        f"{(metadata['commit'] or 'unknown')[:12]}-{args.scale}x.json",
+    )
+    write_results(output, results)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
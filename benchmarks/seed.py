@@ -0,0 +1,201 @@
+"""
+Seed a local Neo4j with OpenFlights data, optionally scaled up synthetically.
+
+The real dataset is prepared with the loader's own prepare_* functions. For
+scale factors above 1, extra routes are sampled from the real route endpoints
+and airlines (so hubs stay hubs) with a fixed random seed, which keeps every
+seeded database identical for a given factor.
+
+Usage:
+    python benchmarks/seed.py --scale 10 --reset
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+DATABASE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "database"
+)
+sys.path.insert(0, DATABASE_DIR)
+import loader  # noqa: E402
+
+SEED_BATCH_SIZE = int(os.getenv("SEED_BATCH_SIZE", "5000"))
+
+
+def read_dataset(dataset_key, data_dir=None):
+    """Read an OpenFlights dataset from a local copy or download it"""
+    if data_dir is None:
+        return loader.load_openflights_dataframe(dataset_key)
+
+    config = loader.OPENFLIGHTS_DATASETS[dataset_key]
+    df = pd.read_csv(
+        os.path.join(data_dir, config["filename"]),
+        names=config["columns"],
+        header=None,
+        na_values=["\\N", ""],
+        keep_default_na=False,
+        dtype=str,
+        encoding_errors="replace",
+    )
+    return df.where(pd.notnull(df), None)
+
+
+def scale_routes(routes_df, airports_df, factor, seed=42):
+    """
+    Add synthetic routes so the result has roughly `factor` times as many.
+
+    Sources, destinations and airlines are sampled independently from the
+    real route columns, so the degree distribution of the real network is
+    preserved. Self-loops and duplicate (airline, source, destination)
+    triples are dropped.
+    """
+    if factor <= 1:
+        return routes_df
+
+    rng = np.random.default_rng(seed)
+    extra = len(routes_df) * (factor - 1)
+
+    synthetic = pd.DataFrame(
+        {
+            "Airline": rng.choice(routes_df["Airline"].to_numpy(), extra),
+            "Source airport": rng.choice(routes_df["Source airport"].to_numpy(), extra),
+            "Destination airport": rng.choice(
+                routes_df["Destination airport"].to_numpy(), extra
+            ),
+            "Equipment": rng.choice(routes_df["Equipment"].to_numpy(), extra),
+            "Stops": "0",
+            "Codeshare": None,
+        }
+    )
+    synthetic = synthetic[
+        synthetic["Source airport"] != synthetic["Destination airport"]
+    ]
+
+    coords = airports_df.drop_duplicates("IATA").set_index("IATA")
+    lat = pd.to_numeric(coords["Latitude"], errors="coerce")
+    lon = pd.to_numeric(coords["Longitude"], errors="coerce")
+    lat1 = np.radians(synthetic["Source airport"].map(lat).to_numpy(dtype=float))
+    lon1 = np.radians(synthetic["Source airport"].map(lon).to_numpy(dtype=float))
+    lat2 = np.radians(synthetic["Destination airport"].map(lat).to_numpy(dtype=float))
+    lon2 = np.radians(synthetic["Destination airport"].map(lon).to_numpy(dtype=float))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    synthetic["Distance"] = np.round(6371.0 * 2 * np.arcsin(np.sqrt(a)), 2)
+
+    combined = pd.concat([routes_df, synthetic], ignore_index=True)
+    combined = combined.drop_duplicates(
+        subset=["Airline", "Source airport", "Destination airport"]
+    )
+    return combined.where(pd.notnull(combined), None)
+
+
+def batched_query(cypher_file):
+    """
+    Turn one of the loader's per-record Cypher files into an UNWIND batch query.
+
+    Every $param becomes row.param so the same statement can upsert a whole
+    batch of records in one round trip.
+    """
+    query = loader.load_query_from_file(cypher_file).strip().rstrip(";")
+    query = re.sub(r"\$(`[^`]+`|\w+)", r"row.\1", query)
+    return f"UNWIND $rows AS row\n{query}"
+
+
+def upload(driver, dataframe, cypher_file, label):
+    """Upload a DataFrame in UNWIND batches and report throughput"""
+    query = batched_query(cypher_file)
+    records = dataframe.to_dict(orient="records")
+    start = time.perf_counter()
+
+    with driver.session() as session:
+        for i in range(0, len(records), SEED_BATCH_SIZE):
+            session.execute_write(
+                lambda tx, rows: tx.run(query, rows=rows).consume(),
+                records[i : i + SEED_BATCH_SIZE],
+            )
+
+    elapsed = time.perf_counter() - start
+    rate = len(records) / elapsed if elapsed else 0
+    print(f"  ✓ {label}: {len(records):,} records in {elapsed:.1f}s ({rate:,.0f}/s)")
+
+
+def reset_database(driver):
+    """Delete every node and relationship"""
+    with driver.session() as session:
+        session.run(
+            "MATCH (n) CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS"
+        ).consume()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--scale", type=int, default=1, help="Route multiplier (1, 10, 100)"
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument(
+        "--data-dir", help="Directory with local airports/airlines/routes.dat copies"
+    )
+    parser.add_argument(
+        "--reset", action="store_true", help="Delete all data before seeding"
+    )
+    args = parser.parse_args()
+
+    if not loader.test_connection():
+        sys.exit(1)
+
+    driver = loader.driver
+    try:
+        if args.reset:
+            print("Resetting database...")
+            reset_database(driver)
+
+        loader.create_schema()
+
+        print("Preparing data...")
+        airports_df = loader.prepare_airports(read_dataset("airports", args.data_dir))
+        airlines_df = loader.prepare_airlines(read_dataset("airlines", args.data_dir))
+        routes_df = loader.prepare_routes(
+            read_dataset("routes", args.data_dir), airlines_df, airports_df
+        )
+        routes_df = scale_routes(routes_df, airports_df, args.scale, args.seed)
+        print(f"  Routes at scale {args.scale}x: {len(routes_df):,}")
+
+        # Readers must not use a snapshot of the previous data
+        loader.remove_snapshot()
+
+        print("Uploading...")
+        for dataset_key, dataframe in (
+            ("airports", airports_df),
+            ("airlines", airlines_df),
+            ("routes", routes_df),
+        ):
+            cypher_file = os.path.join(
+                DATABASE_DIR, loader.OPENFLIGHTS_DATASETS[dataset_key]["cypher"]
+            )
+            upload(driver, dataframe, cypher_file, dataset_key.capitalize())
+
+        print("Classifying codeshares...")
+        loader.classify_codeshares()
+        print("Building route counts...")
+        loader.build_route_counts()
+        print("Building fleet summary...")
+        loader.build_fleet_summary()
+        print("Building airline stats...")
+        loader.build_airline_stats()
+        loader.record_load(uuid.uuid4().hex)
+    finally:
+        driver.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark workloads: every API endpoint and every Neo4jConnector method.
+
+Sample arguments point at busy, well-known entities (JFK, LAX, AA) so that
+each request does realistic work on both the real and the scaled datasets.
+"""
+
+# (name, path[, JSON body]) for every endpoint in api/routers and api/main.py;
+# entries with a body are sent as POST
+API_ENDPOINTS = [
+    ("root", "/"),
+    ("airports_list", "/api/airports/?limit=50"),
+    (
+        "airports_list_coordinates",
+        "/api/airports/?limit=5000&fields=IATA,Latitude,Longitude",
+    ),
+    ("airport_by_iata", "/api/airports/JFK"),
+    ("airports_by_centrality", "/api/airports/centrality?metric=pagerank&limit=20"),
+    ("airports_reachable", "/api/airports/ATL/reachable?max_stops=2&max_km=8000"),
+    ("airports_by_country", "/api/airports/country/United States?limit=50"),
+    ("airlines_list", "/api/airlines/?limit=50"),
+    ("airline_by_iata", "/api/airlines/AA"),
+    ("airline_stats", "/api/airlines/AA/stats"),
+    ("airline_stats_operated", "/api/airlines/AA/stats?include_codeshare=false"),
+    ("airline_fleet", "/api/airlines/AA/fleet"),
+    ("airline_competition", "/api/airlines/AA/competition?limit=20"),
+    ("airlines_by_country", "/api/airlines/country/united states?limit=50"),
+    ("aircraft_types", "/api/aircraft/?limit=20"),
+    ("routes_by_aircraft", "/api/aircraft/738/routes?limit=50"),
+    ("market", "/api/markets/NYC"),
+    ("market_routes", "/api/markets/JFK/routes?limit=50"),
+    ("market_pair", "/api/markets/NYC/to/LON"),
+    ("routes_by_source", "/api/routes/source/JFK?limit=50"),
+    ("routes_by_destination", "/api/routes/destination/LAX?limit=50"),
+    ("routes_by_source_and_destination", "/api/routes/source/JFK/destination/LAX"),
+    ("routes_by_airline", "/api/routes/airline/AA?limit=50"),
+    (
+        "routes_by_airline_operated",
+        "/api/routes/airline/AA?limit=50&include_codeshare=false",
+    ),
+    ("routes_geometry_airline", "/api/routes/geometry?airline=AA&points=32"),
+    ("routes_density_png", "/api/routes/density?resolution=0.5"),
+    ("routes_competition_source", "/api/routes/competition/JFK"),
+    (
+        "routes_competition_source_operated",
+        "/api/routes/competition/JFK?include_codeshare=false",
+    ),
+    (
+        "routes_search",
+        "/api/routes/search?source_country=United States&airline=AA"
+        "&max_distance=3000&sort=-distance&limit=50",
+    ),
+    (
+        "routes_minimal_stops",
+        "/api/routes/stops",
+        {
+            "pairs": [
+                {"source": source, "destination": destination}
+                for source in ("JFK", "LAX", "ATL", "FRA", "SYD")
+                for destination in ("LHR", "NRT", "GRU", "JNB", "GKA")
+            ]
+        },
+    ),
+    (
+        "routes_competition_pairs",
+        "/api/routes/competition",
+        {
+            "pairs": [
+                {"source": source, "destination": destination}
+                for source in ("JFK", "LAX", "ATL", "FRA", "SYD")
+                for destination in ("LHR", "NRT", "ORD", "CDG", "MEL")
+            ]
+        },
+    ),
+]
+
+# (method name, args, kwargs) for every public query method of Neo4jConnector
+CONNECTOR_METHODS = [
+    ("get_total_airports", (), {}),
+    ("get_total_airlines", (), {}),
+    ("get_total_routes", (), {}),
+    ("get_total_countries", (), {}),
+    ("search_airports", ("london",), {"limit": 50}),
+    ("get_airport_by_iata", ("JFK",), {}),
+    ("get_airports_by_country", ("United States",), {"limit": 100}),
+    ("get_all_airports_for_map", (), {"limit": 5000}),
+    ("get_all_airports_for_map_df", (), {"limit": 5000}),
+    ("get_airports_by_country_df", ("United States",), {"limit": 1000}),
+    ("get_routes_from_airport", ("JFK",), {"limit": 100}),
+    ("get_routes_from_airport_df", ("JFK",), {"limit": 100}),
+    (
+        "search_routes",
+        (),
+        {"source_country": "Germany", "stops": 0, "sort": "-distance", "limit": 50},
+    ),
+    ("get_routes_between_airports", ("JFK", "LAX"), {}),
+    ("get_market", ("NYC",), {}),
+    ("get_market_routes", ("JFK",), {"limit": 50}),
+    ("get_market_pair", ("NYC", "LON"), {}),
+    ("get_minimal_stops", ([("JFK", "LAX"), ("ATL", "SYD"), ("FRA", "GKA")],), {}),
+    ("get_route_density", (0.5,), {}),
+    ("get_pair_competition", ([("JFK", "LAX"), ("ATL", "SYD"), ("FRA", "GKA")],), {}),
+    ("get_airport_competition", ("JFK",), {}),
+    ("get_airline_competition", ("AA",), {"limit": 20}),
+    ("get_competition_summary", (), {}),
+    ("get_route_with_coordinates", ("JFK", "LAX"), {}),
+    ("get_top_airports_by_routes", (), {"limit": 10}),
+    ("get_top_airlines_by_routes", (), {"limit": 10}),
+    ("get_top_airports_by_centrality", ("PageRank",), {"limit": 15}),
+    ("get_countries_by_airport_count", (), {"limit": 15}),
+    ("get_all_countries", (), {}),
+    ("get_airline_by_iata", ("AA",), {}),
+    ("search_airlines", ("american",), {"limit": 50}),
+    ("get_airlines_by_country", ("United States",), {"limit": 100}),
+    ("get_airline_network", ("AA",), {"limit": 200}),
+    ("get_airline_route_stats", ("AA",), {}),
+    ("get_airline_routes", ("AA",), {"limit": 1000}),
+    ("get_airline_routes_df", ("AA",), {"limit": 1000}),
+    ("get_airline_fleet", ("AA",), {}),
+    ("get_top_aircraft_types", (), {"limit": 20}),
+    ("get_routes_by_equipment", ("738",), {"limit": 100}),
+    ("get_countries_by_airline_count", (), {"limit": 15}),
+    ("get_airlines_by_active_status", (), {}),
+]
@@ -1,5 +1,6 @@
+import os
 import streamlit as st
-from database_connector import Neo4jConnector
+from database_connector import Neo4jConnector, metrics
 import pandas as pd
 
 # Page configuration
@@ -72,27 +73,53 @@ page = st.sidebar.radio(
 # Initialize connector
 db = get_db_connector()
 
-# Page routing
-if page == "🏠 Home":
-    from pages import home
+# Page routing (all queries of one rerun share a single database session)
+with db.session():
+    if page == "🏠 Home":
+        from pages import home
 
-    home.show(db)
-elif page == "🔍 Airport Search":
-    from pages import airport_search
+        home.show(db)
+    elif page == "🔍 Airport Search":
+        from pages import airport_search
 
-    airport_search.show(db)
-elif page == "✈️ Airline Explorer":
-    from pages import airline_explorer
+        airport_search.show(db)
+    elif page == "✈️ Airline Explorer":
+        from pages import airline_explorer
 
-    airline_explorer.show(db)
-elif page == "🗺️ Route Explorer":
-    from pages import route_explorer
+        airline_explorer.show(db)
+    elif page == "🗺️ Route Explorer":
+        from pages import route_explorer
 
-    route_explorer.show(db)
-elif page == "📊 Analytics":
-    from pages import analytics
+        route_explorer.show(db)
+    elif page == "📊 Analytics":
+        from pages import analytics
 
-    analytics.show(db)
+        analytics.show(db)
+
+# Query debug panel (enable with DASHBOARD_DEBUG=1)
+if os.getenv("DASHBOARD_DEBUG", "0") == "1":
+    with st.sidebar.expander("🐞 Query Metrics"):
+        query_stats = metrics.snapshot()
+        if query_stats:
+            df_stats = pd.DataFrame.from_dict(query_stats, orient="index")
+            st.dataframe(
+                df_stats.sort_values("wall_ms", ascending=False)[
+                    ["calls", "wall_ms_avg", "wall_ms_max", "rows", "slow", "errors"]
+                ],
+                width="stretch",
+                column_config={
+                    "wall_ms_avg": st.column_config.NumberColumn(
+                        "Avg (ms)", format="%.1f"
+                    ),
+                    "wall_ms_max": st.column_config.NumberColumn(
+                        "Max (ms)", format="%.1f"
+                    ),
+                },
+            )
+        else:
+            st.write("No queries recorded yet")
+        if st.button("Reset metrics"):
+            metrics.reset()
 
 # Footer
 st.sidebar.markdown("---")
@@ -1,11 +1,107 @@
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, READ_ACCESS, Result, RoutingControl
 import os
-from typing import List, Dict, Any, Optional
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Callable, Iterator, Tuple
+import pandas as pd
 from dotenv import load_dotenv
 
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow is optional, only execute_query_arrow needs it
+    pa = None
+
+# Add the shared helper directory to path for query instrumentation
+HELPER_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "database", "helper"
+)
+sys.path.insert(0, HELPER_DIR)
+from competition_matrix import load_competition_matrix
+from query_metrics import metrics, profile_query
+from route_density import load_route_density
+from route_search import paginate, plan_route_search
+from stops_matrix import load_stops_matrix
+
 # Load environment variables from .env file
 load_dotenv()
 
+# Column dtypes for the DataFrame/Arrow variants of the route queries
+ROUTE_DTYPES = {
+    "distance": "float64",
+    "stops": "Int64",
+    "airline": "category",
+    "source_country": "category",
+    "dest_country": "category",
+}
+
+AIRPORT_MAP_DTYPES = {
+    "Latitude": "float64",
+    "Longitude": "float64",
+    "Country": "category",
+}
+
+# Airport properties written by database/compute_centrality.py
+CENTRALITY_METRICS = ("PageRank", "Betweenness", "DegreeIn", "DegreeOut")
+
+# Queries shared by the list and DataFrame variants of a method
+# plan-check: allow NodeByLabelScan (every airport is drawn on the map)
+ALL_AIRPORTS_FOR_MAP_QUERY = """
+MATCH (a:Airport)
+WHERE a.Latitude IS NOT NULL AND a.Longitude IS NOT NULL
+RETURN a.IATA as IATA, a.Name as Name, a.City as City,
+       a.Country as Country, a.Latitude as Latitude,
+       a.Longitude as Longitude
+LIMIT $limit
+"""
+
+AIRPORTS_BY_COUNTRY_FOR_MAP_QUERY = """
+MATCH (a:Airport {Country: $country})
+WHERE a.Latitude IS NOT NULL AND a.Longitude IS NOT NULL
+RETURN a.IATA as IATA, a.Name as Name, a.City as City,
+       a.Country as Country, a.Latitude as Latitude,
+       a.Longitude as Longitude
+LIMIT $limit
+"""
+
+ROUTES_FROM_AIRPORT_QUERY = """
+MATCH (source:Airport {IATA: $iata})-[r:ROUTE]->(dest:Airport)
+WHERE $include_codeshare OR r.Operated
+RETURN source.IATA as source, dest.IATA as destination,
+       dest.Name as dest_name, dest.City as dest_city,
+       dest.Country as dest_country, r.Airline as airline,
+       r.Distance as distance
+ORDER BY r.Distance
+LIMIT $limit
+"""
+
+AIRLINE_ROUTES_QUERY = """
+MATCH (source:Airport)-[r:ROUTE]->(dest:Airport)
+WHERE r.Airline = $iata AND ($include_codeshare OR r.Operated)
+RETURN source.IATA as source, source.Name as source_name,
+       source.City as source_city, source.Country as source_country,
+       dest.IATA as destination, dest.Name as dest_name,
+       dest.City as dest_city, dest.Country as dest_country,
+       r.Distance as distance, r.Stops as stops,
+       r.Equipment as equipment
+ORDER BY r.Distance DESC
+LIMIT $limit
+"""
+
+AIRLINE_NETWORK_QUERY = """
+MATCH (source:Airport)-[r:ROUTE]->(dest:Airport)
+WHERE r.Airline = $iata AND ($include_codeshare OR r.Operated)
+   AND source.Latitude IS NOT NULL AND source.Longitude IS NOT NULL
+   AND dest.Latitude IS NOT NULL AND dest.Longitude IS NOT NULL
+RETURN source.IATA as source_iata, source.Name as source_name,
+       source.Latitude as source_lat, source.Longitude as source_lon,
+       dest.IATA as dest_iata, dest.Name as dest_name,
+       dest.Latitude as dest_lat, dest.Longitude as dest_lon,
+       r.Distance as distance
+LIMIT $limit
+"""
+
 
 class Neo4jConnector:
     """Connector for Neo4j database operations"""
@@ -14,46 +110,187 @@ class Neo4jConnector:
         self.uri = os.getenv("NEO4J_URI", "bolt://localhost:7687")
         self.user = os.getenv("NEO4J_USERNAME", "neo4j")
         self.password = os.getenv("NEO4J_PASSWORD", "airfacts-pw")
+        self.database = os.getenv("NEO4J_DATABASE") or None
         self.driver = GraphDatabase.driver(self.uri, auth=(self.user, self.password))
+        # The connector is cached across Streamlit script threads, so the
+        # shared session opened by session() is tracked per thread
+        self._local = threading.local()
 
     def close(self):
         """Close the database connection"""
         if self.driver:
             self.driver.close()
 
+    @contextmanager
+    def session(self) -> Iterator[Any]:
+        """
+        Share one read session across every query issued inside the block.
+
+        Wrap a whole page render (one Streamlit rerun) in this so the queries
+        it issues reuse the same session instead of opening one each. Nested
+        blocks reuse the outer session.
+        """
+        current = getattr(self._local, "session", None)
+        if current is not None:
+            yield current
+            return
+
+        with self.driver.session(
+            database=self.database, default_access_mode=READ_ACCESS
+        ) as session:
+            self._local.session = session
+            try:
+                yield session
+            finally:
+                self._local.session = None
+
+    def _execute_read(
+        self,
+        query: str,
+        parameters: Optional[Dict],
+        transformer: Callable[[Result], Any],
+        name: Optional[str] = None,
+    ) -> Any:
+        """
+        Run a query as a managed read transaction and transform its result.
+
+        Uses the shared session when inside session(), otherwise the driver's
+        execute_query. Both route to read replicas on a cluster and retry
+        transient failures. Every call is timed and recorded in the shared
+        metrics registry under `name`, by default the name of the function
+        that called the execute_* method.
+        """
+        name = name or sys._getframe(2).f_code.co_name
+        parameters = parameters or {}
+        query_text = profile_query(query)
+
+        def transform(result: Result) -> Any:
+            value = transformer(result)
+            return value, result.consume()
+
+        start = time.perf_counter()
+        try:
+            session = getattr(self._local, "session", None)
+            if session is not None:
+                value, summary = session.execute_read(
+                    lambda tx: transform(tx.run(query_text, parameters))
+                )
+            else:
+                value, summary = self.driver.execute_query(
+                    query_text,
+                    parameters,
+                    routing_=RoutingControl.READ,
+                    database_=self.database,
+                    result_transformer_=transform,
+                )
+        except Exception:
+            wall_ms = (time.perf_counter() - start) * 1000
+            metrics.record(
+                name, wall_ms, error=True, query=query, parameters=parameters
+            )
+            raise
+
+        wall_ms = (time.perf_counter() - start) * 1000
+        metrics.record(
+            name,
+            wall_ms,
+            _row_count(value),
+            summary,
+            query=query,
+            parameters=parameters,
+        )
+        return value
+
     def execute_query(
-        self, query: str, parameters: Optional[Dict] = None
+        self, query: str, parameters: Optional[Dict] = None, name: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """Execute a Cypher query and return results as a list of dictionaries"""
-        with self.driver.session() as session:
-            result = session.run(query, parameters or {})
-            return [record.data() for record in result]
+        return self._execute_read(query, parameters, _records_to_dicts, name)
+
+    def execute_query_df(
+        self,
+        query: str,
+        parameters: Optional[Dict] = None,
+        dtypes: Optional[Dict[str, str]] = None,
+        name: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        Execute a Cypher query and return results as a pandas DataFrame.
+
+        Columns are collected straight from the record stream, without
+        building a dictionary per row, and cast to the given dtypes.
+        """
+        keys, columns = self._execute_read(query, parameters, _records_to_columns, name)
+        dtypes = dtypes or {}
+        return pd.DataFrame(
+            {
+                key: pd.Series(column, dtype=dtypes.get(key), name=key)
+                for key, column in zip(keys, columns)
+            },
+            columns=keys,
+        )
+
+    def execute_query_arrow(
+        self,
+        query: str,
+        parameters: Optional[Dict] = None,
+        dtypes: Optional[Dict[str, str]] = None,
+        name: Optional[str] = None,
+    ) -> "pa.Table":
+        """
+        Execute a Cypher query and return results as a pyarrow Table.
+
+        Uses the same dtype names as execute_query_df; "category" columns
+        become dictionary-encoded arrays.
+        """
+        if pa is None:
+            raise ImportError("execute_query_arrow requires pyarrow to be installed")
+
+        keys, columns = self._execute_read(query, parameters, _records_to_columns, name)
+        dtypes = dtypes or {}
+        arrays = [
+            _to_arrow_array(column, dtypes.get(key))
+            for key, column in zip(keys, columns)
+        ]
+        return pa.Table.from_arrays(arrays, names=keys)
+
+    def execute_scalar(
+        self, query: str, parameters: Optional[Dict] = None, name: Optional[str] = None
+    ) -> Any:
+        """Execute a Cypher query and return the first value of its single row"""
+        return self._execute_read(query, parameters, _first_value, name)
 
     # ===== Statistics Queries =====
 
     def get_total_airports(self) -> int:
         """Get total number of airports"""
         query = "MATCH (a:Airport) RETURN count(a) as count"
-        result = self.execute_query(query)
-        return result[0]["count"] if result else 0
+        return self.execute_scalar(query, name="get_total_airports") or 0
 
     def get_total_airlines(self) -> int:
         """Get total number of airlines"""
         query = "MATCH (a:Airline) RETURN count(a) as count"
-        result = self.execute_query(query)
-        return result[0]["count"] if result else 0
+        return self.execute_scalar(query, name="get_total_airlines") or 0
 
-    def get_total_routes(self) -> int:
-        """Get total number of routes"""
-        query = "MATCH ()-[r:ROUTE]->() RETURN count(r) as count"
-        result = self.execute_query(query)
-        return result[0]["count"] if result else 0
+    def get_total_routes(self, include_codeshare: bool = True) -> int:
+        """
+        Get total number of routes, optionally without codeshares (the
+        operated count is precomputed on the Dataset node at load time)
+        """
+        if include_codeshare:
+            query = "MATCH ()-[r:ROUTE]->() RETURN count(r) as count"
+        else:
+            query = """
+            MATCH (d:Dataset {Name: 'openflights'})
+            RETURN d.OperatedRouteCount as count
+            """
+        return self.execute_scalar(query, name="get_total_routes") or 0
 
     def get_total_countries(self) -> int:
         """Get total number of countries with airports"""
+        # plan-check: allow NodeByLabelScan (aggregate over all airports)
         query = "MATCH (a:Airport) RETURN count(DISTINCT a.Country) as count"
-        result = self.execute_query(query)
-        return result[0]["count"] if result else 0
+        return self.execute_scalar(query, name="get_total_countries") or 0
 
     # ===== Airport Queries =====
 
@@ -61,6 +298,7 @@ class Neo4jConnector:
         self, search_term: str, limit: int = 50
     ) -> List[Dict[str, Any]]:
         """Search airports by name, city, country, or IATA code"""
+        # plan-check: allow NodeByLabelScan (substring search)
         query = """
         MATCH (a:Airport)
         WHERE toLower(a.Name) CONTAINS toLower($search)
@@ -72,7 +310,9 @@ class Neo4jConnector:
                a.Longitude as Longitude, a.Altitude as Altitude
         LIMIT $limit
         """
-        return self.execute_query(query, {"search": search_term, "limit": limit})
+        return self.execute_query(
+            query, {"search": search_term, "limit": limit}, name="search_airports"
+        )
 
     def get_airport_by_iata(self, iata: str) -> Optional[Dict[str, Any]]:
         """Get detailed airport information by IATA code"""
@@ -85,7 +325,9 @@ class Neo4jConnector:
                a.DST as DST, a.`Tz database time zone` as TzDatabase,
                a.Type as Type, a.Source as Source
         """
-        result = self.execute_query(query, {"iata": iata.upper()})
+        result = self.execute_query(
+            query, {"iata": iata.upper()}, name="get_airport_by_iata"
+        )
         return result[0] if result else None
 
     def get_airports_by_country(
@@ -98,53 +340,263 @@ class Neo4jConnector:
                a.Latitude as Latitude, a.Longitude as Longitude
         LIMIT $limit
         """
-        return self.execute_query(query, {"country": country, "limit": limit})
+        return self.execute_query(
+            query, {"country": country, "limit": limit}, name="get_airports_by_country"
+        )
 
     def get_all_airports_for_map(self, limit: int = 5000) -> List[Dict[str, Any]]:
         """Get all airports with coordinates for mapping"""
-        query = """
-        MATCH (a:Airport)
-        WHERE a.Latitude IS NOT NULL AND a.Longitude IS NOT NULL
-        RETURN a.IATA as IATA, a.Name as Name, a.City as City,
-               a.Country as Country, a.Latitude as Latitude, 
-               a.Longitude as Longitude
-        LIMIT $limit
-        """
-        return self.execute_query(query, {"limit": limit})
+        return self.execute_query(
+            ALL_AIRPORTS_FOR_MAP_QUERY,
+            {"limit": limit},
+            name="get_all_airports_for_map",
+        )
+
+    def get_all_airports_for_map_df(self, limit: int = 5000) -> pd.DataFrame:
+        """Get all airports with coordinates for mapping as a DataFrame"""
+        return self.execute_query_df(
+            ALL_AIRPORTS_FOR_MAP_QUERY,
+            {"limit": limit},
+            dtypes=AIRPORT_MAP_DTYPES,
+            name="get_all_airports_for_map_df",
+        )
+
+    def get_airports_by_country_df(
+        self, country: str, limit: int = 100
+    ) -> pd.DataFrame:
+        """Get the airports of a country with coordinates as a DataFrame"""
+        return self.execute_query_df(
+            AIRPORTS_BY_COUNTRY_FOR_MAP_QUERY,
+            {"country": country, "limit": limit},
+            dtypes=AIRPORT_MAP_DTYPES,
+            name="get_airports_by_country_df",
+        )
 
     # ===== Route Queries =====
 
     def get_routes_from_airport(
-        self, iata: str, limit: int = 100
+        self, iata: str, limit: int = 100, include_codeshare: bool = True
     ) -> List[Dict[str, Any]]:
         """Get all routes departing from an airport"""
-        query = """
-        MATCH (source:Airport {IATA: $iata})-[r:ROUTE]->(dest:Airport)
-        RETURN source.IATA as source, dest.IATA as destination,
-               dest.Name as dest_name, dest.City as dest_city,
-               dest.Country as dest_country, r.Airline as airline,
-               r.Distance as distance
-        ORDER BY r.Distance
-        LIMIT $limit
+        return self.execute_query(
+            ROUTES_FROM_AIRPORT_QUERY,
+            {
+                "iata": iata.upper(),
+                "limit": limit,
+                "include_codeshare": include_codeshare,
+            },
+            name="get_routes_from_airport",
+        )
+
+    def get_routes_from_airport_df(
+        self, iata: str, limit: int = 100, include_codeshare: bool = True
+    ) -> pd.DataFrame:
+        """Get all routes departing from an airport as a DataFrame"""
+        return self.execute_query_df(
+            ROUTES_FROM_AIRPORT_QUERY,
+            {
+                "iata": iata.upper(),
+                "limit": limit,
+                "include_codeshare": include_codeshare,
+            },
+            dtypes=ROUTE_DTYPES,
+            name="get_routes_from_airport_df",
+        )
+
+    def search_routes(
+        self,
+        sort: str = "distance",
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        **filters: Any,
+    ) -> Dict[str, Any]:
         """
-        return self.execute_query(query, {"iata": iata.upper(), "limit": limit})
+        Search routes by any combination of source, destination,
+        source_country, destination_country, airline, min_distance,
+        max_distance, stops, equipment and codeshare, ordered server-side.
+
+        Returns:
+            {"routes": [...], "next_cursor": cursor of the next page or None}
+        """
+        query, params = plan_route_search(filters, sort, limit, cursor)
+        routes, next_cursor = paginate(
+            self.execute_query(query, params, name="search_routes"), limit, sort
+        )
+        return {"routes": routes, "next_cursor": next_cursor}
 
     def get_routes_between_airports(
-        self, source: str, destination: str
+        self, source: str, destination: str, include_codeshare: bool = True
     ) -> List[Dict[str, Any]]:
-        """Get all routes between two airports"""
+        """
+        Get all routes between two airports; a codeshare route has the
+        airline operating the flight in operated_by (if the loader found it)
+        """
         query = """
         MATCH (source:Airport {IATA: $source})-[r:ROUTE]->(dest:Airport {IATA: $destination})
+        WHERE $include_codeshare OR r.Operated
         RETURN source.IATA as source, source.Name as source_name,
                dest.IATA as destination, dest.Name as dest_name,
                r.Airline as airline, r.Distance as distance,
-               r.Stops as stops, r.Equipment as equipment
+               r.Stops as stops, r.Equipment as equipment,
+               r.Codeshare as codeshare, r.OperatedBy as operated_by
         ORDER BY r.Distance
         """
         return self.execute_query(
-            query, {"source": source.upper(), "destination": destination.upper()}
+            query,
+            {
+                "source": source.upper(),
+                "destination": destination.upper(),
+                "include_codeshare": include_codeshare,
+            },
+            name="get_routes_between_airports",
+        )
+
+    def get_market(self, code: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a city/metro market (by its Id, e.g. NYC, or by any of its
+        airports' IATA codes) with its airports, as precomputed by the loader
+        """
+        query = """
+        OPTIONAL MATCH (m:Market {Id: $code})
+        OPTIONAL MATCH (:Airport {IATA: $code})-[:IN_MARKET]->(am:Market)
+        WITH coalesce(m, am) AS m
+        WHERE m IS NOT NULL
+        RETURN m.Id as Id, m.Name as Name, m.Country as Country,
+               m.Airports as Airports,
+               coalesce(m.Destinations, 0) as destinations,
+               coalesce(m.RouteCount, 0) as total_routes,
+               coalesce(m.OperatedRouteCount, 0) as operated_routes
+        """
+        result = self.execute_query(query, {"code": code.upper()}, name="get_market")
+        return result[0] if result else None
+
+    def get_market_routes(self, code: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Get the markets served from a market, most routes first"""
+        query = """
+        OPTIONAL MATCH (m:Market {Id: $code})
+        OPTIONAL MATCH (:Airport {IATA: $code})-[:IN_MARKET]->(am:Market)
+        WITH coalesce(m, am) AS m
+        MATCH (m)-[mr:MARKET_ROUTE]->(d:Market)
+        RETURN m.Id as source, d.Id as destination, d.Name as destination_name,
+               d.Country as destination_country,
+               mr.Routes as routes, coalesce(mr.OperatedRoutes, 0) as operated_routes,
+               mr.Carriers as carriers, mr.Airlines as airlines,
+               mr.AirportPairs as airport_pairs, mr.MinDistance as min_distance,
+               mr.AvgDistance as avg_distance, mr.MaxDistance as max_distance
+        ORDER BY routes DESC, destination
+        LIMIT $limit
+        """
+        return self.execute_query(
+            query, {"code": code.upper(), "limit": limit}, name="get_market_routes"
+        )
+
+    def get_market_pair(
+        self, source: str, destination: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get route, carrier and distance statistics between two markets
+        (aggregated over all their airports)
+        """
+        query = """
+        OPTIONAL MATCH (s:Market {Id: $source})
+        OPTIONAL MATCH (:Airport {IATA: $source})-[:IN_MARKET]->(sa:Market)
+        WITH coalesce(s, sa) AS s
+        OPTIONAL MATCH (d:Market {Id: $destination})
+        OPTIONAL MATCH (:Airport {IATA: $destination})-[:IN_MARKET]->(da:Market)
+        WITH s, coalesce(d, da) AS d
+        MATCH (s)-[mr:MARKET_ROUTE]->(d)
+        RETURN s.Id as source, s.Name as source_name,
+               d.Id as destination, d.Name as destination_name,
+               mr.Routes as routes, coalesce(mr.OperatedRoutes, 0) as operated_routes,
+               mr.Carriers as carriers, mr.Airlines as airlines,
+               mr.AirportPairs as airport_pairs, mr.MinDistance as min_distance,
+               mr.AvgDistance as avg_distance, mr.MaxDistance as max_distance
+        """
+        result = self.execute_query(
+            query,
+            {"source": source.upper(), "destination": destination.upper()},
+            name="get_market_pair",
+        )
+        return result[0] if result else None
+
+    def get_minimal_stops(
+        self, pairs: List[Tuple[str, str]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the minimal number of legs and distance for a batch of airport pairs
+        from the precomputed stops matrix (empty if it has not been built)
+        """
+        matrix = load_stops_matrix()
+        if matrix is None:
+            return []
+        sources = [source.upper() for source, _ in pairs]
+        destinations = [destination.upper() for _, destination in pairs]
+        legs, distances = matrix.lookup(sources, destinations)
+        return [
+            {"source": s, "destination": d, "legs": n, "distance": km}
+            for s, d, n, km in zip(sources, destinations, legs, distances)
+        ]
+
+    def get_route_density(self, resolution: float = 0.5) -> Optional[Dict[str, Any]]:
+        """
+        Get the prebuilt global route-density image (PNG bytes) with its
+        highest cell count, or None if the rasters have not been built
+        """
+        density = load_route_density()
+        if density is None or resolution not in density.resolutions:
+            return None
+        return {
+            "png": density.png(resolution),
+            "max_count": density.max_count[f"{resolution:g}"],
+            "built_at": density.built_at,
+        }
+
+    def get_pair_competition(
+        self, pairs: List[Tuple[str, str]], include_codeshare: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the airlines flying each directed airport pair from the
+        precomputed competition matrix (empty if it has not been built)
+        """
+        matrix = load_competition_matrix(include_codeshare=include_codeshare)
+        if matrix is None:
+            return []
+        return matrix.lookup(
+            [source.upper() for source, _ in pairs],
+            [destination.upper() for _, destination in pairs],
         )
 
+    def get_airport_competition(
+        self, source: str, include_codeshare: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Get every airport pair leaving an airport with the airlines flying it,
+        most airlines first (empty if unknown or not built)
+        """
+        matrix = load_competition_matrix(include_codeshare=include_codeshare)
+        if matrix is None:
+            return []
+        return matrix.from_airport(source.upper()) or []
+
+    def get_airline_competition(
+        self, iata: str, limit: int = 20, include_codeshare: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get the market mix of an airline's airport pairs and its main
+        competitors (None if it has no routes or the matrix is not built)
+        """
+        matrix = load_competition_matrix(include_codeshare=include_codeshare)
+        if matrix is None:
+            return None
+        return matrix.airline_overlap(iata.upper(), limit=limit)
+
+    def get_competition_summary(
+        self, include_codeshare: bool = True
+    ) -> Dict[str, int]:
+        """Get the number of monopoly, duopoly and competitive airport pairs"""
+        matrix = load_competition_matrix(include_codeshare=include_codeshare)
+        return dict(matrix.markets) if matrix else {}
+
     def get_route_with_coordinates(
         self, source: str, destination: str
     ) -> Optional[Dict[str, Any]]:
@@ -159,39 +611,84 @@ class Neo4jConnector:
         LIMIT 1
         """
         result = self.execute_query(
-            query, {"source": source.upper(), "destination": destination.upper()}
+            query,
+            {"source": source.upper(), "destination": destination.upper()},
+            name="get_route_with_coordinates",
         )
         return result[0] if result else None
 
     # ===== Analytics Queries =====
 
-    def get_top_airports_by_routes(self, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get airports with most outgoing routes"""
-        query = """
-        MATCH (a:Airport)-[r:ROUTE]->()
+    def get_top_airports_by_routes(
+        self, limit: int = 10, include_codeshare: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Get airports with most outgoing routes, from the route counts
+        precomputed on the Airport nodes (without codeshares:
+        OperatedRouteCount)
+        """
+        count = "RouteCount" if include_codeshare else "OperatedRouteCount"
+        # plan-check: allow NodeByLabelScan (top-k over all airports)
+        query = f"""
+        MATCH (a:Airport)
+        WHERE a.{count} > 0
         RETURN a.IATA as IATA, a.Name as Name, a.City as City,
-               a.Country as Country, count(r) as route_count
+               a.Country as Country, a.{count} as route_count
         ORDER BY route_count DESC
         LIMIT $limit
         """
-        return self.execute_query(query, {"limit": limit})
+        return self.execute_query(
+            query, {"limit": limit}, name="get_top_airports_by_routes"
+        )
 
-    def get_top_airlines_by_routes(self, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get airlines operating the most routes"""
-        query = """
-        MATCH ()-[r:ROUTE]->()
-        WHERE r.Airline IS NOT NULL
-        WITH r.Airline as airline, count(r) as route_count
-        MATCH (a:Airline {IATA: airline})
+    def get_top_airlines_by_routes(
+        self, limit: int = 10, include_codeshare: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Get airlines with the most routes, from the route counts precomputed
+        on the Airline nodes (without codeshares: OperatedRouteCount)
+        """
+        count = "RouteCount" if include_codeshare else "OperatedRouteCount"
+        # plan-check: allow NodeByLabelScan (top-k over all airlines)
+        query = f"""
+        MATCH (a:Airline)
+        WHERE a.{count} > 0
         RETURN a.IATA as IATA, a.Name as Name, a.Country as Country,
-               route_count
+               a.{count} as route_count
         ORDER BY route_count DESC
         LIMIT $limit
         """
-        return self.execute_query(query, {"limit": limit})
+        return self.execute_query(
+            query, {"limit": limit}, name="get_top_airlines_by_routes"
+        )
+
+    def get_top_airports_by_centrality(
+        self, metric: str = "PageRank", limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """Get airports ranked by a precomputed centrality metric"""
+        if metric not in CENTRALITY_METRICS:
+            raise ValueError(
+                f"Invalid metric '{metric}'. Use one of {', '.join(CENTRALITY_METRICS)}"
+            )
+        # plan-check: allow NodeByLabelScan (top-k over all airports)
+        query = f"""
+        MATCH (a:Airport)
+        WHERE a.{metric} IS NOT NULL
+        RETURN a.IATA as IATA, a.Name as Name, a.City as City,
+               a.Country as Country, a.PageRank as PageRank,
+               a.Betweenness as Betweenness, a.DegreeIn as DegreeIn,
+               a.DegreeOut as DegreeOut, a.Component as Component,
+               a.ComponentSize as ComponentSize
+        ORDER BY a.{metric} DESC
+        LIMIT $limit
+        """
+        return self.execute_query(
+            query, {"limit": limit}, name="get_top_airports_by_centrality"
+        )
 
     def get_countries_by_airport_count(self, limit: int = 15) -> List[Dict[str, Any]]:
         """Get countries with most airports"""
+        # plan-check: allow NodeByLabelScan (aggregate over all airports)
         query = """
         MATCH (a:Airport)
         WHERE a.Country IS NOT NULL
@@ -199,17 +696,20 @@ class Neo4jConnector:
         ORDER BY airport_count DESC
         LIMIT $limit
         """
-        return self.execute_query(query, {"limit": limit})
+        return self.execute_query(
+            query, {"limit": limit}, name="get_countries_by_airport_count"
+        )
 
     def get_all_countries(self) -> List[str]:
         """Get list of all countries"""
+        # plan-check: allow NodeByLabelScan (aggregate over all airports)
         query = """
         MATCH (a:Airport)
         WHERE a.Country IS NOT NULL
         RETURN DISTINCT a.Country as country
         ORDER BY country
         """
-        result = self.execute_query(query)
+        result = self.execute_query(query, name="get_all_countries")
         return [r["country"] for r in result]
 
     # ===== Airline Queries =====
@@ -222,13 +722,16 @@ class Neo4jConnector:
                a.Callsign as Callsign, a.ICAO as ICAO, a.Alias as Alias,
                a.Active as Active
         """
-        result = self.execute_query(query, {"iata": iata.upper()})
+        result = self.execute_query(
+            query, {"iata": iata.upper()}, name="get_airline_by_iata"
+        )
         return result[0] if result else None
 
     def search_airlines(
         self, search_term: str, limit: int = 50
     ) -> List[Dict[str, Any]]:
         """Search airlines by name, country, or IATA code"""
+        # plan-check: allow NodeByLabelScan (substring search)
         query = """
         MATCH (a:Airline)
         WHERE toLower(a.Name) CONTAINS toLower($search)
@@ -238,7 +741,9 @@ class Neo4jConnector:
                a.Callsign as Callsign, a.Active as Active
         LIMIT $limit
         """
-        return self.execute_query(query, {"search": search_term, "limit": limit})
+        return self.execute_query(
+            query, {"search": search_term, "limit": limit}, name="search_airlines"
+        )
 
     def get_airlines_by_country(
         self, country: str, limit: int = 100
@@ -250,57 +755,128 @@ class Neo4jConnector:
                a.Callsign as Callsign, a.Active as Active
         LIMIT $limit
         """
-        return self.execute_query(query, {"country": country, "limit": limit})
+        return self.execute_query(
+            query, {"country": country, "limit": limit}, name="get_airlines_by_country"
+        )
 
-    def get_airline_network(self, iata: str, limit: int = 50) -> List[Dict[str, Any]]:
+    def get_airline_network(
+        self, iata: str, limit: int = 50, include_codeshare: bool = True
+    ) -> List[Dict[str, Any]]:
         """Get network visualization data for an airline (routes with coordinates)"""
+        return self.execute_query(
+            AIRLINE_NETWORK_QUERY,
+            {
+                "iata": iata.upper(),
+                "limit": limit,
+                "include_codeshare": include_codeshare,
+            },
+            name="get_airline_network",
+        )
+
+    def get_airline_route_stats(
+        self, iata: str, include_codeshare: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get the route statistics precomputed on the Airline node by the loader
+        (without codeshares: the Operated* statistics)
+        """
+        prefix = "" if include_codeshare else "Operated"
+        query = f"""
+        MATCH (a:Airline {{IATA: $iata}})
+        RETURN a.IATA as IATA, a.Name as Name, a.Country as Country,
+               coalesce(a.{prefix}RouteCount, 0) as total_routes,
+               a.{prefix}AvgDistance as avg_distance,
+               a.{prefix}MinDistance as min_distance,
+               a.{prefix}MaxDistance as max_distance,
+               coalesce(a.{prefix}AirportsFrom, 0) as airports_from,
+               coalesce(a.{prefix}AirportsTo, 0) as airports_to,
+               coalesce(a.{prefix}AirportsServed, 0) as airports_served
+        """
+        result = self.execute_query(
+            query, {"iata": iata.upper()}, name="get_airline_route_stats"
+        )
+        return result[0] if result else None
+
+    def get_airline_routes(
+        self, iata: str, limit: int = 100, include_codeshare: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Get all routes of an airline, optionally without codeshares"""
+        return self.execute_query(
+            AIRLINE_ROUTES_QUERY,
+            {
+                "iata": iata.upper(),
+                "limit": limit,
+                "include_codeshare": include_codeshare,
+            },
+            name="get_airline_routes",
+        )
+
+    def get_airline_routes_df(
+        self, iata: str, limit: int = 100, include_codeshare: bool = True
+    ) -> pd.DataFrame:
+        """Get all routes of an airline as a DataFrame"""
+        return self.execute_query_df(
+            AIRLINE_ROUTES_QUERY,
+            {
+                "iata": iata.upper(),
+                "limit": limit,
+                "include_codeshare": include_codeshare,
+            },
+            dtypes=ROUTE_DTYPES,
+            name="get_airline_routes_df",
+        )
+
+    def get_airline_fleet(self, iata: str) -> List[Dict[str, Any]]:
+        """Get the precomputed fleet mix of an airline (aircraft types by routes)"""
         query = """
-        MATCH (source:Airport)-[r:ROUTE {Airline: $iata}]->(dest:Airport)
-        WHERE source.Latitude IS NOT NULL AND source.Longitude IS NOT NULL
-           AND dest.Latitude IS NOT NULL AND dest.Longitude IS NOT NULL
-        RETURN source.IATA as source_iata, source.Name as source_name,
-               source.Latitude as source_lat, source.Longitude as source_lon,
-               dest.IATA as dest_iata, dest.Name as dest_name,
-               dest.Latitude as dest_lat, dest.Longitude as dest_lon,
-               r.Distance as distance
-        LIMIT $limit
+        MATCH (al:Airline {IATA: $iata})-[f:FLIES]->(ac:Aircraft)
+        RETURN ac.Code as code, f.Routes as routes,
+               toFloat(f.Routes) / al.FleetRoutes as share
+        ORDER BY routes DESC, code
         """
-        return self.execute_query(query, {"iata": iata.upper(), "limit": limit})
+        return self.execute_query(
+            query, {"iata": iata.upper()}, name="get_airline_fleet"
+        )
 
-    def get_airline_route_stats(self, iata: str) -> Optional[Dict[str, Any]]:
-        """Get route statistics for an airline"""
+    def get_top_aircraft_types(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Get aircraft types flown on the most routes"""
         query = """
-        MATCH (a:Airline {IATA: $iata})<-[:operates]-(source:Airport)-[r:ROUTE {Airline: $iata}]->(dest:Airport)
-        WITH a, count(r) as total_routes, 
-             avg(CASE WHEN r.Distance IS NOT NULL THEN r.Distance ELSE 0 END) as avg_distance,
-             min(CASE WHEN r.Distance IS NOT NULL THEN r.Distance ELSE 0 END) as min_distance,
-             max(CASE WHEN r.Distance IS NOT NULL THEN r.Distance ELSE 0 END) as max_distance,
-             count(DISTINCT source) as airports_from,
-             count(DISTINCT dest) as airports_to
-        RETURN a.IATA as IATA, a.Name as Name, a.Country as Country,
-               total_routes, avg_distance, min_distance, max_distance,
-               airports_from, airports_to
+        MATCH (ac:Aircraft)
+        WHERE ac.RouteCount > 0
+        RETURN ac.Code as code, ac.RouteCount as routes,
+               ac.AirlineCount as airlines
+        ORDER BY routes DESC, code
+        LIMIT $limit
         """
-        result = self.execute_query(query, {"iata": iata.upper()})
-        return result[0] if result else None
+        return self.execute_query(
+            query, {"limit": limit}, name="get_top_aircraft_types"
+        )
 
-    def get_airline_routes(self, iata: str, limit: int = 100) -> List[Dict[str, Any]]:
-        """Get all routes operated by an airline"""
+    def get_routes_by_equipment(
+        self, code: str, limit: int = 100, include_codeshare: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Get routes flown with an aircraft type (uses the EquipmentKey text index)"""
         query = """
-        MATCH (source:Airport)-[r:ROUTE {Airline: $iata}]->(dest:Airport)
-        RETURN source.IATA as source, source.Name as source_name,
-               source.City as source_city, source.Country as source_country,
-               dest.IATA as destination, dest.Name as dest_name,
-               dest.City as dest_city, dest.Country as dest_country,
-               r.Distance as distance, r.Stops as stops,
+        MATCH (source:Airport)-[r:ROUTE]->(dest:Airport)
+        WHERE r.EquipmentKey CONTAINS $key AND ($include_codeshare OR r.Operated)
+        RETURN source.IATA as source, dest.IATA as destination,
+               r.Airline as airline, r.Distance as distance,
                r.Equipment as equipment
-        ORDER BY r.Distance DESC
         LIMIT $limit
         """
-        return self.execute_query(query, {"iata": iata.upper(), "limit": limit})
+        return self.execute_query(
+            query,
+            {
+                "key": f" {code.strip().upper()} ",
+                "limit": limit,
+                "include_codeshare": include_codeshare,
+            },
+            name="get_routes_by_equipment",
+        )
 
     def get_countries_by_airline_count(self, limit: int = 15) -> List[Dict[str, Any]]:
         """Get countries with most airlines"""
+        # plan-check: allow NodeByLabelScan (aggregate over all airlines)
         query = """
         MATCH (a:Airline)
         WHERE a.Country IS NOT NULL
@@ -308,17 +884,64 @@ class Neo4jConnector:
         ORDER BY airline_count DESC
         LIMIT $limit
         """
-        return self.execute_query(query, {"limit": limit})
+        return self.execute_query(
+            query, {"limit": limit}, name="get_countries_by_airline_count"
+        )
 
     def get_airlines_by_active_status(self) -> Dict[str, int]:
         """Get count of active vs inactive airlines"""
+        # plan-check: allow NodeByLabelScan (aggregate over all airlines)
         query = """
         MATCH (a:Airline)
         RETURN a.Active as status, count(a) as count
         """
-        result = self.execute_query(query)
+        result = self.execute_query(query, name="get_airlines_by_active_status")
         counts = {}
         for row in result:
             status = "Active" if row["status"] == "Y" else "Inactive"
             counts[status] = row["count"]
         return counts
+
+
+def _records_to_dicts(result: Result) -> List[Dict[str, Any]]:
+    """Materialize a result as dictionaries, zipping the keys once per query"""
+    keys = result.keys()
+    return [dict(zip(keys, record)) for record in result]
+
+
+def _first_value(result: Result) -> Any:
+    """Return the first value of the first record, or None for no rows"""
+    record = result.single()
+    return record[0] if record else None
+
+
+def _row_count(value: Any) -> int:
+    """Count the rows in the output of one of the result transformers above"""
+    if isinstance(value, list):
+        return len(value)
+    if isinstance(value, tuple):
+        _, columns = value
+        return len(columns[0]) if columns else 0
+    return 0 if value is None else 1
+
+
+def _records_to_columns(result: Result):
+    """Collect a result column by column, returning (keys, columns)"""
+    keys = result.keys()
+    columns = [[] for _ in keys]
+    appenders = [column.append for column in columns]
+    for record in result:
+        for append, value in zip(appenders, record):
+            append(value)
+    return keys, columns
+
+
+def _to_arrow_array(column: List[Any], dtype: Optional[str]) -> "pa.Array":
+    """Build an Arrow array from a column using a pandas-style dtype name"""
+    if dtype == "category":
+        return pa.array(column, type=pa.string()).dictionary_encode()
+    if dtype == "float64":
+        return pa.array(column, type=pa.float64())
+    if dtype in ("int64", "Int64"):
+        return pa.array(column, type=pa.int64())
+    return pa.array(column)
@@ -3,6 +3,7 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from database_connector import Neo4jConnector
+from route_geometry import geometry_cache, plotly_path
 
 
 def show(db: Neo4jConnector):
@@ -133,30 +134,27 @@ def show_airline_details(db: Neo4jConnector, iata: str):
     # Route statistics
     st.subheader("🛫 Route Statistics")
 
-    routes_data = db.get_airline_routes(iata, limit=1000)
-
-    if routes_data:
-        df_routes = pd.DataFrame(routes_data)
+    df_routes = db.get_airline_routes_df(iata, limit=1000)
+    # Precomputed over all routes, not only the 1000 loaded above
+    stats = db.get_airline_route_stats(iata)
 
+    if not df_routes.empty:
         col1, col2, col3, col4 = st.columns(4)
 
         with col1:
-            st.metric("Total Routes", len(df_routes))
+            st.metric("Total Routes", stats["total_routes"])
 
         with col2:
-            if "distance" in df_routes.columns and df_routes["distance"].notna().any():
-                avg_distance = df_routes["distance"].mean()
-                st.metric("Avg Distance", f"{avg_distance:.0f} km")
+            if stats["avg_distance"] is not None:
+                st.metric("Avg Distance", f"{stats['avg_distance']:.0f} km")
             else:
                 st.metric("Avg Distance", "N/A")
 
         with col3:
-            unique_destinations = df_routes["destination"].nunique()
-            st.metric("Unique Destinations", unique_destinations)
+            st.metric("Unique Destinations", stats["airports_to"])
 
         with col4:
-            unique_sources = df_routes["source"].nunique()
-            st.metric("Hub Airports", unique_sources)
+            st.metric("Hub Airports", stats["airports_from"])
 
         st.markdown("---")
 
@@ -233,6 +231,47 @@ def show_airline_details(db: Neo4jConnector, iata: str):
     else:
         st.info(f"No routes found for airline {iata}")
 
+    # Fleet mix
+    fleet = db.get_airline_fleet(iata)
+
+    if fleet:
+        st.markdown("---")
+        st.subheader("✈️ Fleet Mix")
+
+        df_fleet = pd.DataFrame(fleet)
+        df_fleet["share"] = df_fleet["share"] * 100
+
+        col1, col2 = st.columns([2, 1])
+
+        with col1:
+            fig_fleet = px.bar(
+                df_fleet.head(15),
+                x="routes",
+                y="code",
+                orientation="h",
+                labels={"routes": "Routes", "code": "Aircraft Type"},
+                color="routes",
+                color_continuous_scale="Blues",
+            )
+            fig_fleet.update_layout(
+                showlegend=False, height=400, yaxis={"categoryorder": "total ascending"}
+            )
+            st.plotly_chart(fig_fleet, width="stretch")
+
+        with col2:
+            st.dataframe(
+                df_fleet,
+                width="stretch",
+                hide_index=True,
+                column_config={
+                    "code": "Type",
+                    "routes": "Routes",
+                    "share": st.column_config.NumberColumn(
+                        "Share of Routes", format="%.1f%%"
+                    ),
+                },
+            )
+
 
 def show_airline_analytics(db: Neo4jConnector):
     """Global airline analytics"""
@@ -401,15 +440,31 @@ def show_airline_network(db: Neo4jConnector):
                         }
                     )
 
+                # Great-circle lines, computed once per airport pair
+                paths = geometry_cache.paths(
+                    [
+                        (
+                            route["source"],
+                            route["source_lat"],
+                            route["source_lon"],
+                            route["destination"],
+                            route["dest_lat"],
+                            route["dest_lon"],
+                        )
+                        for route in routes_for_map
+                    ]
+                )
+
                 # Create figure with routes
                 fig = go.Figure()
 
                 # Add route lines
-                for route in routes_for_map:
+                for route, path in zip(routes_for_map, paths):
+                    line_lats, line_lons = plotly_path(path)
                     fig.add_trace(
                         go.Scattergeo(
-                            lon=[route["source_lon"], route["dest_lon"]],
-                            lat=[route["source_lat"], route["dest_lat"]],
+                            lon=line_lons,
+                            lat=line_lats,
                             mode="lines",
                             line=dict(width=0.5, color="rgba(31, 119, 180, 0.3)"),
                             hoverinfo="text",
@@ -528,11 +583,9 @@ def show_airline_comparison(db: Neo4jConnector):
 
             for iata in selected_iatas:
                 airline = db.get_airline_by_iata(iata)
-                routes = db.get_airline_routes(iata, limit=10000)
-
-                if airline and routes:
-                    df_routes = pd.DataFrame(routes)
+                df_routes = db.get_airline_routes_df(iata, limit=10000)
 
+                if airline and not df_routes.empty:
                     comparison_data.append(
                         {
                             "Airline": airline["Name"],
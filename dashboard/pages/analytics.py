@@ -12,7 +12,9 @@ def show(db: Neo4jConnector):
     st.markdown("Explore aviation data through interactive visualizations")
 
     # Tabs for different analytics
-    tab1, tab2, tab3 = st.tabs(["🛫 Airports", "✈️ Airlines", "🗺️ Routes"])
+    tab1, tab2, tab3, tab4 = st.tabs(
+        ["🛫 Airports", "✈️ Airlines", "🗺️ Routes", "🥊 Competition"]
+    )
 
     with tab1:
         show_airport_analytics(db)
@@ -23,6 +25,9 @@ def show(db: Neo4jConnector):
     with tab3:
         show_route_analytics(db)
 
+    with tab4:
+        show_competition_analytics(db)
+
 
 def show_airport_analytics(db: Neo4jConnector):
     """Airport-related analytics"""
@@ -35,8 +40,13 @@ def show_airport_analytics(db: Neo4jConnector):
     with col1:
         st.markdown("#### 🔝 Top Airports by Route Count")
         limit = st.slider("Number of airports", 5, 25, 10, key="airport_limit")
+        include_codeshare = st.checkbox(
+            "Include codeshare routes", value=True, key="airport_codeshare"
+        )
 
-    top_airports = db.get_top_airports_by_routes(limit=limit)
+    top_airports = db.get_top_airports_by_routes(
+        limit=limit, include_codeshare=include_codeshare
+    )
 
     if top_airports:
         df = pd.DataFrame(top_airports)
@@ -76,6 +86,57 @@ def show_airport_analytics(db: Neo4jConnector):
 
     st.markdown("---")
 
+    # Hub centrality (precomputed by database/compute_centrality.py)
+    st.markdown("#### 🧭 Hub Centrality")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        metric_labels = {
+            "PageRank": "PageRank",
+            "Betweenness": "Betweenness (sampled)",
+            "DegreeIn": "Inbound connections",
+            "DegreeOut": "Outbound connections",
+        }
+        metric = st.selectbox(
+            "Metric",
+            list(metric_labels),
+            format_func=metric_labels.get,
+            key="centrality_metric",
+        )
+
+    with col2:
+        centrality_limit = st.slider(
+            "Number of airports", 5, 50, 15, key="centrality_limit"
+        )
+
+    hubs = db.get_top_airports_by_centrality(metric=metric, limit=centrality_limit)
+
+    if hubs:
+        df_hubs = pd.DataFrame(hubs)
+
+        fig_hubs = px.bar(
+            df_hubs,
+            x=metric,
+            y="IATA",
+            orientation="h",
+            labels={metric: metric_labels[metric], "IATA": "Airport Code"},
+            color=metric,
+            color_continuous_scale="Tealgrn",
+            hover_data=["Name", "City", "Country", "ComponentSize"],
+        )
+        fig_hubs.update_layout(
+            showlegend=False, height=450, yaxis={"categoryorder": "total ascending"}
+        )
+        st.plotly_chart(fig_hubs, width="stretch")
+    else:
+        st.info(
+            "Centrality metrics have not been computed yet. "
+            "Run `make centrality` after loading data."
+        )
+
+    st.markdown("---")
+
     # Countries by airport count
     st.markdown("#### 🌍 Countries by Airport Count")
 
@@ -124,7 +185,12 @@ def show_airline_analytics(db: Neo4jConnector):
     st.markdown("#### 🔝 Top Airlines by Route Count")
 
     limit = st.slider("Number of airlines", 5, 25, 10, key="airline_limit")
-    top_airlines = db.get_top_airlines_by_routes(limit=limit)
+    include_codeshare = st.checkbox(
+        "Include codeshare routes", value=True, key="airline_codeshare"
+    )
+    top_airlines = db.get_top_airlines_by_routes(
+        limit=limit, include_codeshare=include_codeshare
+    )
 
     if top_airlines:
         df = pd.DataFrame(top_airlines)
@@ -202,6 +268,36 @@ def show_route_analytics(db: Neo4jConnector):
 
     st.markdown("---")
 
+    # Global route density (prebuilt by database/compute_route_density.py)
+    st.markdown("#### 🌐 Global Route Density")
+
+    resolution = st.radio(
+        "Cell size",
+        [1.0, 0.5, 0.25],
+        index=1,
+        format_func=lambda r: f"{r:g}°",
+        horizontal=True,
+        key="density_resolution",
+    )
+    density = db.get_route_density(resolution)
+
+    if density:
+        st.image(
+            density["png"],
+            caption=(
+                f"Routes crossing each {resolution:g}° cell, log scale "
+                f"(max {density['max_count']:,}; built {density['built_at']})"
+            ),
+            width="stretch",
+        )
+    else:
+        st.info(
+            "Route density has not been built yet. "
+            "Run `make route-density` after loading data."
+        )
+
+    st.markdown("---")
+
     # Search routes from a specific airport
     st.markdown("#### ✈️ Routes from Airport")
 
@@ -228,11 +324,9 @@ def show_route_analytics(db: Neo4jConnector):
                 f"✓ {airport_info['Name']} ({airport_info['City']}, {airport_info['Country']})"
             )
 
-            routes = db.get_routes_from_airport(airport_iata, limit=route_limit)
-
-            if routes:
-                df_routes = pd.DataFrame(routes)
+            df_routes = db.get_routes_from_airport_df(airport_iata, limit=route_limit)
 
+            if not df_routes.empty:
                 st.info(f"Found {len(df_routes)} routes from {airport_iata}")
 
                 # Show distance distribution
@@ -305,3 +399,145 @@ def show_route_analytics(db: Neo4jConnector):
                 st.warning(f"No routes found from {airport_iata}")
         else:
             st.error(f"Airport {airport_iata} not found")
+
+
+def show_competition_analytics(db: Neo4jConnector):
+    """Carriers per airport pair (precomputed by database/compute_competition.py)"""
+
+    st.subheader("Competition Analytics")
+
+    include_codeshare = st.checkbox(
+        "Include codeshare routes",
+        value=True,
+        key="competition_codeshare",
+        help="Off: only the airlines operating a pair count as its carriers",
+    )
+    summary = db.get_competition_summary(include_codeshare=include_codeshare)
+    if not summary:
+        st.info(
+            "The competition matrix has not been built yet. "
+            "Run `make competition` after loading data."
+        )
+        return
+
+    # Market mix over all directed airport pairs
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Airport Pairs", f"{summary['pairs']:,}")
+    col2.metric("Monopoly", f"{summary['monopoly']:,}")
+    col3.metric("Duopoly", f"{summary['duopoly']:,}")
+    col4.metric("Competitive (3+)", f"{summary['competitive']:,}")
+
+    st.markdown("---")
+
+    # One airline's overlap with its competitors
+    st.markdown("#### ✈️ Airline Overlap")
+
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        airline_iata = st.text_input(
+            "Enter airline IATA code",
+            placeholder="e.g., AA",
+            max_chars=2,
+            key="competition_airline",
+        ).upper()
+
+    with col2:
+        competitor_limit = st.slider(
+            "Number of competitors", 5, 30, 10, key="competitor_limit"
+        )
+
+    if airline_iata:
+        overlap = db.get_airline_competition(
+            airline_iata, limit=competitor_limit, include_codeshare=include_codeshare
+        )
+
+        if overlap:
+            col1, col2 = st.columns(2)
+
+            with col1:
+                fig_mix = px.pie(
+                    names=["Monopoly", "Duopoly", "Competitive"],
+                    values=[
+                        overlap["monopoly"],
+                        overlap["duopoly"],
+                        overlap["competitive"],
+                    ],
+                    title=f"{overlap['pairs']:,} airport pairs of {airline_iata}",
+                    hole=0.4,
+                )
+                fig_mix.update_layout(height=400)
+                st.plotly_chart(fig_mix, width="stretch")
+
+            with col2:
+                if overlap["competitors"]:
+                    df_competitors = pd.DataFrame(overlap["competitors"])
+                    fig_competitors = px.bar(
+                        df_competitors,
+                        x="shared_pairs",
+                        y="airline",
+                        orientation="h",
+                        labels={
+                            "shared_pairs": "Shared Airport Pairs",
+                            "airline": "Competitor",
+                        },
+                        color="share",
+                        color_continuous_scale="Reds",
+                        title="Top Competitors",
+                    )
+                    fig_competitors.update_layout(
+                        height=400, yaxis={"categoryorder": "total ascending"}
+                    )
+                    st.plotly_chart(fig_competitors, width="stretch")
+                else:
+                    st.info(f"{airline_iata} flies no pair another airline flies")
+        else:
+            st.warning(f"No routes found for airline {airline_iata}")
+
+    st.markdown("---")
+
+    # Carriers on every pair leaving an airport
+    st.markdown("#### 🛫 Carriers by Destination")
+
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        airport_iata = st.text_input(
+            "Enter airport IATA code",
+            placeholder="e.g., JFK",
+            max_chars=3,
+            key="competition_airport",
+        ).upper()
+
+    with col2:
+        market = st.selectbox(
+            "Market",
+            ["All", "monopoly", "duopoly", "competitive"],
+            key="competition_market",
+        )
+
+    if airport_iata and len(airport_iata) == 3:
+        pairs = db.get_airport_competition(
+            airport_iata, include_codeshare=include_codeshare
+        )
+        if market != "All":
+            pairs = [pair for pair in pairs if pair["market"] == market]
+
+        if pairs:
+            df_pairs = pd.DataFrame(pairs)
+            df_pairs["carriers"] = df_pairs["carriers"].str.join(", ")
+            st.dataframe(
+                df_pairs[["destination", "carrier_count", "market", "carriers"]],
+                width="stretch",
+                hide_index=True,
+                column_config={
+                    "destination": "Destination",
+                    "carrier_count": st.column_config.NumberColumn(
+                        "Airlines", format="%d"
+                    ),
+                    "market": "Market",
+                    "carriers": "Carriers",
+                },
+            )
+        else:
+            st.warning(f"No routes found from {airport_iata}")
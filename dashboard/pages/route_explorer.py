@@ -3,6 +3,8 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from database_connector import Neo4jConnector
+from distance import midpoint
+from route_geometry import geometry_cache, plotly_path
 
 
 def show(db: Neo4jConnector):
@@ -141,14 +143,29 @@ def find_and_display_routes(db: Neo4jConnector, source: str, destination: str):
 def visualize_route(route_data):
     """Visualize a route on a map"""
 
-    # Create line between airports
+    # Great-circle line between the airports, split at the antimeridian
+    (path,) = geometry_cache.paths(
+        [
+            (
+                route_data["source_iata"],
+                route_data["source_lat"],
+                route_data["source_lon"],
+                route_data["dest_iata"],
+                route_data["dest_lat"],
+                route_data["dest_lon"],
+            )
+        ],
+        points=64,
+    )
+    line_lats, line_lons = plotly_path(path)
+
     fig = go.Figure()
 
     # Add route line
     fig.add_trace(
         go.Scattermapbox(
-            lon=[route_data["source_lon"], route_data["dest_lon"]],
-            lat=[route_data["source_lat"], route_data["dest_lat"]],
+            lon=line_lons,
+            lat=line_lats,
             mode="lines",
             line=dict(width=2, color="red"),
             name="Route",
@@ -179,13 +196,17 @@ def visualize_route(route_data):
         )
     )
 
-    # Calculate center point
-    center_lat = (route_data["source_lat"] + route_data["dest_lat"]) / 2
-    center_lon = (route_data["source_lon"] + route_data["dest_lon"]) / 2
+    # Center on the midpoint of the great circle
+    center_lat, center_lon = midpoint(
+        route_data["source_lat"],
+        route_data["source_lon"],
+        route_data["dest_lat"],
+        route_data["dest_lon"],
+    )
 
     fig.update_layout(
         mapbox=dict(
-            style="open-street-map", center=dict(lat=center_lat, lon=center_lon), zoom=2
+            style="open-street-map", center=dict(lat=float(center_lat), lon=float(center_lon)), zoom=2
         ),
         showlegend=True,
         height=500,
@@ -237,13 +258,11 @@ def show_airport_map(db: Neo4jConnector):
 
     # Get airport data
     if selected_country and selected_country != "All Countries":
-        airports = db.get_airports_by_country(selected_country, limit=map_limit)
+        df = db.get_airports_by_country_df(selected_country, limit=map_limit)
     else:
-        airports = db.get_all_airports_for_map(limit=map_limit)
-
-    if airports:
-        df = pd.DataFrame(airports)
+        df = db.get_all_airports_for_map_df(limit=map_limit)
 
+    if not df.empty:
         st.success(f"Displaying {len(df)} airports")
 
         # Create map
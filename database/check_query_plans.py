@@ -0,0 +1,131 @@
+"""
+Check that every shipped Cypher query keeps an index-friendly plan.
+
+Extracts the queries from the API routers, the dashboard connector, the
+loader's Cypher files and database/test_queries, applies the schema from
+cypher/schema.cypher and runs EXPLAIN for each query against a local Neo4j.
+Plans containing AllNodesScan, label scans of large labels,
+CartesianProduct or Eager fail the check unless the query allows them with
+a plan-check directive (see helper/plan_check.py).
+
+Usage:
+    python check_query_plans.py [--report plans.md] [--large-label 1000]
+
+Exits with status 1 if any query fails, so it can gate a build.
+"""
+
+import argparse
+import os
+import sys
+
+from neo4j.exceptions import Neo4jError
+
+import loader
+
+# Add helper directory to path for the plan checks and the route search planner
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "helper"))
+from plan_check import (
+    LARGE_LABEL_THRESHOLD,
+    ShippedQuery,
+    check_plan,
+    collect_queries,
+    render_report,
+)
+from route_search import plan_route_search
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PYTHON_SOURCES = ("api/routers/*.py", "dashboard/database_connector.py")
+CYPHER_SOURCES = ("database/cypher/*.cypher", "database/test_queries/*.cypher")
+
+# Route searches are planned at request time; check one plan per anchor kind
+SAMPLE_ROUTE_SEARCHES = (
+    {"source": "JFK", "max_distance": 3000},
+    {"destination": "LAX", "airline": "AA"},
+    {"source_country": "Germany", "stops": 0},
+    {"destination_country": "Japan", "equipment": "789"},
+    {"airline": "LH", "codeshare": False},
+    {"min_distance": 12000},
+)
+
+
+def shipped_queries():
+    """Return the queries from the source files plus sample route searches"""
+    queries = collect_queries(REPO_ROOT, PYTHON_SOURCES, CYPHER_SOURCES)
+    for filters in SAMPLE_ROUTE_SEARCHES:
+        query, _ = plan_route_search(filters)
+        queries.append(ShippedQuery(f"route_search {filters}", query))
+    return queries
+
+
+def label_counts(session):
+    """Return the number of nodes per label (read from the count store)"""
+    labels = [record["label"] for record in session.run("CALL db.labels()")]
+    return {
+        label: session.run(f"MATCH (n:`{label}`) RETURN count(n) AS n").single()["n"]
+        for label in labels
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--report", help="Write a Markdown report to this path")
+    parser.add_argument(
+        "--large-label",
+        type=int,
+        default=LARGE_LABEL_THRESHOLD,
+        help="Flag label scans of labels with at least this many nodes",
+    )
+    parser.add_argument(
+        "--skip-schema",
+        action="store_true",
+        help="Do not apply cypher/schema.cypher before checking",
+    )
+    args = parser.parse_args()
+
+    if not loader.test_connection():
+        sys.exit(1)
+
+    try:
+        if not args.skip_schema:
+            loader.create_schema()
+
+        results = []
+        with loader.driver.session() as session:
+            counts = label_counts(session)
+            for query in shipped_queries():
+                result = {"name": query.name, "text": query.text, "findings": []}
+                try:
+                    plan = session.run(f"EXPLAIN {query.text}").consume().plan
+                    result["findings"] = check_plan(
+                        query, plan, counts, args.large_label
+                    )
+                    result["error"] = None
+                except Neo4jError as e:
+                    result["error"] = e.message or str(e)
+                results.append(result)
+    finally:
+        loader.driver.close()
+
+    failed = 0
+    for result in results:
+        blocking = [f for f in result["findings"] if not f.allowed]
+        if result["error"] or blocking:
+            failed += 1
+            problems = result["error"] or ", ".join(
+                f"{f.operator} ({f.detail})" if f.detail else f.operator
+                for f in blocking
+            )
+            print(f"  ✗ {result['name']}: {problems}")
+    print(f"\n{len(results) - failed}/{len(results)} queries passed")
+
+    if args.report:
+        with open(args.report, "w") as file:
+            file.write(render_report(results))
+        print(f"Report written to {args.report}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Compute hub and centrality metrics for every airport and store them in Neo4j.
+
+Reads the ROUTE graph once into a sparse adjacency matrix, computes PageRank,
+sampled betweenness, in/out degree and connected components with NumPy/SciPy,
+and writes the results back as Airport properties.
+
+Usage:
+    python compute_centrality.py
+"""
+
+from neo4j import GraphDatabase
+import os
+import sys
+import time
+from dotenv import load_dotenv
+
+# Add helper directory to path for graph and centrality helpers
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "helper"))
+from centrality import betweenness, components, degrees, pagerank
+from graph_snapshot import load_route_graph
+
+# Load environment variables from .env file
+load_dotenv()
+
+NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
+NEO4J_USERNAME = os.getenv("NEO4J_USERNAME", "neo4j")
+NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "airfacts-pw")
+
+# Number of source airports sampled for betweenness (0 = exact, all airports)
+BETWEENNESS_SAMPLES = int(os.getenv("BETWEENNESS_SAMPLES", "500"))
+CENTRALITY_PROCESSES = int(os.getenv("CENTRALITY_PROCESSES", os.cpu_count() or 1))
+WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", "1000"))
+
+CYPHER_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "cypher",
+    "set_airport_centrality.cypher",
+)
+
+
+def compute_metrics(graph):
+    """Compute all centrality metrics and return one row per airport"""
+    adjacency = graph.adjacency(weighted=True)
+
+    start = time.perf_counter()
+    rank = pagerank(adjacency)
+    print(f"  ✓ PageRank ({time.perf_counter() - start:.1f}s)")
+
+    start = time.perf_counter()
+    between = betweenness(
+        adjacency,
+        samples=BETWEENNESS_SAMPLES or None,
+        processes=CENTRALITY_PROCESSES,
+    )
+    print(f"  ✓ Betweenness ({time.perf_counter() - start:.1f}s)")
+
+    degree = degrees(adjacency)
+    component = components(adjacency)
+    print("  ✓ Degrees and components")
+
+    return [
+        {
+            "IATA": graph.iata[i],
+            "PageRank": float(rank[i]),
+            "Betweenness": float(between[i]),
+            "DegreeIn": int(degree["in"][i]),
+            "DegreeOut": int(degree["out"][i]),
+            "Component": int(component["weak"][i]),
+            "ComponentSize": int(component["weak_size"][i]),
+            "StrongComponent": int(component["strong"][i]),
+            "StrongComponentSize": int(component["strong_size"][i]),
+        }
+        for i in range(graph.num_airports)
+    ]
+
+
+def write_metrics(driver, rows):
+    """Write metric rows back to Airport nodes in batches"""
+    with open(CYPHER_FILE) as file:
+        query = file.read()
+
+    with driver.session() as session:
+        for i in range(0, len(rows), WRITE_BATCH_SIZE):
+            batch = rows[i : i + WRITE_BATCH_SIZE]
+            session.execute_write(lambda tx: tx.run(query, rows=batch).consume())
+    print(f"  ✓ Updated {len(rows):,} airports")
+
+
+if __name__ == "__main__":
+    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USERNAME, NEO4J_PASSWORD))
+    try:
+        print("Reading route graph...")
+        graph = load_route_graph(driver)
+        print(f"  ✓ {graph.num_airports:,} airports, {graph.num_routes:,} routes")
+
+        print("\nComputing metrics...")
+        rows = compute_metrics(graph)
+
+        print("\nWriting metrics...")
+        write_metrics(driver, rows)
+        print("\n✅ Centrality metrics updated")
+    finally:
+        driver.close()
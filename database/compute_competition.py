@@ -0,0 +1,61 @@
+"""
+Build the airport-pair x airline competition matrix.
+
+Reads the ROUTE graph (from the snapshot, falling back to Neo4j) and writes,
+for every directed airport pair, the airlines flying it, the pairs of every
+airline and the pairs each two airlines share, as memory-mapped .npy files
+in COMPETITION_DIR. The loader runs this after every load.
+
+Usage:
+    python compute_competition.py
+"""
+
+from neo4j import GraphDatabase
+import os
+import sys
+from dotenv import load_dotenv
+
+# Add helper directory to path for graph and matrix helpers
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "helper"))
+from graph_snapshot import load_route_graph
+from competition_matrix import COMPETITION_DIR, build_competition_matrix
+
+# Load environment variables from .env file
+load_dotenv()
+
+NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
+NEO4J_USERNAME = os.getenv("NEO4J_USERNAME", "neo4j")
+NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "airfacts-pw")
+
+
+def update_competition(driver, graph=None):
+    """
+    Build the competition matrix for `graph`, or for the route graph from the
+    snapshot (falling back to Neo4j) if no graph is given
+    """
+    if graph is None:
+        graph = load_route_graph(driver)
+    print(f"  ✓ {graph.num_airports:,} airports, {graph.num_routes:,} routes")
+
+    stats = build_competition_matrix(graph)
+    print(
+        f"  ✓ {stats['pairs']:,} airport pairs: {stats['monopoly']:,} monopoly, "
+        f"{stats['duopoly']:,} duopoly, {stats['competitive']:,} competitive "
+        f"({stats['seconds']:.1f}s)"
+    )
+    operated = stats["operated"]
+    print(
+        f"  ✓ Without codeshares: {operated['monopoly']:,} monopoly, "
+        f"{operated['duopoly']:,} duopoly, {operated['competitive']:,} competitive"
+    )
+    return stats
+
+
+if __name__ == "__main__":
+    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USERNAME, NEO4J_PASSWORD))
+    try:
+        print("Building competition matrix...")
+        update_competition(driver)
+        print(f"\n✅ Competition matrix written to {os.path.abspath(COMPETITION_DIR)}")
+    finally:
+        driver.close()
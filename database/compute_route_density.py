@@ -0,0 +1,54 @@
+"""
+Build the global route-density rasters.
+
+Reads the ROUTE graph (from the snapshot, falling back to Neo4j), bins every
+route's great circle into latitude/longitude grids at several resolutions
+and writes each grid as a .npy file and a PNG image to ROUTE_DENSITY_DIR.
+The loader runs this after every load.
+
+Usage:
+    python compute_route_density.py
+"""
+
+from neo4j import GraphDatabase
+import os
+import sys
+from dotenv import load_dotenv
+
+# Add helper directory to path for graph and raster helpers
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "helper"))
+from graph_snapshot import load_route_graph
+from route_density import ROUTE_DENSITY_DIR, build_route_density
+
+# Load environment variables from .env file
+load_dotenv()
+
+NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
+NEO4J_USERNAME = os.getenv("NEO4J_USERNAME", "neo4j")
+NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "airfacts-pw")
+
+ROUTE_DENSITY_PROCESSES = int(os.getenv("ROUTE_DENSITY_PROCESSES", os.cpu_count() or 1))
+
+
+def update_route_density(driver, graph=None):
+    """
+    Build the density rasters for `graph`, or for the route graph from the
+    snapshot (falling back to Neo4j) if no graph is given
+    """
+    if graph is None:
+        graph = load_route_graph(driver)
+    print(f"  ✓ {graph.num_airports:,} airports, {graph.num_routes:,} routes")
+
+    stats = build_route_density(graph, processes=ROUTE_DENSITY_PROCESSES)
+    print(f"  ✓ {stats['resolutions']} resolutions in {stats['seconds']:.1f}s")
+    return stats
+
+
+if __name__ == "__main__":
+    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USERNAME, NEO4J_PASSWORD))
+    try:
+        print("Building route density rasters...")
+        update_route_density(driver)
+        print(f"\n✅ Route density written to {os.path.abspath(ROUTE_DENSITY_DIR)}")
+    finally:
+        driver.close()
@@ -0,0 +1,60 @@
+"""
+Build the all-pairs minimal-stops and minimal-distance matrix.
+
+Reads the ROUTE graph from Neo4j and writes, for every pair of airports, the
+minimal number of legs (uint8) and the minimal distance (float32) as
+memory-mapped .npy files in STOPS_MATRIX_DIR. An existing matrix is updated
+incrementally: only the rows of airports that can reach an airport whose
+routes changed are recomputed. The loader runs this after every load.
+
+Usage:
+    python compute_stops_matrix.py [--full]
+"""
+
+from neo4j import GraphDatabase
+import os
+import sys
+from dotenv import load_dotenv
+
+# Add helper directory to path for graph and matrix helpers
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "helper"))
+from graph_snapshot import load_route_graph
+from stops_matrix import STOPS_MATRIX_DIR, build_stops_matrix
+
+# Load environment variables from .env file
+load_dotenv()
+
+NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
+NEO4J_USERNAME = os.getenv("NEO4J_USERNAME", "neo4j")
+NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "airfacts-pw")
+
+STOPS_MATRIX_PROCESSES = int(os.getenv("STOPS_MATRIX_PROCESSES", os.cpu_count() or 1))
+
+
+def update_stops_matrix(driver, incremental=True, graph=None):
+    """
+    Build or update the stops matrix for `graph`, or for the route graph from
+    the snapshot (falling back to Neo4j) if no graph is given
+    """
+    if graph is None:
+        graph = load_route_graph(driver)
+    print(f"  ✓ {graph.num_airports:,} airports, {graph.num_routes:,} routes")
+
+    stats = build_stops_matrix(
+        graph, processes=STOPS_MATRIX_PROCESSES, incremental=incremental
+    )
+    print(
+        f"  ✓ Recomputed {stats['rows_recomputed']:,} of {stats['airports']:,} "
+        f"rows in {stats['seconds']:.1f}s"
+    )
+    return stats
+
+
+if __name__ == "__main__":
+    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USERNAME, NEO4J_PASSWORD))
+    try:
+        print("Building stops matrix...")
+        update_stops_matrix(driver, incremental="--full" not in sys.argv)
+        print(f"\n✅ Stops matrix written to {os.path.abspath(STOPS_MATRIX_DIR)}")
+    finally:
+        driver.close()
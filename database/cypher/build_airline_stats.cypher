@@ -0,0 +1,63 @@
+// Precompute per-airline route statistics on (:Airline) nodes so that
+// reading them is a single indexed node lookup. The Operated* properties
+// hold the same statistics over the routes the airline flies itself,
+// leaving out codeshares (see build_codeshare.cypher).
+// Run after routes are loaded; every run recomputes all airlines.
+// plan-check: allow NodeByLabelScan, Eager (offline rebuild of every airline)
+MATCH (al:Airline)
+SET al.RouteCount = 0,
+    al.AirportsFrom = 0,
+    al.AirportsTo = 0,
+    al.AirportsServed = 0,
+    al.OperatedRouteCount = 0,
+    al.OperatedAirportsFrom = 0,
+    al.OperatedAirportsTo = 0,
+    al.OperatedAirportsServed = 0
+REMOVE al.MinDistance, al.AvgDistance, al.MaxDistance,
+       al.OperatedMinDistance, al.OperatedAvgDistance, al.OperatedMaxDistance;
+
+MATCH (src:Airport)-[r:ROUTE]->(dst:Airport)
+WITH r.Airline AS airline,
+     count(r) AS routes,
+     min(r.Distance) AS min_distance,
+     avg(r.Distance) AS avg_distance,
+     max(r.Distance) AS max_distance,
+     count(DISTINCT src) AS airports_from,
+     count(DISTINCT dst) AS airports_to
+MATCH (al:Airline {IATA: airline})
+SET al.RouteCount = routes,
+    al.MinDistance = min_distance,
+    al.AvgDistance = avg_distance,
+    al.MaxDistance = max_distance,
+    al.AirportsFrom = airports_from,
+    al.AirportsTo = airports_to;
+
+MATCH (src:Airport)-[r:ROUTE]->(dst:Airport)
+UNWIND [src, dst] AS airport
+WITH r.Airline AS airline, count(DISTINCT airport) AS served
+MATCH (al:Airline {IATA: airline})
+SET al.AirportsServed = served;
+
+MATCH (src:Airport)-[r:ROUTE]->(dst:Airport)
+WHERE r.Operated = true
+WITH r.Airline AS airline,
+     count(r) AS routes,
+     min(r.Distance) AS min_distance,
+     avg(r.Distance) AS avg_distance,
+     max(r.Distance) AS max_distance,
+     count(DISTINCT src) AS airports_from,
+     count(DISTINCT dst) AS airports_to
+MATCH (al:Airline {IATA: airline})
+SET al.OperatedRouteCount = routes,
+    al.OperatedMinDistance = min_distance,
+    al.OperatedAvgDistance = avg_distance,
+    al.OperatedMaxDistance = max_distance,
+    al.OperatedAirportsFrom = airports_from,
+    al.OperatedAirportsTo = airports_to;
+
+MATCH (src:Airport)-[r:ROUTE]->(dst:Airport)
+WHERE r.Operated = true
+UNWIND [src, dst] AS airport
+WITH r.Airline AS airline, count(DISTINCT airport) AS served
+MATCH (al:Airline {IATA: airline})
+SET al.OperatedAirportsServed = served;
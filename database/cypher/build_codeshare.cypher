@@ -0,0 +1,18 @@
+// Classify every ROUTE as operated by its airline (Operated = true) or
+// marketed under a codeshare (Operated = false), and link a marketed route
+// to its operating flight: OperatedBy is the airline flying the same
+// airport pair itself, set only when exactly one airline does.
+// Run after routes are loaded and before the airline stats and markets,
+// which count operated routes separately; every run reclassifies all routes.
+// plan-check: allow Eager (offline rebuild of every route)
+MATCH ()-[r:ROUTE]->()
+SET r.Operated = coalesce(r.Codeshare, '') <> 'Y'
+REMOVE r.OperatedBy;
+
+MATCH (src:Airport)-[r:ROUTE]->(dst:Airport)
+WHERE r.Operated = false
+MATCH (src)-[o:ROUTE]->(dst)
+WHERE o.Operated = true AND o.Airline <> r.Airline
+WITH r, collect(DISTINCT o.Airline) AS operators
+WHERE size(operators) = 1
+SET r.OperatedBy = operators[0];
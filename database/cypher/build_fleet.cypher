@@ -0,0 +1,36 @@
+// Normalize ROUTE.Equipment into (:Aircraft) nodes and per-airline
+// (:Airline)-[:FLIES {Routes}]->(:Aircraft) fleet summaries.
+// Run after routes are loaded; every run rebuilds the summary from scratch.
+// plan-check: allow NodeByLabelScan, Eager (offline rebuild of every airline)
+MATCH ()-[r:ROUTE]->()
+WHERE r.Equipment IS NOT NULL AND r.EquipmentKey IS NULL
+SET r.EquipmentKey = ' ' + r.Equipment + ' ';
+
+MATCH (:Airline)-[f:FLIES]->(:Aircraft)
+DELETE f;
+
+MATCH (al:Airline)
+WHERE al.FleetRoutes IS NOT NULL
+REMOVE al.FleetRoutes;
+
+MATCH ()-[r:ROUTE]->()
+WHERE r.Equipment IS NOT NULL
+WITH r.Airline AS airline, count(r) AS routes
+MATCH (al:Airline {IATA: airline})
+SET al.FleetRoutes = routes;
+
+MATCH ()-[r:ROUTE]->()
+WHERE r.Equipment IS NOT NULL
+UNWIND [code IN split(r.Equipment, ' ') WHERE code <> ''] AS code
+WITH r.Airline AS airline, code, count(DISTINCT r) AS routes
+MERGE (ac:Aircraft {Code: code})
+WITH ac, airline, routes
+MATCH (al:Airline {IATA: airline})
+MERGE (al)-[f:FLIES]->(ac)
+SET f.Routes = routes;
+
+MATCH (ac:Aircraft)
+OPTIONAL MATCH (:Airline)-[f:FLIES]->(ac)
+WITH ac, sum(f.Routes) AS routes, count(f) AS airlines
+SET ac.RouteCount = routes,
+    ac.AirlineCount = airlines;
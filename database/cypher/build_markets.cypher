@@ -0,0 +1,53 @@
+// Group airports into (:Market) nodes, one per city or metro area, and
+// precompute one (:Market)-[:MARKET_ROUTE]->(:Market) per market pair with
+// route, carrier and distance statistics, so that market lookups are index
+// seeks instead of aggregations over airport-level routes.
+// The loader assigns airports to markets (helper/markets.py) and passes them
+// as $markets; every run rebuilds all markets.
+// plan-check: allow NodeByLabelScan, Eager (offline rebuild of every market)
+MATCH (m:Market)
+DETACH DELETE m;
+
+UNWIND $markets AS row
+CREATE (m:Market {Id: row.Market})
+SET m.Name = row.Name,
+    m.Country = row.Country,
+    m.Airports = row.Airports
+WITH m, row
+UNWIND row.Airports AS iata
+MATCH (a:Airport {IATA: iata})
+CREATE (a)-[:IN_MARKET]->(m);
+
+MATCH (m1:Market)<-[:IN_MARKET]-(a:Airport)-[r:ROUTE]->(b:Airport)-[:IN_MARKET]->(m2:Market)
+WHERE m1 <> m2
+// Sorted before aggregating, so Airlines lists the codes in order
+WITH m1, m2, a, b, r
+ORDER BY r.Airline
+WITH m1, m2,
+     count(r) AS routes,
+     count(CASE WHEN r.Operated THEN r END) AS operated_routes,
+     collect(DISTINCT r.Airline) AS airlines,
+     count(DISTINCT [a.IATA, b.IATA]) AS airport_pairs,
+     min(r.Distance) AS min_distance,
+     avg(r.Distance) AS avg_distance,
+     max(r.Distance) AS max_distance
+CREATE (m1)-[:MARKET_ROUTE {
+    Routes: routes,
+    OperatedRoutes: operated_routes,
+    Carriers: size(airlines),
+    Airlines: airlines,
+    AirportPairs: airport_pairs,
+    MinDistance: min_distance,
+    AvgDistance: avg_distance,
+    MaxDistance: max_distance
+}]->(m2);
+
+MATCH (m:Market)
+OPTIONAL MATCH (m)-[mr:MARKET_ROUTE]->()
+WITH m,
+     count(mr) AS destinations,
+     coalesce(sum(mr.Routes), 0) AS routes,
+     coalesce(sum(mr.OperatedRoutes), 0) AS operated_routes
+SET m.Destinations = destinations,
+    m.RouteCount = routes,
+    m.OperatedRouteCount = operated_routes;
@@ -0,0 +1,15 @@
+// Precompute outgoing route counts on (:Airport) nodes and the network's
+// operated route count on the (:Dataset) node, so that top-airport rankings
+// and include_codeshare=false totals read stored numbers instead of
+// aggregating every ROUTE. A parameterised `$include_codeshare OR r.Operated`
+// filter cannot be planned as an index seek, so counts are not left to it.
+// Run after build_codeshare.cypher; every run recomputes all airports.
+// plan-check: allow NodeByLabelScan, Eager (offline rebuild of every airport)
+MATCH (a:Airport)
+SET a.RouteCount = COUNT { MATCH (a)-[:ROUTE]->() },
+    a.OperatedRouteCount = COUNT { MATCH (a)-[r:ROUTE]->() WHERE r.Operated = true };
+
+MATCH ()-[r:ROUTE]->()
+WITH count(CASE WHEN r.Operated THEN r END) AS operated
+MERGE (d:Dataset {Name: 'openflights'})
+SET d.OperatedRouteCount = operated;
@@ -1,3 +1,4 @@
+// plan-check: allow CartesianProduct, Eager (three single-row index seeks)
 MATCH
   (source:Airport {IATA: $`Source airport`}),
   (destination:Airport {IATA: $`Destination airport`}),
@@ -14,4 +15,5 @@ MERGE
     r.Stops = coalesce(r.Stops, toInteger($Stops)),
     r.Equipment = coalesce(r.Equipment, $Equipment),
     r.Codeshare = coalesce(r.Codeshare, $Codeshare),
-    r.Distance = coalesce(r.Distance, toFloat($Distance));
\ No newline at end of file
+    r.Distance = coalesce(r.Distance, toFloat($Distance))
+SET r.EquipmentKey = ' ' + r.Equipment + ' ';
\ No newline at end of file
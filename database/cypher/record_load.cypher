@@ -0,0 +1,5 @@
+// Record a completed load on the singleton Dataset node. The graph snapshot
+// stores the same LoadId, and readers ignore a snapshot whose id differs.
+MERGE (d:Dataset {Name: 'openflights'})
+SET d.LoadId = $load_id,
+    d.LoadedAt = datetime();
@@ -0,0 +1,16 @@
+// Indexes used by the loader's MERGEs and by the API/dashboard lookups.
+// Every statement is idempotent; the loader runs this file before each load.
+CREATE INDEX airport_iata IF NOT EXISTS FOR (a:Airport) ON (a.IATA);
+CREATE INDEX airport_country IF NOT EXISTS FOR (a:Airport) ON (a.Country);
+CREATE INDEX airport_name IF NOT EXISTS FOR (a:Airport) ON (a.Name);
+CREATE INDEX airline_iata IF NOT EXISTS FOR (a:Airline) ON (a.IATA);
+CREATE INDEX airline_country IF NOT EXISTS FOR (a:Airline) ON (a.Country);
+CREATE INDEX airline_name IF NOT EXISTS FOR (a:Airline) ON (a.Name);
+// Serves ROUTE {Airline: $iata} patterns without expanding every route
+CREATE INDEX route_airline IF NOT EXISTS FOR ()-[r:ROUTE]-() ON (r.Airline);
+// Serves distance ranges and ORDER BY r.Distance over all routes
+CREATE INDEX route_distance IF NOT EXISTS FOR ()-[r:ROUTE]-() ON (r.Distance);
+CREATE INDEX aircraft_code IF NOT EXISTS FOR (ac:Aircraft) ON (ac.Code);
+CREATE INDEX market_id IF NOT EXISTS FOR (m:Market) ON (m.Id);
+// Padded " 738 320 " equipment list; a TEXT index serves CONTAINS " 738 "
+CREATE TEXT INDEX route_equipment_key IF NOT EXISTS FOR ()-[r:ROUTE]-() ON (r.EquipmentKey);
@@ -0,0 +1,10 @@
+UNWIND $rows AS row
+MATCH (a:Airport {IATA: row.IATA})
+SET a.PageRank = row.PageRank,
+    a.Betweenness = row.Betweenness,
+    a.DegreeIn = row.DegreeIn,
+    a.DegreeOut = row.DegreeOut,
+    a.Component = row.Component,
+    a.ComponentSize = row.ComponentSize,
+    a.StrongComponent = row.StrongComponent,
+    a.StrongComponentSize = row.StrongComponentSize;
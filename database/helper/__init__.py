@@ -4,6 +4,18 @@ from .distance import (
     calculate_distance,
     calculate_distance_km,
     calculate_distance_miles,
+    initial_bearing,
+    intermediate_points,
+    midpoint,
+    split_antimeridian,
 )
 
-__all__ = ["calculate_distance", "calculate_distance_km", "calculate_distance_miles"]
+__all__ = [
+    "calculate_distance",
+    "calculate_distance_km",
+    "calculate_distance_miles",
+    "initial_bearing",
+    "intermediate_points",
+    "midpoint",
+    "split_antimeridian",
+]
@@ -0,0 +1,150 @@
+"""
+Admission control: bounded concurrency with a short wait queue.
+
+An AdmissionLimiter lets `limit` requests run at once and up to `queue`
+more wait for a slot, each for at most `timeout` seconds. Anything beyond
+that is rejected at once, so under overload the service sheds load with a
+fast error instead of letting every request wait until it times out.
+Limiters are asyncio-based and belong to one event loop (one per worker).
+
+RouteGroups maps request paths to named limiters, so cheap lookups are not
+starved by expensive listings and exports.
+"""
+
+import asyncio
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Pattern, Tuple
+
+
+class AdmissionLimiter:
+    """In-flight limit plus a FIFO wait queue with a timeout"""
+
+    def __init__(self, name: str, limit: int, queue: int, timeout: float = 1.0):
+        if limit < 1 or queue < 0:
+            raise ValueError("limit must be at least 1 and queue at least 0")
+        self.name = name
+        self.limit = limit
+        self.queue = queue
+        self.timeout = timeout
+        self.in_flight = 0
+        self.admitted = 0
+        self.queued = 0
+        self.shed = 0
+        self._waiters: deque = deque()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """
+        Take a slot, waiting in the queue if all are busy.
+
+        Returns:
+            True if admitted (call release() when done), False if shed
+            because the queue was full or the wait timed out
+        """
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        if len(self._waiters) >= self.queue:
+            self.shed += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        try:
+            # release() hands its slot straight to the waiter
+            await asyncio.wait_for(waiter, self.timeout)
+        except asyncio.TimeoutError:
+            if not self._granted(waiter):
+                self._remove(waiter)
+                self.shed += 1
+                return False
+        except asyncio.CancelledError:
+            # The client went away; pass on a slot handed over meanwhile
+            if self._granted(waiter):
+                self.release()
+            else:
+                self._remove(waiter)
+            raise
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        """Free a slot, passing it to the oldest waiter if there is one"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, int]:
+        """Return the current load and the counters of this limiter"""
+        return {
+            "limit": self.limit,
+            "queue": self.queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "shed": self.shed,
+        }
+
+    @staticmethod
+    def _granted(waiter: asyncio.Future) -> bool:
+        return waiter.done() and not waiter.cancelled()
+
+    def _remove(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+
+@dataclass
+class RouteGroup:
+    """A named set of paths sharing one limiter"""
+
+    name: str
+    pattern: Pattern
+    limiter: AdmissionLimiter
+
+
+class RouteGroups:
+    """Match request paths to route groups, first matching pattern wins"""
+
+    def __init__(self, groups: Iterable[Tuple[str, str, AdmissionLimiter]]):
+        self.groups = [
+            RouteGroup(name, re.compile(pattern), limiter)
+            for name, pattern, limiter in groups
+        ]
+
+    def match(self, method: str, path: str) -> Optional[RouteGroup]:
+        """Return the group of a request, or None if it is not limited"""
+        key = f"{method} {path}"
+        return next((group for group in self.groups if group.pattern.search(key)), None)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {group.name: group.limiter.stats() for group in self.groups}
+
+
+def parse_limits(value: Optional[str], default: Tuple[int, int]) -> Tuple[int, int]:
+    """
+    Parse an "in_flight,queue" setting such as "24,48".
+
+    Raises:
+        ValueError: Malformed setting
+    """
+    if not value:
+        return default
+    try:
+        limit, queue = (int(part) for part in value.split(","))
+    except ValueError:
+        raise ValueError(f"Invalid admission limits '{value}', expected 'limit,queue'")
+    return limit, queue
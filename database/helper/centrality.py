@@ -0,0 +1,189 @@
+"""
+Hub and centrality metrics over the route graph.
+
+All metrics work on the airport adjacency matrix from RouteGraph.adjacency():
+PageRank by vectorized power iteration, in/out degree, weakly and strongly
+connected components via scipy.sparse.csgraph, and betweenness estimated
+from a sample of source airports with a level-synchronous Brandes pass,
+optionally spread over several processes.
+"""
+
+from multiprocessing import Pool
+from typing import Dict, Optional
+
+import numpy as np
+from scipy.sparse import csgraph
+
+from route_graph import expand_frontier
+
+
+def pagerank(
+    adjacency, damping: float = 0.85, tol: float = 1e-10, max_iter: int = 200
+) -> np.ndarray:
+    """
+    Compute PageRank with power iteration.
+
+    Args:
+        adjacency: scipy.sparse CSR matrix, entry (i, j) is the weight of i -> j
+        damping: Probability of following a route rather than teleporting
+        tol: L1 convergence threshold
+        max_iter: Maximum number of iterations
+
+    Returns:
+        PageRank of every airport, summing to 1
+    """
+    n = adjacency.shape[0]
+    if n == 0:
+        return np.zeros(0)
+
+    out_weight = np.asarray(adjacency.sum(axis=1)).ravel()
+    dangling = out_weight == 0
+    inv_out = np.divide(1.0, out_weight, out=np.zeros(n), where=~dangling)
+    # Row-normalized transpose, so transition @ rank spreads rank along routes
+    transition = adjacency.multiply(inv_out[:, None]).T.tocsr()
+
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        new_rank = damping * (transition @ rank + rank[dangling].sum() / n)
+        new_rank += (1.0 - damping) / n
+        if np.abs(new_rank - rank).sum() < tol:
+            return new_rank
+        rank = new_rank
+    return rank
+
+
+def degrees(adjacency) -> Dict[str, np.ndarray]:
+    """Return the number of distinct destinations and origins of every airport"""
+    binary = adjacency.copy()
+    binary.data[:] = 1
+    return {
+        "out": np.asarray(binary.sum(axis=1)).ravel().astype(np.int64),
+        "in": np.asarray(binary.sum(axis=0)).ravel().astype(np.int64),
+    }
+
+
+def components(adjacency) -> Dict[str, np.ndarray]:
+    """
+    Return weakly and strongly connected component labels and sizes.
+
+    Components are numbered by decreasing size, so component 0 is always the
+    main network.
+    """
+    result = {}
+    for kind, connection in (("weak", "weak"), ("strong", "strong")):
+        _, labels = csgraph.connected_components(
+            adjacency, directed=True, connection=connection
+        )
+        sizes = np.bincount(labels)
+        # Renumber so the largest component is 0
+        rank = np.empty_like(sizes)
+        rank[np.argsort(-sizes, kind="stable")] = np.arange(len(sizes))
+        result[kind] = rank[labels]
+        result[f"{kind}_size"] = sizes[labels]
+    return result
+
+
+def betweenness(
+    adjacency,
+    samples: Optional[int] = None,
+    seed: int = 42,
+    processes: int = 1,
+    normalized: bool = True,
+) -> np.ndarray:
+    """
+    Estimate betweenness centrality from a sample of source airports.
+
+    Uses unweighted shortest paths (fewest legs). The contribution of the
+    sampled sources is scaled by n / samples to estimate the full sum.
+
+    Args:
+        adjacency: scipy.sparse CSR matrix
+        samples: Number of source airports (None = all, exact betweenness)
+        seed: Random seed for the source sample
+        processes: Worker processes to spread sources over
+        normalized: Divide by (n - 1)(n - 2), the number of ordered pairs
+
+    Returns:
+        Betweenness of every airport
+    """
+    n = adjacency.shape[0]
+    if n < 3:
+        return np.zeros(n)
+
+    indptr = adjacency.indptr.astype(np.int64)
+    indices = adjacency.indices.astype(np.int64)
+
+    if samples is None or samples >= n:
+        sources = np.arange(n)
+    else:
+        sources = np.random.default_rng(seed).choice(n, samples, replace=False)
+
+    if processes > 1:
+        chunks = np.array_split(sources, processes * 4)
+        with Pool(
+            processes, initializer=_init_worker, initargs=(indptr, indices, n)
+        ) as pool:
+            partials = pool.map(_betweenness_chunk, chunks)
+        total = np.sum(partials, axis=0)
+    else:
+        total = _accumulate(indptr, indices, n, sources)
+
+    total *= n / len(sources)
+    if normalized:
+        total /= (n - 1) * (n - 2)
+    return total
+
+
+def _accumulate(indptr, indices, n, sources) -> np.ndarray:
+    total = np.zeros(n)
+    for source in sources:
+        total += _source_dependency(indptr, indices, n, int(source))
+    return total
+
+
+def _source_dependency(indptr, indices, n, source) -> np.ndarray:
+    """Brandes dependency of every airport for one source, one BFS level at a time"""
+    dist = np.full(n, -1, dtype=np.int64)
+    sigma = np.zeros(n)
+    dist[source] = 0
+    sigma[source] = 1.0
+    levels = [np.array([source], dtype=np.int64)]
+
+    # Forward pass: count shortest paths level by level
+    while True:
+        frontier = levels[-1]
+        src, dst, _ = expand_frontier(indptr, indices, frontier)
+        if dst.size == 0:
+            break
+        depth = len(levels)
+        new = np.unique(dst[dist[dst] == -1])
+        dist[new] = depth
+        on_path = dist[dst] == depth
+        np.add.at(sigma, dst[on_path], sigma[src[on_path]])
+        if new.size == 0:
+            break
+        levels.append(new)
+
+    # Backward pass: accumulate dependencies from the deepest level up
+    delta = np.zeros(n)
+    for depth in range(len(levels) - 1, 0, -1):
+        src, dst, _ = expand_frontier(indptr, indices, levels[depth - 1])
+        on_path = dist[dst] == depth
+        src, dst = src[on_path], dst[on_path]
+        np.add.at(delta, src, sigma[src] / sigma[dst] * (1.0 + delta[dst]))
+
+    delta[source] = 0.0
+    return delta
+
+
+_worker_graph = None
+
+
+def _init_worker(indptr, indices, n):
+    global _worker_graph
+    _worker_graph = (indptr, indices, n)
+
+
+def _betweenness_chunk(sources) -> np.ndarray:
+    indptr, indices, n = _worker_graph
+    return _accumulate(indptr, indices, n, sources)
@@ -0,0 +1,341 @@
+"""
+Airport-pair x airline competition matrix.
+
+For every directed airport pair with at least one route, the matrix lists
+the airlines flying it, so the carrier count and market type (monopoly,
+duopoly, competitive) of any pair is one binary search in a sorted array.
+The transposed structure lists the pairs of each airline, and a sparse
+airline x airline matrix holds the number of pairs every two airlines both
+fly, which is an airline's overlap with each of its competitors.
+
+Every array exists twice: counting every airline that sells a pair, and
+counting only the airlines operating it (codeshare routes left out, see
+build_codeshare.cypher), so a pair flown by one airline and sold by its
+partners is a monopoly in the second. All arrays are .npy files opened
+memory-mapped (see staged_directory.py); manifest.json maps airport and
+airline codes to indices and holds the market-type totals of both.
+"""
+
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from scipy import sparse
+
+from route_graph import RouteGraph
+from staged_directory import (
+    load_cached_manifest,
+    stage_directory,
+    swap_in,
+    write_manifest,
+)
+
+COMPETITION_DIR = os.getenv(
+    "COMPETITION_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "competition"),
+)
+
+MANIFEST_FILE = "manifest.json"
+
+# File name prefix of the arrays built from operated routes only
+OPERATED_PREFIX = "operated."
+
+# name -> description; every array is stored as <name>.npy
+ARRAYS = {
+    "pairs": "(p,) int64 sorted pair keys, source * airports + destination",
+    "carrier_indptr": "(p + 1,) int64 offsets into carriers per pair",
+    "carriers": "(c,) int32 airline index of every (pair, airline)",
+    "airline_indptr": "(k + 1,) int64 offsets into airline_pairs per airline",
+    "airline_pairs": "(c,) int32 pair index of every (airline, pair)",
+    "overlap_indptr": "(k + 1,) int64 CSR offsets of the overlap matrix",
+    "overlap_airlines": "(o,) int32 competitor airline index",
+    "overlap_pairs": "(o,) int32 number of pairs both airlines fly",
+}
+
+MARKET_TYPES = {1: "monopoly", 2: "duopoly"}
+
+
+def market_type(carriers: int) -> Optional[str]:
+    """Name the market of a pair flown by `carriers` airlines"""
+    if carriers <= 0:
+        return None
+    return MARKET_TYPES.get(carriers, "competitive")
+
+
+@dataclass
+class CompetitionMatrix:
+    """A memory-mapped competition matrix with its IATA indexes"""
+
+    iata: List[str]
+    airlines: List[str]
+    arrays: Dict[str, np.ndarray]
+    markets: Dict[str, int] = field(default_factory=dict)
+    built_at: Optional[str] = None
+    index: Dict[str, int] = field(default_factory=dict)
+    airline_index: Dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if not self.index:
+            self.index = {code: i for i, code in enumerate(self.iata)}
+        if not self.airline_index:
+            self.airline_index = {code: i for i, code in enumerate(self.airlines)}
+
+    def _carriers(self, position: int) -> List[str]:
+        indptr = self.arrays["carrier_indptr"]
+        carriers = self.arrays["carriers"][indptr[position] : indptr[position + 1]]
+        return [self.airlines[i] for i in carriers.tolist()]
+
+    def _pair(self, position: int) -> Dict[str, Any]:
+        n = len(self.iata)
+        key = int(self.arrays["pairs"][position])
+        carriers = self._carriers(position)
+        return {
+            "source": self.iata[key // n],
+            "destination": self.iata[key % n],
+            "carriers": carriers,
+            "carrier_count": len(carriers),
+            "market": market_type(len(carriers)),
+        }
+
+    def lookup(
+        self, sources: Iterable[str], destinations: Iterable[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Look up the carriers of a batch of directed airport pairs.
+
+        Returns:
+            One entry per pair; a pair without routes (or with an unknown
+            airport) has no carriers and market None
+        """
+        sources, destinations = list(sources), list(destinations)
+        n = len(self.iata)
+        src = np.array([self.index.get(code, -1) for code in sources], dtype=np.int64)
+        dst = np.array(
+            [self.index.get(code, -1) for code in destinations], dtype=np.int64
+        )
+        keys = src * n + dst
+        pairs = self.arrays["pairs"]
+        positions = np.searchsorted(pairs, keys)
+        found = (src >= 0) & (dst >= 0) & (positions < len(pairs))
+        found[found] = pairs[positions[found]] == keys[found]
+
+        results = []
+        for source, destination, position, hit in zip(
+            sources, destinations, positions.tolist(), found.tolist()
+        ):
+            carriers = self._carriers(position) if hit else []
+            results.append(
+                {
+                    "source": source,
+                    "destination": destination,
+                    "carriers": carriers,
+                    "carrier_count": len(carriers),
+                    "market": market_type(len(carriers)),
+                }
+            )
+        return results
+
+    def from_airport(self, source: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return every pair leaving an airport, most carriers first.
+
+        The pairs of one source are contiguous, so this is two binary
+        searches and a slice. Returns None for an unknown airport.
+        """
+        i = self.index.get(source)
+        if i is None:
+            return None
+        n = len(self.iata)
+        pairs = self.arrays["pairs"]
+        start, end = np.searchsorted(pairs, [i * n, (i + 1) * n])
+        rows = [self._pair(position) for position in range(start, end)]
+        rows.sort(key=lambda row: (-row["carrier_count"], row["destination"]))
+        return rows
+
+    def airline_overlap(
+        self, airline: str, limit: int = 20
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Summarize an airline's pairs by market type and list the competitors
+        it shares the most pairs with.
+
+        Returns:
+            None for an airline without routes, otherwise pairs, monopoly,
+            duopoly and competitive pair counts, and up to `limit`
+            competitors with their shared pairs
+        """
+        k = self.airline_index.get(airline)
+        if k is None:
+            return None
+        indptr = self.arrays["airline_indptr"]
+        positions = self.arrays["airline_pairs"][indptr[k] : indptr[k + 1]]
+        if positions.size == 0:
+            return None
+        carrier_indptr = self.arrays["carrier_indptr"]
+        counts = carrier_indptr[positions + 1] - carrier_indptr[positions]
+
+        start, end = self.arrays["overlap_indptr"][k : k + 2]
+        others = self.arrays["overlap_airlines"][start:end]
+        shared = self.arrays["overlap_pairs"][start:end]
+        keep = others != k
+        others, shared = others[keep], shared[keep]
+        order = np.lexsort((others, -shared.astype(np.int64)))[:limit]
+
+        total = int(positions.size)
+        return {
+            "airline": airline,
+            "pairs": total,
+            "monopoly": int(np.count_nonzero(counts == 1)),
+            "duopoly": int(np.count_nonzero(counts == 2)),
+            "competitive": int(np.count_nonzero(counts > 2)),
+            "competitors": [
+                {
+                    "airline": self.airlines[int(others[i])],
+                    "shared_pairs": int(shared[i]),
+                    "share": round(int(shared[i]) / total, 4),
+                }
+                for i in order
+            ],
+        }
+
+
+def load_competition_matrix(
+    directory: Optional[str] = None, include_codeshare: bool = True
+) -> Optional[CompetitionMatrix]:
+    """
+    Open the competition matrix memory-mapped, or return None if it was
+    never built.
+
+    With include_codeshare=False the matrix counts only operating airlines.
+    The open matrices are cached per directory and reopened when a rebuild
+    replaces them.
+    """
+    directory = os.path.abspath(directory or COMPETITION_DIR)
+
+    def open_matrices(manifest):
+        def matrix(prefix, markets):
+            return CompetitionMatrix(
+                iata=manifest["iata"],
+                airlines=manifest["airlines"],
+                arrays={
+                    name: np.load(
+                        os.path.join(directory, f"{prefix}{name}.npy"), mmap_mode="r"
+                    )
+                    for name in ARRAYS
+                },
+                markets=markets,
+                built_at=manifest.get("built_at"),
+            )
+
+        return {
+            True: matrix("", manifest.get("markets", {})),
+            # Matrices built before codeshares were classified have no variant
+            False: (
+                matrix(OPERATED_PREFIX, manifest["operated_markets"])
+                if "operated_markets" in manifest
+                else None
+            ),
+        }
+
+    matrices = load_cached_manifest(directory, MANIFEST_FILE, open_matrices)
+    return matrices[include_codeshare] if matrices else None
+
+
+def competition_arrays(
+    graph: RouteGraph, include_codeshare: bool = True
+) -> Dict[str, np.ndarray]:
+    """
+    Build the competition arrays of a route graph.
+
+    Parallel routes of one airline on a pair count once; routes without a
+    known airline, and codeshare routes unless include_codeshare, are left
+    out.
+    """
+    n = graph.num_airports
+    k = max(len(graph.airline_codes), 1)
+    known = graph.airline >= 0
+    if not include_codeshare:
+        known &= graph.operated
+    keys = graph.sources()[known].astype(np.int64) * n + graph.indices[known]
+
+    # Unique (pair, airline), sorted by pair and then airline
+    combos = np.unique(keys * k + graph.airline[known])
+    pair_keys, carriers = combos // k, (combos % k).astype(np.int32)
+    pairs, first = np.unique(pair_keys, return_index=True)
+    carrier_indptr = np.append(first, combos.size).astype(np.int64)
+
+    pair_positions = np.repeat(np.arange(pairs.size), np.diff(carrier_indptr))
+    flies = sparse.csr_matrix(
+        (np.ones(combos.size, dtype=np.int32), (pair_positions, carriers)),
+        shape=(pairs.size, k),
+    )
+    by_airline = flies.T.tocsr()
+    by_airline.sort_indices()
+    overlap = (by_airline @ flies).tocsr()
+    overlap.sort_indices()
+
+    return {
+        "pairs": pairs.astype(np.int64),
+        "carrier_indptr": carrier_indptr,
+        "carriers": carriers,
+        "airline_indptr": by_airline.indptr.astype(np.int64),
+        "airline_pairs": by_airline.indices.astype(np.int32),
+        "overlap_indptr": overlap.indptr.astype(np.int64),
+        "overlap_airlines": overlap.indices.astype(np.int32),
+        "overlap_pairs": overlap.data.astype(np.int32),
+    }
+
+
+def build_competition_matrix(
+    graph: RouteGraph, directory: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Build the competition matrix for a route graph, with and without
+    codeshare routes.
+
+    The new matrix is written next to the old one and swapped in when
+    complete.
+
+    Args:
+        graph: Route graph to build the matrix for
+        directory: Output directory (default: COMPETITION_DIR)
+
+    Returns:
+        Build statistics: pairs, monopoly, duopoly, competitive, the same
+        counts without codeshares under "operated", and seconds
+    """
+    start = time.perf_counter()
+    directory = os.path.abspath(directory or COMPETITION_DIR)
+    staging = stage_directory(directory)
+    markets = {}
+    for prefix, include_codeshare in (("", True), (OPERATED_PREFIX, False)):
+        arrays = competition_arrays(graph, include_codeshare)
+        for name, array in arrays.items():
+            np.save(os.path.join(staging, f"{prefix}{name}.npy"), array)
+        counts = np.diff(arrays["carrier_indptr"])
+        markets[include_codeshare] = {
+            "pairs": int(counts.size),
+            "monopoly": int(np.count_nonzero(counts == 1)),
+            "duopoly": int(np.count_nonzero(counts == 2)),
+            "competitive": int(np.count_nonzero(counts > 2)),
+        }
+
+    write_manifest(
+        staging,
+        MANIFEST_FILE,
+        {
+            "iata": graph.iata.tolist(),
+            "airlines": graph.airline_codes.tolist(),
+            "markets": markets[True],
+            "operated_markets": markets[False],
+        },
+    )
+    swap_in(staging, directory)
+
+    return {
+        **markets[True],
+        "operated": markets[False],
+        "seconds": round(time.perf_counter() - start, 2),
+    }
@@ -0,0 +1,196 @@
+"""
+Data-quality checks for the prepared OpenFlights dataframes.
+
+The loader runs them before anything is uploaded. Every check is one
+vectorized pandas/NumPy operation over a whole dataset that gives each bad
+row a reason; rows with a reason are dropped from the upload and written,
+with the reason, to a quarantine CSV per dataset. The counts per reason go
+to a machine-readable report, DATA_QUALITY_DIR/report.json.
+
+Checks, in order (a row gets the first reason that applies):
+
+- airports: coordinates that are unparsable or out of range (as
+  validate_coordinates), codes taken from the ICAO fallback of
+  harmonize_codes that duplicate another airport's IATA code, and any
+  other duplicate code (the last row is kept, as MERGE ... SET would)
+- airlines: the same duplicate-code checks
+- routes: an unknown source, destination or airline (the MATCH in
+  load_route.cypher would find nothing), source equal to destination and
+  repeats of an earlier route. A repeat is merged into the first row,
+  filling its missing values as the ON MATCH coalesce() of the MERGE
+  would, and quarantined for the record.
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+from distance import validate_coordinates_array
+
+DATA_QUALITY_DIR = os.getenv(
+    "DATA_QUALITY_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "quality"),
+)
+
+REPORT_FILE = "report.json"
+
+ROUTE_KEY = ["Source airport", "Destination airport", "Airline"]
+
+
+def _flag(reasons: pd.Series, mask, reason: str) -> None:
+    """Give `reason` to the rows in `mask` that have no reason yet"""
+    reasons[reasons.isna() & mask] = reason
+
+
+def _duplicated(values, kept: pd.Series, keep: str) -> pd.Series:
+    """Mark repeats (of a Series or of DataFrame rows) among the kept rows"""
+    return values[kept].duplicated(keep=keep).reindex(kept.index, fill_value=False)
+
+
+def _flag_duplicate_codes(
+    df: pd.DataFrame, reasons: pd.Series, code: str, fallback: str
+) -> None:
+    codes = df[code]
+    # harmonize_codes filled the code from the fallback column
+    from_fallback = codes.eq(df[fallback]) & df[fallback].notna()
+    primary = codes[reasons.isna() & ~from_fallback]
+    _flag(reasons, from_fallback & codes.isin(primary), "duplicate_fallback_code")
+    _flag(reasons, _duplicated(codes, reasons.isna(), "last"), "duplicate_code")
+
+
+def check_airports(df: pd.DataFrame) -> Tuple[pd.Series, Dict[str, int]]:
+    """
+    Check prepared airports.
+
+    Returns:
+        (reasons, warnings): the reason per row (None for a good row) and
+        counts of kept rows worth knowing about (missing_coordinates)
+    """
+    reasons = pd.Series(None, index=df.index, dtype=object)
+    latitude = pd.to_numeric(df["Latitude"], errors="coerce")
+    longitude = pd.to_numeric(df["Longitude"], errors="coerce")
+    # Airports without any coordinates are kept; they just get no distances
+    missing = df["Latitude"].isna() & df["Longitude"].isna()
+    valid = validate_coordinates_array(latitude, longitude)
+    _flag(reasons, ~missing & ~valid, "invalid_coordinates")
+    _flag_duplicate_codes(df, reasons, "IATA", "ICAO")
+    return reasons, {"missing_coordinates": int((missing & reasons.isna()).sum())}
+
+
+def check_airlines(df: pd.DataFrame) -> Tuple[pd.Series, Dict[str, int]]:
+    """Check prepared airlines; returns (reasons, warnings) as check_airports"""
+    reasons = pd.Series(None, index=df.index, dtype=object)
+    _flag_duplicate_codes(df, reasons, "IATA", "ICAO")
+    return reasons, {}
+
+
+def check_routes(
+    df: pd.DataFrame, airport_codes: Iterable[str], airline_codes: Iterable[str]
+) -> Tuple[pd.Series, Dict[str, int]]:
+    """
+    Check prepared routes against the airports and airlines that will be
+    uploaded; returns (reasons, warnings) as check_airports
+    """
+    airport_codes = pd.Index(airport_codes)
+    reasons = pd.Series(None, index=df.index, dtype=object)
+    source, destination = df["Source airport"], df["Destination airport"]
+    _flag(reasons, ~source.isin(airport_codes), "unknown_source_airport")
+    _flag(reasons, ~destination.isin(airport_codes), "unknown_destination_airport")
+    _flag(reasons, ~df["Airline"].isin(pd.Index(airline_codes)), "unknown_airline")
+    _flag(reasons, source.eq(destination), "same_airport")
+    _flag(
+        reasons, _duplicated(df[ROUTE_KEY], reasons.isna(), "first"), "duplicate_route"
+    )
+    return reasons, {}
+
+
+def merge_repeats(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Merge the rows of each route into its first, taking the first non-null
+    value of every column (the MERGE ... ON MATCH coalesce() of
+    load_route.cypher)
+    """
+    merged = df.groupby(ROUTE_KEY, sort=False, as_index=False).first()
+    return merged.astype(object).where(merged.notna(), None)
+
+
+def summarize(reasons: pd.Series, warnings: Dict[str, int]) -> Dict[str, Any]:
+    """Report entry of one dataset"""
+    rejected = reasons.dropna()
+    return {
+        "rows": len(reasons),
+        "kept": len(reasons) - len(rejected),
+        "rejected": len(rejected),
+        "reasons": {
+            reason: int(count)
+            for reason, count in sorted(rejected.value_counts().items())
+        },
+        "warnings": warnings,
+    }
+
+
+def validate_datasets(
+    airports: pd.DataFrame, airlines: pd.DataFrame, routes: pd.DataFrame
+) -> Tuple[Dict[str, pd.DataFrame], Dict[str, pd.DataFrame], Dict[str, Any]]:
+    """
+    Run every check. Routes are checked against the airports and airlines
+    that pass, so a route to a rejected airport is rejected too.
+
+    Returns:
+        (kept, rejected, report): the good rows and the bad rows (with a
+        Reason column) per dataset, and the quality report
+    """
+    kept: Dict[str, pd.DataFrame] = {}
+    rejected: Dict[str, pd.DataFrame] = {}
+    report: Dict[str, Any] = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "datasets": {},
+    }
+
+    def split(name, df, checked):
+        reasons, warnings = checked
+        bad = reasons.notna()
+        kept[name] = df[~bad]
+        rejected[name] = df[bad].assign(Reason=reasons[bad])
+        report["datasets"][name] = summarize(reasons, warnings)
+        return reasons
+
+    split("airports", airports, check_airports(airports))
+    split("airlines", airlines, check_airlines(airlines))
+    reasons = split(
+        "routes",
+        routes,
+        check_routes(routes, kept["airports"]["IATA"], kept["airlines"]["IATA"]),
+    )
+    kept["routes"] = merge_repeats(
+        routes[reasons.isna() | reasons.eq("duplicate_route")]
+    )
+    report["datasets"]["routes"]["warnings"] = {
+        "missing_distance": int(kept["routes"]["Distance"].isna().sum())
+    }
+    return kept, rejected, report
+
+
+def write_quality_report(
+    report: Dict[str, Any],
+    rejected: Dict[str, pd.DataFrame],
+    directory: Optional[str] = None,
+) -> str:
+    """
+    Write report.json and one <dataset>.csv of quarantined rows per
+    dataset, replacing those of the previous load.
+
+    Returns:
+        Path of the report
+    """
+    directory = os.path.abspath(directory or DATA_QUALITY_DIR)
+    os.makedirs(directory, exist_ok=True)
+    for name, frame in rejected.items():
+        frame.to_csv(os.path.join(directory, f"{name}.csv"), index=False)
+    path = os.path.join(directory, REPORT_FILE)
+    with open(path, "w") as file:
+        json.dump(report, file, indent=2)
+    return path
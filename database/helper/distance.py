@@ -3,10 +3,16 @@ Distance calculation utilities using the Haversine formula.
 
 The Haversine formula calculates the great-circle distance between two points
 on a sphere given their longitudes and latitudes.
+
+The great-circle geometry helpers (initial_bearing, midpoint,
+intermediate_points, split_antimeridian) take scalars or NumPy arrays and
+work on all routes at once.
 """
 
 import math
-from typing import Tuple, Optional
+from typing import List, Tuple, Optional
+
+import numpy as np
 
 
 def calculate_distance(
@@ -128,6 +134,23 @@ def validate_coordinates(lat: float, lon: float) -> bool:
     return -90 <= lat <= 90 and -180 <= lon <= 180
 
 
+def validate_coordinates_array(lats, lons) -> np.ndarray:
+    """
+    validate_coordinates() for arrays of coordinates at once.
+
+    Args:
+        lats, lons: Decimal degrees, arrays of shape (m,); NaN for missing
+
+    Returns:
+        Boolean array of shape (m,), False where a coordinate is missing or
+        out of range
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    # NaN compares False, so missing coordinates are invalid
+    return (np.abs(lats) <= 90) & (np.abs(lons) <= 180)
+
+
 def calculate_distance_safe(
     lat1: Optional[float],
     lon1: Optional[float],
@@ -195,3 +218,134 @@ def get_distance_between_airports(
     """
     distance = calculate_distance_km(origin_lat, origin_lon, dest_lat, dest_lon)
     return round(distance, round_to)
+
+
+def initial_bearing(lat1, lon1, lat2, lon2):
+    """
+    Initial bearing (forward azimuth) from the first point to the second.
+
+    Args:
+        lat1, lon1, lat2, lon2: Decimal degrees, scalars or arrays
+
+    Returns:
+        Bearing in degrees clockwise from north, in [0, 360)
+    """
+    phi1, lam1, phi2, lam2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    dlam = lam2 - lam1
+    y = np.sin(dlam) * np.cos(phi2)
+    x = np.cos(phi1) * np.sin(phi2) - np.sin(phi1) * np.cos(phi2) * np.cos(dlam)
+    return np.degrees(np.arctan2(y, x)) % 360
+
+
+def midpoint(lat1, lon1, lat2, lon2):
+    """
+    Midpoint of the great-circle arc between two points.
+
+    Args:
+        lat1, lon1, lat2, lon2: Decimal degrees, scalars or arrays
+
+    Returns:
+        (latitude, longitude) in decimal degrees, longitude in [-180, 180)
+    """
+    phi1, lam1, phi2, lam2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    dlam = lam2 - lam1
+    bx = np.cos(phi2) * np.cos(dlam)
+    by = np.cos(phi2) * np.sin(dlam)
+    lat = np.arctan2(np.sin(phi1) + np.sin(phi2), np.hypot(np.cos(phi1) + bx, by))
+    lon = lam1 + np.arctan2(by, np.cos(phi1) + bx)
+    return np.degrees(lat), (np.degrees(lon) + 180) % 360 - 180
+
+
+def intermediate_points(lat1, lon1, lat2, lon2, points: int = 32):
+    """
+    Evenly spaced points along the great-circle arcs between point pairs.
+
+    Args:
+        lat1, lon1, lat2, lon2: Decimal degrees, scalars or arrays of shape (m,)
+        points: Points per arc, endpoints included (at least 2)
+
+    Returns:
+        (latitudes, longitudes), each of shape (m, points) (or (points,)
+        for scalar input); longitudes in [-180, 180]. Antipodal pairs have
+        no unique arc and get a straight line.
+    """
+    if points < 2:
+        raise ValueError("points must be at least 2")
+    scalar = np.ndim(lat1) == 0
+    phi1, lam1, phi2, lam2 = (
+        np.radians(np.atleast_1d(np.asarray(value, dtype=np.float64)))[:, None]
+        for value in (lat1, lon1, lat2, lon2)
+    )
+
+    # Unit vectors of both endpoints, shape (m, 1) per component
+    a = np.stack(
+        [np.cos(phi1) * np.cos(lam1), np.cos(phi1) * np.sin(lam1), np.sin(phi1)]
+    )
+    b = np.stack(
+        [np.cos(phi2) * np.cos(lam2), np.cos(phi2) * np.sin(lam2), np.sin(phi2)]
+    )
+    angle = np.arccos(np.clip((a * b).sum(axis=0), -1.0, 1.0))
+    sin_angle = np.sin(angle)
+
+    fraction = np.linspace(0.0, 1.0, points)[None, :]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        wa = np.sin((1 - fraction) * angle) / sin_angle
+        wb = np.sin(fraction * angle) / sin_angle
+    # Identical or antipodal endpoints: interpolate linearly instead
+    degenerate = np.broadcast_to(sin_angle < 1e-12, wa.shape)
+    wa = np.where(degenerate, 1 - fraction, wa)
+    wb = np.where(degenerate, fraction, wb)
+
+    x, y, z = wa * a + wb * b
+    lats = np.degrees(np.arctan2(z, np.hypot(x, y)))
+    lons = np.degrees(np.arctan2(y, x))
+    # Keep the given endpoint longitudes exactly (e.g. 180 vs -180)
+    lons[:, 0] = np.degrees(lam1[:, 0])
+    lons[:, -1] = np.degrees(lam2[:, 0])
+    if scalar:
+        return lats[0], lons[0]
+    return lats, lons
+
+
+def split_antimeridian(lats, lons) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Split a polyline where it crosses the antimeridian.
+
+    A crossing is a step of more than 180 degrees in longitude. The
+    crossing latitude is interpolated and added to both parts, at +180 on
+    one side and -180 on the other, so maps do not draw a line across the
+    whole world.
+
+    Returns:
+        List of (latitudes, longitudes) parts, one part if there is no crossing
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    crossings = np.flatnonzero(np.abs(np.diff(lons)) > 180)
+    if crossings.size == 0:
+        return [(lats, lons)]
+
+    parts = []
+    start = 0
+    entry = None
+    for i in crossings:
+        lon_a, lon_b = lons[i], lons[i + 1]
+        side = 180.0 if lon_a > 0 else -180.0
+        # Unwrap the next longitude to the side of the current one
+        lon_b_unwrapped = lon_b + 360.0 if side > 0 else lon_b - 360.0
+        t = (side - lon_a) / (lon_b_unwrapped - lon_a)
+        lat_cross = lats[i] + t * (lats[i + 1] - lats[i])
+
+        part_lats = lats[start : i + 1]
+        part_lons = lons[start : i + 1]
+        if entry is not None:
+            part_lats = np.concatenate([[entry[0]], part_lats])
+            part_lons = np.concatenate([[entry[1]], part_lons])
+        parts.append((np.append(part_lats, lat_cross), np.append(part_lons, side)))
+        entry = (lat_cross, -side)
+        start = i + 1
+
+    part_lats = np.concatenate([[entry[0]], lats[start:]])
+    part_lons = np.concatenate([[entry[1]], lons[start:]])
+    parts.append((part_lats, part_lons))
+    return parts
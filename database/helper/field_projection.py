@@ -0,0 +1,69 @@
+"""
+Field projection for Cypher queries.
+
+parse_fields() validates a comma-separated `fields=` value against the
+fields a response may contain. with_return() then swaps the RETURN items of
+a query for just those fields, so the properties nobody asked for are not
+read from the store, not serialized and not sent. The rest of the query
+(MATCH, WHERE, ORDER BY, LIMIT) is kept, and so is its plan.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional
+
+RETURN_CLAUSE = re.compile(
+    r"(\bRETURN\s+)(.*?)(\s+(?:ORDER\s+BY|SKIP|LIMIT)\b.*)?\s*$", re.I | re.S
+)
+
+
+def parse_fields(value: Optional[str], allowed: Dict[str, str]) -> Optional[List[str]]:
+    """
+    Parse a comma-separated list of field names.
+
+    Args:
+        value: The fields= parameter, None or empty for all fields
+        allowed: Accepted field name -> output key (a field may be accepted
+            under several names, e.g. its alias and its attribute name)
+
+    Returns:
+        Output keys in request order without duplicates, or None for all
+
+    Raises:
+        ValueError: Unknown field names
+    """
+    if value is None or not value.strip():
+        return None
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise ValueError(
+            f"Unknown field(s): {', '.join(unknown)}. "
+            f"Use any of {', '.join(sorted(set(allowed.values())))}"
+        )
+    return list(dict.fromkeys(allowed[name] for name in names))
+
+
+def return_items(columns: Dict[str, str], keys: Iterable[str]) -> str:
+    """Render 'expression AS key' items for the given output keys"""
+    return ", ".join(f"{columns[key]} AS {quote(key)}" for key in keys)
+
+
+def with_return(query: str, items: str) -> str:
+    """
+    Replace the items of a query's final RETURN clause.
+
+    Raises:
+        ValueError: The query has no RETURN clause
+    """
+    start = query.upper().rfind("RETURN")
+    match = RETURN_CLAUSE.match(query, start) if start >= 0 else None
+    if match is None:
+        raise ValueError("Query has no RETURN clause")
+    return query[:start] + match.group(1) + items + (match.group(3) or "")
+
+
+def quote(name: str) -> str:
+    """Quote a Cypher identifier with backticks unless it is a plain word"""
+    if re.fullmatch(r"[A-Za-z_]\w*", name):
+        return name
+    return "`" + name.replace("`", "``") + "`"
@@ -0,0 +1,372 @@
+"""
+Versioned, memory-mappable binary snapshot of the airport/airline/route graph.
+
+The loader writes one snapshot file per load. Readers (API workers, batch
+jobs) open it with numpy.memmap, so every array is a zero-copy view of the
+file: opening takes milliseconds and all processes share one copy through
+the OS page cache instead of each rebuilding the graph from Neo4j.
+
+File layout (all integers little-endian):
+
+    magic "AFSNAP\\0\\0" | version u32 | table-of-contents length u32
+    | table of contents (JSON) | arrays, each aligned to 64 bytes
+
+The table of contents lists every array with its dtype, length and offset.
+Strings are stored as string tables: UTF-8 bytes concatenated into one
+uint8 array plus an int64 offsets array (None is stored as an empty string).
+Airports are sorted by IATA code and routes are CSR arrays in the same
+layout as RouteGraph.
+
+A snapshot is only used while it matches the database: its metadata holds
+the load id the loader recorded on the Dataset node plus the airport and
+route counts, and load_route_graph() compares them with Neo4j before
+trusting the file (see snapshot_is_current).
+"""
+
+import json
+import os
+import struct
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from route_graph import AIRPORTS_QUERY, ROUTES_QUERY, RouteGraph, fetch_route_graph
+
+MAGIC = b"AFSNAP\0\0"
+FORMAT_VERSION = 2
+ALIGNMENT = 64
+_HEADER = struct.Struct("<8sII")
+
+SNAPSHOT_PATH = os.getenv(
+    "SNAPSHOT_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "airfacts.snapshot"),
+)
+
+# String columns stored per entity: snapshot column -> Neo4j property
+AIRPORT_STRINGS = {
+    "iata": "IATA",
+    "icao": "ICAO",
+    "name": "Name",
+    "city": "City",
+    "country": "Country",
+}
+AIRLINE_STRINGS = {"iata": "IATA", "icao": "ICAO", "name": "Name", "country": "Country"}
+
+# What a snapshot must agree with: the id of the last completed load
+# (recorded by the loader) and the airport and route counts (count store)
+FINGERPRINT_QUERY = """
+OPTIONAL MATCH (d:Dataset {Name: 'openflights'})
+RETURN d.LoadId AS load_id,
+       COUNT { MATCH (:Airport) } AS airports,
+       COUNT { MATCH ()-[:ROUTE]->() } AS routes
+"""
+
+AIRPORT_ROWS_QUERY = """
+MATCH (a:Airport)
+RETURN a.IATA AS IATA, a.ICAO AS ICAO, a.Name AS Name, a.City AS City,
+       a.Country AS Country
+"""
+
+AIRLINE_ROWS_QUERY = """
+MATCH (al:Airline)
+RETURN al.IATA AS IATA, al.ICAO AS ICAO, al.Name AS Name,
+       al.Country AS Country, al.Active AS Active
+"""
+
+
+class StringTable:
+    """Read-only sequence of strings backed by an offsets and a bytes array"""
+
+    def __init__(self, offsets: np.ndarray, data: np.ndarray):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> Optional[str]:
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        if start == end:
+            return None
+        return self.data[start:end].tobytes().decode("utf-8")
+
+    def tolist(self) -> List[Optional[str]]:
+        text = self.data.tobytes()
+        offsets = self.offsets.tolist()
+        return [
+            text[start:end].decode("utf-8") if end > start else None
+            for start, end in zip(offsets[:-1], offsets[1:])
+        ]
+
+
+class Snapshot:
+    """An open snapshot file; arrays are zero-copy views of the memory map"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._buffer = np.memmap(path, dtype=np.uint8, mode="r")
+        magic, version, toc_length = _HEADER.unpack(
+            self._buffer[: _HEADER.size].tobytes()
+        )
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an Airfacts snapshot")
+        if version != FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported snapshot version {version} "
+                f"(expected {FORMAT_VERSION}), rerun the loader"
+            )
+        toc = self._buffer[_HEADER.size : _HEADER.size + toc_length].tobytes()
+        toc = json.loads(toc.decode("utf-8"))
+        self.version = version
+        self.metadata: Dict[str, Any] = toc["metadata"]
+        self._arrays: Dict[str, Dict[str, Any]] = toc["arrays"]
+        self._airport_index: Optional[Dict[str, int]] = None
+
+    def array(self, name: str) -> np.ndarray:
+        """Return a stored array as a read-only view of the file"""
+        entry = self._arrays[name]
+        dtype = np.dtype(entry["dtype"])
+        end = entry["offset"] + entry["length"] * dtype.itemsize
+        return self._buffer[entry["offset"] : end].view(dtype)
+
+    def strings(self, name: str) -> StringTable:
+        """Return a stored string table"""
+        return StringTable(self.array(f"{name}.offsets"), self.array(f"{name}.data"))
+
+    @property
+    def num_airports(self) -> int:
+        return len(self.array("airports.latitude"))
+
+    @property
+    def num_routes(self) -> int:
+        return len(self.array("routes.indices"))
+
+    @property
+    def airport_index(self) -> Dict[str, int]:
+        """IATA code to airport index, built on first use"""
+        if self._airport_index is None:
+            codes = self.strings("airports.iata").tolist()
+            self._airport_index = {code: i for i, code in enumerate(codes)}
+        return self._airport_index
+
+    def airport(self, i: int) -> Dict[str, Any]:
+        """Return the attributes of one airport"""
+        row = {
+            prop: self.strings(f"airports.{column}")[i]
+            for column, prop in AIRPORT_STRINGS.items()
+        }
+        row["Latitude"] = _optional_float(self.array("airports.latitude")[i])
+        row["Longitude"] = _optional_float(self.array("airports.longitude")[i])
+        return row
+
+    def to_route_graph(self) -> RouteGraph:
+        """Return the routes as a RouteGraph; CSR arrays are not copied"""
+        iata = np.array(self.strings("airports.iata").tolist(), dtype=object)
+        return RouteGraph(
+            iata=iata,
+            latitude=self.array("airports.latitude"),
+            longitude=self.array("airports.longitude"),
+            indptr=self.array("routes.indptr"),
+            indices=self.array("routes.indices"),
+            distance=self.array("routes.distance"),
+            airline=self.array("routes.airline"),
+            stops=self.array("routes.stops"),
+            airline_codes=np.array(
+                self.strings("routes.airline_codes").tolist(), dtype=object
+            ),
+            index=self.airport_index,
+            operated=self.array("routes.operated").view(bool),
+        )
+
+
+def open_snapshot(path: Optional[str] = None) -> Snapshot:
+    """Open a snapshot file (default: SNAPSHOT_PATH)"""
+    return Snapshot(path or SNAPSHOT_PATH)
+
+
+def write_snapshot(
+    path: str,
+    graph: RouteGraph,
+    airports: Iterable[Dict[str, Any]],
+    airlines: Iterable[Dict[str, Any]],
+    metadata: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Write a snapshot file atomically.
+
+    Args:
+        path: Output file; replaced only once the new file is complete
+        graph: Airports and routes
+        airports: Airport rows keyed by Neo4j property name (IATA, ICAO, Name,
+            City, Country), matched to the graph's airports by IATA
+        airlines: Airline rows (IATA, ICAO, Name, Country, Active)
+        metadata: Extra JSON-serializable metadata to store
+
+    Returns:
+        The stored metadata
+    """
+    by_iata = {row.get("IATA"): row for row in airports}
+    airport_rows = [by_iata.get(code, {}) for code in graph.iata.tolist()]
+    airline_rows = sorted(
+        (row for row in airlines if row.get("IATA")), key=lambda row: row["IATA"]
+    )
+
+    arrays: Dict[str, np.ndarray] = {}
+    arrays.update(_string_table("airports.iata", graph.iata.tolist()))
+    for column, prop in AIRPORT_STRINGS.items():
+        if column != "iata":
+            arrays.update(
+                _string_table(
+                    f"airports.{column}", [row.get(prop) for row in airport_rows]
+                )
+            )
+    arrays["airports.latitude"] = np.asarray(graph.latitude, dtype="<f8")
+    arrays["airports.longitude"] = np.asarray(graph.longitude, dtype="<f8")
+
+    for column, prop in AIRLINE_STRINGS.items():
+        arrays.update(
+            _string_table(f"airlines.{column}", [row.get(prop) for row in airline_rows])
+        )
+    arrays["airlines.active"] = np.array(
+        [row.get("Active") == "Y" for row in airline_rows], dtype=np.uint8
+    )
+
+    arrays["routes.indptr"] = np.asarray(graph.indptr, dtype="<i8")
+    arrays["routes.indices"] = np.asarray(graph.indices, dtype="<i4")
+    arrays["routes.distance"] = np.asarray(graph.distance, dtype="<f4")
+    arrays["routes.airline"] = np.asarray(graph.airline, dtype="<i4")
+    arrays["routes.stops"] = np.asarray(graph.stops, dtype="i1")
+    arrays["routes.operated"] = np.asarray(graph.operated, dtype=np.uint8)
+    arrays.update(_string_table("routes.airline_codes", graph.airline_codes.tolist()))
+
+    metadata = {
+        **(metadata or {}),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "airports": graph.num_airports,
+        "airlines": len(airline_rows),
+        "routes": graph.num_routes,
+    }
+
+    # Offsets depend on the table of contents length, which depends on the
+    # offsets; reserve a padded TOC size and lay the arrays out after it
+    entries = {
+        name: {"dtype": array.dtype.str, "length": len(array)}
+        for name, array in arrays.items()
+    }
+    toc_size = _align(
+        len(json.dumps({"metadata": metadata, "arrays": entries})) + 32 * len(entries)
+    )
+    offset = _align(_HEADER.size + toc_size)
+    for name, array in arrays.items():
+        entries[name]["offset"] = offset
+        offset = _align(offset + array.nbytes)
+    toc = json.dumps({"metadata": metadata, "arrays": entries}).encode("utf-8")
+    if len(toc) > toc_size:
+        # Checked even under python -O: the arrays would overlap the TOC
+        raise RuntimeError("snapshot table of contents outgrew its reservation")
+
+    staging = f"{path}.tmp"
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(staging, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(toc)))
+        file.write(toc)
+        for name, array in arrays.items():
+            file.seek(entries[name]["offset"])
+            file.write(np.ascontiguousarray(array).tobytes())
+        file.truncate(max(offset, file.tell()))
+    # Readers that still map the old file keep a valid view of it
+    os.replace(staging, path)
+    return metadata
+
+
+def remove_snapshot(path: Optional[str] = None) -> bool:
+    """
+    Delete the snapshot so readers go to Neo4j; returns whether there was one.
+    Readers that still map the file keep a valid view of it.
+    """
+    try:
+        os.remove(path or SNAPSHOT_PATH)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def database_fingerprint(driver, database: Optional[str] = None) -> Dict[str, Any]:
+    """Return the load id and the airport and route counts of the database"""
+    with driver.session(database=database) as session:
+        return session.run(FINGERPRINT_QUERY).single().data()
+
+
+def snapshot_is_current(
+    snapshot: Snapshot, driver, database: Optional[str] = None
+) -> bool:
+    """
+    Whether the snapshot was written for the data currently in Neo4j: same
+    load id, and as many airports and routes (which catches upload batches
+    that failed and writes by anything other than the loader).
+    """
+    fingerprint = database_fingerprint(driver, database)
+    return fingerprint["load_id"] is not None and all(
+        snapshot.metadata.get(key) == value for key, value in fingerprint.items()
+    )
+
+
+def load_route_graph(
+    driver=None, database: Optional[str] = None, path: Optional[str] = None
+) -> RouteGraph:
+    """
+    Return the route graph from the snapshot if it matches the database,
+    otherwise from Neo4j. Without a driver the snapshot is used unchecked.
+    """
+    path = path or SNAPSHOT_PATH
+    if os.path.exists(path):
+        try:
+            snapshot = open_snapshot(path)
+        except ValueError:
+            if driver is None:
+                raise
+            # Another format version: use Neo4j until the next load rewrites it
+            snapshot = None
+        if snapshot is not None and (
+            driver is None or snapshot_is_current(snapshot, driver, database)
+        ):
+            return snapshot.to_route_graph()
+    return fetch_route_graph(driver, database)
+
+
+def snapshot_from_neo4j(
+    driver,
+    path: Optional[str] = None,
+    database: Optional[str] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> RouteGraph:
+    """
+    Write the snapshot from what is stored in Neo4j rather than from the
+    loader's dataframes, and return its graph
+    """
+    with driver.session(database=database) as session:
+        graph = RouteGraph.from_rows(
+            session.run(AIRPORTS_QUERY).data(), session.run(ROUTES_QUERY).data()
+        )
+        airports = session.run(AIRPORT_ROWS_QUERY).data()
+        airlines = session.run(AIRLINE_ROWS_QUERY).data()
+    write_snapshot(path or SNAPSHOT_PATH, graph, airports, airlines, metadata)
+    return graph
+
+
+def _string_table(name: str, values: Sequence[Optional[str]]) -> Dict[str, np.ndarray]:
+    encoded = [(value or "").encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype="<i8")
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return {f"{name}.offsets": offsets, f"{name}.data": data}
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _optional_float(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
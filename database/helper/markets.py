@@ -0,0 +1,110 @@
+"""
+City and metro-area markets.
+
+A market is the set of airports serving one city. By default airports are
+grouped by City and Country; the metro-area table (METRO_AREAS_PATH, a CSV
+of Market,Name,Country,IATA rows) puts airports of neighbouring cities
+into one market under its IATA metro code, e.g. JFK, LGA and EWR into NYC.
+
+A market without an override takes the lowest IATA code of its airports
+as its Id, so the market of a single-airport city has the airport's code.
+The loader writes the markets as (:Market) nodes and aggregates the routes
+between every two markets (see cypher/build_markets.cypher).
+"""
+
+import csv
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+METRO_AREAS_PATH = os.getenv(
+    "METRO_AREAS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "metro_areas.csv"),
+)
+
+# Airport IATA -> (market Id, market name, country)
+MetroAreas = Dict[str, Tuple[str, str, str]]
+
+
+def load_metro_areas(path: Optional[str] = None) -> MetroAreas:
+    """
+    Read the metro-area overrides.
+
+    Raises:
+        ValueError: An airport is listed in two metro areas
+    """
+    overrides: MetroAreas = {}
+    with open(path or METRO_AREAS_PATH, newline="", encoding="utf-8") as file:
+        for row in csv.DictReader(file):
+            iata = row["IATA"].strip().upper()
+            market = (row["Market"].strip().upper(), row["Name"], row["Country"])
+            if overrides.get(iata, market) != market:
+                raise ValueError(f"{iata} is listed in two metro areas")
+            overrides[iata] = market
+    return overrides
+
+
+def city_key(city: Optional[str], country: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Normalize City + Country for grouping, None if the city is unknown"""
+    if not city or not city.strip():
+        return None
+    return (" ".join(city.split()).casefold(), (country or "").strip().casefold())
+
+
+def assign_markets(
+    airports: Iterable[Dict[str, Any]], metro_areas: Optional[MetroAreas] = None
+) -> List[Dict[str, Any]]:
+    """
+    Group airports into markets.
+
+    A metro area also takes in the unlisted airports of the city it is named
+    after (a heliport with City "New York" joins NYC).
+
+    Args:
+        airports: Rows with IATA, City and Country
+        metro_areas: Overrides from load_metro_areas() (default: none)
+
+    Returns:
+        One row per market: Market (Id), Name, Country and its Airports
+        (sorted IATA codes), ordered by Id. An airport without a city is
+        a market of its own.
+    """
+    metro_areas = metro_areas or {}
+    groups: Dict[Any, Dict[str, Any]] = {}
+    aliases: Dict[Any, Any] = {}
+    for market, name, country in set(metro_areas.values()):
+        key = ("metro", market)
+        groups[key] = {"Market": market, "Name": name, "Country": country}
+        aliases[city_key(name, country)] = key
+
+    members: Dict[Any, List[str]] = {}
+    for airport in airports:
+        iata = airport.get("IATA")
+        if not iata:
+            continue
+        if iata in metro_areas:
+            key: Any = ("metro", metro_areas[iata][0])
+        else:
+            city = city_key(airport.get("City"), airport.get("Country"))
+            key = aliases.get(city, city) if city else ("airport", iata)
+            groups.setdefault(
+                key,
+                {
+                    "Market": None,
+                    "Name": airport.get("City") or iata,
+                    "Country": airport.get("Country"),
+                },
+            )
+        members.setdefault(key, []).append(iata)
+
+    # Other markets take their lowest IATA code not already a metro code
+    taken = {group["Market"] for group in groups.values() if group["Market"]}
+    markets = []
+    for key, codes in members.items():
+        group = dict(groups[key], Airports=sorted(codes))
+        if group["Market"] is None:
+            free = [code for code in group["Airports"] if code not in taken]
+            group["Market"] = free[0] if free else f"{group['Airports'][0]}-2"
+            taken.add(group["Market"])
+        markets.append(group)
+    markets.sort(key=lambda group: group["Market"])
+    return markets
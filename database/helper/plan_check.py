@@ -0,0 +1,283 @@
+"""
+Query plan regression checks for the Cypher shipped in this repository.
+
+collect_queries() extracts every Cypher statement from Python modules
+(string literals that start with a Cypher clause, f-string fields rendered
+as placeholders) and from .cypher files. plan_findings() walks an EXPLAIN
+plan and reports operators that do not scale: AllNodesScan, label scans of
+large labels, CartesianProduct and Eager.
+
+A finding that is intended can be allowed where the query is written, with
+"# plan-check: allow <Operator>[, <Operator>]" on the comment lines directly
+above a Python query, or "// plan-check: allow ..." inside a Cypher
+statement. In a .cypher file, a directive before the first statement
+applies to every statement of the file.
+"""
+
+import ast
+import glob
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+
+FLAGGED_OPERATORS = ("AllNodesScan", "NodeByLabelScan", "CartesianProduct", "Eager")
+
+# Label scans of labels with at least this many nodes are flagged
+LARGE_LABEL_THRESHOLD = 1000
+
+LABEL_SCANS = (
+    "NodeByLabelScan",
+    "UnionNodeByLabelsScan",
+    "IntersectionNodeByLabelsScan",
+)
+
+ALLOW_DIRECTIVE = re.compile(r"(?://|#)\s*plan-check:\s*allow\s+([\w ,]+)", re.I)
+CYPHER_START = re.compile(
+    r"^\s*(OPTIONAL\s+MATCH|MATCH|UNWIND|MERGE|CALL|WITH|CREATE|RETURN)\b"
+)
+CYPHER_BODY = re.compile(r"\b(RETURN|SET|DELETE|MERGE|CREATE)\b")
+SCHEMA_STATEMENT = re.compile(
+    r"^\s*(SHOW\b|(CREATE|DROP)\s+(\w+\s+)?(INDEX|CONSTRAINT)\b)", re.I
+)
+LABEL = re.compile(r":\s*`?(\w+)`?")
+
+
+@dataclass
+class ShippedQuery:
+    """A Cypher statement and where it was found"""
+
+    name: str
+    text: str
+    allow: FrozenSet[str] = field(default_factory=frozenset)
+
+
+@dataclass
+class Finding:
+    """An operator in a query plan that does not scale"""
+
+    operator: str
+    detail: str = ""
+    allowed: bool = False
+
+
+def parse_allow(lines: Iterable[str]) -> FrozenSet[str]:
+    """Return the operators allowed by plan-check directives in `lines`"""
+    allowed = set()
+    for line in lines:
+        match = ALLOW_DIRECTIVE.search(line)
+        if match:
+            allowed.update(
+                name.strip().lower()
+                for name in re.split(r"[ ,]+", match.group(1))
+                if name.strip()
+            )
+    return frozenset(allowed)
+
+
+def split_cypher(text: str, name: str) -> List[ShippedQuery]:
+    """
+    Split the contents of a .cypher file into statements.
+
+    Comment lines are dropped from the statement text (as the loader does)
+    but their plan-check directives are kept. Schema statements are skipped,
+    EXPLAIN cannot plan them.
+    """
+    # Directives above the first statement apply to the whole file
+    leading = []
+    for line in text.splitlines():
+        if line.strip() and not line.strip().startswith("//"):
+            break
+        leading.append(line)
+    file_allow = parse_allow(leading)
+
+    queries = []
+    statement, comments = [], []
+
+    def flush():
+        text = "\n".join(statement).strip()
+        if text and not SCHEMA_STATEMENT.match(text):
+            queries.append(
+                ShippedQuery(
+                    f"{name}#{len(queries) + 1}",
+                    text,
+                    file_allow | parse_allow(comments),
+                )
+            )
+        statement.clear()
+        comments.clear()
+
+    for line in text.splitlines():
+        if line.strip().startswith("//"):
+            comments.append(line)
+            continue
+        *complete, rest = line.split(";")
+        for part in complete:
+            statement.append(part)
+            flush()
+        statement.append(rest)
+    flush()
+    return queries
+
+
+def extract_python(source: str, name: str) -> List[ShippedQuery]:
+    """Extract Cypher string literals (and f-strings) from Python source"""
+    tree = ast.parse(source)
+    lines = source.splitlines()
+    queries = []
+
+    def visit(node, scope, statement):
+        if isinstance(node, ast.stmt):
+            statement = node
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            scope = node.name
+        elif isinstance(node, ast.Assign) and scope is None:
+            targets = [t.id for t in node.targets if isinstance(t, ast.Name)]
+            scope = targets[0] if targets else None
+
+        if isinstance(node, (ast.Constant, ast.JoinedStr)):
+            text = _render_string(node)
+            if text and CYPHER_START.match(text) and CYPHER_BODY.search(text):
+                label = f"{name}:{node.lineno}" + (f" {scope}" if scope else "")
+                queries.append(
+                    ShippedQuery(
+                        label,
+                        text.strip(),
+                        parse_allow(_comments_above(lines, statement.lineno)),
+                    )
+                )
+            return
+        for child in ast.iter_child_nodes(node):
+            visit(child, scope, statement)
+
+    visit(tree, None, None)
+    return queries
+
+
+def collect_queries(root: str, python: Iterable[str], cypher: Iterable[str]):
+    """
+    Collect the shipped queries from files matching the glob patterns.
+
+    Args:
+        root: Repository root the patterns and query names are relative to
+        python: Glob patterns of Python modules
+        cypher: Glob patterns of .cypher files
+
+    Returns:
+        List of ShippedQuery
+    """
+    queries = []
+    for patterns, extract in ((python, extract_python), (cypher, split_cypher)):
+        for pattern in patterns:
+            for path in sorted(glob.glob(os.path.join(root, pattern))):
+                with open(path, encoding="utf-8") as file:
+                    queries.extend(extract(file.read(), os.path.relpath(path, root)))
+    return queries
+
+
+def plan_findings(
+    plan: Dict[str, Any],
+    label_counts: Dict[str, int],
+    large_label: int = LARGE_LABEL_THRESHOLD,
+) -> List[Finding]:
+    """
+    Walk an EXPLAIN plan and return the operators that do not scale.
+
+    Args:
+        plan: Plan dictionary as returned by the driver (operatorType, args,
+            children)
+        label_counts: Number of nodes per label in the checked database
+        large_label: Label scans of labels with at least this many nodes
+            are flagged; scans of smaller labels are not
+    """
+    findings = []
+    operator = plan["operatorType"].split("@")[0]
+    details = str(plan.get("args", {}).get("Details", ""))
+    if operator in LABEL_SCANS:
+        labels = LABEL.findall(details)
+        if any(label_counts.get(label, 0) >= large_label for label in labels):
+            findings.append(Finding("NodeByLabelScan", details))
+    elif operator in FLAGGED_OPERATORS:
+        findings.append(Finding(operator, details))
+    for child in plan.get("children", []):
+        findings.extend(plan_findings(child, label_counts, large_label))
+    return findings
+
+
+def check_plan(
+    query: ShippedQuery,
+    plan: Dict[str, Any],
+    label_counts: Dict[str, int],
+    large_label: int = LARGE_LABEL_THRESHOLD,
+) -> List[Finding]:
+    """Return the findings of a query's plan, marking the allowed ones"""
+    findings = plan_findings(plan, label_counts, large_label)
+    for finding in findings:
+        finding.allowed = finding.operator.lower() in query.allow
+    return findings
+
+
+def render_report(results: List[Dict[str, Any]]) -> str:
+    """
+    Render check results as Markdown.
+
+    Args:
+        results: One dict per query with name, findings (List[Finding]) and
+            error (str or None)
+    """
+    failed = [r for r in results if r["error"] or _blocking(r["findings"])]
+    lines = [
+        "# Query plan check",
+        "",
+        f"{len(results)} queries checked, {len(failed)} failed.",
+        "",
+        "| Query | Status | Findings |",
+        "| --- | --- | --- |",
+    ]
+    for result in results:
+        status = (
+            "error"
+            if result["error"]
+            else ("fail" if _blocking(result["findings"]) else "ok")
+        )
+        findings = result["error"] or ", ".join(
+            finding.operator + (" (allowed)" if finding.allowed else "")
+            for finding in result["findings"]
+        )
+        lines.append(f"| `{result['name']}` | {status} | {findings} |")
+
+    for result in failed:
+        lines += ["", f"## {result['name']}", "", "```cypher", result["text"], "```"]
+        for finding in result["findings"]:
+            if not finding.allowed:
+                lines.append(f"- {finding.operator}: {finding.detail}")
+        if result["error"]:
+            lines.append(f"- error: {result['error']}")
+    return "\n".join(lines) + "\n"
+
+
+def _blocking(findings: List[Finding]) -> bool:
+    return any(not finding.allowed for finding in findings)
+
+
+def _render_string(node) -> Optional[str]:
+    """Return a string literal, with f-string fields rendered as identifiers"""
+    if isinstance(node, ast.Constant):
+        return node.value if isinstance(node.value, str) else None
+    parts = []
+    for value in node.values:
+        if isinstance(value, ast.Constant):
+            parts.append(str(value.value))
+        else:
+            parts.append(re.sub(r"\W", "_", ast.unparse(value.value)))
+    return "".join(parts)
+
+
+def _comments_above(lines: List[str], lineno: int) -> List[str]:
+    """Return the comment lines directly above line `lineno` (1-based)"""
+    comments = []
+    index = lineno - 2
+    while index >= 0 and lines[index].strip().startswith("#"):
+        comments.append(lines[index])
+        index -= 1
+    return comments
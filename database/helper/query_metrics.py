@@ -0,0 +1,349 @@
+"""
+Query timing, aggregation and slow-query logging.
+
+Shared by the API (api/database.py) and the dashboard connector so every
+Cypher call is measured the same way: wall time on the client, the server's
+result_available_after / result_consumed_after, row counts and, when
+PROFILE_QUERIES=1, database hits from a PROFILE plan.
+
+Under gunicorn every worker has its own registry. With METRICS_DIR set, each
+worker publishes its registry there as <pid>.json and /metrics renders the
+merge of all files, so a scrape does not depend on which worker answers.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Dict, List, Optional
+
+# Queries slower than this (wall time, milliseconds) go to the slow log
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+# Prefix queries with PROFILE to collect db hits (adds server overhead)
+PROFILE_QUERIES = os.getenv("PROFILE_QUERIES", "0") == "1"
+
+# Directory shared by the workers of one server (unset: one process)
+METRICS_DIR = os.getenv("METRICS_DIR") or None
+
+# Seconds between two publications of a worker's registry
+METRICS_PUBLISH_SECONDS = float(os.getenv("METRICS_PUBLISH_SECONDS", "5"))
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+slow_query_log = logging.getLogger("airfacts.slow_query")
+
+
+@dataclass
+class QueryStats:
+    """Aggregated measurements for one named query"""
+
+    calls: int = 0
+    errors: int = 0
+    slow: int = 0
+    rows: int = 0
+    wall_ms: float = 0.0
+    wall_ms_max: float = 0.0
+    available_after_ms: float = 0.0
+    consumed_after_ms: float = 0.0
+    db_hits: int = 0
+    buckets: List[int] = field(default_factory=lambda: [0] * len(LATENCY_BUCKETS))
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the stats with averages, without the raw histogram"""
+        data = asdict(self)
+        data.pop("buckets")
+        data["wall_ms_avg"] = self.wall_ms / self.calls if self.calls else 0.0
+        return data
+
+
+class QueryMetrics:
+    """Thread-safe registry of per-query statistics"""
+
+    def __init__(self, slow_query_ms: float = SLOW_QUERY_MS):
+        self.slow_query_ms = slow_query_ms
+        self._stats: Dict[str, QueryStats] = {}
+        self._counters: Dict[str, int] = {}
+        self._gauges: Dict[str, Callable[[], float]] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        name: str,
+        wall_ms: float,
+        rows: int = 0,
+        summary: Any = None,
+        error: bool = False,
+        query: Optional[str] = None,
+        parameters: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Record one query execution.
+
+        Args:
+            name: Stable name for the query, e.g. the calling function
+            wall_ms: Client-side wall time in milliseconds
+            rows: Number of rows returned
+            summary: neo4j ResultSummary, if the query completed
+            error: True if the query raised
+            query: Query text, only used for the slow log
+            parameters: Query parameters, only used for the slow log
+        """
+        available_after = getattr(summary, "result_available_after", None) or 0
+        consumed_after = getattr(summary, "result_consumed_after", None) or 0
+        hits = profile_db_hits(getattr(summary, "profile", None))
+        is_slow = wall_ms >= self.slow_query_ms
+
+        with self._lock:
+            stats = self._stats.setdefault(name, QueryStats())
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.slow += int(is_slow)
+            stats.rows += rows
+            stats.wall_ms += wall_ms
+            stats.wall_ms_max = max(stats.wall_ms_max, wall_ms)
+            stats.available_after_ms += available_after
+            stats.consumed_after_ms += consumed_after
+            stats.db_hits += hits
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if wall_ms / 1000 <= bound:
+                    stats.buckets[i] += 1
+
+        if is_slow:
+            slow_query_log.warning(
+                json.dumps(
+                    {
+                        "event": "slow_query",
+                        "name": name,
+                        "wall_ms": round(wall_ms, 2),
+                        "result_available_after_ms": available_after,
+                        "result_consumed_after_ms": consumed_after,
+                        "rows": rows,
+                        "db_hits": hits,
+                        "error": error,
+                        "query": " ".join(query.split()) if query else None,
+                        "parameters": parameters,
+                    },
+                    default=str,
+                )
+            )
+
+    def increment(self, counter: str, amount: int = 1) -> None:
+        """Increment a free-standing counter, e.g. for cache hits"""
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + amount
+
+    def register_gauge(self, gauge: str, read: Callable[[], float]) -> None:
+        """Register a gauge whose current value is read when rendering"""
+        with self._lock:
+            self._gauges[gauge] = read
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return a copy of the per-query statistics"""
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in self._stats.items()}
+
+    def counters(self) -> Dict[str, int]:
+        """Return a copy of the free-standing counters"""
+        with self._lock:
+            return dict(self._counters)
+
+    def gauges(self) -> Dict[str, float]:
+        """Return the current value of every registered gauge"""
+        with self._lock:
+            gauges = list(self._gauges.items())
+        return {gauge: read() for gauge, read in gauges}
+
+    def reset(self) -> None:
+        """Drop all recorded statistics (registered gauges are kept)"""
+        with self._lock:
+            self._stats.clear()
+            self._counters.clear()
+
+    def state(self) -> Dict[str, Any]:
+        """Return the raw statistics, counters and gauge values"""
+        with self._lock:
+            stats = {name: asdict(stats) for name, stats in self._stats.items()}
+            counters = dict(self._counters)
+        return {"stats": stats, "counters": counters, "gauges": self.gauges()}
+
+    def publish(self, directory: str) -> None:
+        """Write this process's state to <directory>/<pid>.json"""
+        path = os.path.join(directory, f"{os.getpid()}.json")
+        os.makedirs(directory, exist_ok=True)
+        with open(f"{path}.tmp", "w") as file:
+            json.dump(self.state(), file)
+        os.replace(f"{path}.tmp", path)
+
+    def start_publishing(
+        self, directory: str, interval: float = METRICS_PUBLISH_SECONDS
+    ) -> threading.Thread:
+        """Publish this process's state every `interval` seconds"""
+
+        def run():
+            while True:
+                try:
+                    self.publish(directory)
+                except OSError as e:
+                    logging.getLogger(__name__).warning(
+                        "Could not publish metrics: %s", e
+                    )
+                time.sleep(interval)
+
+        thread = threading.Thread(target=run, name="metrics-publisher", daemon=True)
+        thread.start()
+        return thread
+
+    def render_prometheus(self, prefix: str = "airfacts") -> str:
+        """Render the statistics in the Prometheus text exposition format"""
+        return render_prometheus(self.state(), prefix)
+
+
+def read_states(directory: str) -> List[Dict[str, Any]]:
+    """
+    Read every process state published in `directory`.
+
+    Workers that have exited keep contributing their final counts, so
+    counters never go backwards when a worker is recycled; their gauges are
+    dropped.
+    """
+    states = []
+    try:
+        names = sorted(os.listdir(directory))
+    except OSError:
+        return states
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as file:
+                state = json.load(file)
+        except (OSError, ValueError):
+            continue
+        if not _alive(int(name[: -len(".json")])):
+            state["gauges"] = {}
+        states.append(state)
+    return states
+
+
+def merge_states(states: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sum the states of several processes into one"""
+    merged: Dict[str, Any] = {"stats": {}, "counters": {}, "gauges": {}}
+    for state in states:
+        for name, values in state["stats"].items():
+            stats = merged["stats"].setdefault(name, asdict(QueryStats()))
+            for key, value in values.items():
+                if key == "buckets":
+                    stats[key] = [a + b for a, b in zip(stats[key], value)]
+                elif key == "wall_ms_max":
+                    stats[key] = max(stats[key], value)
+                else:
+                    stats[key] += value
+        for kind in ("counters", "gauges"):
+            for name, value in state[kind].items():
+                merged[kind][name] = merged[kind].get(name, 0) + value
+    return merged
+
+
+def render_prometheus(state: Dict[str, Any], prefix: str = "airfacts") -> str:
+    """Render a state in the Prometheus text exposition format"""
+    items = sorted(
+        (name, QueryStats(**values)) for name, values in state["stats"].items()
+    )
+    counters = sorted(state["counters"].items())
+    gauges = sorted(state["gauges"].items())
+
+    lines = []
+
+    def metric(kind: str, metric_name: str, help_text: str) -> str:
+        full_name = f"{prefix}_{metric_name}"
+        lines.append(f"# HELP {full_name} {help_text}")
+        lines.append(f"# TYPE {full_name} {kind}")
+        return full_name
+
+    full = metric("histogram", "query_duration_seconds", "Query wall time")
+    for name, stats in items:
+        label = _label(name)
+        for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+            lines.append(f'{full}_bucket{{query="{label}",le="{bound}"}} {count}')
+        lines.append(f'{full}_bucket{{query="{label}",le="+Inf"}} {stats.calls}')
+        lines.append(f'{full}_sum{{query="{label}"}} {stats.wall_ms / 1000:.6f}')
+        lines.append(f'{full}_count{{query="{label}"}} {stats.calls}')
+
+    for metric_name, attribute, help_text in (
+        ("query_errors_total", "errors", "Queries that raised"),
+        ("query_slow_total", "slow", "Queries over the slow threshold"),
+        ("query_rows_total", "rows", "Rows returned"),
+        ("query_db_hits_total", "db_hits", "Database hits (PROFILE only)"),
+    ):
+        full = metric("counter", metric_name, help_text)
+        for name, stats in items:
+            value = getattr(stats, attribute)
+            lines.append(f'{full}{{query="{_label(name)}"}} {value}')
+
+    for metric_name, attribute, help_text in (
+        (
+            "query_result_available_after_seconds_total",
+            "available_after_ms",
+            "Server time until the first record was available",
+        ),
+        (
+            "query_result_consumed_after_seconds_total",
+            "consumed_after_ms",
+            "Server time until the result was consumed",
+        ),
+    ):
+        full = metric("counter", metric_name, help_text)
+        for name, stats in items:
+            value = getattr(stats, attribute) / 1000
+            lines.append(f'{full}{{query="{_label(name)}"}} {value:.6f}')
+
+    for counter, value in counters:
+        full = metric("counter", f"{counter}_total", counter.replace("_", " "))
+        lines.append(f"{full} {value}")
+
+    for gauge, value in gauges:
+        full = metric("gauge", gauge, gauge.replace("_", " "))
+        lines.append(f"{full} {value}")
+
+    return "\n".join(lines) + "\n"
+
+
+def _alive(pid: int) -> bool:
+    """Return True if a process with this pid is running"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def profile_query(query: str) -> str:
+    """Prefix a query with PROFILE when PROFILE_QUERIES is enabled"""
+    if PROFILE_QUERIES and not query.lstrip().upper().startswith("PROFILE"):
+        return f"PROFILE {query}"
+    return query
+
+
+def profile_db_hits(profile: Optional[Dict[str, Any]]) -> int:
+    """Sum the db hits of every operator in a PROFILE plan tree"""
+    if not profile:
+        return 0
+    hits = profile.get("dbHits", 0) or 0
+    for child in profile.get("children", []) or []:
+        hits += profile_db_hits(child)
+    return hits
+
+
+def _label(value: str) -> str:
+    """Escape a value for use as a Prometheus label"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Process-wide registry used by the API and the dashboard
+metrics = QueryMetrics()
@@ -0,0 +1,123 @@
+"""
+Content-encoding negotiation and a cache of compressed payloads.
+
+negotiate() picks the best encoding a client accepts (zstd, then brotli,
+then gzip; zstd and brotli only when their packages are installed).
+CompressedCache compresses a payload once per encoding and keeps the
+result in an LRU bounded by bytes, keyed by a digest of the payload, so a
+hot response is never compressed twice.
+"""
+
+import gzip
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, "br" is not offered without it
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional, "zstd" is not offered without it
+    zstandard = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+ZSTD_LEVEL = 3
+
+
+def _zstd(data: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+
+
+# Encodings in order of preference, each with its compressor
+CODECS: Dict[str, Callable[[bytes], bytes]] = {}
+if zstandard is not None:
+    CODECS["zstd"] = _zstd
+if brotli is not None:
+    CODECS["br"] = lambda data: brotli.compress(data, quality=BROTLI_QUALITY)
+CODECS["gzip"] = lambda data: gzip.compress(data, GZIP_LEVEL, mtime=0)
+
+
+def negotiate(accept_encoding: Optional[str], codecs=CODECS) -> Optional[str]:
+    """
+    Return the preferred encoding allowed by an Accept-Encoding header.
+
+    Returns:
+        A key of `codecs`, or None to send the payload uncompressed
+    """
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    candidates = [
+        (accepted.get(name, wildcard), -rank, name)
+        for rank, name in enumerate(codecs)
+        if accepted.get(name, wildcard) > 0
+    ]
+    return max(candidates)[2] if candidates else None
+
+
+class CompressedCache:
+    """Thread-safe LRU of compressed payloads, bounded by total bytes"""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, codecs=CODECS):
+        self.max_bytes = max_bytes
+        self.codecs = codecs
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, bytes], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def compress(self, encoding: str, payload: bytes) -> Tuple[bytes, float, bool]:
+        """
+        Return a payload compressed with `encoding`, from the cache if possible.
+
+        Returns:
+            (compressed, cpu_ms, hit): cpu_ms is the compression CPU time,
+            0.0 for a cache hit
+        """
+        key = (encoding, hashlib.blake2b(payload, digest_size=16).digest())
+        with self._lock:
+            compressed = self._entries.get(key)
+            if compressed is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compressed, 0.0, True
+            self.misses += 1
+
+        start = time.thread_time()
+        compressed = self.codecs[encoding](payload)
+        cpu_ms = (time.thread_time() - start) * 1000
+
+        if len(compressed) <= self.max_bytes:
+            with self._lock:
+                if key not in self._entries:
+                    self._entries[key] = compressed
+                    self.size += len(compressed)
+                while self.size > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self.size -= len(evicted)
+        return compressed, cpu_ms, False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
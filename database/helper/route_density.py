@@ -0,0 +1,348 @@
+"""
+Global route-density rasters.
+
+Every route is sampled along its great circle and the samples are binned
+into latitude/longitude grids at several resolutions (RESOLUTIONS, in
+degrees). A cell counts the routes that cross it: parallel routes of
+different airlines each count, a route counts once per cell however many
+of its samples fall in it, and a route and its return both count.
+
+Routes are merged per unordered airport pair, sampled and binned in one
+vectorized pass per chunk, and the chunks are spread over worker
+processes. Each grid is stored as a uint32 .npy file (row 0 is the
+northern edge, column 0 the antimeridian) and as a log-scaled RGBA PNG,
+so the API and the dashboard serve a prebuilt image instead of drawing
+tens of thousands of lines.
+"""
+
+import os
+import struct
+import time
+import zlib
+from dataclasses import dataclass, field
+from multiprocessing import Pool
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from route_graph import RouteGraph
+from staged_directory import (
+    load_cached_manifest,
+    stage_directory,
+    swap_in,
+    write_manifest,
+)
+
+ROUTE_DENSITY_DIR = os.getenv(
+    "ROUTE_DENSITY_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "route_density"),
+)
+
+# Cell sizes in degrees, coarsest first
+RESOLUTIONS = (1.0, 0.5, 0.25)
+
+MANIFEST_FILE = "manifest.json"
+
+# Airport pairs sampled per chunk, bounds the sample arrays per worker
+PAIR_CHUNK = 2000
+
+# Colour ramp of the PNG from the sparsest to the densest cell (RGB)
+RAMP = np.array(
+    [[13, 8, 135], [126, 3, 168], [204, 71, 120], [248, 149, 64], [240, 249, 33]],
+    dtype=np.float64,
+)
+
+
+def grid_file(resolution: float) -> str:
+    return f"density_{resolution:g}.npy"
+
+
+def png_file(resolution: float) -> str:
+    return f"density_{resolution:g}.png"
+
+
+@dataclass
+class RouteDensity:
+    """Memory-mapped density grids with their prerendered PNG images"""
+
+    directory: str
+    resolutions: List[float]
+    max_count: Dict[str, int]
+    num_routes: int = 0
+    built_at: Optional[str] = None
+    _png: Dict[float, bytes] = field(default_factory=dict, repr=False)
+
+    def grid(self, resolution: float) -> np.ndarray:
+        """
+        Return the (180/res, 360/res) uint32 grid of one resolution.
+
+        Raises:
+            KeyError: The resolution was not built
+        """
+        if resolution not in self.resolutions:
+            raise KeyError(resolution)
+        return np.load(
+            os.path.join(self.directory, grid_file(resolution)), mmap_mode="r"
+        )
+
+    def png(self, resolution: float) -> bytes:
+        """
+        Return the PNG image of one resolution (read once, then kept).
+
+        Raises:
+            KeyError: The resolution was not built
+        """
+        if resolution not in self.resolutions:
+            raise KeyError(resolution)
+        if resolution not in self._png:
+            with open(os.path.join(self.directory, png_file(resolution)), "rb") as f:
+                self._png[resolution] = f.read()
+        return self._png[resolution]
+
+
+def load_route_density(directory: Optional[str] = None) -> Optional[RouteDensity]:
+    """
+    Open the density rasters, or return None if they were never built.
+
+    The open rasters are cached per directory and reopened when a rebuild
+    replaces them.
+    """
+    directory = os.path.abspath(directory or ROUTE_DENSITY_DIR)
+    return load_cached_manifest(
+        directory,
+        MANIFEST_FILE,
+        lambda manifest: RouteDensity(
+            directory=directory,
+            resolutions=[float(r) for r in manifest["resolutions"]],
+            max_count=manifest["max_count"],
+            num_routes=manifest.get("num_routes", 0),
+            built_at=manifest.get("built_at"),
+        ),
+    )
+
+
+def route_pairs(graph: RouteGraph) -> Tuple[np.ndarray, ...]:
+    """
+    Merge the routes of a graph per unordered airport pair.
+
+    Returns:
+        (lat1, lon1, lat2, lon2, weight): one entry per pair with known
+        coordinates; weight is the number of routes between the two airports
+    """
+    sources = graph.sources().astype(np.int64)
+    targets = graph.indices.astype(np.int64)
+    low, high = np.minimum(sources, targets), np.maximum(sources, targets)
+    keys, weight = np.unique(low * graph.num_airports + high, return_counts=True)
+    a, b = keys // graph.num_airports, keys % graph.num_airports
+    lat1, lon1 = graph.latitude[a], graph.longitude[a]
+    lat2, lon2 = graph.latitude[b], graph.longitude[b]
+    known = (
+        np.isfinite(lat1) & np.isfinite(lon1) & np.isfinite(lat2) & np.isfinite(lon2)
+    )
+    known &= a != b
+    return (
+        lat1[known],
+        lon1[known],
+        lat2[known],
+        lon2[known],
+        weight[known].astype(np.uint32),
+    )
+
+
+def sample_arcs(lat1, lon1, lat2, lon2, step: float):
+    """
+    Sample great-circle arcs at most `step` degrees of arc apart.
+
+    Unlike distance.intermediate_points, the number of samples grows with
+    the length of each arc; all arcs are sampled in one flat array.
+
+    Returns:
+        (arc, lats, lons): the index of the arc each sample belongs to and
+        its coordinates, samples of one arc contiguous and in order
+    """
+    phi1, lam1, phi2, lam2 = (
+        np.radians(np.asarray(value, dtype=np.float64))
+        for value in (lat1, lon1, lat2, lon2)
+    )
+    a = np.stack(
+        [np.cos(phi1) * np.cos(lam1), np.cos(phi1) * np.sin(lam1), np.sin(phi1)], 1
+    )
+    b = np.stack(
+        [np.cos(phi2) * np.cos(lam2), np.cos(phi2) * np.sin(lam2), np.sin(phi2)], 1
+    )
+    angle = np.arccos(np.clip((a * b).sum(axis=1), -1.0, 1.0))
+    counts = np.maximum(2, np.ceil(np.degrees(angle) / step).astype(np.int64) + 1)
+
+    arc = np.repeat(np.arange(len(angle)), counts)
+    first = np.cumsum(counts) - counts
+    fraction = (np.arange(arc.size) - first[arc]) / (counts[arc] - 1)
+    theta = angle[arc]
+    sin_theta = np.sin(theta)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        wa = np.sin((1 - fraction) * theta) / sin_theta
+        wb = np.sin(fraction * theta) / sin_theta
+    # Identical or antipodal endpoints: interpolate linearly instead
+    degenerate = sin_theta < 1e-12
+    wa = np.where(degenerate, 1 - fraction, wa)
+    wb = np.where(degenerate, fraction, wb)
+
+    x, y, z = (wa[:, None] * a[arc] + wb[:, None] * b[arc]).T
+    return arc, np.degrees(np.arctan2(z, np.hypot(x, y))), np.degrees(np.arctan2(y, x))
+
+
+def bin_samples(
+    arc: np.ndarray,
+    lats: np.ndarray,
+    lons: np.ndarray,
+    weight: np.ndarray,
+    resolution: float,
+) -> np.ndarray:
+    """
+    Count the arcs crossing each cell of a grid.
+
+    Consecutive samples of one arc in the same cell count once, so an arc
+    adds its weight to every cell it passes through.
+    """
+    rows, cols = int(round(180 / resolution)), int(round(360 / resolution))
+    row = np.clip(((90.0 - lats) // resolution).astype(np.int64), 0, rows - 1)
+    col = np.clip(((lons + 180.0) // resolution).astype(np.int64), 0, cols - 1)
+    cell = row * cols + col
+    enters = np.ones(cell.size, dtype=bool)
+    enters[1:] = (cell[1:] != cell[:-1]) | (arc[1:] != arc[:-1])
+    counts = np.bincount(
+        cell[enters], weights=weight[arc[enters]], minlength=rows * cols
+    )
+    return counts.astype(np.uint32).reshape(rows, cols)
+
+
+def _bin_chunk(chunk) -> List[np.ndarray]:
+    """Sample one chunk of pairs and bin it at every resolution"""
+    lat1, lon1, lat2, lon2, weight, resolutions = chunk
+    # Half the finest cell, so no arc skips a cell it crosses (except
+    # narrowly clipped corners and longitude cells near the poles)
+    arc, lats, lons = sample_arcs(lat1, lon1, lat2, lon2, min(resolutions) / 2)
+    return [bin_samples(arc, lats, lons, weight, r) for r in resolutions]
+
+
+def density_grids(
+    graph: RouteGraph,
+    resolutions: Sequence[float] = RESOLUTIONS,
+    processes: int = 1,
+) -> List[np.ndarray]:
+    """Return one uint32 density grid per resolution for a route graph"""
+    lat1, lon1, lat2, lon2, weight = route_pairs(graph)
+    n_chunks = max(processes * 4, -(-lat1.size // PAIR_CHUNK), 1)
+    bounds = np.array_split(np.arange(lat1.size), n_chunks)
+    chunks = [
+        (lat1[i], lon1[i], lat2[i], lon2[i], weight[i], tuple(resolutions))
+        for i in bounds
+        if i.size
+    ]
+    grids = [
+        np.zeros((int(round(180 / r)), int(round(360 / r))), dtype=np.uint32)
+        for r in resolutions
+    ]
+    if processes > 1 and len(chunks) > 1:
+        with Pool(processes) as pool:
+            results = pool.imap_unordered(_bin_chunk, chunks)
+            for partial in results:
+                for grid, part in zip(grids, partial):
+                    grid += part
+    else:
+        for chunk in chunks:
+            for grid, part in zip(grids, _bin_chunk(chunk)):
+                grid += part
+    return grids
+
+
+def render_png(grid: np.ndarray) -> bytes:
+    """
+    Render a density grid as an RGBA PNG on a log colour scale.
+
+    Empty cells are transparent, so the image can be laid over a map.
+    """
+    counts = np.asarray(grid, dtype=np.float64)
+    top = counts.max()
+    level = np.log1p(counts) / np.log1p(top) if top > 0 else counts
+    position = level * (len(RAMP) - 1)
+    lower = np.minimum(position.astype(np.int64), len(RAMP) - 2)
+    mix = (position - lower)[..., None]
+    rgb = RAMP[lower] * (1 - mix) + RAMP[lower + 1] * mix
+    alpha = np.where(counts > 0, 96 + 159 * level, 0)
+    rgba = np.concatenate([rgb, alpha[..., None]], axis=-1)
+    return encode_png(np.rint(rgba).astype(np.uint8))
+
+
+def encode_png(rgba: np.ndarray) -> bytes:
+    """Encode an (h, w, 4) uint8 array as a PNG (no image library needed)"""
+    height, width, _ = rgba.shape
+    # Filter type 0 (none) in front of every scanline
+    scanlines = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    scanlines[:, 1:] = rgba.reshape(height, width * 4)
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(data))
+            + kind
+            + data
+            + struct.pack(">I", zlib.crc32(kind + data))
+        )
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(scanlines.tobytes(), 9))
+        + chunk(b"IEND", b"")
+    )
+
+
+def build_route_density(
+    graph: RouteGraph,
+    directory: Optional[str] = None,
+    resolutions: Sequence[float] = RESOLUTIONS,
+    processes: int = 1,
+) -> Dict[str, Any]:
+    """
+    Build the density grids and images for a route graph.
+
+    The new rasters are written next to the old ones and swapped in when
+    complete.
+
+    Args:
+        graph: Route graph to rasterize
+        directory: Output directory (default: ROUTE_DENSITY_DIR)
+        resolutions: Cell sizes in degrees
+        processes: Worker processes to spread airport pairs over
+
+    Returns:
+        Build statistics: routes, resolutions, seconds
+    """
+    start = time.perf_counter()
+    directory = os.path.abspath(directory or ROUTE_DENSITY_DIR)
+    grids = density_grids(graph, resolutions, processes)
+
+    staging = stage_directory(directory)
+    for resolution, grid in zip(resolutions, grids):
+        np.save(os.path.join(staging, grid_file(resolution)), grid)
+        with open(os.path.join(staging, png_file(resolution)), "wb") as file:
+            file.write(render_png(grid))
+
+    write_manifest(
+        staging,
+        MANIFEST_FILE,
+        {
+            "resolutions": list(resolutions),
+            "max_count": {
+                f"{r:g}": int(grid.max()) for r, grid in zip(resolutions, grids)
+            },
+            "num_routes": graph.num_routes,
+        },
+    )
+    swap_in(staging, directory)
+
+    return {
+        "routes": graph.num_routes,
+        "resolutions": len(resolutions),
+        "seconds": round(time.perf_counter() - start, 2),
+    }
@@ -0,0 +1,152 @@
+"""
+Great-circle route geometry as GeoJSON, cached per airport pair.
+
+GeometryCache.paths() returns the great-circle polyline of every route,
+split at the antimeridian, as GeoJSON [longitude, latitude] coordinates.
+Polylines are cached per unordered airport pair and point density, so a
+route and its return share one entry, and only the pairs not yet cached
+are computed, in one vectorized call (see distance.intermediate_points).
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from distance import intermediate_points, split_antimeridian
+
+# Polylines kept per process (one per airport pair and point density)
+GEOMETRY_CACHE_SIZE = int(os.getenv("GEOMETRY_CACHE_SIZE", "50000"))
+
+# Coordinates are rounded to 5 decimals (about 1 m)
+PRECISION = 5
+
+# One polyline: a list of parts, each a list of [lon, lat]
+Path = List[List[List[float]]]
+
+# (source IATA, source lat, source lon, destination IATA, dest lat, dest lon)
+Pair = Tuple[str, float, float, str, float, float]
+
+
+class GeometryCache:
+    """Thread-safe LRU of great-circle polylines per airport pair"""
+
+    def __init__(self, max_entries: int = GEOMETRY_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[tuple, Path]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def paths(self, pairs: Sequence[Pair], points: int = 32) -> List[Path]:
+        """
+        Return the polyline of every pair, computing the missing ones at once.
+
+        Args:
+            pairs: Routes as (source, lat, lon, destination, lat, lon)
+            points: Points per arc, endpoints included
+
+        Returns:
+            One Path per pair, from source to destination
+        """
+        keys = [_key(pair, points) for pair in pairs]
+        found: Dict[tuple, Path] = {}
+        with self._lock:
+            for key in keys:
+                path = self._entries.get(key)
+                if path is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = path
+            self.hits += len(keys) - sum(key not in found for key in keys)
+
+        missing = list(dict.fromkeys(key for key in keys if key not in found))
+        if missing:
+            lats, lons = intermediate_points(
+                [key[2] for key in missing],
+                [key[3] for key in missing],
+                [key[4] for key in missing],
+                [key[5] for key in missing],
+                points,
+            )
+            with self._lock:
+                self.misses += len(missing)
+                for key, line_lats, line_lons in zip(missing, lats, lons):
+                    path = [
+                        _coordinates(part_lats, part_lons)
+                        for part_lats, part_lons in split_antimeridian(
+                            line_lats, line_lons
+                        )
+                    ]
+                    found[key] = path
+                    self._entries[key] = path
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        return [
+            found[key] if _forward(pair) else _reverse(found[key])
+            for key, pair in zip(keys, pairs)
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def line_geometry(path: Path) -> Dict[str, Any]:
+    """Return a GeoJSON LineString, or a MultiLineString for a split path"""
+    if len(path) == 1:
+        return {"type": "LineString", "coordinates": path[0]}
+    return {"type": "MultiLineString", "coordinates": path}
+
+
+def feature_collection(
+    features: Sequence[Tuple[Path, Dict[str, Any]]],
+) -> Dict[str, Any]:
+    """Build a GeoJSON FeatureCollection from (path, properties) pairs"""
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "geometry": line_geometry(path), "properties": props}
+            for path, props in features
+        ],
+    }
+
+
+def plotly_path(path: Path) -> Tuple[List[Optional[float]], List[Optional[float]]]:
+    """Return (lats, lons) for a plotly line trace, None between the parts"""
+    lats: List[Optional[float]] = []
+    lons: List[Optional[float]] = []
+    for part in path:
+        if lats:
+            lats.append(None)
+            lons.append(None)
+        lons.extend(lon for lon, _ in part)
+        lats.extend(lat for _, lat in part)
+    return lats, lons
+
+
+def _forward(pair: Pair) -> bool:
+    return pair[0] <= pair[3]
+
+
+def _key(pair: Pair, points: int) -> tuple:
+    """Key of the unordered pair: the cached path runs from the lower IATA"""
+    source, lat1, lon1, destination, lat2, lon2 = pair
+    if _forward(pair):
+        return (source, destination, lat1, lon1, lat2, lon2, points)
+    return (destination, source, lat2, lon2, lat1, lon1, points)
+
+
+def _coordinates(lats, lons) -> List[List[float]]:
+    return [
+        [round(float(lon), PRECISION), round(float(lat), PRECISION)]
+        for lat, lon in zip(lats, lons)
+    ]
+
+
+def _reverse(path: Path) -> Path:
+    return [part[::-1] for part in reversed(path)]
+
+
+# Process-wide cache used by the API and the dashboard
+geometry_cache = GeometryCache()
@@ -0,0 +1,292 @@
+"""
+In-memory route graph in compressed sparse row (CSR) form.
+
+Airports are numbered 0..n-1 and the ROUTE relationships of each airport
+are stored contiguously, so the outgoing routes of airport i are
+indices[indptr[i]:indptr[i + 1]]. Per-route attributes (distance, airline,
+stops, operated) are parallel arrays in the same order. Batch jobs and the API use this
+instead of expanding variable-length patterns in Cypher.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+AIRPORTS_QUERY = """
+MATCH (a:Airport)
+WHERE a.IATA IS NOT NULL
+RETURN a.IATA AS iata, a.Latitude AS latitude, a.Longitude AS longitude
+ORDER BY iata
+"""
+
+ROUTES_QUERY = """
+MATCH (source:Airport)-[r:ROUTE]->(dest:Airport)
+RETURN source.IATA AS source, dest.IATA AS destination,
+       r.Airline AS airline, r.Distance AS distance, r.Stops AS stops,
+       r.Operated AS operated
+"""
+
+
+@dataclass
+class RouteGraph:
+    """Airports plus their ROUTE relationships as CSR arrays"""
+
+    iata: np.ndarray  # (n,) airport IATA codes, sorted
+    latitude: np.ndarray  # (n,) float64, NaN if unknown
+    longitude: np.ndarray  # (n,) float64, NaN if unknown
+    indptr: np.ndarray  # (n + 1,) int64 offsets into the route arrays
+    indices: np.ndarray  # (m,) int32 destination airport of each route
+    distance: np.ndarray  # (m,) float32 route distance in km, NaN if unknown
+    airline: np.ndarray  # (m,) int32 index into airline_codes, -1 if unknown
+    stops: np.ndarray  # (m,) int8 number of stops
+    airline_codes: np.ndarray  # (k,) airline IATA codes
+    index: Dict[str, int] = field(default_factory=dict)
+    operated: Optional[np.ndarray] = None  # (m,) bool, False for a codeshare
+
+    def __post_init__(self):
+        if not self.index:
+            self.index = {code: i for i, code in enumerate(self.iata.tolist())}
+        if self.operated is None:
+            self.operated = np.ones(len(self.indices), dtype=bool)
+
+    @property
+    def num_airports(self) -> int:
+        return len(self.iata)
+
+    @property
+    def num_routes(self) -> int:
+        return len(self.indices)
+
+    def sources(self) -> np.ndarray:
+        """Return the source airport of every route (the CSR row of each entry)"""
+        return np.repeat(
+            np.arange(self.num_airports, dtype=np.int32), np.diff(self.indptr)
+        )
+
+    def adjacency(self, weighted: bool = False):
+        """
+        Return the airport-to-airport adjacency as a scipy.sparse CSR matrix.
+
+        Parallel routes (same airport pair, different airlines) are merged.
+        With weighted=True each entry is the number of parallel routes,
+        otherwise every entry is 1.
+        """
+        from scipy import sparse
+
+        n = self.num_airports
+        # Copy the CSR arrays, sum_duplicates() rewrites them in place
+        matrix = sparse.csr_matrix(
+            (
+                np.ones(self.num_routes, dtype=np.float64),
+                self.indices.copy(),
+                self.indptr.copy(),
+            ),
+            shape=(n, n),
+        )
+        matrix.sum_duplicates()
+        if not weighted:
+            matrix.data[:] = 1.0
+        return matrix
+
+    @classmethod
+    def from_rows(
+        cls, airports: Iterable[Dict[str, Any]], routes: Iterable[Dict[str, Any]]
+    ) -> "RouteGraph":
+        """
+        Build a graph from airport and route rows.
+
+        Args:
+            airports: Rows with iata, latitude and longitude
+            routes: Rows with source, destination, airline, distance, stops
+                and operated (False for a codeshare route, missing counts as
+                operated). Routes whose endpoints are not in `airports` are
+                skipped.
+        """
+        airport_rows = sorted(
+            (row for row in airports if row.get("iata")), key=lambda row: row["iata"]
+        )
+        iata = np.array([row["iata"] for row in airport_rows], dtype=object)
+        index = {code: i for i, code in enumerate(iata.tolist())}
+        latitude = _float_array(row.get("latitude") for row in airport_rows)
+        longitude = _float_array(row.get("longitude") for row in airport_rows)
+
+        src: List[int] = []
+        dst: List[int] = []
+        distance: List[Optional[float]] = []
+        airline: List[Optional[str]] = []
+        stops: List[int] = []
+        operated: List[bool] = []
+        for row in routes:
+            s = index.get(row.get("source"))
+            d = index.get(row.get("destination"))
+            if s is None or d is None:
+                continue
+            src.append(s)
+            dst.append(d)
+            distance.append(row.get("distance"))
+            airline.append(row.get("airline"))
+            stops.append(row.get("stops") or 0)
+            operated.append(row.get("operated") is not False)
+
+        airline_codes, airline_index = _encode(airline)
+        return cls.from_edges(
+            iata,
+            latitude,
+            longitude,
+            np.array(src, dtype=np.int64),
+            np.array(dst, dtype=np.int64),
+            _float_array(distance).astype(np.float32),
+            airline_index,
+            np.array(stops, dtype=np.int8),
+            airline_codes,
+            index=index,
+            operated=np.array(operated, dtype=bool),
+        )
+
+    @classmethod
+    def from_edges(
+        cls,
+        iata: np.ndarray,
+        latitude: np.ndarray,
+        longitude: np.ndarray,
+        src: np.ndarray,
+        dst: np.ndarray,
+        distance: np.ndarray,
+        airline: np.ndarray,
+        stops: np.ndarray,
+        airline_codes: np.ndarray,
+        index: Optional[Dict[str, int]] = None,
+        operated: Optional[np.ndarray] = None,
+    ) -> "RouteGraph":
+        """Build a graph from parallel edge arrays in any order"""
+        order = np.lexsort((dst, src))
+        counts = np.bincount(src, minlength=len(iata))
+        indptr = np.zeros(len(iata) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        return cls(
+            iata=iata,
+            latitude=latitude,
+            longitude=longitude,
+            indptr=indptr,
+            indices=dst[order].astype(np.int32),
+            distance=distance[order].astype(np.float32),
+            airline=airline[order].astype(np.int32),
+            stops=stops[order].astype(np.int8),
+            airline_codes=airline_codes,
+            index=index or {},
+            operated=None if operated is None else operated[order].astype(bool),
+        )
+
+
+def fetch_route_graph(driver, database: Optional[str] = None) -> RouteGraph:
+    """Read every airport and ROUTE relationship from Neo4j into a RouteGraph"""
+    with driver.session(database=database) as session:
+        airports = session.run(AIRPORTS_QUERY).data()
+        routes = session.run(ROUTES_QUERY).data()
+    return RouteGraph.from_rows(airports, routes)
+
+
+def expand_frontier(
+    indptr: np.ndarray, indices: np.ndarray, frontier: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Gather all routes leaving a set of airports in one vectorized step.
+
+    Args:
+        indptr: CSR offsets
+        indices: CSR destinations
+        frontier: Airport indices to expand
+
+    Returns:
+        (sources, destinations, positions): parallel arrays with one entry per
+        route; positions index into the per-route attribute arrays
+    """
+    starts = indptr[frontier]
+    counts = indptr[frontier + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty
+    sources = np.repeat(frontier, counts)
+    positions = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(
+        total
+    )
+    return sources, indices[positions], positions
+
+
+def reachable(
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    distance: np.ndarray,
+    source: int,
+    max_legs: int,
+    max_distance: Optional[float] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find every airport reachable from `source` within a leg and distance budget.
+
+    Runs a level-synchronous BFS: each level expands the whole frontier with
+    expand_frontier() and relaxes distances against the previous level, so
+    after level k `dist` holds the shortest distance over paths of at most k
+    legs. Frontiers and visited sets are boolean masks over all airports.
+
+    Args:
+        indptr: CSR offsets
+        indices: CSR destinations
+        distance: Per-route distance in km, NaN if unknown
+        source: Index of the starting airport
+        max_legs: Maximum number of legs (flights)
+        max_distance: Maximum total distance in km (None = unlimited). Routes
+            with an unknown distance are not used when a budget is set.
+
+    Returns:
+        (legs, dist): minimal number of legs (-1 if unreachable) and minimal
+        distance within max_legs legs (inf if unknown) for every airport
+    """
+    n = len(indptr) - 1
+    weights = np.where(np.isnan(distance), np.inf, distance).astype(np.float64)
+    legs = np.full(n, -1, dtype=np.int16)
+    dist = np.full(n, np.inf)
+    legs[source] = 0
+    dist[source] = 0.0
+
+    frontier = np.array([source], dtype=np.int64)
+    for level in range(1, max_legs + 1):
+        if frontier.size == 0:
+            break
+        src, dst, positions = expand_frontier(indptr, indices, frontier)
+        candidate = dist[src] + weights[positions]
+        if max_distance is not None:
+            within = candidate <= max_distance
+            dst, candidate = dst[within], candidate[within]
+
+        reached = np.zeros(n, dtype=bool)
+        reached[dst] = True
+        new = reached & (legs == -1)
+        legs[new] = level
+
+        best = np.full(n, np.inf)
+        np.minimum.at(best, dst, candidate)
+        improved = best < dist
+        dist[improved] = best[improved]
+
+        # Only airports that are new or got closer can improve their neighbours
+        frontier = np.flatnonzero(new | improved)
+
+    return legs, dist
+
+
+def _float_array(values: Iterable[Any]) -> np.ndarray:
+    return np.array(
+        [np.nan if value is None else float(value) for value in values],
+        dtype=np.float64,
+    )
+
+
+def _encode(values: List[Optional[str]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Dictionary-encode strings; None becomes -1"""
+    codes = sorted({value for value in values if value is not None})
+    lookup = {code: i for i, code in enumerate(codes)}
+    encoded = np.array([lookup.get(value, -1) for value in values], dtype=np.int32)
+    return np.array(codes, dtype=object), encoded
@@ -0,0 +1,227 @@
+"""
+Query planner for composite route searches with cursor pagination.
+
+plan_route_search() turns a set of filters into one Cypher statement. The
+planner anchors the MATCH on the most selective index-backed predicate
+(airport IATA, then airport country; without either, the planner may seek
+the ROUTE.Airline or ROUTE.Distance index), evaluates the remaining predicates
+cheapest first (equality, then ranges, then substring matches) and orders
+server-side by a single sort field. Pages are fetched with keyset
+pagination: the cursor holds the sort value and element id of the last row,
+so every page costs the same no matter how deep it is.
+"""
+
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+# Filters the planner understands
+FILTERS = (
+    "source",
+    "destination",
+    "source_country",
+    "destination_country",
+    "airline",
+    "min_distance",
+    "max_distance",
+    "stops",
+    "equipment",
+    "codeshare",
+)
+
+# Index-backed node predicates, most selective first:
+# (filter, node variable, indexed property)
+INDEXED_ANCHORS = (
+    ("source", "a", "IATA"),
+    ("destination", "b", "IATA"),
+    ("source_country", "a", "Country"),
+    ("destination_country", "b", "Country"),
+)
+
+# Residual predicates in evaluation order: (filter, Cypher condition)
+RESIDUAL_PREDICATES = (
+    ("source", "a.IATA = $source"),
+    ("destination", "b.IATA = $destination"),
+    ("source_country", "a.Country = $source_country"),
+    ("destination_country", "b.Country = $destination_country"),
+    ("airline", "r.Airline = $airline"),
+    ("stops", "r.Stops = $stops"),
+    ("min_distance", "r.Distance >= $min_distance"),
+    ("max_distance", "r.Distance <= $max_distance"),
+    ("equipment", "r.EquipmentKey CONTAINS $equipment"),
+)
+
+# Sortable fields and the (null-safe) expression each sorts by
+SORT_FIELDS = {
+    "distance": "coalesce(r.Distance, -1.0)",
+    "stops": "coalesce(r.Stops, 0)",
+    "airline": "coalesce(r.Airline, '')",
+    "source": "a.IATA",
+    "destination": "b.IATA",
+}
+
+MAX_LIMIT = 1000
+
+
+def plan_route_search(
+    filters: Dict[str, Any],
+    sort: str = "distance",
+    limit: int = 50,
+    cursor: Optional[str] = None,
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Plan a route search.
+
+    Args:
+        filters: Any of FILTERS; None values are ignored
+        sort: A key of SORT_FIELDS, prefixed with '-' for descending order
+        limit: Page size (one extra row is fetched to detect a next page)
+        cursor: Cursor returned with the previous page
+
+    Returns:
+        (query, parameters)
+
+    Raises:
+        ValueError: Unknown filter or sort field, or an invalid cursor
+    """
+    params = normalize_filters(filters)
+    field, descending = parse_sort(sort)
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+
+    anchor = next(
+        (
+            (name, variable, prop)
+            for name, variable, prop in INDEXED_ANCHORS
+            if name in params
+        ),
+        None,
+    )
+    source_pattern, dest_pattern = "(a:Airport)", "(b:Airport)"
+    if anchor is not None:
+        name, variable, prop = anchor
+        pattern = f"({variable}:Airport {{{prop}: ${name}}})"
+        if variable == "a":
+            source_pattern = pattern
+        else:
+            dest_pattern = pattern
+
+    conditions = [
+        condition
+        for name, condition in RESIDUAL_PREDICATES
+        if name in params and (anchor is None or name != anchor[0])
+    ]
+    if "codeshare" in params:
+        conditions.append(
+            "r.Codeshare = 'Y'"
+            if params.pop("codeshare")
+            else "coalesce(r.Codeshare, '') <> 'Y'"
+        )
+
+    sort_key = SORT_FIELDS[field]
+    direction = "DESC" if descending else "ASC"
+    after = ""
+    if cursor:
+        value, route_id = decode_cursor(cursor, sort)
+        comparison = "<" if descending else ">"
+        after = (
+            f"WHERE sort_value {comparison} $after_value OR "
+            f"(sort_value = $after_value AND route_id {comparison} $after_id)\n"
+        )
+        params["after_value"] = value
+        params["after_id"] = route_id
+
+    where = "WHERE " + "\n  AND ".join(conditions) + "\n" if conditions else ""
+    query = (
+        f"MATCH {source_pattern}-[r:ROUTE]->{dest_pattern}\n"
+        f"{where}"
+        f"WITH a, r, b, {sort_key} AS sort_value, elementId(r) AS route_id\n"
+        f"{after}"
+        "RETURN a.IATA AS source, b.IATA AS destination, r.Airline AS airline,\n"
+        "       r.Distance AS distance, r.Stops AS stops,\n"
+        "       r.Equipment AS equipment, r.Codeshare AS codeshare,\n"
+        "       r.OperatedBy AS operated_by,\n"
+        "       a.Country AS source_country, b.Country AS destination_country,\n"
+        "       sort_value, route_id\n"
+        f"ORDER BY sort_value {direction}, route_id {direction}\n"
+        "LIMIT $limit"
+    )
+    params["limit"] = limit + 1
+    return query, params
+
+
+def normalize_filters(filters: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate filters, drop unset ones and normalize codes to query parameters"""
+    unknown = set(filters) - set(FILTERS)
+    if unknown:
+        raise ValueError(f"Unknown route filter(s): {', '.join(sorted(unknown))}")
+
+    params = {name: value for name, value in filters.items() if value is not None}
+    for name in ("source", "destination", "airline"):
+        if name in params:
+            params[name] = str(params[name]).strip().upper()
+    if "equipment" in params:
+        # Match whole aircraft codes in the space-separated Equipment list
+        params["equipment"] = f" {str(params['equipment']).strip().upper()} "
+    if "stops" in params:
+        params["stops"] = int(params["stops"])
+    for name in ("min_distance", "max_distance"):
+        if name in params:
+            params[name] = float(params[name])
+    if "codeshare" in params:
+        params["codeshare"] = bool(params["codeshare"])
+    return params
+
+
+def parse_sort(sort: str) -> Tuple[str, bool]:
+    """Split a sort spec like '-distance' into (field, descending)"""
+    descending = sort.startswith("-")
+    field = sort.lstrip("-")
+    if field not in SORT_FIELDS:
+        raise ValueError(
+            f"Invalid sort field '{field}'. Use one of {', '.join(SORT_FIELDS)}"
+        )
+    return field, descending
+
+
+def encode_cursor(sort: str, value: Any, route_id: str) -> str:
+    """Encode the position after a row as an opaque cursor"""
+    payload = json.dumps({"s": sort, "v": value, "id": route_id})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, str]:
+    """Decode a cursor into (sort value, route id) for the given sort"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        value, route_id, cursor_sort = payload["v"], payload["id"], payload["s"]
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if cursor_sort != sort:
+        raise ValueError("Cursor was issued for a different sort order")
+    return value, route_id
+
+
+def paginate(
+    rows: List[Dict[str, Any]], limit: int, sort: str
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Split the rows of a planned query into a page and the next cursor.
+
+    Returns:
+        (routes, next_cursor): next_cursor is None on the last page
+    """
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit and page:
+        last = page[-1]
+        next_cursor = encode_cursor(sort, last["sort_value"], last["route_id"])
+    routes = [
+        {
+            key: value
+            for key, value in row.items()
+            if key not in ("sort_value", "route_id")
+        }
+        for row in page
+    ]
+    return routes, next_cursor
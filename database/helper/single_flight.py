@@ -0,0 +1,106 @@
+"""
+Single-flight coalescing of identical concurrent calls.
+
+When many requests ask for the same thing at once, only the first one (the
+leader) runs the call; the others wait for it and receive the same result,
+or the same exception. Nothing is cached: once the call has finished, the
+next identical call runs again. do() serves threads (sync FastAPI handlers
+run in a thread pool), do_async() serves coroutines; async callers of one
+event loop wait on a shared future instead of each holding a thread.
+"""
+
+import asyncio
+import json
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    """An in-flight call and its outcome"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Run at most one call per key at a time and share its outcome"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._futures: Dict[Hashable, asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn(), or wait for the identical call already in flight.
+
+        Args:
+            key: Identity of the call, see flight_key()
+            fn: Call to run if no call with this key is in flight
+
+        Returns:
+            (result, shared): shared is True if the result came from
+            another caller's call. Shared results are the same object, so
+            callers must not mutate them.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Async variant of do(): fn is a blocking callable run in the loop's
+        default executor. Coroutines share one future per key and loop, and
+        the executor thread goes through do(), so async and sync callers of
+        the same key also share one call.
+        """
+        loop = asyncio.get_running_loop()
+        future = self._futures.get(key)
+        if future is not None and future.get_loop() is loop:
+            result, _ = await asyncio.shield(future)
+            return result, True
+
+        future = loop.run_in_executor(None, self.do, key, fn)
+        self._futures[key] = future
+        try:
+            # Shielded so a cancelled leader does not cancel its followers
+            return await asyncio.shield(future)
+        finally:
+            if self._futures.get(key) is future:
+                del self._futures[key]
+
+    def in_flight(self) -> int:
+        """Return the number of calls currently running"""
+        with self._lock:
+            return len(self._calls)
+
+
+def flight_key(*parts: Hashable, params: Dict[str, Any] = None) -> Tuple:
+    """
+    Build a key from fixed parts and a parameter dict.
+
+    Parameters are normalized so that the same values in a different order
+    (or as equal lists) give the same key.
+    """
+    return (*parts, json.dumps(params or {}, sort_keys=True, default=str))
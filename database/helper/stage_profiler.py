@@ -0,0 +1,168 @@
+"""
+Per-stage timing and resource profiling for batch jobs such as the loader.
+
+Each stage records wall time, CPU time, rows processed (and so rows/sec),
+peak RSS, retries and failed batches. Stages can be nested; the report
+indents children under their parent. Optionally every stage is also run
+under cProfile or pyinstrument and the profile is dumped to a directory.
+"""
+
+import cProfile
+import json
+import os
+import re
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows, peak RSS is reported as None
+    resource = None
+
+
+@dataclass
+class StageRecord:
+    """Measurements for one profiled stage"""
+
+    name: str
+    depth: int = 0
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    rows: int = 0
+    retries: int = 0
+    failed_batches: int = 0
+    peak_rss_mb: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def rows_per_s(self) -> float:
+        return self.rows / self.wall_s if self.wall_s else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["rows_per_s"] = round(self.rows_per_s, 2)
+        return data
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Return the peak resident set size of this process so far, in MB"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+class StageProfiler:
+    """Collects StageRecords for a sequence of (possibly nested) stages"""
+
+    def __init__(self, profile_dir: Optional[str] = None, profiler: str = "cprofile"):
+        """
+        Args:
+            profile_dir: Directory to dump one profile per stage to (None disables)
+            profiler: 'cprofile' or 'pyinstrument' (falls back to cProfile if
+                pyinstrument is not installed)
+        """
+        self.profile_dir = profile_dir
+        self.profiler = profiler
+        self.stages: List[StageRecord] = []
+        self._depth = 0
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageRecord]:
+        """
+        Profile the enclosed block as one stage.
+
+        The yielded record can be updated with rows, retries and
+        failed_batches while the stage runs.
+        """
+        record = StageRecord(name=name, depth=self._depth)
+        self.stages.append(record)
+        index = len(self.stages)
+        self._depth += 1
+
+        # Profilers cannot be nested, so only top-level stages are sampled
+        sampler = self._start_sampler() if record.depth == 0 else None
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record
+        except BaseException as exc:
+            record.error = f"{type(exc).__name__}: {exc}"[:200]
+            raise
+        finally:
+            record.wall_s = time.perf_counter() - wall_start
+            record.cpu_s = time.process_time() - cpu_start
+            record.peak_rss_mb = peak_rss_mb()
+            self._depth -= 1
+            self._stop_sampler(sampler, index, name)
+
+    def _start_sampler(self) -> Any:
+        if not self.profile_dir:
+            return None
+        if self.profiler == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                pass
+            else:
+                sampler = Profiler()
+                sampler.start()
+                return sampler
+        sampler = cProfile.Profile()
+        sampler.enable()
+        return sampler
+
+    def _stop_sampler(self, sampler: Any, index: int, name: str) -> None:
+        if sampler is None:
+            return
+        os.makedirs(self.profile_dir, exist_ok=True)
+        filename = f"{index:02d}-{re.sub(r'[^A-Za-z0-9]+', '_', name).strip('_')}"
+        if isinstance(sampler, cProfile.Profile):
+            sampler.disable()
+            sampler.dump_stats(os.path.join(self.profile_dir, f"{filename}.prof"))
+        else:
+            sampler.stop()
+            with open(os.path.join(self.profile_dir, f"{filename}.html"), "w") as file:
+                file.write(sampler.output_html())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the full report as a JSON-serializable dictionary"""
+        return {
+            "total_wall_s": round(time.perf_counter() - self._started, 4),
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": [stage.as_dict() for stage in self.stages],
+        }
+
+    def write_json(self, path: str) -> None:
+        """Write the report as JSON"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as file:
+            json.dump(self.to_dict(), file, indent=2)
+            file.write("\n")
+
+    def report(self) -> str:
+        """Return the report as a human-readable table"""
+        header = (
+            f"{'Stage':<38} {'Wall (s)':>9} {'CPU (s)':>9} {'Rows':>10} "
+            f"{'Rows/s':>10} {'Peak MB':>8} {'Retries':>7} {'Failed':>6}"
+        )
+        lines = [header, "-" * len(header)]
+        for stage in self.stages:
+            name = ("  " * stage.depth + stage.name)[:38]
+            peak = f"{stage.peak_rss_mb:.0f}" if stage.peak_rss_mb is not None else "-"
+            lines.append(
+                f"{name:<38} {stage.wall_s:>9.2f} {stage.cpu_s:>9.2f} "
+                f"{stage.rows:>10,} {stage.rows_per_s:>10,.0f} {peak:>8} "
+                f"{stage.retries:>7} {stage.failed_batches:>6}"
+            )
+        lines.append("-" * len(header))
+        lines.append(f"Total wall time: {self.to_dict()['total_wall_s']:.2f}s")
+        return "\n".join(lines)
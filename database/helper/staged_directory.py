@@ -0,0 +1,90 @@
+"""
+Precomputed outputs that are rebuilt as a whole directory.
+
+The stops matrix, the route-density rasters and the competition matrix each
+live in one directory of .npy/.png files described by a JSON manifest. A
+build writes into a staging directory next to the live one and swaps it in
+when complete, so readers never see a half-written build; readers open the
+files memory-mapped and cache the opened object until the manifest changes.
+"""
+
+import json
+import os
+import shutil
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Opened builds per manifest path, with the manifest's mtime
+_cache: Dict[str, Tuple[float, Any]] = {}
+
+
+def load_cached_manifest(
+    directory: str, manifest_file: str, factory: Callable[[Dict[str, Any]], T]
+) -> Optional[T]:
+    """
+    Return factory(manifest) for a built directory, or None if it was never
+    built.
+
+    The result is cached per directory and rebuilt from the manifest when a
+    rebuild replaces it.
+    """
+    manifest_path = os.path.join(directory, manifest_file)
+    try:
+        mtime = os.path.getmtime(manifest_path)
+    except OSError:
+        cached = _cache.get(manifest_path)
+        # Keep serving the previous build while a rebuild swaps directories
+        return cached[1] if cached else None
+
+    cached = _cache.get(manifest_path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with open(manifest_path) as file:
+        value = factory(json.load(file))
+    _cache[manifest_path] = (mtime, value)
+    return value
+
+
+def read_manifest(directory: str, manifest_file: str) -> Optional[Dict[str, Any]]:
+    """Return the manifest of a built directory, or None if there is none"""
+    try:
+        with open(os.path.join(directory, manifest_file)) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def stage_directory(directory: str) -> str:
+    """Create an empty staging directory for a rebuild of `directory`"""
+    staging = f"{directory}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    return staging
+
+
+def write_manifest(staging: str, manifest_file: str, manifest: Dict[str, Any]):
+    """Write the manifest of a staged build, stamped with its build time"""
+    with open(os.path.join(staging, manifest_file), "w") as file:
+        json.dump(
+            {
+                **manifest,
+                "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            },
+            file,
+        )
+
+
+def swap_in(staging: str, directory: str) -> None:
+    """
+    Replace `directory` with a finished staging directory; open memory maps
+    of the old files stay valid
+    """
+    retired = f"{directory}.old"
+    shutil.rmtree(retired, ignore_errors=True)
+    if os.path.exists(directory):
+        os.rename(directory, retired)
+    os.rename(staging, directory)
+    shutil.rmtree(retired, ignore_errors=True)
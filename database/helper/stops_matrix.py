@@ -0,0 +1,304 @@
+"""
+All-pairs minimal-stops and minimal-distance matrix.
+
+For every pair of airports the matrix stores the minimal number of legs
+(uint8, UNREACHABLE if there is no path) and the minimal total distance in km
+(float32, inf if unknown). Both are .npy files that are opened memory-mapped,
+so lookups touch only the pages they need and several processes share one
+copy through the page cache. airports.json maps IATA codes to row/column
+indices and stores a fingerprint of each airport's routes, which lets a
+rebuild recompute only the rows a change can affect.
+"""
+
+import hashlib
+import os
+import time
+from dataclasses import dataclass, field
+from multiprocessing import Pool
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+
+from route_graph import RouteGraph, expand_frontier
+from staged_directory import (
+    load_cached_manifest,
+    read_manifest,
+    stage_directory,
+    swap_in,
+    write_manifest,
+)
+
+UNREACHABLE = 255
+
+STOPS_MATRIX_DIR = os.getenv(
+    "STOPS_MATRIX_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "stops_matrix"),
+)
+
+LEGS_FILE = "legs.npy"
+DISTANCE_FILE = "distance.npy"
+MANIFEST_FILE = "airports.json"
+
+# Rows computed per csgraph call, bounds the float64 scratch matrix per worker
+ROW_CHUNK = 256
+
+
+@dataclass
+class StopsMatrix:
+    """A memory-mapped stops matrix with its IATA index"""
+
+    iata: List[str]
+    legs: np.ndarray  # (n, n) uint8, UNREACHABLE if there is no path
+    distance: np.ndarray  # (n, n) float32 km, inf if unknown
+    built_at: Optional[str] = None
+    index: Dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if not self.index:
+            self.index = {code: i for i, code in enumerate(self.iata)}
+
+    def lookup(
+        self, sources: Iterable[str], destinations: Iterable[str]
+    ) -> Tuple[List[Optional[int]], List[Optional[float]]]:
+        """
+        Look up a batch of airport pairs.
+
+        Returns:
+            (legs, distance): one entry per pair, None if either airport is
+            unknown or there is no path (distance is also None if unknown)
+        """
+        src = np.array([self.index.get(code, -1) for code in sources], dtype=np.int64)
+        dst = np.array(
+            [self.index.get(code, -1) for code in destinations], dtype=np.int64
+        )
+        known = (src >= 0) & (dst >= 0)
+        legs = np.full(len(src), UNREACHABLE, dtype=np.uint8)
+        dist = np.full(len(src), np.inf, dtype=np.float32)
+        legs[known] = self.legs[src[known], dst[known]]
+        dist[known] = self.distance[src[known], dst[known]]
+        return (
+            [None if value == UNREACHABLE else int(value) for value in legs],
+            [float(value) if np.isfinite(value) else None for value in dist],
+        )
+
+
+def load_stops_matrix(directory: Optional[str] = None) -> Optional[StopsMatrix]:
+    """
+    Open the stops matrix memory-mapped, or return None if it was never built.
+
+    The open matrix is cached per directory and reopened when a rebuild
+    replaces it.
+    """
+    directory = os.path.abspath(directory or STOPS_MATRIX_DIR)
+    return load_cached_manifest(
+        directory,
+        MANIFEST_FILE,
+        lambda manifest: StopsMatrix(
+            iata=manifest["iata"],
+            legs=np.load(os.path.join(directory, LEGS_FILE), mmap_mode="r"),
+            distance=np.load(os.path.join(directory, DISTANCE_FILE), mmap_mode="r"),
+            built_at=manifest.get("built_at"),
+        ),
+    )
+
+
+def route_fingerprints(graph: RouteGraph) -> Dict[str, str]:
+    """Return a hash of the outgoing routes (destination, distance) of every airport"""
+    fingerprints = {}
+    for i, code in enumerate(graph.iata.tolist()):
+        start, end = graph.indptr[i], graph.indptr[i + 1]
+        routes = zip(
+            graph.iata[graph.indices[start:end]].tolist(),
+            np.round(graph.distance[start:end], 1).tolist(),
+        )
+        digest = hashlib.sha1(repr(sorted(routes)).encode())
+        fingerprints[code] = digest.hexdigest()
+    return fingerprints
+
+
+def distance_adjacency(graph: RouteGraph):
+    """
+    Return the airport adjacency weighted by the shortest parallel route.
+
+    Routes with an unknown distance are left out.
+    """
+    n = graph.num_airports
+    known = ~np.isnan(graph.distance)
+    src = graph.sources()[known].astype(np.int64)
+    dst = graph.indices[known].astype(np.int64)
+    distance = graph.distance[known].astype(np.float64)
+
+    # CSR order is sorted by (source, destination), so parallel routes are adjacent
+    pair = src * n + dst
+    starts = np.flatnonzero(np.r_[True, pair[1:] != pair[:-1]]) if pair.size else pair
+    return sparse.csr_matrix(
+        (
+            np.minimum.reduceat(distance, starts) if pair.size else distance,
+            (src[starts], dst[starts]),
+        ),
+        shape=(n, n),
+    )
+
+
+def affected_sources(graph: RouteGraph, changed: np.ndarray) -> np.ndarray:
+    """
+    Return the airports whose rows can change when the routes of `changed` change.
+
+    A row can only change if its airport reaches a changed airport, so this is
+    the reverse reachability set of `changed` (including `changed` itself).
+    """
+    reverse = graph.adjacency().T.tocsr()
+    indptr = reverse.indptr.astype(np.int64)
+    indices = reverse.indices.astype(np.int64)
+
+    visited = np.zeros(graph.num_airports, dtype=bool)
+    visited[changed] = True
+    frontier = np.flatnonzero(visited)
+    while frontier.size:
+        _, neighbours, _ = expand_frontier(indptr, indices, frontier)
+        new = np.zeros_like(visited)
+        new[neighbours] = True
+        new &= ~visited
+        visited |= new
+        frontier = np.flatnonzero(new)
+    return np.flatnonzero(visited)
+
+
+def build_stops_matrix(
+    graph: RouteGraph,
+    directory: Optional[str] = None,
+    processes: int = 1,
+    incremental: bool = True,
+) -> Dict[str, Any]:
+    """
+    Build (or update) the stops matrix for a route graph.
+
+    With incremental=True and an existing matrix, only the rows of airports
+    that can reach an airport whose routes changed are recomputed; all other
+    rows are copied. The new matrix is written next to the old one and swapped
+    in when complete.
+
+    Args:
+        graph: Route graph to build the matrix for
+        directory: Output directory (default: STOPS_MATRIX_DIR)
+        processes: Worker processes to spread source rows over
+        incremental: Reuse unchanged rows of an existing matrix
+
+    Returns:
+        Build statistics: airports, rows_recomputed, seconds
+    """
+    start = time.perf_counter()
+    directory = os.path.abspath(directory or STOPS_MATRIX_DIR)
+    n = graph.num_airports
+    iata = graph.iata.tolist()
+    fingerprints = route_fingerprints(graph)
+
+    previous = read_manifest(directory, MANIFEST_FILE) if incremental else None
+    if previous is None:
+        recompute = np.arange(n)
+    else:
+        changed = np.array(
+            [
+                i
+                for i, code in enumerate(iata)
+                if previous["fingerprints"].get(code) != fingerprints[code]
+            ],
+            dtype=np.int64,
+        )
+        recompute = affected_sources(graph, changed)
+
+    staging = stage_directory(directory)
+    legs = np.lib.format.open_memmap(
+        os.path.join(staging, LEGS_FILE), mode="w+", dtype=np.uint8, shape=(n, n)
+    )
+    distance = np.lib.format.open_memmap(
+        os.path.join(staging, DISTANCE_FILE), mode="w+", dtype=np.float32, shape=(n, n)
+    )
+
+    if previous is not None:
+        keep = np.setdiff1d(np.arange(n), recompute)
+        _copy_rows(directory, previous["iata"], iata, keep, legs, distance)
+    legs.flush()
+    distance.flush()
+    del legs, distance
+
+    if recompute.size:
+        unweighted = graph.adjacency()
+        weighted = distance_adjacency(graph)
+        chunks = np.array_split(
+            recompute, max(processes * 4, -(-recompute.size // ROW_CHUNK))
+        )
+        args = (unweighted, weighted, staging)
+        if processes > 1:
+            with Pool(processes, initializer=_init_worker, initargs=args) as pool:
+                pool.map(_compute_rows, chunks)
+        else:
+            _init_worker(*args)
+            for chunk in chunks:
+                _compute_rows(chunk)
+
+    write_manifest(
+        staging,
+        MANIFEST_FILE,
+        {
+            "iata": iata,
+            "fingerprints": fingerprints,
+            "num_routes": graph.num_routes,
+        },
+    )
+    swap_in(staging, directory)
+
+    return {
+        "airports": n,
+        "rows_recomputed": int(recompute.size),
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+
+
+def _copy_rows(directory, old_iata, new_iata, rows, legs, distance):
+    """Copy `rows` from the existing matrix, remapping airport indices"""
+    old_index = {code: i for i, code in enumerate(old_iata)}
+    mapping = np.array([old_index.get(code, -1) for code in new_iata], dtype=np.int64)
+    old_legs = np.load(os.path.join(directory, LEGS_FILE), mmap_mode="r")
+    old_distance = np.load(os.path.join(directory, DISTANCE_FILE), mmap_mode="r")
+
+    columns = np.flatnonzero(mapping >= 0)
+    # Airports new to the graph changed by definition, so every kept row exists
+    for chunk in np.array_split(rows, max(1, -(-rows.size // ROW_CHUNK))):
+        if chunk.size == 0:
+            continue
+        old_rows = mapping[chunk]
+        legs[chunk] = UNREACHABLE
+        distance[chunk] = np.inf
+        legs[np.ix_(chunk, columns)] = old_legs[np.ix_(old_rows, mapping[columns])]
+        distance[np.ix_(chunk, columns)] = old_distance[
+            np.ix_(old_rows, mapping[columns])
+        ]
+
+
+_worker_state = None
+
+
+def _init_worker(unweighted, weighted, staging):
+    global _worker_state
+    _worker_state = (unweighted, weighted, staging)
+
+
+def _compute_rows(sources: np.ndarray) -> None:
+    """Compute the rows of `sources` and write them into the staged matrix"""
+    if sources.size == 0:
+        return
+    unweighted, weighted, staging = _worker_state
+    legs = np.load(os.path.join(staging, LEGS_FILE), mmap_mode="r+")
+    distance = np.load(os.path.join(staging, DISTANCE_FILE), mmap_mode="r+")
+
+    hops = csgraph.shortest_path(
+        unweighted, method="D", unweighted=True, indices=sources
+    )
+    hops[~np.isfinite(hops) | (hops >= UNREACHABLE)] = UNREACHABLE
+    legs[sources] = hops.astype(np.uint8)
+    distance[sources] = csgraph.dijkstra(weighted, indices=sources).astype(np.float32)
+    legs.flush()
+    distance.flush()
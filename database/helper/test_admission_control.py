@@ -0,0 +1,102 @@
+"""
+Unit tests for admission control.
+Run with: python -m pytest test_admission_control.py
+or: python test_admission_control.py
+"""
+
+import asyncio
+import unittest
+from admission_control import AdmissionLimiter, RouteGroups, parse_limits
+
+
+class TestAdmissionLimiter(unittest.TestCase):
+    """Test suite for the in-flight limit and wait queue"""
+
+    def test_admits_up_to_limit_then_queues_then_sheds(self):
+        """Test that requests beyond limit + queue are shed at once"""
+
+        async def main():
+            limiter = AdmissionLimiter("lookups", limit=2, queue=1, timeout=1.0)
+            self.assertTrue(await limiter.acquire())
+            self.assertTrue(await limiter.acquire())
+
+            waiting = asyncio.ensure_future(limiter.acquire())
+            await asyncio.sleep(0)
+            self.assertEqual(limiter.queue_depth, 1)
+            self.assertFalse(await limiter.acquire())
+
+            limiter.release()
+            self.assertTrue(await waiting)
+            self.assertEqual(limiter.in_flight, 2)
+            limiter.release()
+            limiter.release()
+            return limiter.stats()
+
+        stats = asyncio.run(main())
+        self.assertEqual(stats["in_flight"], 0)
+        self.assertEqual(stats["admitted"], 3)
+        self.assertEqual(stats["queued"], 1)
+        self.assertEqual(stats["shed"], 1)
+
+    def test_queue_timeout_sheds(self):
+        """Test that a request waiting longer than the timeout is shed"""
+
+        async def main():
+            limiter = AdmissionLimiter("exports", limit=1, queue=5, timeout=0.01)
+            await limiter.acquire()
+            admitted = await limiter.acquire()
+            return admitted, limiter
+
+        admitted, limiter = asyncio.run(main())
+        self.assertFalse(admitted)
+        self.assertEqual(limiter.queue_depth, 0)
+        self.assertEqual(limiter.shed, 1)
+
+    def test_cancelled_waiter_does_not_leak_a_slot(self):
+        """Test that a client leaving the queue does not take a slot"""
+
+        async def main():
+            limiter = AdmissionLimiter("listings", limit=1, queue=2, timeout=1.0)
+            await limiter.acquire()
+            waiting = asyncio.ensure_future(limiter.acquire())
+            await asyncio.sleep(0)
+            waiting.cancel()
+            await asyncio.sleep(0)
+            limiter.release()
+            return limiter
+
+        limiter = asyncio.run(main())
+        self.assertEqual(limiter.in_flight, 0)
+        self.assertEqual(limiter.queue_depth, 0)
+
+
+class TestRouteGroups(unittest.TestCase):
+    """Test matching requests to route groups"""
+
+    def test_first_matching_group_wins(self):
+        """Test that groups are matched in order on method and path"""
+        groups = RouteGroups(
+            [
+                ("exports", r"^POST /api/routes/stops$", AdmissionLimiter("e", 1, 0)),
+                ("lookups", r"^GET /api/", AdmissionLimiter("l", 1, 0)),
+            ]
+        )
+        self.assertEqual(groups.match("POST", "/api/routes/stops").name, "exports")
+        self.assertEqual(groups.match("GET", "/api/airports/JFK").name, "lookups")
+        self.assertIsNone(groups.match("GET", "/health"))
+
+
+class TestParseLimits(unittest.TestCase):
+    """Test parsing limit settings"""
+
+    def test_parse(self):
+        """Test valid, empty and malformed settings"""
+        self.assertEqual(parse_limits("24,48", (1, 1)), (24, 48))
+        self.assertEqual(parse_limits(None, (4, 8)), (4, 8))
+        with self.assertRaises(ValueError):
+            parse_limits("24", (1, 1))
+
+
+if __name__ == "__main__":
+    # Run tests
+    unittest.main(verbosity=2)
@@ -0,0 +1,61 @@
+"""
+Unit tests for centrality metrics.
+Run with: python -m pytest test_centrality.py
+or: python test_centrality.py
+"""
+
+import unittest
+import numpy as np
+from scipy import sparse
+from centrality import betweenness, components, degrees, pagerank
+
+
+def adjacency(edges, n):
+    rows, cols = zip(*edges)
+    return sparse.csr_matrix((np.ones(len(edges)), (rows, cols)), shape=(n, n))
+
+
+class TestCentrality(unittest.TestCase):
+    """Test suite for centrality metrics"""
+
+    def test_pagerank_cycle_is_uniform(self):
+        """Test that every airport on a cycle gets the same rank"""
+        rank = pagerank(adjacency([(0, 1), (1, 2), (2, 0)], 3))
+        np.testing.assert_allclose(rank, [1 / 3] * 3)
+
+    def test_pagerank_hub(self):
+        """Test that a hub everyone flies to ranks highest and ranks sum to 1"""
+        edges = [(1, 0), (2, 0), (3, 0), (0, 1)]
+        rank = pagerank(adjacency(edges, 4))
+        self.assertEqual(int(np.argmax(rank)), 0)
+        self.assertAlmostEqual(rank.sum(), 1.0)
+
+    def test_degrees(self):
+        """Test in and out degree"""
+        result = degrees(adjacency([(0, 1), (0, 2), (1, 2)], 3))
+        self.assertEqual(result["out"].tolist(), [2, 1, 0])
+        self.assertEqual(result["in"].tolist(), [0, 1, 2])
+
+    def test_components_largest_is_zero(self):
+        """Test that the largest component is numbered 0"""
+        edges = [(0, 1), (2, 3), (3, 4), (4, 2)]
+        result = components(adjacency(edges, 5))
+        self.assertEqual(result["weak"].tolist(), [1, 1, 0, 0, 0])
+        self.assertEqual(result["weak_size"].tolist(), [2, 2, 3, 3, 3])
+        self.assertEqual(result["strong_size"].tolist(), [1, 1, 3, 3, 3])
+
+    def test_betweenness_path(self):
+        """Test betweenness on a directed path 0 -> 1 -> 2"""
+        result = betweenness(adjacency([(0, 1), (1, 2)], 3), normalized=False)
+        self.assertEqual(result.tolist(), [0.0, 1.0, 0.0])
+
+    def test_betweenness_splits_parallel_paths(self):
+        """Test that two equally short paths share the dependency"""
+        edges = [(0, 1), (0, 2), (1, 3), (2, 3)]
+        result = betweenness(adjacency(edges, 4), normalized=False)
+        self.assertEqual(result.tolist(), [0.0, 0.5, 0.5, 0.0])
+
+
+if __name__ == "__main__":
+    # Run tests
+    unittest.main(verbosity=2)
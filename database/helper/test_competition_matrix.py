@@ -0,0 +1,124 @@
+"""
+Unit tests for the competition matrix.
+Run with: python -m pytest test_competition_matrix.py
+or: python test_competition_matrix.py
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from competition_matrix import (
+    build_competition_matrix,
+    load_competition_matrix,
+    market_type,
+)
+from route_graph import RouteGraph
+
+AIRPORTS = [{"iata": code} for code in ["AAA", "BBB", "CCC", "DDD"]]
+
+# AAA -> BBB: XA, XB, XC (XA twice, XC codeshare); AAA -> CCC: XA, XB (XB
+# codeshare); AAA -> DDD: XA; BBB -> AAA: XB; one route without an airline
+ROUTES = [
+    {"source": "AAA", "destination": "BBB", "airline": "XA"},
+    {"source": "AAA", "destination": "BBB", "airline": "XA"},
+    {"source": "AAA", "destination": "BBB", "airline": "XB"},
+    {"source": "AAA", "destination": "BBB", "airline": "XC", "operated": False},
+    {"source": "AAA", "destination": "CCC", "airline": "XA"},
+    {"source": "AAA", "destination": "CCC", "airline": "XB", "operated": False},
+    {"source": "AAA", "destination": "DDD", "airline": "XA"},
+    {"source": "BBB", "destination": "AAA", "airline": "XB"},
+    {"source": "CCC", "destination": "DDD", "airline": None},
+]
+
+
+class TestCompetitionMatrix(unittest.TestCase):
+    """Test suite for building and querying the competition matrix"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.directory = os.path.join(self.tmp, "competition")
+        graph = RouteGraph.from_rows(AIRPORTS, ROUTES)
+        self.stats = build_competition_matrix(graph, self.directory)
+        self.matrix = load_competition_matrix(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_market_totals(self):
+        """Test pair counts per market type"""
+        self.assertEqual(
+            self.matrix.markets,
+            {"pairs": 4, "monopoly": 2, "duopoly": 1, "competitive": 1},
+        )
+        self.assertEqual(self.stats["pairs"], 4)
+
+    def test_lookup_pairs(self):
+        """Test carriers of known, reverse, unserved and unknown pairs"""
+        rows = self.matrix.lookup(
+            ["AAA", "BBB", "CCC", "XXX"], ["BBB", "AAA", "DDD", "AAA"]
+        )
+        self.assertEqual(rows[0]["carriers"], ["XA", "XB", "XC"])
+        self.assertEqual(rows[0]["market"], "competitive")
+        self.assertEqual(rows[1]["carriers"], ["XB"])
+        self.assertEqual(rows[1]["market"], "monopoly")
+        # Routes without an airline are not carriers
+        self.assertEqual(rows[2]["carrier_count"], 0)
+        self.assertIsNone(rows[2]["market"])
+        self.assertIsNone(rows[3]["market"])
+
+    def test_pairs_from_airport(self):
+        """Test that one airport's pairs come most carriers first"""
+        rows = self.matrix.from_airport("AAA")
+        self.assertEqual([row["destination"] for row in rows], ["BBB", "CCC", "DDD"])
+        self.assertEqual([row["market"] for row in rows][1:], ["duopoly", "monopoly"])
+        self.assertEqual(self.matrix.from_airport("DDD"), [])
+        self.assertIsNone(self.matrix.from_airport("XXX"))
+
+    def test_airline_overlap(self):
+        """Test market mix and competitors of an airline"""
+        overlap = self.matrix.airline_overlap("XA")
+        self.assertEqual(
+            (overlap["pairs"], overlap["monopoly"], overlap["duopoly"]), (3, 1, 1)
+        )
+        self.assertEqual(overlap["competitive"], 1)
+        self.assertEqual(
+            [(c["airline"], c["shared_pairs"]) for c in overlap["competitors"]],
+            [("XB", 2), ("XC", 1)],
+        )
+        self.assertAlmostEqual(overlap["competitors"][0]["share"], 0.6667)
+        self.assertEqual(
+            len(self.matrix.airline_overlap("XA", limit=1)["competitors"]), 1
+        )
+        self.assertIsNone(self.matrix.airline_overlap("ZZ"))
+
+    def test_operated_variant(self):
+        """Test that codeshare routes do not count as carriers"""
+        operated = load_competition_matrix(self.directory, include_codeshare=False)
+        self.assertEqual(
+            operated.markets,
+            {"pairs": 4, "monopoly": 3, "duopoly": 1, "competitive": 0},
+        )
+        self.assertEqual(self.stats["operated"], operated.markets)
+        rows = operated.lookup(["AAA", "AAA"], ["BBB", "CCC"])
+        self.assertEqual(rows[0]["carriers"], ["XA", "XB"])
+        self.assertEqual(rows[1]["market"], "monopoly")
+        overlap = operated.airline_overlap("XA")
+        self.assertEqual(
+            [(c["airline"], c["shared_pairs"]) for c in overlap["competitors"]],
+            [("XB", 1)],
+        )
+        # XC only sells a pair another airline operates
+        self.assertIsNone(operated.airline_overlap("XC"))
+
+    def test_market_type(self):
+        """Test market names by carrier count"""
+        self.assertEqual(
+            [market_type(n) for n in range(5)],
+            [None, "monopoly", "duopoly", "competitive", "competitive"],
+        )
+
+
+if __name__ == "__main__":
+    # Run tests
+    unittest.main(verbosity=2)
@@ -0,0 +1,195 @@
+"""
+Unit tests for the data-quality checks.
+Run with: python -m pytest test_data_quality.py
+or: python test_data_quality.py
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+from data_quality import (
+    check_airlines,
+    check_airports,
+    ROUTE_KEY,
+    check_routes,
+    merge_repeats,
+    validate_datasets,
+    write_quality_report,
+)
+from distance import validate_coordinates, validate_coordinates_array
+
+# As after prepare_airports: IATA is filled from ICAO where it was missing
+AIRPORTS = pd.DataFrame(
+    [
+        ("JFK", "KJFK", "40.6413", "-73.7781"),
+        ("LAX", "KLAX", "33.9416", "-118.4085"),
+        ("BAD", "XBAD", "95.0", "10.0"),  # latitude out of range
+        ("NAN", "XNAN", "north", "10.0"),  # unparsable
+        ("NOC", None, None, None),  # no coordinates: kept
+        ("KSFO", "KSFO", "37.6", "-122.4"),  # ICAO fallback, no clash
+        ("JFK", "JFK", "40.6", "-73.8"),  # fallback clashing with JFK
+        ("ORD", "KORD", "41.97", "-87.9"),
+        ("ORD", "KORD", "41.98", "-87.9"),  # duplicate: last row is kept
+    ],
+    columns=["IATA", "ICAO", "Latitude", "Longitude"],
+)
+
+AIRLINES = pd.DataFrame(
+    [("AA", "AAL"), ("BA", "BAW"), ("BAW", "BAW"), ("XYZ", "XYZ")],
+    columns=["IATA", "ICAO"],
+)
+
+ROUTES = pd.DataFrame(
+    [
+        ("JFK", "LAX", "AA", None),
+        ("JFK", "LAX", "AA", 3974.3),  # repeat: merged into the first
+        ("JFK", "BAD", "AA", None),  # to a rejected airport
+        ("ZZZ", "LAX", "AA", None),  # unknown source
+        ("LAX", "JFK", "QQ", 3974.3),  # unknown airline
+        ("LAX", "LAX", "AA", 0.0),  # same airport
+        ("LAX", "NOC", "BA", None),  # kept, without a distance
+    ],
+    columns=["Source airport", "Destination airport", "Airline", "Distance"],
+)
+
+
+class TestMergeRepeats(unittest.TestCase):
+    """Test merging repeated routes"""
+
+    def test_first_non_null_wins(self):
+        """Test that a repeat fills the missing values of the first row"""
+        routes = pd.DataFrame(
+            [
+                ("JFK", "LAX", "AA", None, "738"),
+                ("LAX", "JFK", "AA", None, None),
+                ("JFK", "LAX", "AA", "Y", "320"),
+            ],
+            columns=ROUTE_KEY + ["Codeshare", "Equipment"],
+        )
+        merged = merge_repeats(routes)
+        self.assertEqual(
+            merged.to_dict(orient="records"),
+            [
+                {
+                    "Source airport": "JFK",
+                    "Destination airport": "LAX",
+                    "Airline": "AA",
+                    "Codeshare": "Y",
+                    "Equipment": "738",
+                },
+                {
+                    "Source airport": "LAX",
+                    "Destination airport": "JFK",
+                    "Airline": "AA",
+                    "Codeshare": None,
+                    "Equipment": None,
+                },
+            ],
+        )
+
+
+class TestCoordinates(unittest.TestCase):
+    """Test the batch coordinate check"""
+
+    def test_matches_validate_coordinates(self):
+        """Test that the array check agrees with validate_coordinates"""
+        lats = [0, 90, -90, 45.5, 91, -91, 0, 0]
+        lons = [0, 180, -180, -122.6, 0, 0, 181, -181]
+        self.assertEqual(
+            validate_coordinates_array(lats, lons).tolist(),
+            [validate_coordinates(lat, lon) for lat, lon in zip(lats, lons)],
+        )
+
+    def test_missing_is_invalid(self):
+        """Test that NaN coordinates are invalid"""
+        valid = validate_coordinates_array([np.nan, 10.0], [10.0, np.nan])
+        self.assertFalse(valid.any())
+
+
+class TestChecks(unittest.TestCase):
+    """Test the per-dataset checks"""
+
+    def test_airports(self):
+        """Test coordinate and duplicate-code reasons"""
+        reasons, warnings = check_airports(AIRPORTS)
+        self.assertEqual(
+            reasons.dropna().to_dict(),
+            {
+                2: "invalid_coordinates",
+                3: "invalid_coordinates",
+                6: "duplicate_fallback_code",
+                7: "duplicate_code",
+            },
+        )
+        self.assertEqual(warnings, {"missing_coordinates": 1})
+
+    def test_airlines(self):
+        """Test that a fallback code only clashes with a primary code"""
+        reasons, _ = check_airlines(AIRLINES)
+        self.assertTrue(reasons.isna().all())
+
+        clash = pd.DataFrame([("BA", "BAW"), ("BA", "BA")], columns=["IATA", "ICAO"])
+        reasons, _ = check_airlines(clash)
+        self.assertEqual(reasons.dropna().to_dict(), {1: "duplicate_fallback_code"})
+
+    def test_routes(self):
+        """Test that routes the MATCH would drop are rejected in pandas"""
+        reasons, _ = check_routes(ROUTES, ["JFK", "LAX", "NOC"], ["AA", "BA"])
+        self.assertEqual(
+            reasons.dropna().to_dict(),
+            {
+                1: "duplicate_route",
+                2: "unknown_destination_airport",
+                3: "unknown_source_airport",
+                4: "unknown_airline",
+                5: "same_airport",
+            },
+        )
+
+
+class TestValidateDatasets(unittest.TestCase):
+    """Test the whole validation stage and its report"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_split_and_report(self):
+        """Test kept and quarantined rows and the written report"""
+        kept, rejected, report = validate_datasets(AIRPORTS, AIRLINES, ROUTES)
+
+        self.assertEqual(len(kept["airports"]) + len(rejected["airports"]), 9)
+        self.assertNotIn("BAD", kept["airports"]["IATA"].tolist())
+        self.assertEqual(len(kept["routes"]), 2)
+        self.assertIn("Reason", rejected["routes"].columns)
+        self.assertEqual(
+            report["datasets"]["airports"]["reasons"],
+            {
+                "duplicate_code": 1,
+                "duplicate_fallback_code": 1,
+                "invalid_coordinates": 2,
+            },
+        )
+        self.assertEqual(report["datasets"]["routes"]["rejected"], 5)
+        self.assertEqual(kept["routes"]["Distance"].tolist(), [3974.3, None])
+        self.assertEqual(
+            report["datasets"]["routes"]["warnings"], {"missing_distance": 1}
+        )
+
+        path = write_quality_report(report, rejected, self.tmp)
+        with open(path) as file:
+            self.assertEqual(json.load(file), report)
+        quarantined = pd.read_csv(os.path.join(self.tmp, "routes.csv"))
+        self.assertEqual(len(quarantined), 5)
+
+
+if __name__ == "__main__":
+    # Run tests
+    unittest.main(verbosity=2)
@@ -6,6 +6,7 @@ or: python test_distance.py
 
 import unittest
 import math
+import numpy as np
 from distance import (
     calculate_distance,
     calculate_distance_km,
@@ -13,6 +14,10 @@ from distance import (
     validate_coordinates,
     calculate_distance_safe,
     get_distance_between_airports,
+    initial_bearing,
+    intermediate_points,
+    midpoint,
+    split_antimeridian,
 )
 
 
@@ -168,6 +173,80 @@ class TestEdgeCases(unittest.TestCase):
         self.assertAlmostEqual(distance, 8280, delta=100)
 
 
+class TestGreatCircleGeometry(unittest.TestCase):
+    """Test the vectorized great-circle helpers"""
+
+    def test_initial_bearing(self):
+        """Test bearings along the cardinal directions and for arrays"""
+        self.assertAlmostEqual(float(initial_bearing(0, 0, 10, 0)), 0.0)
+        self.assertAlmostEqual(float(initial_bearing(0, 0, 0, 10)), 90.0)
+        bearings = initial_bearing(
+            np.array([0.0, 0.0]),
+            np.array([0.0, 0.0]),
+            np.array([-10.0, 0.0]),
+            np.array([0.0, -10.0]),
+        )
+        np.testing.assert_allclose(bearings, [180.0, 270.0])
+
+    def test_midpoint(self):
+        """Test midpoints on the equator and across the date line"""
+        lat, lon = midpoint(0, 0, 0, 90)
+        self.assertAlmostEqual(float(lat), 0.0)
+        self.assertAlmostEqual(float(lon), 45.0)
+        lat, lon = midpoint(0, 170, 0, -170)
+        self.assertAlmostEqual(abs(float(lon)), 180.0)
+
+    def test_intermediate_points_follow_the_great_circle(self):
+        """Test endpoints, shape and that every step has the same length"""
+        lats, lons = intermediate_points(
+            [40.6413, 51.47],
+            [-73.7781, -0.4543],
+            [33.9416, 40.6413],
+            [-118.4085, -73.7781],
+            points=9,
+        )
+        self.assertEqual(lats.shape, (2, 9))
+        self.assertAlmostEqual(lats[0, 0], 40.6413)
+        self.assertAlmostEqual(lons[0, -1], -118.4085)
+
+        steps = [
+            calculate_distance_km(
+                lats[1, i], lons[1, i], lats[1, i + 1], lons[1, i + 1]
+            )
+            for i in range(8)
+        ]
+        total = calculate_distance_km(51.47, -0.4543, 40.6413, -73.7781)
+        for step in steps:
+            self.assertAlmostEqual(step, total / 8, delta=0.5)
+        # The great circle from London to New York bulges north
+        self.assertGreater(lats[1].max(), 51.47)
+
+    def test_intermediate_points_scalar_and_identical(self):
+        """Test scalar input and a zero-length arc"""
+        lats, lons = intermediate_points(10, 20, 10, 20, points=3)
+        np.testing.assert_allclose(lats, [10, 10, 10])
+        np.testing.assert_allclose(lons, [20, 20, 20])
+        with self.assertRaises(ValueError):
+            intermediate_points(0, 0, 1, 1, points=1)
+
+    def test_split_antimeridian(self):
+        """Test that a line crossing the date line is split at +/-180"""
+        lats, lons = intermediate_points(35.76, 140.39, 40.64, -73.78, points=16)
+        parts = split_antimeridian(lats, lons)
+
+        self.assertEqual(len(parts), 2)
+        (lats_a, lons_a), (lats_b, lons_b) = parts
+        self.assertEqual(lons_a[-1], 180.0)
+        self.assertEqual(lons_b[0], -180.0)
+        self.assertEqual(lats_a[-1], lats_b[0])
+        self.assertEqual(len(lats_a) + len(lats_b), 18)
+
+    def test_split_antimeridian_no_crossing(self):
+        """Test that a line not crossing the date line is returned whole"""
+        lats, lons = intermediate_points(40.64, -73.78, 33.94, -118.41, points=8)
+        self.assertEqual(len(split_antimeridian(lats, lons)), 1)
+
+
 if __name__ == "__main__":
     # Run tests
     unittest.main(verbosity=2)
@@ -0,0 +1,83 @@
+"""
+Unit tests for field projection.
+Run with: python -m pytest test_field_projection.py
+or: python test_field_projection.py
+"""
+
+import unittest
+from field_projection import parse_fields, quote, return_items, with_return
+
+ALLOWED = {
+    "IATA": "IATA",
+    "Latitude": "Latitude",
+    "Tz database time zone": "Tz database time zone",
+    "TzDatabaseTimeZone": "Tz database time zone",
+}
+
+QUERY = """
+MATCH (a:Airport)-[r:ROUTE]->(b:Airport)
+WHERE r.Airline = $airline
+RETURN a.IATA AS source, b.IATA AS destination, r.Distance AS distance
+ORDER BY r.Distance
+LIMIT $limit
+"""
+
+
+class TestParseFields(unittest.TestCase):
+    """Test suite for parsing fields= values"""
+
+    def test_no_fields_means_all(self):
+        """Test that a missing or blank value selects every field"""
+        self.assertIsNone(parse_fields(None, ALLOWED))
+        self.assertIsNone(parse_fields(" ", ALLOWED))
+
+    def test_names_map_to_output_keys(self):
+        """Test order, whitespace, duplicates and attribute names"""
+        self.assertEqual(
+            parse_fields("Latitude, IATA,TzDatabaseTimeZone,IATA", ALLOWED),
+            ["Latitude", "IATA", "Tz database time zone"],
+        )
+
+    def test_unknown_fields_are_rejected(self):
+        """Test that fields outside the schema raise ValueError"""
+        with self.assertRaises(ValueError) as context:
+            parse_fields("IATA,Password", ALLOWED)
+        self.assertIn("Password", str(context.exception))
+
+
+class TestWithReturn(unittest.TestCase):
+    """Test rewriting RETURN clauses"""
+
+    def test_only_return_items_change(self):
+        """Test that MATCH, WHERE, ORDER BY and LIMIT are kept"""
+        columns = {"destination": "b.IATA", "distance": "r.Distance"}
+        query = with_return(QUERY, return_items(columns, ["destination"]))
+
+        self.assertIn("RETURN b.IATA AS destination\nORDER BY r.Distance", query)
+        self.assertIn("WHERE r.Airline = $airline", query)
+        self.assertTrue(query.rstrip().endswith("LIMIT $limit"))
+        self.assertNotIn("a.IATA", query)
+
+    def test_query_without_order(self):
+        """Test a RETURN clause that ends the query"""
+        query = with_return(
+            "MATCH (a:Airport {IATA: $iata})\nRETURN a.Name AS Name", "a.IATA AS IATA"
+        )
+        self.assertEqual(
+            query, "MATCH (a:Airport {IATA: $iata})\nRETURN a.IATA AS IATA"
+        )
+
+    def test_missing_return(self):
+        """Test that a query without RETURN is rejected"""
+        with self.assertRaises(ValueError):
+            with_return("MATCH (a) SET a.x = 1", "a.x AS x")
+
+    def test_quote(self):
+        """Test identifier quoting"""
+        self.assertEqual(quote("IATA"), "IATA")
+        self.assertEqual(quote("Tz database time zone"), "`Tz database time zone`")
+
+
+if __name__ == "__main__":
+    # Run tests
+    unittest.main(verbosity=2)
@@ -0,0 +1,241 @@
+"""
+Unit tests for the memory-mapped graph snapshot.
+Run with: python -m pytest test_graph_snapshot.py
+or: python test_graph_snapshot.py
+"""
+
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+import numpy as np
+from graph_snapshot import (
+    FINGERPRINT_QUERY,
+    FORMAT_VERSION,
+    MAGIC,
+    load_route_graph,
+    open_snapshot,
+    remove_snapshot,
+    snapshot_is_current,
+    write_snapshot,
+)
+from route_graph import AIRPORTS_QUERY, ROUTES_QUERY, RouteGraph
+
+AIRPORTS = [
+    {
+        "IATA": "JFK",
+        "Name": "John F Kennedy International Airport",
+        "City": "New York",
+        "Country": "United States",
+        "ICAO": "KJFK",
+        "Latitude": 40.64,
+        "Longitude": -73.78,
+    },
+    {
+        "IATA": "ZRH",
+        "Name": "Zürich Airport",
+        "City": "Zurich",
+        "Country": "Switzerland",
+        "ICAO": None,
+        "Latitude": 47.46,
+        "Longitude": 8.55,
+    },
+    {
+        "IATA": "LAX",
+        "Name": "Los Angeles International Airport",
+        "City": "Los Angeles",
+        "Country": "United States",
+        "ICAO": "KLAX",
+        "Latitude": None,
+        "Longitude": None,
+    },
+]
+
+AIRLINES = [
+    {
+        "IATA": "LX",
+        "ICAO": "SWR",
+        "Name": "Swiss",
+        "Country": "Switzerland",
+        "Active": "Y",
+    },
+    {
+        "IATA": "AA",
+        "ICAO": "AAL",
+        "Name": "American Airlines",
+        "Country": "United States",
+        "Active": "N",
+    },
+]
+
+ROUTES = [
+    {"source": "JFK", "destination": "ZRH", "airline": "LX", "distance": 6300.0},
+    {
+        "source": "JFK",
+        "destination": "LAX",
+        "airline": "AA",
+        "distance": None,
+        "stops": 1,
+    },
+    {"source": "ZRH", "destination": "JFK", "airline": "LX", "distance": 6300.0},
+]
+
+
+def graph_rows(rows):
+    return [
+        {
+            "iata": row["IATA"],
+            "latitude": row["Latitude"],
+            "longitude": row["Longitude"],
+        }
+        for row in rows
+    ]
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def single(self):
+        return self
+
+    def data(self):
+        return self.rows
+
+
+class FakeDriver:
+    """Answers the fingerprint and route graph queries from fixed rows"""
+
+    def __init__(self, load_id, airports=3, routes=3):
+        self.answers = {
+            FINGERPRINT_QUERY: {
+                "load_id": load_id,
+                "airports": airports,
+                "routes": routes,
+            },
+            AIRPORTS_QUERY: graph_rows(AIRPORTS),
+            ROUTES_QUERY: ROUTES[:1],
+        }
+
+    def session(self, database=None):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query):
+        return FakeResult(self.answers[query])
+
+
+class TestGraphSnapshot(unittest.TestCase):
+    """Test suite for writing and opening snapshots"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "airfacts.snapshot")
+        self.graph = RouteGraph.from_rows(graph_rows(AIRPORTS), ROUTES)
+        write_snapshot(
+            self.path,
+            self.graph,
+            AIRPORTS,
+            AIRLINES,
+            {"source": "test", "load_id": "load-1"},
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_round_trip_route_graph(self):
+        """Test that the CSR route arrays survive a round trip"""
+        graph = open_snapshot(self.path).to_route_graph()
+        self.assertEqual(graph.iata.tolist(), ["JFK", "LAX", "ZRH"])
+        for name in ("indptr", "indices", "airline", "stops", "operated"):
+            np.testing.assert_array_equal(
+                getattr(graph, name), getattr(self.graph, name)
+            )
+        np.testing.assert_array_equal(graph.distance, self.graph.distance)
+        self.assertEqual(graph.airline_codes.tolist(), ["AA", "LX"])
+        self.assertEqual(graph.index["ZRH"], 2)
+
+    def test_arrays_are_zero_copy_views(self):
+        """Test that arrays are read-only views of the memory map"""
+        snapshot = open_snapshot(self.path)
+        indices = snapshot.array("routes.indices")
+        self.assertIsInstance(indices.base, np.memmap)
+        self.assertFalse(indices.flags.writeable)
+        self.assertEqual(snapshot._arrays["routes.indices"]["offset"] % 64, 0)
+
+    def test_airport_attributes(self):
+        """Test string tables with unicode and missing values"""
+        snapshot = open_snapshot(self.path)
+        zrh = snapshot.airport(snapshot.airport_index["ZRH"])
+        self.assertEqual(zrh["Name"], "Zürich Airport")
+        self.assertIsNone(zrh["ICAO"])
+        lax = snapshot.airport(snapshot.airport_index["LAX"])
+        self.assertIsNone(lax["Latitude"])
+
+    def test_airlines(self):
+        """Test that airlines are stored sorted by IATA"""
+        snapshot = open_snapshot(self.path)
+        self.assertEqual(snapshot.strings("airlines.iata").tolist(), ["AA", "LX"])
+        self.assertEqual(snapshot.array("airlines.active").tolist(), [0, 1])
+
+    def test_metadata(self):
+        """Test the stored metadata and counts"""
+        snapshot = open_snapshot(self.path)
+        self.assertEqual(snapshot.version, FORMAT_VERSION)
+        self.assertEqual(snapshot.metadata["source"], "test")
+        self.assertEqual(snapshot.metadata["routes"], 3)
+        self.assertEqual(snapshot.num_airports, 3)
+
+    def test_rejects_other_versions(self):
+        """Test that a snapshot of another format version is rejected"""
+        with open(self.path, "r+b") as file:
+            file.write(struct.pack("<8sI", MAGIC, FORMAT_VERSION + 1))
+        with self.assertRaises(ValueError):
+            open_snapshot(self.path)
+
+    def test_rejects_other_files(self):
+        """Test that a file without the magic bytes is rejected"""
+        other = os.path.join(self.tmp, "other")
+        with open(other, "wb") as file:
+            file.write(b"\0" * 64)
+        with self.assertRaises(ValueError):
+            open_snapshot(other)
+
+    def test_load_route_graph_prefers_snapshot(self):
+        """Test that no database is needed when a snapshot exists"""
+        graph = load_route_graph(driver=None, path=self.path)
+        self.assertEqual(graph.num_routes, 3)
+
+    def test_snapshot_is_current(self):
+        """Test that the load id and the counts must match the database"""
+        snapshot = open_snapshot(self.path)
+        self.assertTrue(snapshot_is_current(snapshot, FakeDriver("load-1")))
+        self.assertFalse(snapshot_is_current(snapshot, FakeDriver("load-2")))
+        self.assertFalse(snapshot_is_current(snapshot, FakeDriver(None)))
+        # A failed upload batch leaves fewer routes in Neo4j
+        self.assertFalse(snapshot_is_current(snapshot, FakeDriver("load-1", routes=2)))
+
+    def test_load_route_graph_falls_back_when_stale(self):
+        """Test that a snapshot of another load is ignored"""
+        graph = load_route_graph(FakeDriver("load-1"), path=self.path)
+        self.assertEqual(graph.num_routes, 3)
+        graph = load_route_graph(FakeDriver("load-2"), path=self.path)
+        self.assertEqual(graph.num_routes, 1)
+
+    def test_remove_snapshot(self):
+        """Test that a removed snapshot sends readers to Neo4j"""
+        self.assertTrue(remove_snapshot(self.path))
+        self.assertFalse(remove_snapshot(self.path))
+        graph = load_route_graph(FakeDriver("load-1"), path=self.path)
+        self.assertEqual(graph.num_routes, 1)
+
+
+if __name__ == "__main__":
+    # Run tests
+    unittest.main(verbosity=2)
@@ -0,0 +1,91 @@
+"""
+Unit tests for city and metro-area markets.
+Run with: python -m pytest test_markets.py
+or: python test_markets.py
+"""
+
+import os
+import tempfile
+import unittest
+from markets import METRO_AREAS_PATH, assign_markets, city_key, load_metro_areas
+
+AIRPORTS = [
+    {"IATA": "JFK", "City": "New York", "Country": "United States"},
+    {"IATA": "LGA", "City": "New York", "Country": "United States"},
+    {"IATA": "EWR", "City": "Newark", "Country": "United States"},
+    {"IATA": "JRB", "City": "New York ", "Country": "United States"},
+    {"IATA": "BOS", "City": "Boston", "Country": "United States"},
+    {"IATA": "YLO", "City": "London", "Country": "Canada"},
+    {"IATA": "YXU", "City": "london", "Country": "Canada"},
+    {"IATA": "ZZZ", "City": None, "Country": "Nowhere"},
+]
+
+METRO_AREAS = {
+    "JFK": ("NYC", "New York", "United States"),
+    "LGA": ("NYC", "New York", "United States"),
+    "EWR": ("NYC", "New York", "United States"),
+}
+
+
+class TestAssignMarkets(unittest.TestCase):
+    """Test grouping airports into markets"""
+
+    def setUp(self):
+        self.markets = {
+            row["Market"]: row for row in assign_markets(AIRPORTS, METRO_AREAS)
+        }
+
+    def test_metro_area_overrides_city(self):
+        """Test that listed airports of another city join the metro area"""
+        self.assertEqual(self.markets["NYC"]["Airports"], ["EWR", "JFK", "JRB", "LGA"])
+        self.assertEqual(self.markets["NYC"]["Name"], "New York")
+
+    def test_cities_group_by_city_and_country(self):
+        """Test case-insensitive grouping and Ids from the lowest IATA code"""
+        self.assertEqual(self.markets["YLO"]["Airports"], ["YLO", "YXU"])
+        self.assertEqual(self.markets["YLO"]["Country"], "Canada")
+        self.assertEqual(self.markets["BOS"]["Airports"], ["BOS"])
+
+    def test_airport_without_city(self):
+        """Test that an airport without a city is its own market"""
+        self.assertEqual(self.markets["ZZZ"]["Name"], "ZZZ")
+        self.assertEqual(len(self.markets), 4)
+
+    def test_market_ids_do_not_clash_with_metro_codes(self):
+        """Test that a city market skips an IATA code used as a metro code"""
+        airports = [{"IATA": "NYC", "City": "Nyc Town", "Country": "Elsewhere"}]
+        airports += AIRPORTS[:1]
+        ids = [row["Market"] for row in assign_markets(airports, METRO_AREAS)]
+        self.assertEqual(sorted(ids), ["NYC", "NYC-2"])
+
+    def test_city_key(self):
+        """Test city normalization"""
+        self.assertEqual(city_key(" New  York", "US"), ("new york", "us"))
+        self.assertIsNone(city_key(" ", "US"))
+
+
+class TestMetroAreas(unittest.TestCase):
+    """Test reading the metro-area table"""
+
+    def test_shipped_table(self):
+        """Test that the shipped table lists each airport once"""
+        metro_areas = load_metro_areas(METRO_AREAS_PATH)
+        self.assertEqual(metro_areas["LGW"][0], "LON")
+        self.assertEqual(metro_areas["EWR"], ("NYC", "New York", "United States"))
+
+    def test_airport_in_two_metro_areas(self):
+        """Test that conflicting rows are rejected"""
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as file:
+            file.write("Market,Name,Country,IATA\n")
+            file.write("NYC,New York,United States,EWR\n")
+            file.write("PHL,Philadelphia,United States,EWR\n")
+        try:
+            with self.assertRaises(ValueError):
+                load_metro_areas(file.name)
+        finally:
+            os.remove(file.name)
+
+
+if __name__ == "__main__":
+    # Run tests
+    unittest.main(verbosity=2)
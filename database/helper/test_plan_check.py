@@ -0,0 +1,145 @@
+"""
+Unit tests for the query plan checks.
+Run with: python -m pytest test_plan_check.py
+or: python test_plan_check.py
+"""
+
+import unittest
+from plan_check import (
+    ShippedQuery,
+    check_plan,
+    extract_python,
+    plan_findings,
+    render_report,
+    split_cypher,
+)
+
+PYTHON_SOURCE = '''
+TOP_QUERY = """
+MATCH (a:Airport) RETURN a.IATA LIMIT 10
+"""
+
+
+def get_airport(iata):
+    """Return an airport (MATCH in a docstring is not a query)"""
+    query = """
+    MATCH (a:Airport {IATA: $iata})
+    RETURN a.Name
+    """
+    return run(query, iata=iata)
+
+
+def ranked(prop):
+    # plan-check: allow NodeByLabelScan (top-k over all airports)
+    query = f"""
+    MATCH (a:Airport) RETURN a.IATA ORDER BY a.{prop} DESC
+    """
+    print("MATCH is not enough without a clause body")
+    return query
+'''
+
+CYPHER_FILE = """// Rebuild everything; runs offline
+// plan-check: allow Eager
+MATCH (al:Airline)
+SET al.Count = 0;
+
+// plan-check: allow NodeByLabelScan
+MATCH (a:Airport)
+SET a.Flag = true;
+CREATE INDEX airport_iata IF NOT EXISTS FOR (a:Airport) ON (a.IATA);
+"""
+
+
+def operator(name, details="", children=()):
+    return {
+        "operatorType": f"{name}@neo4j",
+        "args": {"Details": details},
+        "children": list(children),
+    }
+
+
+class TestExtraction(unittest.TestCase):
+    """Test suite for extracting shipped queries"""
+
+    def test_python_queries(self):
+        """Test string literals, f-strings and names"""
+        queries = extract_python(PYTHON_SOURCE, "module.py")
+        self.assertEqual(
+            [query.name for query in queries],
+            ["module.py:2 TOP_QUERY", "module.py:9 get_airport", "module.py:18 ranked"],
+        )
+        self.assertIn("ORDER BY a.prop DESC", queries[2].text)
+
+    def test_python_allow_directive(self):
+        """Test that comments above the statement allow operators"""
+        queries = extract_python(PYTHON_SOURCE, "module.py")
+        self.assertEqual(queries[2].allow, frozenset({"nodebylabelscan"}))
+        self.assertEqual(queries[1].allow, frozenset())
+
+    def test_cypher_statements(self):
+        """Test splitting with semicolons in comments and skipped schema statements"""
+        queries = split_cypher(CYPHER_FILE, "build.cypher")
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(queries[0].text, "MATCH (al:Airline)\nSET al.Count = 0")
+        self.assertEqual(queries[0].allow, frozenset({"eager"}))
+        self.assertEqual(queries[1].allow, frozenset({"eager", "nodebylabelscan"}))
+
+
+class TestPlanFindings(unittest.TestCase):
+    """Test suite for walking query plans"""
+
+    def setUp(self):
+        self.counts = {"Airport": 7700, "Aircraft": 200}
+
+    def test_flags_unscalable_operators(self):
+        """Test that scans, cartesian products and Eager are found in children"""
+        plan = operator(
+            "ProduceResults",
+            children=[
+                operator(
+                    "CartesianProduct",
+                    children=[
+                        operator("NodeByLabelScan", "a:Airport"),
+                        operator("Eager", children=[operator("AllNodesScan", "n")]),
+                    ],
+                )
+            ],
+        )
+        findings = plan_findings(plan, self.counts)
+        self.assertEqual(
+            [finding.operator for finding in findings],
+            ["CartesianProduct", "NodeByLabelScan", "Eager", "AllNodesScan"],
+        )
+
+    def test_small_labels_and_index_seeks_pass(self):
+        """Test that small label scans and index seeks are not flagged"""
+        plan = operator(
+            "ProduceResults",
+            children=[
+                operator("NodeByLabelScan", "ac:Aircraft"),
+                operator("NodeIndexSeek", "RANGE INDEX a:Airport(IATA)"),
+            ],
+        )
+        self.assertEqual(plan_findings(plan, self.counts), [])
+        self.assertEqual(len(plan_findings(plan, self.counts, large_label=100)), 1)
+
+    def test_allowed_findings(self):
+        """Test that allowed operators are marked and do not fail the report"""
+        plan = operator("NodeByLabelScan", "a:Airport")
+        allowed = ShippedQuery("q", "MATCH (a:Airport)", frozenset({"nodebylabelscan"}))
+        findings = check_plan(allowed, plan, self.counts)
+        self.assertTrue(findings[0].allowed)
+
+        report = render_report(
+            [
+                {"name": "q", "text": "", "findings": findings, "error": None},
+                {"name": "bad", "text": "MATCH", "findings": [], "error": "Invalid"},
+            ]
+        )
+        self.assertIn("2 queries checked, 1 failed.", report)
+        self.assertIn("| `q` | ok | NodeByLabelScan (allowed) |", report)
+
+
+if __name__ == "__main__":
+    # Run tests
+    unittest.main(verbosity=2)
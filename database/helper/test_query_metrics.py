@@ -0,0 +1,170 @@
+"""
+Unit tests for query instrumentation.
+Run with: python -m pytest test_query_metrics.py
+or: python test_query_metrics.py
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from query_metrics import (
+    QueryMetrics,
+    merge_states,
+    profile_db_hits,
+    read_states,
+    render_prometheus,
+)
+
+
+class TestQueryMetrics(unittest.TestCase):
+    """Test suite for the query metrics registry"""
+
+    def test_record_aggregates_calls(self):
+        """Test that repeated calls are aggregated per query name"""
+        registry = QueryMetrics(slow_query_ms=1000)
+        summary = SimpleNamespace(
+            result_available_after=3, result_consumed_after=5, profile=None
+        )
+
+        registry.record("get_airport", 10.0, rows=1, summary=summary)
+        registry.record("get_airport", 30.0, rows=1, summary=summary)
+
+        stats = registry.snapshot()["get_airport"]
+        self.assertEqual(stats["calls"], 2)
+        self.assertEqual(stats["rows"], 2)
+        self.assertAlmostEqual(stats["wall_ms_avg"], 20.0)
+        self.assertAlmostEqual(stats["wall_ms_max"], 30.0)
+        self.assertEqual(stats["available_after_ms"], 6)
+        self.assertEqual(stats["consumed_after_ms"], 10)
+        self.assertEqual(stats["slow"], 0)
+
+    def test_slow_queries_are_logged(self):
+        """Test that queries over the threshold are counted and logged"""
+        registry = QueryMetrics(slow_query_ms=50)
+
+        with self.assertLogs("airfacts.slow_query", level="WARNING") as logs:
+            registry.record("get_routes", 75.0, rows=10, query="MATCH (n)\n RETURN n")
+
+        self.assertEqual(registry.snapshot()["get_routes"]["slow"], 1)
+        self.assertIn('"query": "MATCH (n) RETURN n"', logs.output[0])
+
+    def test_errors_are_counted(self):
+        """Test that failed queries are counted as errors"""
+        registry = QueryMetrics()
+        registry.record("get_routes", 1.0, error=True)
+        self.assertEqual(registry.snapshot()["get_routes"]["errors"], 1)
+
+    def test_render_prometheus(self):
+        """Test the Prometheus text output"""
+        registry = QueryMetrics()
+        registry.record("get_airport", 7.0, rows=1)
+        registry.increment("coalesced_requests", 3)
+
+        text = registry.render_prometheus()
+
+        self.assertIn(
+            'airfacts_query_duration_seconds_bucket{query="get_airport",le="0.005"} 0',
+            text,
+        )
+        self.assertIn(
+            'airfacts_query_duration_seconds_bucket{query="get_airport",le="0.01"} 1',
+            text,
+        )
+        self.assertIn(
+            'airfacts_query_duration_seconds_count{query="get_airport"} 1', text
+        )
+        self.assertIn("airfacts_coalesced_requests_total 3", text)
+
+    def test_gauges_are_read_when_rendering(self):
+        """Test that registered gauges report their current value"""
+        registry = QueryMetrics()
+        depth = [3]
+        registry.register_gauge("admission_queue_depth_lookups", lambda: depth[0])
+        depth[0] = 5
+
+        self.assertEqual(registry.gauges(), {"admission_queue_depth_lookups": 5})
+        self.assertIn(
+            "# TYPE airfacts_admission_queue_depth_lookups gauge",
+            registry.render_prometheus(),
+        )
+
+    def test_reset(self):
+        """Test that reset drops all statistics"""
+        registry = QueryMetrics()
+        registry.record("get_airport", 1.0)
+        registry.reset()
+        self.assertEqual(registry.snapshot(), {})
+
+
+class TestWorkerMetrics(unittest.TestCase):
+    """Test publishing and merging the registries of several workers"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_merge_published_states(self):
+        """Test that counts are summed and gauges of exited workers dropped"""
+        registry = QueryMetrics()
+        registry.record("get_airport", 7.0, rows=1)
+        registry.increment("coalesced_requests", 3)
+        registry.register_gauge("admission_in_flight_lookups", lambda: 2)
+        registry.publish(self.directory)
+
+        # A worker that has exited: no process has this pid
+        exited = QueryMetrics()
+        exited.record("get_airport", 70.0, rows=4)
+        exited.increment("coalesced_requests", 1)
+        exited.register_gauge("admission_in_flight_lookups", lambda: 5)
+        with open(os.path.join(self.directory, "99999999.json"), "w") as file:
+            json.dump(exited.state(), file)
+
+        merged = merge_states(read_states(self.directory))
+        stats = merged["stats"]["get_airport"]
+        self.assertEqual((stats["calls"], stats["rows"]), (2, 5))
+        self.assertEqual(stats["wall_ms_max"], 70.0)
+        self.assertEqual(stats["buckets"][1], 1)
+        self.assertEqual(merged["counters"], {"coalesced_requests": 4})
+        self.assertEqual(merged["gauges"], {"admission_in_flight_lookups": 2})
+
+        text = render_prometheus(merged)
+        self.assertIn(
+            'airfacts_query_duration_seconds_count{query="get_airport"} 2', text
+        )
+        self.assertIn("airfacts_coalesced_requests_total 4", text)
+
+    def test_missing_directory(self):
+        """Test that an unpublished directory merges to an empty state"""
+        states = read_states(os.path.join(self.directory, "missing"))
+        self.assertEqual(
+            merge_states(states), {"stats": {}, "counters": {}, "gauges": {}}
+        )
+
+
+class TestProfileDbHits(unittest.TestCase):
+    """Test summing db hits from PROFILE plans"""
+
+    def test_nested_plan(self):
+        """Test that hits from every operator are summed"""
+        profile = {
+            "dbHits": 1,
+            "children": [
+                {"dbHits": 10, "children": []},
+                {"dbHits": 5, "children": [{"dbHits": 2}]},
+            ],
+        }
+        self.assertEqual(profile_db_hits(profile), 18)
+
+    def test_no_profile(self):
+        """Test that a missing plan counts as zero hits"""
+        self.assertEqual(profile_db_hits(None), 0)
+
+
+if __name__ == "__main__":
+    # Run tests
+    unittest.main(verbosity=2)
@@ -0,0 +1,77 @@
+"""
+Unit tests for response compression.
+Run with: python -m pytest test_response_compression.py
+or: python test_response_compression.py
+"""
+
+import gzip
+import unittest
+from response_compression import CODECS, CompressedCache, negotiate
+
+CODECS_ALL = {"zstd": bytes, "br": bytes, "gzip": bytes}
+
+
+class TestNegotiate(unittest.TestCase):
+    """Test suite for Accept-Encoding negotiation"""
+
+    def test_preferred_codec_wins_at_equal_quality(self):
+        """Test that server preference breaks ties"""
+        self.assertEqual(negotiate("gzip, br, zstd", CODECS_ALL), "zstd")
+        self.assertEqual(negotiate("gzip, br", CODECS_ALL), "br")
+
+    def test_quality_values(self):
+        """Test that q-values override server preference, and q=0 refuses"""
+        self.assertEqual(negotiate("br;q=0.5, gzip", CODECS_ALL), "gzip")
+        self.assertIsNone(negotiate("gzip;q=0", CODECS_ALL))
+
+    def test_unavailable_codecs_are_skipped(self):
+        """Test that only installed codecs are chosen"""
+        self.assertEqual(negotiate("br, gzip;q=0.5", {"gzip": bytes}), "gzip")
+        self.assertIsNone(negotiate("br", {"gzip": bytes}))
+
+    def test_identity_and_wildcard(self):
+        """Test missing, identity and wildcard headers"""
+        self.assertIsNone(negotiate(None, CODECS_ALL))
+        self.assertIsNone(negotiate("identity", CODECS_ALL))
+        self.assertEqual(negotiate("*", CODECS_ALL), "zstd")
+
+
+class TestCompressedCache(unittest.TestCase):
+    """Test the cache of compressed payloads"""
+
+    def test_payload_is_compressed_once(self):
+        """Test that a repeated payload is served from the cache"""
+        cache = CompressedCache()
+        payload = b'{"source": "JFK", "destination": "LAX"}' * 100
+
+        first, cpu_ms, hit = cache.compress("gzip", payload)
+        second, cached_ms, cached_hit = cache.compress("gzip", payload)
+
+        self.assertEqual(gzip.decompress(first), payload)
+        self.assertIs(second, first)
+        self.assertFalse(hit)
+        self.assertTrue(cached_hit)
+        self.assertEqual(cached_ms, 0.0)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_size_bound_evicts_least_recently_used(self):
+        """Test that the cache stays within its byte budget"""
+        codecs = {"copy": bytes}
+        cache = CompressedCache(max_bytes=250, codecs=codecs)
+        for value in (b"a", b"b", b"c"):
+            cache.compress("copy", value * 100)
+
+        self.assertLessEqual(cache.size, 250)
+        _, _, hit = cache.compress("copy", b"a" * 100)
+        self.assertFalse(hit)
+        _, _, hit = cache.compress("copy", b"c" * 100)
+        self.assertTrue(hit)
+
+    def test_gzip_is_always_available(self):
+        """Test that gzip needs no optional package"""
+        self.assertIn("gzip", CODECS)
+
+
+if __name__ == "__main__":
+    # Run tests
+    unittest.main(verbosity=2)
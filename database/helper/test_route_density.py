@@ -0,0 +1,120 @@
+"""
+Unit tests for route-density rasters.
+Run with: python -m pytest test_route_density.py
+or: python test_route_density.py
+"""
+
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+import zlib
+import numpy as np
+from route_density import (
+    build_route_density,
+    density_grids,
+    encode_png,
+    load_route_density,
+    route_pairs,
+)
+from route_graph import RouteGraph
+
+AIRPORTS = [
+    {"iata": "AAA", "latitude": 0.25, "longitude": 0.1},
+    {"iata": "BBB", "latitude": 0.25, "longitude": 9.9},
+    {"iata": "CCC", "latitude": 10.25, "longitude": 179.6},
+    {"iata": "DDD", "latitude": 10.25, "longitude": -179.6},
+    {"iata": "EEE", "latitude": None, "longitude": None},
+]
+
+# Three routes between AAA and BBB, one across the antimeridian, one to an
+# airport without coordinates
+ROUTES = [
+    {"source": "AAA", "destination": "BBB", "airline": "XA"},
+    {"source": "AAA", "destination": "BBB", "airline": "XB"},
+    {"source": "BBB", "destination": "AAA", "airline": "XA"},
+    {"source": "CCC", "destination": "DDD", "airline": "XA"},
+    {"source": "AAA", "destination": "EEE", "airline": "XA"},
+]
+
+
+class TestDensityGrids(unittest.TestCase):
+    """Test binning routes into grids"""
+
+    def setUp(self):
+        self.graph = RouteGraph.from_rows(AIRPORTS, ROUTES)
+
+    def test_route_pairs_merge_directions(self):
+        """Test that routes merge per unordered pair and unknown ends are dropped"""
+        lat1, lon1, lat2, lon2, weight = route_pairs(self.graph)
+        self.assertEqual(sorted(weight.tolist()), [1, 3])
+
+    def test_every_crossed_cell_counts_once_per_route(self):
+        """Test the cells of a short east-west route"""
+        (grid,) = density_grids(self.graph, resolutions=(1.0,))
+        self.assertEqual(grid.shape, (180, 360))
+        # Latitude 0.25 is row 89; longitudes 0..10 are columns 180..189
+        self.assertEqual(grid[89, 180:190].tolist(), [3] * 10)
+
+    def test_antimeridian_route_takes_the_short_way(self):
+        """Test that a route across 180° touches only the cells at the edges"""
+        (grid,) = density_grids(self.graph, resolutions=(1.0,))
+        self.assertEqual(grid[79, 359], 1)
+        self.assertEqual(grid[79, 0], 1)
+        self.assertEqual(int(grid.sum()), 30 + 2)
+
+    def test_resolutions_and_processes_agree(self):
+        """Test that finer grids and worker processes give the same totals"""
+        coarse, fine = density_grids(self.graph, resolutions=(1.0, 0.5))
+        self.assertEqual(fine.shape, (360, 720))
+        self.assertEqual(int(fine.sum()), 3 * 20 + 2)
+        parallel = density_grids(self.graph, resolutions=(1.0, 0.5), processes=2)
+        np.testing.assert_array_equal(parallel[0], coarse)
+        np.testing.assert_array_equal(parallel[1], fine)
+
+
+class TestBuildAndLoad(unittest.TestCase):
+    """Test writing and opening the rasters"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.directory = os.path.join(self.tmp, "route_density")
+        self.graph = RouteGraph.from_rows(AIRPORTS, ROUTES)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_missing_rasters(self):
+        """Test that unbuilt rasters load as None"""
+        self.assertIsNone(load_route_density(self.directory))
+
+    def test_build_and_load(self):
+        """Test grids, maximum counts and images after a build"""
+        build_route_density(self.graph, self.directory, resolutions=(1.0, 0.5))
+        density = load_route_density(self.directory)
+
+        self.assertEqual(density.resolutions, [1.0, 0.5])
+        self.assertEqual(density.max_count, {"1": 3, "0.5": 3})
+        self.assertEqual(density.grid(0.5).shape, (360, 720))
+        self.assertTrue(density.png(1.0).startswith(b"\x89PNG\r\n\x1a\n"))
+        with self.assertRaises(KeyError):
+            density.grid(0.25)
+
+    def test_png_layout(self):
+        """Test the PNG header and that empty cells are transparent"""
+        rgba = np.zeros((2, 3, 4), dtype=np.uint8)
+        rgba[0, 1] = [1, 2, 3, 255]
+        png = encode_png(rgba)
+
+        width, height = struct.unpack(">II", png[16:24])
+        self.assertEqual((width, height), (3, 2))
+        idat_length = struct.unpack(">I", png[33:37])[0]
+        raw = zlib.decompress(png[41 : 41 + idat_length])
+        self.assertEqual(len(raw), 2 * (3 * 4 + 1))
+        self.assertEqual(list(raw[5:9]), [1, 2, 3, 255])
+
+
+if __name__ == "__main__":
+    # Run tests
+    unittest.main(verbosity=2)
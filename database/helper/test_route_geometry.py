@@ -0,0 +1,77 @@
+"""
+Unit tests for cached route geometry.
+Run with: python -m pytest test_route_geometry.py
+or: python test_route_geometry.py
+"""
+
+import unittest
+from route_geometry import GeometryCache, feature_collection, plotly_path
+
+JFK_LAX = ("JFK", 40.64, -73.78, "LAX", 33.94, -118.41)
+LAX_JFK = ("LAX", 33.94, -118.41, "JFK", 40.64, -73.78)
+NRT_JFK = ("NRT", 35.76, 140.39, "JFK", 40.64, -73.78)
+
+
+class TestGeometryCache(unittest.TestCase):
+    """Test suite for the per-pair geometry cache"""
+
+    def test_paths_run_from_source_to_destination(self):
+        """Test that both directions share one entry but keep their order"""
+        cache = GeometryCache()
+        outbound, inbound = cache.paths([JFK_LAX, LAX_JFK], points=8)
+
+        self.assertEqual(outbound[0][0], [-73.78, 40.64])
+        self.assertEqual(outbound[-1][-1], [-118.41, 33.94])
+        self.assertEqual(inbound[0][0], [-118.41, 33.94])
+        self.assertEqual(inbound, [part[::-1] for part in reversed(outbound)])
+        self.assertEqual(cache.misses, 1)
+
+    def test_repeated_requests_hit_the_cache(self):
+        """Test that a second request computes nothing"""
+        cache = GeometryCache()
+        first = cache.paths([JFK_LAX, NRT_JFK], points=8)
+        second = cache.paths([JFK_LAX, NRT_JFK], points=8)
+
+        self.assertEqual(first, second)
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+        cache.paths([JFK_LAX], points=16)
+        self.assertEqual(cache.misses, 3)
+
+    def test_cache_is_bounded(self):
+        """Test that the least recently used pairs are evicted"""
+        cache = GeometryCache(max_entries=1)
+        cache.paths([JFK_LAX], points=8)
+        cache.paths([NRT_JFK], points=8)
+        cache.paths([JFK_LAX], points=8)
+        self.assertEqual(cache.misses, 3)
+
+
+class TestGeoJSON(unittest.TestCase):
+    """Test GeoJSON and plotly output"""
+
+    def test_feature_collection(self):
+        """Test LineString and MultiLineString features"""
+        paths = GeometryCache().paths([JFK_LAX, NRT_JFK], points=8)
+        collection = feature_collection(
+            [
+                (path, {"source": pair[0]})
+                for path, pair in zip(paths, [JFK_LAX, NRT_JFK])
+            ]
+        )
+
+        types = [feature["geometry"]["type"] for feature in collection["features"]]
+        self.assertEqual(collection["type"], "FeatureCollection")
+        self.assertEqual(types, ["LineString", "MultiLineString"])
+        self.assertEqual(collection["features"][1]["properties"], {"source": "NRT"})
+
+    def test_plotly_path_separates_parts(self):
+        """Test that parts are separated by None for plotly"""
+        (path,) = GeometryCache().paths([NRT_JFK], points=8)
+        lats, lons = plotly_path(path)
+        self.assertEqual(lats.count(None), 1)
+        self.assertEqual(len(lons), sum(len(part) for part in path) + 1)
+
+
+if __name__ == "__main__":
+    # Run tests
+    unittest.main(verbosity=2)
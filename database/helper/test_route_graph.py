@@ -0,0 +1,138 @@
+"""
+Unit tests for the CSR route graph.
+Run with: python -m pytest test_route_graph.py
+or: python test_route_graph.py
+"""
+
+import unittest
+import numpy as np
+from route_graph import RouteGraph, expand_frontier, reachable
+
+AIRPORTS = [
+    {"iata": "LAX", "latitude": 33.94, "longitude": -118.41},
+    {"iata": "JFK", "latitude": 40.64, "longitude": -73.78},
+    {"iata": "LHR", "latitude": 51.47, "longitude": -0.45},
+]
+
+ROUTES = [
+    {"source": "JFK", "destination": "LHR", "airline": "BA", "distance": 5540.0},
+    {"source": "JFK", "destination": "LAX", "airline": "AA", "distance": 3974.0},
+    {"source": "JFK", "destination": "LAX", "airline": "DL", "distance": 3974.0},
+    {"source": "LHR", "destination": "JFK", "airline": "BA", "distance": None},
+    {"source": "JFK", "destination": "XXX", "airline": "AA", "distance": 1.0},
+]
+
+
+class TestRouteGraph(unittest.TestCase):
+    """Test suite for building route graphs"""
+
+    def setUp(self):
+        self.graph = RouteGraph.from_rows(AIRPORTS, ROUTES)
+
+    def test_airports_are_sorted_and_indexed(self):
+        """Test that airports are numbered in IATA order"""
+        self.assertEqual(self.graph.iata.tolist(), ["JFK", "LAX", "LHR"])
+        self.assertEqual(self.graph.index["LHR"], 2)
+
+    def test_unknown_airports_are_skipped(self):
+        """Test that routes to airports not in the graph are dropped"""
+        self.assertEqual(self.graph.num_routes, 4)
+
+    def test_csr_layout(self):
+        """Test that the routes of each airport are contiguous and sorted"""
+        jfk = self.graph.index["JFK"]
+        start, end = self.graph.indptr[jfk], self.graph.indptr[jfk + 1]
+        destinations = self.graph.iata[self.graph.indices[start:end]].tolist()
+        self.assertEqual(destinations, ["LAX", "LAX", "LHR"])
+        self.assertEqual(self.graph.sources().tolist(), [0, 0, 0, 2])
+
+    def test_edge_attributes(self):
+        """Test that distances and airlines follow the CSR order"""
+        self.assertTrue(np.isnan(self.graph.distance[3]))
+        airlines = self.graph.airline_codes[self.graph.airline].tolist()
+        self.assertEqual(airlines, ["AA", "DL", "BA", "BA"])
+
+    def test_adjacency_merges_parallel_routes(self):
+        """Test that parallel routes are merged in the adjacency matrix"""
+        weighted = self.graph.adjacency(weighted=True).toarray()
+        self.assertEqual(weighted[0, 1], 2)
+        self.assertEqual(self.graph.adjacency().toarray()[0, 1], 1)
+        # The graph's own CSR arrays are left untouched
+        self.assertEqual(self.graph.num_routes, 4)
+        self.assertEqual(self.graph.indices.tolist(), [1, 1, 2, 0])
+
+    def test_expand_frontier(self):
+        """Test expanding several airports at once"""
+        sources, destinations, positions = expand_frontier(
+            self.graph.indptr, self.graph.indices, np.array([0, 2])
+        )
+        self.assertEqual(sources.tolist(), [0, 0, 0, 2])
+        self.assertEqual(destinations.tolist(), [1, 1, 2, 0])
+        self.assertEqual(positions.tolist(), [0, 1, 2, 3])
+
+    def test_expand_empty_frontier(self):
+        """Test expanding airports without routes"""
+        _, destinations, _ = expand_frontier(
+            self.graph.indptr, self.graph.indices, np.array([1])
+        )
+        self.assertEqual(destinations.size, 0)
+
+
+class TestReachable(unittest.TestCase):
+    """Test suite for leg- and distance-bounded reachability"""
+
+    def setUp(self):
+        # A -> B -> C -> D, plus a long direct A -> C and an unknown-distance C -> E
+        airports = [{"iata": code} for code in "ABCDE"]
+        routes = [
+            {"source": "A", "destination": "B", "distance": 100.0},
+            {"source": "B", "destination": "C", "distance": 100.0},
+            {"source": "A", "destination": "C", "distance": 500.0},
+            {"source": "C", "destination": "D", "distance": 100.0},
+            {"source": "C", "destination": "E", "distance": None},
+        ]
+        self.graph = RouteGraph.from_rows(airports, routes)
+
+    def run_bfs(self, max_legs, max_distance=None):
+        graph = self.graph
+        return reachable(
+            graph.indptr,
+            graph.indices,
+            graph.distance,
+            graph.index["A"],
+            max_legs,
+            max_distance,
+        )
+
+    def test_minimal_legs_and_distance(self):
+        """Test that legs and distance are minimized independently"""
+        legs, dist = self.run_bfs(3)
+        self.assertEqual(legs.tolist(), [0, 1, 1, 2, 2])
+        # C is one leg away, but the two-leg path via B is shorter
+        self.assertEqual(dist[:4].tolist(), [0.0, 100.0, 200.0, 300.0])
+        self.assertTrue(np.isinf(dist[4]))
+
+    def test_leg_limit(self):
+        """Test that airports beyond max_legs are unreachable"""
+        legs, dist = self.run_bfs(1)
+        self.assertEqual(legs.tolist(), [0, 1, 1, -1, -1])
+        self.assertEqual(dist[2], 500.0)
+
+    def test_distance_budget(self):
+        """Test that paths over the budget and unknown distances are not used"""
+        legs, dist = self.run_bfs(3, max_distance=250.0)
+        self.assertEqual(legs.tolist(), [0, 1, 2, -1, -1])
+        self.assertEqual(dist[2], 200.0)
+
+    def test_isolated_source(self):
+        """Test starting from an airport without routes"""
+        graph = self.graph
+        legs, _ = reachable(
+            graph.indptr, graph.indices, graph.distance, graph.index["E"], 3
+        )
+        self.assertEqual((legs >= 0).sum(), 1)
+
+
+if __name__ == "__main__":
+    # Run tests
+    unittest.main(verbosity=2)
@@ -0,0 +1,144 @@
+"""
+Unit tests for the route search planner.
+Run with: python -m pytest test_route_search.py
+or: python test_route_search.py
+"""
+
+import unittest
+from route_search import (
+    decode_cursor,
+    encode_cursor,
+    normalize_filters,
+    paginate,
+    plan_route_search,
+)
+
+
+class TestPlanRouteSearch(unittest.TestCase):
+    """Test suite for planning route search queries"""
+
+    def test_anchors_on_airport_iata(self):
+        """Test that an IATA code is used as the index-backed anchor"""
+        query, params = plan_route_search(
+            {"source_country": "Germany", "destination": "lax"}
+        )
+        self.assertIn("(b:Airport {IATA: $destination})", query)
+        self.assertIn("a.Country = $source_country", query)
+        self.assertNotIn("b.IATA = $destination", query)
+        self.assertEqual(params["destination"], "LAX")
+
+    def test_source_iata_beats_destination_iata(self):
+        """Test that the source airport is preferred as anchor"""
+        query, _ = plan_route_search({"source": "JFK", "destination": "LAX"})
+        self.assertIn("(a:Airport {IATA: $source})", query)
+        self.assertIn("b.IATA = $destination", query)
+
+    def test_anchors_on_country(self):
+        """Test that a country is used when no IATA code is given"""
+        query, _ = plan_route_search({"destination_country": "Japan", "stops": 0})
+        self.assertIn("(b:Airport {Country: $destination_country})", query)
+
+    def test_without_anchor(self):
+        """Test a search on route properties only"""
+        query, params = plan_route_search({"airline": "aa", "codeshare": None})
+        self.assertIn("MATCH (a:Airport)-[r:ROUTE]->(b:Airport)", query)
+        self.assertEqual(params, {"airline": "AA", "limit": 51})
+
+    def test_no_index_hints(self):
+        """Test that route properties are filtered without index hints"""
+        query, _ = plan_route_search({"airline": "AA", "max_distance": 500})
+        self.assertIn("r.Airline = $airline", query)
+        self.assertNotIn("USING", query)
+        query, _ = plan_route_search({"min_distance": 10000})
+        self.assertNotIn("USING", query)
+
+    def test_predicate_order(self):
+        """Test that equality predicates come before ranges and substring matches"""
+        query, _ = plan_route_search(
+            {
+                "equipment": "738",
+                "max_distance": 5000,
+                "airline": "AA",
+                "source": "JFK",
+            }
+        )
+        airline = query.index("r.Airline")
+        distance = query.index("r.Distance <=")
+        equipment = query.index("CONTAINS")
+        self.assertLess(airline, distance)
+        self.assertLess(distance, equipment)
+
+    def test_codeshare_flag(self):
+        """Test codeshare filters in both directions"""
+        query, params = plan_route_search({"codeshare": True})
+        self.assertIn("r.Codeshare = 'Y'", query)
+        self.assertNotIn("codeshare", params)
+        query, _ = plan_route_search({"codeshare": False})
+        self.assertIn("coalesce(r.Codeshare, '') <> 'Y'", query)
+
+    def test_sort_direction(self):
+        """Test ascending and descending server-side ordering"""
+        query, _ = plan_route_search({}, sort="-distance")
+        self.assertIn("ORDER BY sort_value DESC, route_id DESC", query)
+        query, _ = plan_route_search({}, sort="airline")
+        self.assertIn("coalesce(r.Airline, '') AS sort_value", query)
+        self.assertIn("ORDER BY sort_value ASC, route_id ASC", query)
+
+    def test_cursor_adds_keyset_condition(self):
+        """Test that a cursor continues after the last row of the previous page"""
+        cursor = encode_cursor("-distance", 3974.0, "5:abc:42")
+        query, params = plan_route_search({}, sort="-distance", cursor=cursor)
+        self.assertIn("sort_value < $after_value", query)
+        self.assertEqual(params["after_value"], 3974.0)
+        self.assertEqual(params["after_id"], "5:abc:42")
+
+    def test_invalid_input(self):
+        """Test that invalid filters, sorts, limits and cursors are rejected"""
+        with self.assertRaises(ValueError):
+            plan_route_search({"color": "red"})
+        with self.assertRaises(ValueError):
+            plan_route_search({}, sort="price")
+        with self.assertRaises(ValueError):
+            plan_route_search({}, limit=0)
+        with self.assertRaises(ValueError):
+            plan_route_search({}, cursor="not-a-cursor")
+        with self.assertRaises(ValueError):
+            plan_route_search(
+                {}, sort="distance", cursor=encode_cursor("stops", 0, "id")
+            )
+
+
+class TestPagination(unittest.TestCase):
+    """Test suite for cursors and pages"""
+
+    def test_cursor_round_trip(self):
+        """Test encoding and decoding a cursor"""
+        cursor = encode_cursor("source", "JFK", "5:abc:1")
+        self.assertEqual(decode_cursor(cursor, "source"), ("JFK", "5:abc:1"))
+
+    def test_paginate(self):
+        """Test that the extra row produces a cursor and internal columns are dropped"""
+        rows = [
+            {"source": "JFK", "sort_value": 100.0, "route_id": "1"},
+            {"source": "JFK", "sort_value": 200.0, "route_id": "2"},
+            {"source": "JFK", "sort_value": 300.0, "route_id": "3"},
+        ]
+        routes, cursor = paginate(rows, 2, "distance")
+        self.assertEqual(routes, [{"source": "JFK"}, {"source": "JFK"}])
+        self.assertEqual(decode_cursor(cursor, "distance"), (200.0, "2"))
+
+        routes, cursor = paginate(rows, 3, "distance")
+        self.assertEqual(len(routes), 3)
+        self.assertIsNone(cursor)
+
+    def test_normalize_filters(self):
+        """Test that codes are upper-cased and equipment is padded"""
+        params = normalize_filters(
+            {"airline": " ua ", "equipment": "738", "stops": "1"}
+        )
+        self.assertEqual(params, {"airline": "UA", "equipment": " 738 ", "stops": 1})
+
+
+if __name__ == "__main__":
+    # Run tests
+    unittest.main(verbosity=2)
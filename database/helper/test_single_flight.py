@@ -0,0 +1,112 @@
+"""
+Unit tests for single-flight call coalescing.
+Run with: python -m pytest test_single_flight.py
+or: python test_single_flight.py
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from single_flight import SingleFlight, flight_key
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test suite for coalescing concurrent calls"""
+
+    def slow_call(self, calls, release):
+        def fn():
+            calls.append(1)
+            release.wait(5)
+            return ["row"]
+
+        return fn
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Test that identical concurrent calls run once and share the result"""
+        flight = SingleFlight()
+        calls, release = [], threading.Event()
+        fn = self.slow_call(calls, release)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(flight.do, "k", fn) for _ in range(8)]
+            while flight.in_flight() == 0:
+                time.sleep(0.001)
+            time.sleep(0.05)
+            release.set()
+            results = [future.result() for future in futures]
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result == ["row"] for result, _ in results))
+        self.assertEqual(sum(not shared for _, shared in results), 1)
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_sequential_calls_are_not_cached(self):
+        """Test that a finished call is run again for the next caller"""
+        flight = SingleFlight()
+        counter = iter(range(10))
+        self.assertEqual(flight.do("k", lambda: next(counter)), (0, False))
+        self.assertEqual(flight.do("k", lambda: next(counter)), (1, False))
+
+    def test_errors_are_shared(self):
+        """Test that waiters receive the leader's exception"""
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def fail():
+            release.wait(5)
+            raise RuntimeError("database down")
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [pool.submit(flight.do, "k", fail) for _ in range(3)]
+            while flight.in_flight() == 0:
+                time.sleep(0.001)
+            time.sleep(0.05)
+            release.set()
+            for future in futures:
+                with self.assertRaises(RuntimeError):
+                    future.result()
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_async_calls_share_one_execution(self):
+        """Test that coroutines awaiting the same key share one call"""
+        flight = SingleFlight()
+        calls = []
+
+        def fn():
+            calls.append(1)
+            time.sleep(0.05)
+            return 42
+
+        async def main():
+            return await asyncio.gather(*(flight.do_async("k", fn) for _ in range(5)))
+
+        results = asyncio.run(main())
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([result for result, _ in results], [42] * 5)
+        self.assertEqual(sum(shared for _, shared in results), 4)
+
+
+class TestFlightKey(unittest.TestCase):
+    """Test key normalization"""
+
+    def test_parameter_order_is_ignored(self):
+        """Test that parameter order does not change the key"""
+        self.assertEqual(
+            flight_key("q", params={"iata": "JFK", "limit": 50}),
+            flight_key("q", params={"limit": 50, "iata": "JFK"}),
+        )
+
+    def test_different_values_differ(self):
+        """Test that different parameters or parts give different keys"""
+        self.assertNotEqual(
+            flight_key("q", params={"limit": 50}),
+            flight_key("q", params={"limit": 51}),
+        )
+        self.assertNotEqual(flight_key("a", params={}), flight_key("b", params={}))
+
+
+if __name__ == "__main__":
+    # Run tests
+    unittest.main(verbosity=2)
@@ -0,0 +1,82 @@
+"""
+Unit tests for the stage profiler.
+Run with: python -m pytest test_stage_profiler.py
+or: python test_stage_profiler.py
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from stage_profiler import StageProfiler
+
+
+class TestStageProfiler(unittest.TestCase):
+    """Test suite for StageProfiler"""
+
+    def test_stage_records_rows_and_time(self):
+        """Test that a stage records its rows and a positive wall time"""
+        profiler = StageProfiler()
+
+        with profiler.stage("parse") as stage:
+            sum(range(10000))
+            stage.rows = 500
+
+        record = profiler.stages[0]
+        self.assertEqual(record.name, "parse")
+        self.assertEqual(record.rows, 500)
+        self.assertGreater(record.wall_s, 0)
+        self.assertGreater(record.rows_per_s, 0)
+
+    def test_nested_stages(self):
+        """Test that nested stages record their depth"""
+        profiler = StageProfiler()
+
+        with profiler.stage("prepare routes"):
+            with profiler.stage("distances"):
+                pass
+
+        self.assertEqual([s.depth for s in profiler.stages], [0, 1])
+        self.assertIn("  distances", profiler.report())
+
+    def test_failed_stage_is_recorded(self):
+        """Test that an exception is recorded on the stage and re-raised"""
+        profiler = StageProfiler()
+
+        with self.assertRaises(ValueError):
+            with profiler.stage("upload"):
+                raise ValueError("boom")
+
+        self.assertEqual(profiler.stages[0].error, "ValueError: boom")
+
+    def test_write_json(self):
+        """Test that the JSON report contains every stage"""
+        profiler = StageProfiler()
+        with profiler.stage("download") as stage:
+            stage.retries = 2
+            stage.failed_batches = 1
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile.json")
+            profiler.write_json(path)
+            with open(path) as file:
+                report = json.load(file)
+
+        self.assertEqual(report["stages"][0]["name"], "download")
+        self.assertEqual(report["stages"][0]["retries"], 2)
+        self.assertEqual(report["stages"][0]["failed_batches"], 1)
+
+    def test_cprofile_dump(self):
+        """Test that top-level stages are dumped when a profile directory is set"""
+        with tempfile.TemporaryDirectory() as directory:
+            profiler = StageProfiler(profile_dir=directory)
+            with profiler.stage("Upload Routes"):
+                with profiler.stage("batch"):
+                    pass
+
+            self.assertEqual(os.listdir(directory), ["01-Upload_Routes.prof"])
+
+
+if __name__ == "__main__":
+    # Run tests
+    unittest.main(verbosity=2)
@@ -0,0 +1,81 @@
+"""
+Unit tests for staged directory builds.
+Run with: python -m pytest test_staged_directory.py
+or: python test_staged_directory.py
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from staged_directory import (
+    load_cached_manifest,
+    read_manifest,
+    stage_directory,
+    swap_in,
+    write_manifest,
+)
+
+
+class TestStagedDirectory(unittest.TestCase):
+    """Test suite for building, swapping and reading directories"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.directory = os.path.join(self.tmp, "build")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def build(self, version):
+        staging = stage_directory(self.directory)
+        write_manifest(staging, "manifest.json", {"version": version})
+        swap_in(staging, self.directory)
+
+    def test_swap_replaces_directory(self):
+        """Test that a build replaces the previous one and leaves no staging"""
+        self.build(1)
+        self.build(2)
+        self.assertEqual(read_manifest(self.directory, "manifest.json")["version"], 2)
+        self.assertIn("built_at", read_manifest(self.directory, "manifest.json"))
+        self.assertEqual(os.listdir(self.tmp), ["build"])
+
+    def test_missing_build(self):
+        """Test that a directory that was never built reads as None"""
+        self.assertIsNone(read_manifest(self.directory, "manifest.json"))
+        self.assertIsNone(load_cached_manifest(self.directory, "manifest.json", dict))
+
+    def test_cached_until_manifest_changes(self):
+        """Test that the opened build is reused until a rebuild"""
+        calls = []
+
+        def factory(manifest):
+            calls.append(manifest["version"])
+            return manifest["version"]
+
+        self.build(1)
+        self.assertEqual(
+            load_cached_manifest(self.directory, "manifest.json", factory), 1
+        )
+        self.assertEqual(
+            load_cached_manifest(self.directory, "manifest.json", factory), 1
+        )
+        self.assertEqual(calls, [1])
+
+        self.build(2)
+        os.utime(os.path.join(self.directory, "manifest.json"), (1, 1))
+        self.assertEqual(
+            load_cached_manifest(self.directory, "manifest.json", factory), 2
+        )
+
+        # While a rebuild has moved the directory away the last build is served
+        os.rename(self.directory, f"{self.directory}.old")
+        self.assertEqual(
+            load_cached_manifest(self.directory, "manifest.json", factory), 2
+        )
+        self.assertEqual(calls, [1, 2])
+
+
+if __name__ == "__main__":
+    # Run tests
+    unittest.main(verbosity=2)
@@ -0,0 +1,108 @@
+"""
+Unit tests for the all-pairs stops matrix.
+Run with: python -m pytest test_stops_matrix.py
+or: python test_stops_matrix.py
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from route_graph import RouteGraph
+from stops_matrix import (
+    UNREACHABLE,
+    build_stops_matrix,
+    distance_adjacency,
+    load_stops_matrix,
+)
+
+AIRPORTS = [{"iata": code} for code in ["AAA", "BBB", "CCC", "DDD", "EEE"]]
+
+# AAA -> BBB -> CCC -> AAA, a long direct AAA -> CCC, and an isolated DDD -> EEE
+ROUTES = [
+    {"source": "AAA", "destination": "BBB", "distance": 100.0},
+    {"source": "BBB", "destination": "CCC", "distance": 100.0},
+    {"source": "CCC", "destination": "AAA", "distance": 150.0},
+    {"source": "AAA", "destination": "CCC", "distance": 500.0},
+    {"source": "AAA", "destination": "CCC", "distance": 450.0},
+    {"source": "DDD", "destination": "EEE", "distance": None},
+]
+
+
+class TestStopsMatrix(unittest.TestCase):
+    """Test suite for building and querying the stops matrix"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.directory = os.path.join(self.tmp, "stops_matrix")
+        self.graph = RouteGraph.from_rows(AIRPORTS, ROUTES)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_distance_adjacency_keeps_shortest_parallel_route(self):
+        """Test that parallel routes collapse to the shortest one"""
+        matrix = distance_adjacency(self.graph).toarray()
+        self.assertEqual(matrix[0, 2], 450.0)
+        # Unknown distances are left out
+        self.assertEqual(matrix[3, 4], 0.0)
+
+    def test_build_and_lookup(self):
+        """Test minimal legs and distance for a batch of pairs"""
+        stats = build_stops_matrix(self.graph, self.directory)
+        self.assertEqual(stats["rows_recomputed"], 5)
+
+        matrix = load_stops_matrix(self.directory)
+        legs, distance = matrix.lookup(
+            ["AAA", "BBB", "AAA", "DDD", "AAA", "XXX"],
+            ["CCC", "AAA", "AAA", "EEE", "DDD", "AAA"],
+        )
+        self.assertEqual(legs, [1, 2, 0, 1, None, None])
+        self.assertEqual(distance, [200.0, 250.0, 0.0, None, None, None])
+
+    def test_matrix_dtypes(self):
+        """Test the compact on-disk representation"""
+        build_stops_matrix(self.graph, self.directory)
+        matrix = load_stops_matrix(self.directory)
+        self.assertEqual(matrix.legs.dtype, np.uint8)
+        self.assertEqual(matrix.distance.dtype, np.float32)
+        self.assertIsInstance(matrix.legs, np.memmap)
+        self.assertEqual(matrix.legs[0, 3], UNREACHABLE)
+
+    def test_missing_matrix(self):
+        """Test that an unbuilt matrix loads as None"""
+        self.assertIsNone(load_stops_matrix(os.path.join(self.tmp, "missing")))
+
+    def test_incremental_rebuild_matches_full_build(self):
+        """Test that an incremental rebuild recomputes only affected rows"""
+        build_stops_matrix(self.graph, self.directory)
+
+        # New airport FFF reachable from DDD only; AAA..CCC cannot reach DDD
+        routes = ROUTES + [{"source": "DDD", "destination": "FFF", "distance": 80.0}]
+        graph = RouteGraph.from_rows(AIRPORTS + [{"iata": "FFF"}], routes)
+        stats = build_stops_matrix(graph, self.directory)
+        self.assertEqual(stats["rows_recomputed"], 2)
+
+        full_directory = os.path.join(self.tmp, "full")
+        build_stops_matrix(graph, full_directory, incremental=False)
+        incremental = load_stops_matrix(self.directory)
+        full = load_stops_matrix(full_directory)
+        np.testing.assert_array_equal(incremental.legs, full.legs)
+        np.testing.assert_array_equal(incremental.distance, full.distance)
+        self.assertEqual(incremental.lookup(["DDD"], ["FFF"])[0], [1])
+
+    def test_parallel_build_matches_serial_build(self):
+        """Test building with several worker processes"""
+        build_stops_matrix(self.graph, self.directory, incremental=False)
+        parallel_directory = os.path.join(self.tmp, "parallel")
+        build_stops_matrix(self.graph, parallel_directory, processes=2)
+        serial = load_stops_matrix(self.directory)
+        parallel = load_stops_matrix(parallel_directory)
+        np.testing.assert_array_equal(serial.legs, parallel.legs)
+        np.testing.assert_array_equal(serial.distance, parallel.distance)
+
+
+if __name__ == "__main__":
+    # Run tests
+    unittest.main(verbosity=2)
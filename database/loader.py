@@ -3,6 +3,7 @@ import pandas as pd
 import os
 import sys
 import time
+import uuid
 from io import StringIO
 import requests
 import certifi
@@ -11,6 +12,21 @@ from dotenv import load_dotenv
 # Add helper directory to path for distance calculations
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "helper"))
 from distance import calculate_distance_km
+from data_quality import validate_datasets, write_quality_report
+from stage_profiler import StageProfiler
+from graph_snapshot import (
+    SNAPSHOT_PATH,
+    open_snapshot,
+    remove_snapshot,
+    snapshot_from_neo4j,
+    snapshot_is_current,
+    write_snapshot,
+)
+from markets import assign_markets, load_metro_areas
+from route_graph import RouteGraph
+from compute_stops_matrix import update_stops_matrix
+from compute_route_density import update_route_density
+from compute_competition import update_competition
 
 # Load environment variables from .env file
 load_dotenv()
@@ -24,6 +40,48 @@ BATCH_SIZE = int(os.getenv("BATCH_SIZE", "100"))  # Process in batches
 MAX_RETRIES = int(os.getenv("MAX_RETRIES", "3"))  # Retry failed operations
 RETRY_DELAY = int(os.getenv("RETRY_DELAY", "2"))  # Seconds between retries
 
+# Configuration for the stage profiling report
+LOADER_PROFILE_PATH = os.getenv(
+    "LOADER_PROFILE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "loader_profile.json"),
+)
+LOADER_PROFILE_DIR = os.getenv("LOADER_PROFILE_DIR")  # Dump a profile per stage
+LOADER_PROFILER = os.getenv("LOADER_PROFILER", "cprofile")  # or "pyinstrument"
+
+SCHEMA_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "cypher", "schema.cypher"
+)
+FLEET_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "cypher", "build_fleet.cypher"
+)
+CODESHARE_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "cypher", "build_codeshare.cypher"
+)
+AIRLINE_STATS_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "cypher", "build_airline_stats.cypher"
+)
+MARKETS_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "cypher", "build_markets.cypher"
+)
+ROUTE_COUNTS_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "cypher", "build_route_counts.cypher"
+)
+RECORD_LOAD_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "cypher", "record_load.cypher"
+)
+
+# Write the memory-mapped graph snapshot after the upload (0 disables)
+SNAPSHOT_WRITE = os.getenv("SNAPSHOT_WRITE", "1") == "1"
+
+# Update the all-pairs stops matrix after the upload (0 disables)
+STOPS_MATRIX_REBUILD = os.getenv("STOPS_MATRIX_REBUILD", "1") == "1"
+
+# Rebuild the route-density rasters after the upload (0 disables)
+ROUTE_DENSITY_REBUILD = os.getenv("ROUTE_DENSITY_REBUILD", "1") == "1"
+
+# Rebuild the airport-pair x airline competition matrix (0 disables)
+COMPETITION_REBUILD = os.getenv("COMPETITION_REBUILD", "1") == "1"
+
 OPENFLIGHTS_BASE_URL = (
     "https://raw.githubusercontent.com/jpatokal/openflights/master/data/"
 )
@@ -90,19 +148,129 @@ driver = GraphDatabase.driver(
 )
 
 
+profiler = StageProfiler(profile_dir=LOADER_PROFILE_DIR, profiler=LOADER_PROFILER)
+
+
 def load_query_from_file(filepath):
     with open(filepath, "r") as file:
         return file.read()
 
 
-def load_openflights_dataframe(dataset_key):
+def load_statements_from_file(filepath):
+    """Split a Cypher file into statements, dropping // comment lines"""
+    lines = [
+        line
+        for line in load_query_from_file(filepath).splitlines()
+        if not line.strip().startswith("//")
+    ]
+    return [
+        statement.strip()
+        for statement in "\n".join(lines).split(";")
+        if statement.strip()
+    ]
+
+
+def run_cypher_file(filepath, parameters=None):
+    """Run every statement of a Cypher file in order, each in its own transaction"""
+    statements = load_statements_from_file(filepath)
+    with driver.session() as session:
+        for statement in statements:
+            session.run(statement, parameters or {}).consume()
+    return len(statements)
+
+
+def create_schema(schema_file=SCHEMA_FILE):
+    """Create the indexes in cypher/schema.cypher and wait until they are online"""
+    count = run_cypher_file(schema_file)
+    with driver.session() as session:
+        session.run("CALL db.awaitIndexes(300)").consume()
+    return count
+
+
+def build_fleet_summary(fleet_file=FLEET_FILE):
+    """Rebuild Aircraft nodes and per-airline FLIES summaries from ROUTE.Equipment"""
+    run_cypher_file(fleet_file)
+    with driver.session() as session:
+        record = session.run(
+            "MATCH (ac:Aircraft) WHERE ac.RouteCount > 0 RETURN count(ac) AS types"
+        ).single()
+    return record["types"]
+
+
+def classify_codeshares(codeshare_file=CODESHARE_FILE):
+    """
+    Mark every route as operated or marketed (codeshare) and link marketed
+    routes to the airline operating the flight
+    """
+    run_cypher_file(codeshare_file)
+    with driver.session() as session:
+        record = session.run(
+            "MATCH ()-[r:ROUTE]->() WHERE r.Operated = false "
+            "RETURN count(r) AS marketed, count(r.OperatedBy) AS linked"
+        ).single()
+    return record["marketed"], record["linked"]
+
+
+def build_route_counts(counts_file=ROUTE_COUNTS_FILE):
+    """
+    Recompute the route counts stored on every Airport node and the
+    operated route total on the Dataset node
+    """
+    run_cypher_file(counts_file)
+    with driver.session() as session:
+        record = session.run(
+            "MATCH (a:Airport) WHERE a.RouteCount > 0 RETURN count(a) AS airports"
+        ).single()
+    return record["airports"]
+
+
+def build_airline_stats(stats_file=AIRLINE_STATS_FILE):
+    """Recompute the route statistics stored on every Airline node"""
+    run_cypher_file(stats_file)
+    with driver.session() as session:
+        record = session.run(
+            "MATCH (al:Airline) WHERE al.RouteCount > 0 RETURN count(al) AS airlines"
+        ).single()
+    return record["airlines"]
+
+
+def build_markets(airports_df, markets_file=MARKETS_FILE):
+    """
+    Group airports into city/metro markets and aggregate the routes between
+    every two markets
+    """
+    markets = assign_markets(
+        airports_df[["IATA", "City", "Country"]].to_dict(orient="records"),
+        load_metro_areas(),
+    )
+    run_cypher_file(markets_file, {"markets": markets})
+    with driver.session() as session:
+        record = session.run(
+            "MATCH ()-[mr:MARKET_ROUTE]->() RETURN count(mr) AS pairs"
+        ).single()
+    return len(markets), record["pairs"]
+
+
+def record_load(load_id, record_file=RECORD_LOAD_FILE):
+    """
+    Store the id of a completed load on the Dataset node; a graph snapshot
+    is only used while its load id matches
+    """
+    run_cypher_file(record_file, {"load_id": load_id})
+
+
+def download_openflights_dataset(dataset_key):
     config = OPENFLIGHTS_DATASETS[dataset_key]
     url = f"{OPENFLIGHTS_BASE_URL}{config['filename']}"
     response = requests.get(url, timeout=30, verify=certifi.where())
     response.raise_for_status()
-    buffer = StringIO(response.content.decode("utf-8", errors="replace"))
+    return response.content.decode("utf-8", errors="replace")
+
+
+def parse_openflights_dataset(dataset_key, content):
+    config = OPENFLIGHTS_DATASETS[dataset_key]
     df = pd.read_csv(
-        buffer,
+        StringIO(content),
         names=config["columns"],
         header=None,
         na_values=["\\N", ""],
@@ -112,6 +280,12 @@ def load_openflights_dataframe(dataset_key):
     return df.where(pd.notnull(df), None)
 
 
+def load_openflights_dataframe(dataset_key):
+    return parse_openflights_dataset(
+        dataset_key, download_openflights_dataset(dataset_key)
+    )
+
+
 def harmonize_codes(df, primary_col, fallback_col):
     df[primary_col] = df[primary_col].apply(
         lambda value: value.strip().upper() if value else value
@@ -245,7 +419,9 @@ def prepare_routes(df, airlines_df, airports_df):
 
     # Add Distance column
     print("Calculating route distances...")
-    filtered["Distance"] = filtered.apply(calculate_route_distance, axis=1)
+    with profiler.stage("Calculate distances") as stage:
+        filtered["Distance"] = filtered.apply(calculate_route_distance, axis=1)
+        stage.rows = len(filtered)
 
     # Log statistics
     total_routes = len(filtered)
@@ -261,8 +437,71 @@ def prepare_routes(df, airlines_df, airports_df):
     return filtered.where(pd.notnull(filtered), None)
 
 
-def execute_query(dataframe, cypher_file):
-    """Execute queries in batches with retry logic"""
+def build_snapshot(
+    airports_df, airlines_df, routes_df, load_id, failed=0, path=SNAPSHOT_PATH
+):
+    """
+    Write the graph snapshot from the prepared dataframes.
+
+    Mirrors what the Cypher load files create: one airport and airline per
+    IATA code (the last row wins) and one route per source, destination and
+    airline (the first row wins), only between known airports and airlines.
+    If upload records failed, or the result does not match Neo4j (e.g. routes
+    left over from an earlier load), the snapshot is rewritten from Neo4j.
+    """
+    metadata = {"source": "openflights", "load_id": load_id}
+    airports = airports_df.drop_duplicates(subset=["IATA"], keep="last")
+    airlines = airlines_df.drop_duplicates(subset=["IATA"], keep="last")
+    routes = routes_df[routes_df["Airline"].isin(set(airlines["IATA"]))]
+    routes = routes.drop_duplicates(
+        subset=["Source airport", "Destination airport", "Airline"]
+    )
+
+    graph = RouteGraph.from_rows(
+        (
+            {"iata": row.IATA, "latitude": row.Latitude, "longitude": row.Longitude}
+            for row in airports.itertuples(index=False)
+        ),
+        (
+            {
+                "source": source,
+                "destination": destination,
+                "airline": airline,
+                "distance": distance,
+                "stops": int(stops),
+                # As build_codeshare.cypher classifies the route
+                "operated": codeshare != "Y",
+            }
+            for source, destination, airline, distance, stops, codeshare in zip(
+                routes["Source airport"],
+                routes["Destination airport"],
+                routes["Airline"],
+                routes["Distance"],
+                routes["Stops"],
+                routes["Codeshare"],
+            )
+        ),
+    )
+    write_snapshot(
+        path,
+        graph,
+        airports.to_dict(orient="records"),
+        airlines.to_dict(orient="records"),
+        metadata=metadata,
+    )
+    if failed or not snapshot_is_current(open_snapshot(path), driver):
+        print("  ⚠ Snapshot differs from Neo4j, rereading the graph from Neo4j")
+        graph = snapshot_from_neo4j(driver, path, metadata=metadata)
+    return graph
+
+
+def execute_query(dataframe, cypher_file, stage=None):
+    """
+    Execute queries in batches with retry logic.
+
+    If a profiler stage record is given, it is updated with the number of
+    processed records, retries and failed batches.
+    """
     query = load_query_from_file(cypher_file)
     total_records = len(dataframe)
     records = dataframe.to_dict(orient="records")
@@ -295,6 +534,8 @@ def execute_query(dataframe, cypher_file):
 
             except Exception as e:
                 retry_count += 1
+                if stage is not None:
+                    stage.retries += 1
                 if retry_count < MAX_RETRIES:
                     print(
                         f"  ⚠ Batch {batch_num} failed (attempt {retry_count}/{MAX_RETRIES}): {str(e)[:100]}"
@@ -306,10 +547,15 @@ def execute_query(dataframe, cypher_file):
                         f"  ✗ Batch {batch_num} failed after {MAX_RETRIES} attempts: {str(e)[:100]}"
                     )
                     failed += len(batch)
+                    if stage is not None:
+                        stage.failed_batches += 1
 
     if failed > 0:
         print(f"  ⚠ Warning: {failed:,} records failed to upload")
 
+    if stage is not None:
+        stage.rows = processed
+
     return processed, failed
 
 
@@ -345,41 +591,129 @@ if __name__ == "__main__":
 
         base_dir = os.path.dirname(os.path.abspath(__file__))
 
+        print("\nCreating indexes...")
+        with profiler.stage("Create indexes") as stage:
+            stage.rows = create_schema()
+        print(f"  ✓ {stage.rows} indexes ready")
+
         print("\nLoading and preparing data...")
-        airports_df = prepare_airports(load_openflights_dataframe("airports"))
+        raw = {}
+        for dataset_key in OPENFLIGHTS_DATASETS:
+            with profiler.stage(f"Download {dataset_key}") as stage:
+                content = download_openflights_dataset(dataset_key)
+                stage.rows = content.count("\n")
+            with profiler.stage(f"Parse {dataset_key}") as stage:
+                raw[dataset_key] = parse_openflights_dataset(dataset_key, content)
+                stage.rows = len(raw[dataset_key])
+
+        with profiler.stage("Prepare airports") as stage:
+            airports_df = prepare_airports(raw["airports"])
+            stage.rows = len(airports_df)
         print(f"  ✓ Airports: {len(airports_df):,} records prepared")
 
-        airlines_df = prepare_airlines(load_openflights_dataframe("airlines"))
+        with profiler.stage("Prepare airlines") as stage:
+            airlines_df = prepare_airlines(raw["airlines"])
+            stage.rows = len(airlines_df)
         print(f"  ✓ Airlines: {len(airlines_df):,} records prepared")
 
-        routes_df = prepare_routes(
-            load_openflights_dataframe("routes"), airlines_df, airports_df
-        )
+        with profiler.stage("Prepare routes") as stage:
+            routes_df = prepare_routes(raw["routes"], airlines_df, airports_df)
+            stage.rows = len(routes_df)
         print(f"  ✓ Routes: {len(routes_df):,} records prepared")
 
-        print("\n" + "=" * 70)
-        print("Uploading Airports...")
-        print("=" * 70)
-        processed, failed = execute_query(
-            airports_df,
-            os.path.join(base_dir, OPENFLIGHTS_DATASETS["airports"]["cypher"]),
-        )
-
-        print("\n" + "=" * 70)
-        print("Uploading Airlines...")
-        print("=" * 70)
-        processed, failed = execute_query(
-            airlines_df,
-            os.path.join(base_dir, OPENFLIGHTS_DATASETS["airlines"]["cypher"]),
-        )
-
-        print("\n" + "=" * 70)
-        print("Uploading Routes...")
-        print("=" * 70)
-        processed, failed = execute_query(
-            routes_df,
-            os.path.join(base_dir, OPENFLIGHTS_DATASETS["routes"]["cypher"]),
-        )
+        print("\nValidating data...")
+        with profiler.stage("Validate data") as stage:
+            kept, rejected, report = validate_datasets(
+                airports_df, airlines_df, routes_df
+            )
+            airports_df = kept["airports"]
+            airlines_df = kept["airlines"]
+            routes_df = kept["routes"]
+            report_path = write_quality_report(report, rejected)
+            stage.rows = sum(len(frame) for frame in rejected.values())
+        for dataset_key, summary in report["datasets"].items():
+            print(
+                f"  ✓ {dataset_key.capitalize()}: {summary['kept']:,} kept, "
+                f"{summary['rejected']:,} quarantined {summary['reasons'] or ''}"
+            )
+        print(f"  ✓ Quality report written to {report_path}")
+
+        # The old snapshot no longer describes the database from here on
+        load_id = uuid.uuid4().hex
+        remove_snapshot()
+        upload_failed = 0
+
+        for dataset_key, dataframe in (
+            ("airports", airports_df),
+            ("airlines", airlines_df),
+            ("routes", routes_df),
+        ):
+            print("\n" + "=" * 70)
+            print(f"Uploading {dataset_key.capitalize()}...")
+            print("=" * 70)
+            with profiler.stage(f"Upload {dataset_key}") as stage:
+                processed, failed = execute_query(
+                    dataframe,
+                    os.path.join(base_dir, OPENFLIGHTS_DATASETS[dataset_key]["cypher"]),
+                    stage,
+                )
+            upload_failed += failed
+
+        print("\nClassifying codeshares...")
+        with profiler.stage("Classify codeshares") as stage:
+            stage.rows, linked = classify_codeshares()
+        print(f"  ✓ {stage.rows:,} codeshare routes, {linked:,} linked to an operator")
+
+        print("\nBuilding route counts...")
+        with profiler.stage("Build route counts") as stage:
+            stage.rows = build_route_counts()
+        print(f"  ✓ {stage.rows:,} airports with routes")
+
+        print("\nBuilding fleet summary...")
+        with profiler.stage("Build fleet summary") as stage:
+            stage.rows = build_fleet_summary()
+        print(f"  ✓ {stage.rows} aircraft types")
+
+        print("\nBuilding airline stats...")
+        with profiler.stage("Build airline stats") as stage:
+            stage.rows = build_airline_stats()
+        print(f"  ✓ {stage.rows} airlines with routes")
+
+        print("\nBuilding markets...")
+        with profiler.stage("Build markets") as stage:
+            markets, stage.rows = build_markets(airports_df)
+        print(f"  ✓ {markets:,} markets, {stage.rows:,} market pairs with routes")
+
+        record_load(load_id)
+
+        # Without a snapshot the jobs below read the graph from Neo4j
+        graph = None
+        if SNAPSHOT_WRITE:
+            print("\nWriting graph snapshot...")
+            with profiler.stage("Write snapshot") as stage:
+                graph = build_snapshot(
+                    airports_df, airlines_df, routes_df, load_id, upload_failed
+                )
+                stage.rows = graph.num_routes
+            print(f"  ✓ Snapshot written to {os.path.abspath(SNAPSHOT_PATH)}")
+
+        if STOPS_MATRIX_REBUILD:
+            print("\nUpdating stops matrix...")
+            with profiler.stage("Update stops matrix") as stage:
+                stats = update_stops_matrix(driver, graph=graph)
+                stage.rows = stats["rows_recomputed"]
+
+        if ROUTE_DENSITY_REBUILD:
+            print("\nBuilding route density rasters...")
+            with profiler.stage("Build route density") as stage:
+                stats = update_route_density(driver, graph=graph)
+                stage.rows = stats["routes"]
+
+        if COMPETITION_REBUILD:
+            print("\nBuilding competition matrix...")
+            with profiler.stage("Build competition matrix") as stage:
+                stats = update_competition(driver, graph=graph)
+                stage.rows = stats["pairs"]
 
         print("\n" + "=" * 70)
         print("✅ Data upload completed successfully!")
@@ -393,6 +727,14 @@ if __name__ == "__main__":
 
         traceback.print_exc()
     finally:
+        if profiler.stages:
+            print("\n" + "=" * 70)
+            print("Loader profile")
+            print("=" * 70)
+            print(profiler.report())
+            profiler.write_json(LOADER_PROFILE_PATH)
+            print(f"\nProfile written to {LOADER_PROFILE_PATH}")
+
         print("\nClosing database connection...")
         driver.close()
         print("Done.")
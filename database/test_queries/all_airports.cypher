@@ -1,3 +1,4 @@
+// plan-check: allow NodeByLabelScan (first rows of an unfiltered listing)
 MATCH (a:Airport)
 RETURN a.IATA AS Code, a.Name AS Name, a.City AS City, a.Country AS Country
 LIMIT 10
\ No newline at end of file
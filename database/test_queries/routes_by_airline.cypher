@@ -1,2 +1,4 @@
-MATCH (al:Airline {IATA: 'AA'})-[:OPERATES]->(r:ROUTE)
-RETURN r.source AS From, r.destination AS To, al.Name AS Airline
+MATCH (al:Airline {IATA: 'AA'})
+MATCH (source:Airport)-[r:ROUTE]->(dest:Airport)
+WHERE r.Airline = al.IATA
+RETURN source.IATA AS From, dest.IATA AS To, al.Name AS Airline
\ No newline at end of file
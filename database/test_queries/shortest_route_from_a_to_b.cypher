@@ -1,5 +1,5 @@
-MATCH (a:Airport {IATA: 'JFK'})-[:ROUTE*]->(b:Airport {IATA: 'LAX'})
-WITH a, b, REDUCE(total_distance = 0, r IN RELATIONSHIPS(p) | total_distance + r.distance) AS total_distance, p
+MATCH p = (a:Airport {IATA: 'JFK'})-[:ROUTE*..3]->(b:Airport {IATA: 'LAX'})
+WITH a, b, REDUCE(total_distance = 0, r IN RELATIONSHIPS(p) | total_distance + r.Distance) AS total_distance, p
 ORDER BY total_distance ASC
 RETURN a.IATA AS From, b.IATA AS To, total_distance, nodes(p) AS Stops
 LIMIT 1
\ No newline at end of file